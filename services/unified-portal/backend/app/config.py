@@ -2,7 +2,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
-from typing import List
+from typing import Dict, List
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -37,6 +37,37 @@ class Settings(BaseSettings):
     blog_db_user: str = "root"
     blog_db_password: str = "password"
 
+    # WordPress container (wp-cli)
+    wordpress_container_name: str = "blog-wordpress"
+    wp_cli_workers: int = 4
+    wp_cli_user: str = "www-data"
+
+    # Async execution layer (concurrent calls per target, file I/O and long-scan threads)
+    exec_limit_docker: int = 8
+    exec_limit_wp_cli: int = 4
+    exec_limit_mysql: int = 4
+    file_io_workers: int = 8
+    scan_workers: int = 2
+
+    # WordPress site health crawler
+    wordpress_health_enabled: bool = True
+    wordpress_health_interval_seconds: float = 300.0
+    wordpress_health_ttl_seconds: float = 900.0
+    wordpress_health_concurrency: int = 4
+
+    # HTTP prober (site availability, latency, TLS expiry)
+    http_probe_enabled: bool = True
+    http_probe_interval_seconds: float = 60.0
+    http_probe_timeout_seconds: float = 10.0
+    http_probe_concurrency: int = 16
+    http_probe_history_size: int = 120
+    http_probe_tls_cache_seconds: float = 21600.0
+    # Probe through the local nginx by Host header (e.g. http://blog-nginx); empty probes public URLs
+    http_probe_via_url: str = ""
+
+    # Blog Redis (object cache, dashboard statistics)
+    blog_redis_url: str = "redis://blog-redis:6379/0"
+
     # WordPress Database User (for wp-cli config create)
     blog_wp_db_user: str = "wpuser"
     blog_wp_db_password: str = "password"
@@ -64,14 +95,65 @@ class Settings(BaseSettings):
     # Docker
     docker_host: str = "unix:///var/run/docker.sock"
 
+    # Host cgroup v2 and procfs mounts (container resource counters)
+    cgroup_root: str = "/host/sys/fs/cgroup"
+    host_proc_root: str = "/host/proc"
+
+    # Dashboard metrics collector
+    dashboard_metrics_enabled: bool = True
+    dashboard_metrics_interval_seconds: float = 10.0
+    dashboard_source_timeout_seconds: float = 5.0
+    dashboard_history_enabled: bool = True
+    dashboard_history_interval_seconds: float = 1.0
+
+    # Nginx access-log analytics (blog nginx logs volume mounted read-only)
+    access_log_enabled: bool = True
+    access_log_dir: str = "/var/log/blog-nginx"
+    access_log_interval_seconds: float = 10.0
+    access_log_bucket_seconds: int = 300
+    access_log_retention_hours: float = 24.0
+    access_log_top_size: int = 50
+
+    # Backup catalog (SQLite index of backup directories)
+    backup_catalog_path: str = "/var/lib/unified-portal/backup_catalog.db"
+
     # Cloudflare API
     cloudflare_api_token: str = ""
     cloudflare_account_id: str = ""
     cloudflare_tunnel_id: str = ""
+    cloudflare_timeout_seconds: float = 30.0
+    cloudflare_max_retries: int = 3
+    # Token bucket below the API limit of 1200 requests / 5 minutes
+    cloudflare_rate_limit_per_second: float = 4.0
+    cloudflare_rate_limit_burst: int = 20
+    # List pages fetched concurrently once the page count is known
+    cloudflare_page_concurrency: int = 4
+    # Zone name -> ID and per-zone DNS record caches
+    cloudflare_zone_cache_seconds: float = 3600.0
+    cloudflare_dns_cache_seconds: float = 300.0
+    # Bulk DNS import (records per batch transaction, parallel requests otherwise)
+    cloudflare_dns_batch_size: int = 200
+    cloudflare_import_concurrency: int = 8
+
+    # DNS propagation checks ([name=]doh:URL, udp:IP[:port] or tcp:IP[:port])
+    dns_propagation_resolvers: List[str] = [
+        "Google=doh:https://dns.google/resolve",
+        "Cloudflare=doh:https://cloudflare-dns.com/dns-query",
+        "Quad9=doh:https://dns.quad9.net:5053/dns-query",
+    ]
+    dns_propagation_timeout_seconds: float = 5.0
+    dns_propagation_wait_seconds: float = 300.0
+    dns_propagation_poll_initial_seconds: float = 2.0
+    dns_propagation_poll_max_seconds: float = 30.0
 
     # Nginx Configuration (for Blog System management)
     nginx_config_dir: str = "/etc/nginx/conf.d"
     nginx_container_name: str = "blog-nginx"
+    # FastCGI upstream per PHP version (e.g. {"8.2": "php-8-2:9000"}); others use the default
+    nginx_php_upstreams: Dict[str, str] = {}
+    nginx_default_php_upstream: str = "wordpress:9000"
+    # Blog nginx site configs as mounted in this container (read by the site registry)
+    blog_nginx_conf_dir: str = "/opt/onprem-infra-system/project-root-infra/services/blog/config/nginx/conf.d"
 
     # SMTP Email Settings (for password reset, welcome emails, etc.)
     smtp_host: str = "localhost"
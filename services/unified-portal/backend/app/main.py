@@ -11,6 +11,7 @@ from loguru import logger
 
 from app.config import get_settings
 from app.database import Base, engine
+from app.services.async_exec import CancelOnDisconnectMiddleware
 
 settings = get_settings()
 
@@ -32,9 +33,69 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     Base.metadata.create_all(bind=engine)
     logger.info("Database tables created")
 
+    # Start dashboard metrics collector
+    from app.routers.dashboard import get_access_log_analytics, get_history_recorder, get_metrics_collector
+
+    metrics_collector = get_metrics_collector()
+    if settings.dashboard_metrics_enabled:
+        metrics_collector.start()
+
+    history_recorder = get_history_recorder()
+    if settings.dashboard_history_enabled:
+        history_recorder.start()
+
+    access_log_analytics = get_access_log_analytics()
+    if settings.access_log_enabled:
+        access_log_analytics.start()
+
+    # Build the site registry off the event loop before serving lookups
+    from app.services.site_registry import get_site_registry
+
+    await get_site_registry().load()
+
+    # Start WordPress site health crawler and HTTP prober
+    from app.routers.wordpress import get_http_prober, get_site_health_crawler
+
+    site_health_crawler = get_site_health_crawler()
+    if settings.wordpress_health_enabled:
+        site_health_crawler.start()
+
+    http_prober = get_http_prober()
+    if settings.http_probe_enabled:
+        http_prober.start()
+
+    # Shared Cloudflare API client (pooled connections, rate-limit budget)
+    from app.services.cloudflare_client import get_cloudflare_client
+
+    cloudflare_client = get_cloudflare_client()
+
     yield
 
     # Shutdown
+    await site_health_crawler.stop()
+    await http_prober.stop()
+    await history_recorder.stop()
+    await access_log_analytics.stop()
+    await metrics_collector.stop()
+
+    from app.services.docker_client import get_docker_client
+    from app.services.wp_cli_service import get_wp_cli_pool
+
+    await get_wp_cli_pool().close()
+    await get_docker_client().close()
+
+    from app.services.redis_stats import get_redis_stats_client
+
+    await get_redis_stats_client().close()
+    await cloudflare_client.close()
+
+    from app.services.dns_propagation import get_propagation_checker
+
+    await get_propagation_checker().close()
+
+    from app.services.async_exec import shutdown_io_pool
+
+    shutdown_io_pool()
     logger.info(f"Shutting down {settings.app_name}")
 
 
@@ -49,6 +110,9 @@ app = FastAPI(
     openapi_url="/openapi.json",
 )
 
+# Cancel request handlers (and their exec/wp-cli/file I/O calls) when the client disconnects
+app.add_middleware(CancelOnDisconnectMiddleware)
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -21,6 +21,7 @@ class WordPressSite(Base):
     domain = Column(String(255), unique=True, nullable=False, index=True, comment="Site domain (e.g., kuma8088.com)")
     database_name = Column(String(100), nullable=False, comment="MariaDB database name")
     php_version = Column(String(10), nullable=False, index=True, comment="PHP version (e.g., 7.4, 8.0, 8.1, 8.2)")
+    proxy_pass = Column(String(255), nullable=True, comment="Upstream URL (reverse-proxy Nginx variant only)")
     enabled = Column(Boolean, default=True, nullable=False, comment="Site enabled status")
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -6,8 +6,11 @@ from typing import List, Dict, Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from datetime import datetime
+import asyncio
 import os
-import glob
+
+from app.services.async_exec import run_scan
+from app.services.backup_catalog import BackupEntry, get_backup_catalog
 
 
 router = APIRouter(prefix="/api/v1/backup", tags=["Backup"])
@@ -20,6 +23,10 @@ class BackupInfo(BaseModel):
     size_mb: float
     path: str
     type: str  # daily, weekly
+    disk_mb: float = 0.0  # Allocated space, hard links counted once
+    exclusive_mb: float = 0.0  # Space not shared with other snapshots
+    file_count: int = 0
+    checksum_status: str = "unknown"  # present, missing
 
 
 class MailserverBackups(BaseModel):
@@ -51,18 +58,32 @@ class BackupSchedule(BaseModel):
 
 
 # Helper Functions
-def get_directory_size(path: str) -> float:
-    """Get directory size in MB."""
-    total_size = 0
-    try:
-        for dirpath, dirnames, filenames in os.walk(path):
-            for filename in filenames:
-                filepath = os.path.join(dirpath, filename)
-                if os.path.exists(filepath):
-                    total_size += os.path.getsize(filepath)
-    except Exception:
-        pass
-    return round(total_size / (1024 * 1024), 2)
+async def list_backup_dirs(root: str, backup_type: str) -> List[BackupInfo]:
+    """List backups of a directory from the backup catalog.
+
+    Only backups that are new or changed since the last call are measured.
+
+    Args:
+        root: Directory containing one subdirectory per backup
+        backup_type: Backup type reported for each entry
+
+    Returns:
+        Backups sorted newest first
+    """
+    entries: List[BackupEntry] = await run_scan(get_backup_catalog().scan, root)
+    return [
+        BackupInfo(
+            date=parse_backup_date(entry.path),
+            size_mb=round(entry.size_bytes / (1024 * 1024), 2),
+            path=entry.path,
+            type=backup_type,
+            disk_mb=round(entry.disk_bytes / (1024 * 1024), 2),
+            exclusive_mb=round(entry.exclusive_bytes / (1024 * 1024), 2),
+            file_count=entry.file_count,
+            checksum_status=entry.checksum_status
+        )
+        for entry in entries
+    ]
 
 
 def parse_backup_date(backup_path: str) -> str:
@@ -95,36 +116,11 @@ async def list_mailserver_backups():
     """
     try:
         backup_base = "/mnt/backup-hdd/mailserver"
-        daily_backups = []
-        weekly_backups = []
-
-        # List daily backups
-        daily_path = os.path.join(backup_base, "daily")
-        if os.path.exists(daily_path):
-            for backup_dir in sorted(glob.glob(f"{daily_path}/*"), reverse=True):
-                if os.path.isdir(backup_dir):
-                    date = parse_backup_date(backup_dir)
-                    size = get_directory_size(backup_dir)
-                    daily_backups.append(BackupInfo(
-                        date=date,
-                        size_mb=size,
-                        path=backup_dir,
-                        type="daily"
-                    ))
-
-        # List weekly backups
-        weekly_path = os.path.join(backup_base, "weekly")
-        if os.path.exists(weekly_path):
-            for backup_dir in sorted(glob.glob(f"{weekly_path}/*"), reverse=True):
-                if os.path.isdir(backup_dir):
-                    date = parse_backup_date(backup_dir)
-                    size = get_directory_size(backup_dir)
-                    weekly_backups.append(BackupInfo(
-                        date=date,
-                        size_mb=size,
-                        path=backup_dir,
-                        type="weekly"
-                    ))
+
+        daily_backups, weekly_backups = await asyncio.gather(
+            list_backup_dirs(os.path.join(backup_base, "daily"), "daily"),
+            list_backup_dirs(os.path.join(backup_base, "weekly"), "weekly")
+        )
 
         return MailserverBackups(
             daily=daily_backups,
@@ -149,17 +145,7 @@ async def list_blog_backups():
         # Check daily and weekly backups
         for backup_type in ["daily", "weekly"]:
             backup_path = os.path.join(backup_base, backup_type)
-            if os.path.exists(backup_path):
-                for backup_dir in sorted(glob.glob(f"{backup_path}/*"), reverse=True):
-                    if os.path.isdir(backup_dir):
-                        date = parse_backup_date(backup_dir)
-                        size = get_directory_size(backup_dir)
-                        backups.append(BackupInfo(
-                            date=date,
-                            size_mb=size,
-                            path=backup_dir,
-                            type=f"blog-{backup_type}"
-                        ))
+            backups.extend(await list_backup_dirs(backup_path, f"blog-{backup_type}"))
 
         return BlogBackups(backups=backups)
     except Exception as e:
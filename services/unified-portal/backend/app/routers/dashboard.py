@@ -2,15 +2,35 @@
 Dashboard API endpoints for system statistics and overview.
 """
 
-from typing import List, Dict, Any
-from fastapi import APIRouter, HTTPException
+from typing import AsyncGenerator, List, Dict, Any, Optional
+from fastapi import APIRouter, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import subprocess
-import json
-import os
+import asyncio
+import shutil
+
+from app.config import get_settings
+from app.services.access_log_analytics import AccessLogAnalytics, TrafficSummary
+from app.services.async_exec import run_blocking, run_scan
+from app.services.docker_client import (
+    calculate_cpu_percent,
+    calculate_memory_usage,
+    calculate_network_io,
+    format_binary_size,
+    format_decimal_size,
+    get_docker_client,
+)
+from app.services.cgroup_reader import BASELINE_DASHBOARD, CgroupReader, get_cgroup_reader
+from app.services.container_stats import get_stats_sampler
+from app.services.metrics_collector import MetricsCollector
+from app.services.metrics_history import CpuUsageTracker, HistoryRecorder, MetricsHistory
+from app.services.redis_stats import get_redis_stats_client
+from app.services.site_registry import get_site_registry
+from app.services.sse import format_sse
 
 
 router = APIRouter(prefix="/api/v1/dashboard", tags=["Dashboard"])
+settings = get_settings()
 
 
 # Pydantic Models
@@ -44,6 +64,32 @@ class WordPressSiteStatus(BaseModel):
     status: str
     redis_connected: bool
     cache_hit_rate: float
+    response_time_ms: Optional[float] = None  # Median probe response time
+    tls_days_left: Optional[float] = None
+    tls_error: Optional[str] = None
+
+
+class RedisKeyspace(BaseModel):
+    """Redis per-database keyspace statistics."""
+    keys: int
+    expires: int
+    avg_ttl: int
+
+
+class RedisLatencyEvent(BaseModel):
+    """Redis latency monitor event (LATENCY LATEST)."""
+    event: str
+    timestamp: int
+    latest_ms: int
+    max_ms: int
+
+
+class RedisSlowlogEntry(BaseModel):
+    """Redis slowlog entry."""
+    id: int
+    timestamp: int
+    duration_us: int
+    command: str
 
 
 class RedisStats(BaseModel):
@@ -56,6 +102,13 @@ class RedisStats(BaseModel):
     cache_hit_rate: float
     connected_clients: int
     uptime_days: int
+    maxmemory_policy: str = ""
+    evicted_keys: int = 0
+    expired_keys: int = 0
+    keyspace: Dict[str, RedisKeyspace] = {}
+    latency_events: List[RedisLatencyEvent] = []
+    slowlog_len: int = 0
+    slowlog: List[RedisSlowlogEntry] = []
 
 
 class BackupStats(BaseModel):
@@ -69,43 +122,87 @@ class BackupStats(BaseModel):
 
 
 class DashboardOverview(BaseModel):
-    """Complete dashboard overview."""
-    system: SystemStats
-    containers: List[ContainerStats]
-    wordpress_sites: List[WordPressSiteStatus]
-    redis: RedisStats
+    """Complete dashboard overview.
+
+    Sections that could not be collected are None and listed in `errors`;
+    sections served from an outdated snapshot are listed in `stale`.
+    """
+    system: Optional[SystemStats] = None
+    containers: Optional[List[ContainerStats]] = None
+    wordpress_sites: Optional[List[WordPressSiteStatus]] = None
+    redis: Optional[RedisStats] = None
+    snapshot_age_seconds: float = 0.0  # Age of the oldest metrics source
+    errors: Dict[str, str] = {}
+    stale: List[str] = []
 
 
-# Helper Functions
-def run_command(cmd: List[str], cwd: str = None) -> str:
-    """Execute shell command and return output."""
-    try:
-        result = subprocess.run(
-            cmd,
-            cwd=cwd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"Command failed: {result.stderr}")
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        raise RuntimeError(f"Command timed out: {' '.join(cmd)}")
-    except Exception as e:
-        raise RuntimeError(f"Command execution error: {str(e)}")
+class HistoryIndex(BaseModel):
+    """Available metrics history series."""
+    series: List[str]
+    resolutions: List[str]
+
 
+class HistorySeries(BaseModel):
+    """Metrics history points of one series."""
+    name: str
+    resolution: str
+    timestamps: List[float]
+    values: List[float]
 
+
+class TrafficCount(BaseModel):
+    """A path or client with its request count."""
+    value: str
+    count: int
+
+
+class UpstreamBucket(BaseModel):
+    """Upstream response time histogram bucket (le=None: slower than all bounds)."""
+    le: Optional[float]
+    count: int
+
+
+class TrafficPointModel(BaseModel):
+    """Traffic of one time bucket."""
+    timestamp: float
+    requests: int
+    bytes_sent: int
+    client_errors: int
+    server_errors: int
+
+
+class SiteTraffic(BaseModel):
+    """Access-log traffic of one site over a window."""
+    name: str  # Access log name
+    site_name: Optional[str] = None  # Registry site served by the log, if known
+    window_seconds: float
+    requests: int
+    requests_per_second: float
+    bytes_sent: int
+    status_codes: Dict[str, int]
+    status_classes: Dict[str, int]
+    top_paths: List[TrafficCount]
+    top_clients: List[TrafficCount]
+    upstream_histogram: List[UpstreamBucket]
+    upstream_p50_ms: Optional[float] = None
+    upstream_p95_ms: Optional[float] = None
+    last_read: float
+    timeline: Optional[List[TrafficPointModel]] = None
+
+
+# CPU utilization between consecutive system stats refreshes
+_system_cpu = CpuUsageTracker()
+
+# Running blog containers (name -> full ID), updated by get_container_stats
+_running_containers: Dict[str, str] = {}
+
+
+# Helper Functions
 def get_system_stats() -> SystemStats:
     """Get system resource statistics from /proc filesystem."""
     try:
-        # Read CPU stats from /proc/stat
-        with open('/proc/stat', 'r') as f:
-            cpu_line = f.readline()
-            cpu_values = [float(x) for x in cpu_line.split()[1:]]
-            cpu_total = sum(cpu_values)
-            cpu_idle = cpu_values[3]  # idle time
-            cpu_percent = 100.0 * (1.0 - cpu_idle / cpu_total) if cpu_total > 0 else 0.0
+        # CPU utilization since the previous refresh (from /proc/stat deltas)
+        cpu_percent = _system_cpu.percent()
 
         # Read load average from /proc/loadavg
         with open('/proc/loadavg', 'r') as f:
@@ -133,13 +230,12 @@ def get_system_stats() -> SystemStats:
         memory_used_gb = memory_total_gb - memory_available_gb
         memory_percent = (memory_used_gb / memory_total_gb) * 100 if memory_total_gb > 0 else 0.0
 
-        # Read disk stats (this still works in container)
-        disk_output = run_command(["df", "-BG", "/"])
-        disk_lines = disk_output.split('\n')
-        disk_data = disk_lines[1].split()
-        disk_total_gb = float(disk_data[1].replace('G', ''))
-        disk_used_gb = float(disk_data[2].replace('G', ''))
-        disk_percent = float(disk_data[4].replace('%', ''))
+        # Read disk stats via statvfs (same figures as `df /`)
+        disk = shutil.disk_usage('/')
+        disk_total_gb = round(disk.total / (1024 ** 3), 2)
+        disk_used_gb = round(disk.used / (1024 ** 3), 2)
+        disk_available = disk.used + disk.free
+        disk_percent = round(disk.used / disk_available * 100, 2) if disk_available > 0 else 0.0
 
         return SystemStats(
             cpu_percent=round(cpu_percent, 2),
@@ -156,60 +252,65 @@ def get_system_stats() -> SystemStats:
         raise HTTPException(status_code=500, detail=f"Failed to get system stats: {str(e)}")
 
 
-def get_container_stats() -> List[ContainerStats]:
-    """Get Docker container statistics from blog service."""
+async def get_container_stats() -> List[ContainerStats]:
+    """Get Docker container statistics from blog service.
+
+    Counters are read from cgroup files when available; containers without
+    a previous cgroup sample are sampled via the Docker stats API in a
+    single concurrent pass.
+    """
+    global _running_containers
+
     try:
-        # Get blog containers using docker ps
-        ps_output = run_command([
-            "docker", "ps", "-a",
-            "--filter", "name=blog-",
-            "--format", "{{.Names}}\t{{.State}}"
-        ])
+        containers_data = await get_docker_client().list_containers(all=True, filters={"name": ["blog-"]})
+        containers_data.sort(key=lambda c: c["Names"][0] if c.get("Names") else "")
 
-        containers = []
-        for line in ps_output.split('\n'):
-            if not line.strip():
-                continue
+        running_ids = [c["Id"] for c in containers_data if c.get("State") == "running"]
 
-            parts = line.split('\t')
-            if len(parts) != 2:
-                continue
+        # Rebind rather than refill so the history sampler never sees a partial map
+        _running_containers = {
+            container["Names"][0].lstrip('/'): container["Id"]
+            for container in containers_data
+            if container.get("State") == "running" and container.get("Names")
+        }
 
-            container_name = parts[0]
-            state = parts[1]
-
-            # Get detailed stats for running containers
-            if state == 'running':
-                try:
-                    stats_cmd_output = run_command([
-                        "docker", "stats", "--no-stream", "--format",
-                        "{{.CPUPerc}}\t{{.MemUsage}}\t{{.NetIO}}", container_name
-                    ])
-
-                    if stats_cmd_output:
-                        stats_parts = stats_cmd_output.split('\t')
-                        cpu_percent = stats_parts[0] if len(stats_parts) > 0 else "0%"
-                        mem_usage = stats_parts[1] if len(stats_parts) > 1 else "0B / 0B"
-                        network_io = stats_parts[2] if len(stats_parts) > 2 else "0B / 0B"
-
-                        mem_parts = mem_usage.split(' / ')
-                        memory_usage = mem_parts[0] if len(mem_parts) > 0 else "0B"
-                        memory_limit = mem_parts[1] if len(mem_parts) > 1 else "0B"
-                    else:
-                        cpu_percent = "0%"
-                        memory_usage = "0B"
-                        memory_limit = "0B"
-                        network_io = "0B / 0B"
-                except Exception:
-                    cpu_percent = "0%"
-                    memory_usage = "0B"
-                    memory_limit = "0B"
-                    network_io = "0B / 0B"
-            else:
-                cpu_percent = "0%"
-                memory_usage = "0B"
-                memory_limit = "0B"
-                network_io = "0B / 0B"
+        reader = get_cgroup_reader()
+        resources_by_id = await run_blocking(reader.read_many, running_ids)
+        cpu_by_id = {
+            container_id: reader.cpu_percent(container_id, resources, baseline=BASELINE_DASHBOARD)
+            for container_id, resources in resources_by_id.items()
+        }
+
+        stats_ids = [container_id for container_id in running_ids if cpu_by_id.get(container_id) is None]
+        stats_by_id = await get_stats_sampler().sample(stats_ids)
+
+        containers = []
+        for container in containers_data:
+            container_name = container["Names"][0].lstrip('/') if container.get("Names") else container["Id"][:12]
+            state = container.get("State", "unknown")
+
+            cpu_percent = "0%"
+            memory_usage = "0B"
+            memory_limit = "0B"
+            network_io = "0B / 0B"
+
+            # Detailed stats are only available for running containers
+            resources = resources_by_id.get(container["Id"])
+            stats = stats_by_id.get(container["Id"])
+            if resources and cpu_by_id.get(container["Id"]) is not None:
+                cpu_percent = f"{cpu_by_id[container['Id']]:.2f}%"
+                memory_usage = format_binary_size(resources.memory_usage_bytes)
+                memory_limit = format_binary_size(resources.memory_limit_bytes)
+                network_io = (f"{format_decimal_size(resources.network_rx_bytes)} / "
+                              f"{format_decimal_size(resources.network_tx_bytes)}")
+            elif stats:
+                mem_used, mem_limit = calculate_memory_usage(stats)
+                rx_bytes, tx_bytes = calculate_network_io(stats)
+
+                cpu_percent = f"{calculate_cpu_percent(stats):.2f}%"
+                memory_usage = format_binary_size(mem_used)
+                memory_limit = format_binary_size(mem_limit)
+                network_io = f"{format_decimal_size(rx_bytes)} / {format_decimal_size(tx_bytes)}"
 
             containers.append(ContainerStats(
                 name=container_name,
@@ -226,138 +327,272 @@ def get_container_stats() -> List[ContainerStats]:
 
 
 def get_wordpress_sites_status() -> List[WordPressSiteStatus]:
-    """Get status for all 16 WordPress sites (optimized for dashboard)."""
+    """Get status for all WordPress sites from the site health crawler and HTTP prober caches."""
+    # Imported here: the WordPress router owns the crawler and prober
+    from app.routers.wordpress import get_http_prober, get_site_health_crawler
+
     try:
-        # WordPress sites list (from wordpress.py)
-        sites = [
-            ("fx-trader-life", "https://fx-trader-life.com"),
-            ("fx-trader-life-4line", "https://4line.fx-trader-life.com"),
-            ("fx-trader-life-lp", "https://lp.fx-trader-life.com"),
-            ("fx-trader-life-mfkc", "https://mfkc.fx-trader-life.com"),
-            ("webmakeprofit", "https://webmakeprofit.org"),
-            ("webmakeprofit-coconala", "https://coconala.webmakeprofit.org"),
-            ("webmakesprofit", "https://webmakesprofit.com"),
-            ("toyota-phv", "https://toyota-phv.jp"),
-            ("kuma8088", "https://kuma8088.com"),
-            ("kuma8088-cameramanual", "https://camera.kuma8088.com"),
-            ("kuma8088-cameramanual-gwpbk492", "https://gwpbk492.kuma8088.com"),
-            ("kuma8088-elementordemo1", "https://demo1.kuma8088.com"),
-            ("kuma8088-elementordemo02", "https://demo2.kuma8088.com"),
-            ("kuma8088-elementor-demo-03", "https://demo3.kuma8088.com"),
-            ("kuma8088-elementor-demo-04", "https://demo4.kuma8088.com"),
-            ("kuma8088-ec02test", "https://ec-test.kuma8088.com"),
-            ("kuma8088-test", "https://test.kuma8088.com"),
-        ]
-
-        # Dashboard API optimization: Skip individual wp-cli redis status checks
-        # Redis connection info is available from Redis API endpoint
-        sites_status = []
-        for site_name, url in sites:
-            sites_status.append(WordPressSiteStatus(
-                site_name=site_name,
-                url=url,
-                status="running",  # Assume running (WordPress container is up)
-                redis_connected=True,  # Check Redis API for overall status
-                cache_hit_rate=0.0  # Individual hit rates not needed for dashboard
+        prober = get_http_prober()
+        sites = []
+        for health in get_site_health_crawler().all():
+            probe = prober.get(health.name)
+            sites.append(WordPressSiteStatus(
+                site_name=health.name,
+                url=health.url,
+                status=health.status,
+                redis_connected=health.redis_connected,
+                cache_hit_rate=0.0,  # Individual hit rates not needed for dashboard
+                response_time_ms=probe.p50_ms if probe else None,
+                tls_days_left=probe.tls_days_left if probe else None,
+                tls_error=probe.tls_error if probe else None
             ))
-
-        return sites_status
+        return sites
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get WordPress sites status: {str(e)}")
 
 
-def get_redis_stats() -> RedisStats:
-    """Get Redis cache statistics."""
+async def get_redis_stats() -> RedisStats:
+    """Get Redis cache statistics over the pooled Redis connection."""
     try:
-        # Get Redis INFO using docker exec
-        info_output = run_command([
-            "docker", "exec", "-i", "blog-redis",
-            "redis-cli", "INFO"
-        ])
-
-        # Parse INFO output
-        info_dict = {}
-        for line in info_output.split('\n'):
-            if ':' in line and not line.startswith('#'):
-                key, value = line.split(':', 1)
-                info_dict[key.strip()] = value.strip()
-
-        # Extract metrics
-        memory_used_mb = float(info_dict.get('used_memory', '0')) / (1024 * 1024)
-        memory_total_mb = 512.0  # From docker-compose.yml maxmemory setting
-        memory_percent = (memory_used_mb / memory_total_mb) * 100
-
-        # Get total keys across all databases
-        total_keys = 0
-        for i in range(16):
-            db_key = f'db{i}'
-            if db_key in info_dict:
-                keys_part = info_dict[db_key].split(',')[0]
-                keys_count = int(keys_part.split('=')[1])
-                total_keys += keys_count
-
-        commands_processed = int(info_dict.get('total_commands_processed', '0'))
-        connected_clients = int(info_dict.get('connected_clients', '0'))
-        uptime_seconds = int(info_dict.get('uptime_in_seconds', '0'))
-        uptime_days = uptime_seconds // 86400
-
-        # Calculate cache hit rate
-        keyspace_hits = int(info_dict.get('keyspace_hits', '0'))
-        keyspace_misses = int(info_dict.get('keyspace_misses', '0'))
-        total_requests = keyspace_hits + keyspace_misses
-        cache_hit_rate = (keyspace_hits / total_requests * 100) if total_requests > 0 else 0.0
-
-        return RedisStats(
-            memory_used_mb=round(memory_used_mb, 2),
-            memory_total_mb=memory_total_mb,
-            memory_percent=round(memory_percent, 2),
-            total_keys=total_keys,
-            commands_processed=commands_processed,
-            cache_hit_rate=round(cache_hit_rate, 2),
-            connected_clients=connected_clients,
-            uptime_days=uptime_days
-        )
+        return RedisStats(**await get_redis_stats_client().collect())
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get Redis stats: {str(e)}")
 
 
+# Background metrics collector (started from main.py lifespan)
+_metrics_collector: Optional[MetricsCollector] = None
+
+
+def get_metrics_collector() -> MetricsCollector:
+    """Get dashboard metrics collector singleton.
+
+    Returns:
+        MetricsCollector instance refreshing system, container and Redis stats
+    """
+    global _metrics_collector
+    if _metrics_collector is None:
+        _metrics_collector = MetricsCollector(
+            sources={
+                "system": get_system_stats,
+                "containers": get_container_stats,
+                "redis": get_redis_stats,
+            },
+            interval=settings.dashboard_metrics_interval_seconds,
+            timeout=settings.dashboard_source_timeout_seconds,
+        )
+    return _metrics_collector
+
+
+# Metrics history (recorded from main.py lifespan)
+_metrics_history: Optional[MetricsHistory] = None
+_history_recorder: Optional[HistoryRecorder] = None
+_history_cpu = CpuUsageTracker()
+_history_cgroup_reader: Optional[CgroupReader] = None
+
+
+def get_metrics_history() -> MetricsHistory:
+    """Get dashboard metrics history singleton.
+
+    Returns:
+        MetricsHistory instance
+    """
+    global _metrics_history
+    if _metrics_history is None:
+        _metrics_history = MetricsHistory()
+    return _metrics_history
+
+
+def collect_history_sample() -> Dict[str, float]:
+    """Collect one metrics history sample.
+
+    Reads /proc and cgroup counters directly (cheap enough for 1s sampling);
+    the Redis hit rate is taken from the latest collector snapshot.
+
+    Returns:
+        Mapping of series name to value
+    """
+    global _history_cgroup_reader
+
+    values: Dict[str, float] = {"system.cpu_percent": _history_cpu.percent()}
+
+    meminfo = {}
+    with open('/proc/meminfo', 'r') as f:
+        for line in f:
+            if ':' in line:
+                key, value = line.split(':', 1)
+                meminfo[key.strip()] = int(value.strip().split()[0])
+    mem_total_kb = meminfo.get('MemTotal', 0)
+    mem_available_kb = meminfo.get('MemAvailable', meminfo.get('MemFree', 0))
+    if mem_total_kb > 0:
+        values["system.memory_percent"] = (mem_total_kb - mem_available_kb) / mem_total_kb * 100
+
+    with open('/proc/loadavg', 'r') as f:
+        values["system.load_1m"] = float(f.readline().split()[0])
+
+    disk = shutil.disk_usage('/')
+    if disk.used + disk.free > 0:
+        values["system.disk_percent"] = disk.used / (disk.used + disk.free) * 100
+
+    # Separate reader so CPU deltas are not shared with the dashboard snapshot
+    if _history_cgroup_reader is None:
+        _history_cgroup_reader = CgroupReader()
+    running = list(_running_containers.items())
+    resources_by_id = _history_cgroup_reader.read_many([container_id for _, container_id in running])
+    for name, container_id in running:
+        resources = resources_by_id.get(container_id)
+        if resources is None:
+            continue
+        cpu_percent = _history_cgroup_reader.cpu_percent(container_id, resources)
+        if cpu_percent is not None:
+            values[f"container.{name}.cpu_percent"] = cpu_percent
+        values[f"container.{name}.memory_bytes"] = resources.memory_usage_bytes
+
+    redis = get_metrics_collector().peek("redis")
+    if redis.value is not None:
+        values["redis.cache_hit_rate"] = redis.value.cache_hit_rate
+
+    return values
+
+
+def get_history_recorder() -> HistoryRecorder:
+    """Get metrics history recorder singleton.
+
+    Returns:
+        HistoryRecorder instance
+    """
+    global _history_recorder
+    if _history_recorder is None:
+        _history_recorder = HistoryRecorder(
+            get_metrics_history(),
+            collect_history_sample,
+            interval=settings.dashboard_history_interval_seconds,
+        )
+    return _history_recorder
+
+
+# Access-log analytics (ingested from main.py lifespan)
+_access_log_analytics: Optional[AccessLogAnalytics] = None
+
+
+def get_access_log_analytics() -> AccessLogAnalytics:
+    """Get access-log analytics singleton.
+
+    Returns:
+        AccessLogAnalytics instance reading the blog nginx access logs
+    """
+    global _access_log_analytics
+    if _access_log_analytics is None:
+        _access_log_analytics = AccessLogAnalytics(
+            settings.access_log_dir,
+            interval=settings.access_log_interval_seconds,
+            bucket_seconds=settings.access_log_bucket_seconds,
+            retention_seconds=settings.access_log_retention_hours * 3600,
+            top_size=settings.access_log_top_size,
+        )
+    return _access_log_analytics
+
+
+def traffic_site_names(log_names: List[str]) -> Dict[str, Optional[str]]:
+    """Map access log names to registry sites ({site}_access.log or {conf}-access.log)."""
+    registry = get_site_registry()
+    by_config = {site.nginx_config: site.name for site in registry.all() if site.nginx_config}
+    return {
+        log_name: log_name if registry.get(log_name) is not None else by_config.get(f"{log_name}.conf")
+        for log_name in log_names
+    }
+
+
+def to_site_traffic(summary: TrafficSummary, site_name: Optional[str]) -> SiteTraffic:
+    """Convert an analytics summary to the API model."""
+    return SiteTraffic(
+        name=summary.name,
+        site_name=site_name,
+        window_seconds=summary.window_seconds,
+        requests=summary.requests,
+        requests_per_second=summary.requests_per_second,
+        bytes_sent=summary.bytes_sent,
+        status_codes=summary.status_codes,
+        status_classes=summary.status_classes,
+        top_paths=[TrafficCount(value=value, count=count) for value, count in summary.top_paths],
+        top_clients=[TrafficCount(value=value, count=count) for value, count in summary.top_clients],
+        upstream_histogram=[UpstreamBucket(le=le, count=count) for le, count in summary.upstream_histogram],
+        upstream_p50_ms=summary.upstream_p50_ms,
+        upstream_p95_ms=summary.upstream_p95_ms,
+        last_read=summary.last_read
+    )
+
+
+async def get_cached_metrics(name: str, response: Response):
+    """Get cached metrics value and report its age in the X-Snapshot-Age header."""
+    sample = await get_metrics_collector().get(name)
+    response.headers["X-Snapshot-Age"] = f"{sample.age_seconds:.2f}"
+    return sample.value
+
+
 # API Endpoints
 @router.get("/overview", response_model=DashboardOverview)
-def get_dashboard_overview():
+async def get_dashboard_overview(response: Response):
     """
     Get complete dashboard overview with system stats, containers, WordPress sites, and Redis.
+
+    System, container and Redis stats are served from the background metrics snapshot.
+    All sections are assembled concurrently; a failing or slow section is
+    reported in `errors` instead of failing the whole overview.
     """
-    try:
-        system = get_system_stats()
-        containers = get_container_stats()
-        wordpress_sites = get_wordpress_sites_status()
-        redis = get_redis_stats()
-
-        return DashboardOverview(
-            system=system,
-            containers=containers,
-            wordpress_sites=wordpress_sites,
-            redis=redis
-        )
-    except HTTPException:
-        raise
-    except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail=f"Failed to get dashboard overview: {str(e)}"
-        )
+    collector = get_metrics_collector()
+    names = ["system", "containers", "redis"]
+
+    results = await asyncio.gather(
+        *(collector.get(name) for name in names),
+        asyncio.wait_for(
+            run_blocking(get_wordpress_sites_status),
+            timeout=settings.dashboard_source_timeout_seconds
+        ),
+        return_exceptions=True
+    )
+
+    overview = DashboardOverview()
+    errors: Dict[str, str] = {}
+    stale: List[str] = []
+    ages = []
+
+    for name, result in zip(names, results):
+        if isinstance(result, BaseException):
+            errors[name] = getattr(result, "detail", None) or str(result) or type(result).__name__
+            continue
+        setattr(overview, name, result.value)
+        ages.append(result.age_seconds)
+        if result.error:
+            errors[name] = result.error
+        if collector.is_stale(result):
+            stale.append(name)
+
+    wordpress_sites = results[-1]
+    if isinstance(wordpress_sites, BaseException):
+        errors["wordpress_sites"] = (getattr(wordpress_sites, "detail", None) or str(wordpress_sites)
+                                     or type(wordpress_sites).__name__)
+    else:
+        overview.wordpress_sites = wordpress_sites
+
+    snapshot_age = max(ages, default=0.0)
+    response.headers["X-Snapshot-Age"] = f"{snapshot_age:.2f}"
+
+    overview.snapshot_age_seconds = round(snapshot_age, 2)
+    overview.errors = errors
+    overview.stale = stale
+    return overview
 
 
 @router.get("/system", response_model=SystemStats)
-def get_system():
+async def get_system(response: Response):
     """Get system resource statistics."""
-    return get_system_stats()
+    return await get_cached_metrics("system", response)
 
 
 @router.get("/containers", response_model=List[ContainerStats])
-def get_containers():
+async def get_containers(response: Response):
     """Get Docker container statistics."""
-    return get_container_stats()
+    return await get_cached_metrics("containers", response)
 
 
 @router.get("/wordpress", response_model=List[WordPressSiteStatus])
@@ -367,9 +602,141 @@ def get_wordpress():
 
 
 @router.get("/redis", response_model=RedisStats)
-def get_redis():
+async def get_redis(response: Response):
     """Get Redis cache statistics."""
-    return get_redis_stats()
+    return await get_cached_metrics("redis", response)
+
+
+async def stream_dashboard_events(request: Request, keepalive: float = 15.0) -> AsyncGenerator[str, None]:
+    """Stream the metrics snapshot followed by deltas of each refresh.
+
+    Every viewer subscribes to the shared collector, so additional viewers
+    add no collection cost.
+
+    Args:
+        request: Incoming request (used to detect disconnects)
+        keepalive: Seconds between keepalive comments when idle
+    """
+    collector = get_metrics_collector()
+    queue = collector.subscribe()
+    try:
+        yield format_sse("snapshot", collector.snapshot())
+
+        while True:
+            try:
+                delta = await asyncio.wait_for(queue.get(), timeout=keepalive)
+            except asyncio.TimeoutError:
+                if await request.is_disconnected():
+                    break
+                yield ": keepalive\n\n"
+                continue
+
+            if delta is None:
+                # Fell behind: resend the full snapshot
+                yield format_sse("snapshot", collector.snapshot())
+            else:
+                yield format_sse("delta", delta)
+    finally:
+        collector.unsubscribe(queue)
+
+
+@router.get("/stream")
+async def stream_dashboard(request: Request):
+    """
+    Live dashboard metrics via Server-Sent Events.
+
+    Sends a `snapshot` event with all system, container and Redis stats,
+    then a `delta` event with only the changed fields after each refresh.
+    """
+    return StreamingResponse(
+        stream_dashboard_events(request),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/history", response_model=HistoryIndex)
+async def get_history_index():
+    """List recorded metrics history series and available resolutions."""
+    history = get_metrics_history()
+    return HistoryIndex(
+        series=history.series_names(),
+        resolutions=[tier.name for tier in history.tiers]
+    )
+
+
+@router.get("/history/{name}", response_model=HistorySeries)
+async def get_history(
+    name: str,
+    resolution: str = Query("1s", description="Resolution (1s, 1m, 1h)"),
+    since: Optional[float] = Query(None, description="Start Unix timestamp"),
+    until: Optional[float] = Query(None, description="End Unix timestamp")
+):
+    """
+    Get metrics history of one series as arrays.
+
+    Args:
+        name: Series name (e.g. system.cpu_percent, container.blog-nginx.cpu_percent)
+        resolution: Resolution tier
+        since: Start Unix timestamp (inclusive)
+        until: End Unix timestamp (inclusive)
+    """
+    try:
+        timestamps, values = get_metrics_history().query(
+            name,
+            resolution,
+            since if since is not None else 0.0,
+            until if until is not None else float("inf")
+        )
+    except KeyError:
+        raise HTTPException(status_code=404, detail=f"Unknown metrics series: {name}")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return HistorySeries(name=name, resolution=resolution, timestamps=timestamps, values=values)
+
+
+@router.get("/traffic", response_model=List[SiteTraffic])
+async def get_traffic(
+    window: float = Query(3600, gt=0, description="Window in seconds"),
+    top: int = Query(5, ge=0, le=100, description="Top paths and clients per site")
+):
+    """
+    Access-log traffic of all sites: request rate, status mix, bytes,
+    top paths/clients and upstream response times.
+    """
+    analytics = get_access_log_analytics()
+    site_names = await run_blocking(traffic_site_names, analytics.names())
+    sites = [
+        to_site_traffic(analytics.summary(name, window, top), site_name)
+        for name, site_name in site_names.items()
+    ]
+    return sorted(sites, key=lambda site: site.requests, reverse=True)
+
+
+@router.get("/traffic/{name}", response_model=SiteTraffic)
+async def get_site_traffic(
+    name: str,
+    window: float = Query(3600, gt=0, description="Window in seconds"),
+    top: int = Query(20, ge=0, le=100, description="Top paths and clients")
+):
+    """
+    Access-log traffic of one site with a per-bucket timeline.
+
+    Args:
+        name: Access log name or site name
+    """
+    analytics = get_access_log_analytics()
+    site_names = await run_blocking(traffic_site_names, analytics.names())
+    if name not in site_names:
+        matches = [log_name for log_name, site_name in site_names.items() if site_name == name]
+        if not matches:
+            raise HTTPException(status_code=404, detail=f"No access log for site: {name}")
+        name = matches[0]
+
+    site = to_site_traffic(analytics.summary(name, window, top), site_names[name])
+    site.timeline = [TrafficPointModel(**vars(point)) for point in analytics.timeline(name, window)]
+    return site
 
 
 def get_backup_stats() -> BackupStats:
@@ -420,6 +787,6 @@ def get_backup_stats() -> BackupStats:
 
 
 @router.get("/backup", response_model=BackupStats)
-def get_backup():
-    """Get backup statistics."""
-    return get_backup_stats()
+async def get_backup():
+    """Get backup statistics (directory listings on the backup disk run on the scan pool)."""
+    return await run_scan(get_backup_stats)
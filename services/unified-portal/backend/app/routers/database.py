@@ -5,10 +5,12 @@ Database management API endpoints.
 from typing import List, Optional
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import subprocess
-import json
 import os
 
+from app.services.async_exec import TARGET_MYSQL, get_exec_limits
+from app.services.docker_client import get_docker_client
+from app.services.site_registry import get_site_registry
+
 
 router = APIRouter(prefix="/api/v1/database", tags=["Database"])
 
@@ -43,8 +45,8 @@ class DatabaseStats(BaseModel):
 
 
 # Helper Functions
-def run_mysql_command(query: str) -> str:
-    """Execute MySQL query via docker exec.
+async def run_mysql_command(query: str) -> str:
+    """Execute MySQL query via the Docker exec API.
 
     Args:
         query: SQL query to execute
@@ -55,28 +57,22 @@ def run_mysql_command(query: str) -> str:
     # Get password from environment variable
     mysql_password = os.environ.get('BLOG_MYSQL_ROOT_PASSWORD', 'wordpress_root_password')
 
-    # Execute via docker exec with container name
-    docker_cmd = [
-        "docker", "exec", "-i", "blog-mariadb",
+    mysql_cmd = [
         "mysql", "-u", "root", f"-p{mysql_password}",
         "-e", query
     ]
 
     try:
-        result = subprocess.run(
-            docker_cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
+        result = await get_exec_limits().run(
+            TARGET_MYSQL, get_docker_client().exec("blog-mariadb", mysql_cmd, timeout=30), timeout=30
         )
-        if result.returncode != 0:
-            raise RuntimeError(f"MySQL command failed: {result.stderr}")
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("MySQL command timed out")
     except Exception as e:
         raise RuntimeError(f"MySQL command error: {str(e)}")
 
+    if result.exit_code != 0:
+        raise RuntimeError(f"MySQL command failed: {result.stderr}")
+    return result.stdout.strip()
+
 
 # API Endpoints
 @router.get("/status", response_model=DatabaseStatus)
@@ -89,11 +85,11 @@ async def get_database_status():
     """
     try:
         # Check connection and get version
-        version_output = run_mysql_command("SELECT VERSION();")
+        version_output = await run_mysql_command("SELECT VERSION();")
         version = version_output.split('\n')[1] if '\n' in version_output else version_output
 
         # Get uptime
-        uptime_output = run_mysql_command("SHOW GLOBAL STATUS LIKE 'Uptime';")
+        uptime_output = await run_mysql_command("SHOW GLOBAL STATUS LIKE 'Uptime';")
         uptime = 0
         if '\n' in uptime_output:
             lines = uptime_output.split('\n')
@@ -121,35 +117,8 @@ async def list_databases():
     Returns:
         List of database information with sizes and WordPress site names
     """
-    # WordPress site to database mapping (from wordpress.py WORDPRESS_SITES)
-    # Database naming pattern: wp_{site_name with hyphens converted to underscores}
-    WP_DB_MAPPING = {
-        # fx-trader-life.com domain (4 sites)
-        "wp_fx_trader_life": {"site": "fx-trader-life", "url": "https://fx-trader-life.com"},
-        "wp_fx_trader_life_4line": {"site": "fx-trader-life-4line", "url": "https://4line.fx-trader-life.com"},
-        "wp_fx_trader_life_lp": {"site": "fx-trader-life-lp", "url": "https://lp.fx-trader-life.com"},
-        "wp_fx_trader_life_mfkc": {"site": "fx-trader-life-mfkc", "url": "https://mfkc.fx-trader-life.com"},
-
-        # webmakeprofit.org domain (2 sites)
-        "wp_webmakeprofit": {"site": "webmakeprofit", "url": "https://webmakeprofit.org"},
-        "wp_webmakeprofit_coconala": {"site": "webmakeprofit-coconala", "url": "https://coconala.webmakeprofit.org"},
-
-        # webmakesprofit.com domain (1 site)
-        "wp_webmakesprofit": {"site": "webmakesprofit", "url": "https://webmakesprofit.com"},
-
-        # toyota-phv.jp domain (1 site)
-        "wp_toyota_phv": {"site": "toyota-phv", "url": "https://toyota-phv.jp"},
-
-        # kuma8088.com domain (9 sites)
-        # Note: kuma8088 root site does not exist in WordPress
-        "wp_kuma8088_cameramanual": {"site": "kuma8088-cameramanual / gwpbk492", "url": "https://camera.kuma8088.com"},
-        "wp_kuma8088_elementordemo1": {"site": "kuma8088-elementordemo1", "url": "https://demo1.kuma8088.com"},
-        "wp_kuma8088_elementordemo02": {"site": "kuma8088-elementordemo02", "url": "https://demo2.kuma8088.com"},
-        "wp_kuma8088_elementordemo03": {"site": "kuma8088-elementor-demo-03", "url": "https://demo3.kuma8088.com"},
-        "wp_kuma8088_elementordemo04": {"site": "kuma8088-elementor-demo-04", "url": "https://demo4.kuma8088.com"},
-        "wp_kuma8088_ec02": {"site": "kuma8088-ec02test", "url": "https://ec-test.kuma8088.com"},
-        "wp_kuma8088_test": {"site": "kuma8088-test", "url": "https://test.kuma8088.com"},
-    }
+    registry = get_site_registry()
+    await registry.load()
 
     try:
         # Get database list with sizes
@@ -163,7 +132,7 @@ async def list_databases():
         ORDER BY table_schema;
         """
 
-        output = run_mysql_command(query)
+        output = await run_mysql_command(query)
         databases = []
 
         if '\n' in output:
@@ -175,14 +144,14 @@ async def list_databases():
                         db_name = parts[0]
                         size_mb = float(parts[1]) if parts[1] != 'NULL' else 0.0
 
-                        # Check if this database is associated with a WordPress site
-                        wp_info = WP_DB_MAPPING.get(db_name)
+                        # Join with the WordPress sites using this database
+                        sites = registry.by_database(db_name)
 
                         databases.append(DatabaseInfo(
                             name=db_name,
                             size_mb=size_mb,
-                            wordpress_site=wp_info["site"] if wp_info else None,
-                            wordpress_url=wp_info["url"] if wp_info else None
+                            wordpress_site=" / ".join(site.name for site in sites) if sites else None,
+                            wordpress_url=sites[0].url if sites else None
                         ))
 
         return databases
@@ -204,7 +173,7 @@ async def get_database_size(db_name: str):
     try:
         # Check if database exists
         check_query = f"SHOW DATABASES LIKE '{db_name}';"
-        check_output = run_mysql_command(check_query)
+        check_output = await run_mysql_command(check_query)
 
         if db_name not in check_output:
             raise HTTPException(status_code=404, detail=f"Database not found: {db_name}")
@@ -216,7 +185,7 @@ async def get_database_size(db_name: str):
         FROM information_schema.tables
         WHERE table_schema = '{db_name}';
         """
-        size_output = run_mysql_command(size_query)
+        size_output = await run_mysql_command(size_query)
         size_mb = 0.0
         if '\n' in size_output:
             lines = size_output.split('\n')
@@ -229,7 +198,7 @@ async def get_database_size(db_name: str):
         FROM information_schema.tables
         WHERE table_schema = '{db_name}';
         """
-        tables_output = run_mysql_command(tables_query)
+        tables_output = await run_mysql_command(tables_query)
         tables_count = 0
         if '\n' in tables_output:
             lines = tables_output.split('\n')
@@ -242,7 +211,7 @@ async def get_database_size(db_name: str):
         FROM information_schema.tables
         WHERE table_schema = '{db_name}';
         """
-        rows_output = run_mysql_command(rows_query)
+        rows_output = await run_mysql_command(rows_query)
         rows_count = 0
         if '\n' in rows_output:
             lines = rows_output.split('\n')
@@ -271,7 +240,7 @@ async def get_database_stats():
     """
     try:
         # Get MariaDB version
-        version_output = run_mysql_command("SELECT VERSION();")
+        version_output = await run_mysql_command("SELECT VERSION();")
         version = version_output.split('\n')[1] if '\n' in version_output else version_output
 
         # Get total databases count and size
@@ -283,7 +252,7 @@ async def get_database_stats():
         WHERE table_schema NOT IN ('information_schema', 'performance_schema', 'mysql', 'sys');
         """
 
-        output = run_mysql_command(query)
+        output = await run_mysql_command(query)
         total_databases = 0
         total_size_mb = 0.0
 
@@ -2,15 +2,34 @@
 Docker management API endpoints.
 """
 
-from typing import List, Optional
+import logging
+from typing import AsyncIterator, List, Optional
 from fastapi import APIRouter, HTTPException, Query
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-import subprocess
-import json
 
 
+from app.services.async_exec import TARGET_DOCKER, get_exec_limits, run_blocking
+from app.services.cgroup_reader import BASELINE_CONTAINER_DETAIL, ContainerResources, get_cgroup_reader
+from app.services.docker_client import (
+    DockerAPIError,
+    DockerNotFoundError,
+    calculate_cpu_percent,
+    format_binary_size,
+    format_decimal_size,
+    get_docker_client,
+)
+from app.services.log_stream import compile_filter, iter_log_lines, parse_log_time, with_keepalive
+from app.services.sse import format_sse
+
+
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/v1/docker", tags=["Docker"])
 
+# Seconds between keepalives on idle followed log streams
+LOG_STREAM_KEEPALIVE = 15.0
+
 
 # Pydantic Models
 class ContainerBase(BaseModel):
@@ -26,6 +45,7 @@ class ContainerDetail(ContainerBase):
     created: str
     ports: List[str]
     stats: dict
+    resources: Optional[ContainerResources] = None
 
 
 class ContainerLogs(BaseModel):
@@ -50,57 +70,16 @@ class OperationResult(BaseModel):
 
 
 # Helper Functions
-def run_docker_command(cmd: List[str]) -> str:
-    """Execute Docker command and return output."""
+async def get_all_containers(status_filter: Optional[str] = None) -> List[ContainerBase]:
+    """Get all Docker containers via the Docker Engine API."""
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"Docker command failed: {result.stderr}")
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("Docker command timed out")
-    except Exception as e:
-        raise RuntimeError(f"Docker command error: {str(e)}")
-
-
-def get_all_containers(status_filter: Optional[str] = None) -> List[ContainerBase]:
-    """Get all Docker containers using docker ps command."""
-    try:
-        # Get all containers with docker ps
-        cmd = [
-            "docker", "ps", "-a",
-            "--format", "{{.ID}}|||{{.Names}}|||{{.Status}}|||{{.Image}}"
-        ]
-
-        output = run_docker_command(cmd)
+        containers = await get_docker_client().list_containers(all=True)
         containers_list = []
 
-        for line in output.split('\n'):
-            if not line.strip():
-                continue
-
+        for container in containers:
             try:
-                parts = line.split('|||')
-                if len(parts) != 4:
-                    continue
-
-                container_id, name, status_text, image = parts
-
-                # Determine status from status text
-                status = "unknown"
-                if "Up" in status_text:
-                    status = "running"
-                elif "Exited" in status_text:
-                    status = "exited"
-                elif "Created" in status_text:
-                    status = "created"
-                elif "Paused" in status_text:
-                    status = "paused"
+                # Docker states: created, running, paused, restarting, exited, dead
+                status = container.get("State", "unknown")
 
                 # Apply status filter
                 if status_filter:
@@ -109,11 +88,12 @@ def get_all_containers(status_filter: Optional[str] = None) -> List[ContainerBas
                     elif status_filter == "stopped" and status not in ["exited", "stopped"]:
                         continue
 
+                names = container.get("Names") or []
                 containers_list.append(ContainerBase(
-                    id=container_id[:12],
-                    name=name,
+                    id=container["Id"][:12],
+                    name=names[0].lstrip('/') if names else container["Id"][:12],
                     status=status,
-                    image=image
+                    image=container.get("Image", "")
                 ))
             except Exception:
                 continue
@@ -132,7 +112,7 @@ async def list_containers(status: Optional[str] = Query(None, description="Filte
     Args:
         status: Optional filter by container status (running/stopped)
     """
-    return get_all_containers(status_filter=status)
+    return await get_all_containers(status_filter=status)
 
 
 @router.get("/containers/{container_id}", response_model=ContainerDetail)
@@ -144,20 +124,31 @@ async def get_container_detail(container_id: str):
         container_id: Container ID or name
     """
     try:
-        # Get container inspect output
-        inspect_output = run_docker_command([
-            "docker", "inspect", container_id
-        ])
+        docker = get_docker_client()
 
-        inspect_data = json.loads(inspect_output)[0]
+        # Get container inspect output
+        inspect_data = await docker.inspect_container(container_id)
+
+        # Read raw counters from cgroup, falling back to the stats API
+        # (stats are only available while running)
+        resources = None
+        cpu_percent = None
+        if inspect_data['State']['Status'] == 'running':
+            reader = get_cgroup_reader()
+            try:
+                resources = await run_blocking(reader.read, inspect_data['Id'])
+                # Own baseline: the dashboard collector samples the same containers
+                cpu_percent = reader.cpu_percent(inspect_data['Id'], resources, baseline=BASELINE_CONTAINER_DETAIL)
+            except OSError:
+                resources = None
 
-        # Get container stats
-        stats_output = run_docker_command([
-            "docker", "stats", "--no-stream", "--format",
-            "{{json .}}", container_id
-        ])
+            if resources is None or cpu_percent is None:
+                stats_data = await docker.container_stats(container_id)
+                cpu_percent = calculate_cpu_percent(stats_data)
+                if resources is None:
+                    resources = ContainerResources.from_stats(stats_data)
 
-        stats_data = json.loads(stats_output) if stats_output else {}
+        current = resources or ContainerResources(timestamp_ns=0)
 
         # Extract port mappings
         ports = []
@@ -175,17 +166,15 @@ async def get_container_detail(container_id: str):
             created=inspect_data['Created'],
             ports=ports,
             stats={
-                "cpu_percent": stats_data.get('CPUPerc', '0%'),
-                "memory_usage": stats_data.get('MemUsage', '0B / 0B'),
-                "network_io": stats_data.get('NetIO', '0B / 0B'),
-                "block_io": stats_data.get('BlockIO', '0B / 0B')
-            }
+                "cpu_percent": f"{cpu_percent or 0.0:.2f}%",
+                "memory_usage": f"{format_binary_size(current.memory_usage_bytes)} / {format_binary_size(current.memory_limit_bytes)}",
+                "network_io": f"{format_decimal_size(current.network_rx_bytes)} / {format_decimal_size(current.network_tx_bytes)}",
+                "block_io": f"{format_decimal_size(current.block_read_bytes)} / {format_decimal_size(current.block_write_bytes)}"
+            },
+            resources=resources
         )
-    except RuntimeError as e:
-        # RuntimeError from run_docker_command indicates container not found
-        if "command failed" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
-        raise HTTPException(status_code=500, detail=f"Failed to get container details: {str(e)}")
+    except DockerNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get container details: {str(e)}")
 
@@ -199,16 +188,14 @@ async def start_container(container_id: str):
         container_id: Container ID or name
     """
     try:
-        run_docker_command(["docker", "start", container_id])
+        await get_docker_client().start_container(container_id)
         return OperationResult(
             success=True,
             message=f"Container {container_id} started successfully",
             container_id=container_id
         )
-    except RuntimeError as e:
-        if "command failed" in str(e).lower() or "no such container" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
-        raise HTTPException(status_code=500, detail=f"Failed to start container: {str(e)}")
+    except DockerNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to start container: {str(e)}")
 
@@ -222,16 +209,14 @@ async def stop_container(container_id: str):
         container_id: Container ID or name
     """
     try:
-        run_docker_command(["docker", "stop", container_id])
+        await get_docker_client().stop_container(container_id)
         return OperationResult(
             success=True,
             message=f"Container {container_id} stopped successfully",
             container_id=container_id
         )
-    except RuntimeError as e:
-        if "command failed" in str(e).lower() or "no such container" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
-        raise HTTPException(status_code=500, detail=f"Failed to stop container: {str(e)}")
+    except DockerNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to stop container: {str(e)}")
 
@@ -245,16 +230,14 @@ async def restart_container(container_id: str):
         container_id: Container ID or name
     """
     try:
-        run_docker_command(["docker", "restart", container_id])
+        await get_docker_client().restart_container(container_id)
         return OperationResult(
             success=True,
             message=f"Container {container_id} restarted successfully",
             container_id=container_id
         )
-    except RuntimeError as e:
-        if "command failed" in str(e).lower() or "no such container" in str(e).lower():
-            raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
-        raise HTTPException(status_code=500, detail=f"Failed to restart container: {str(e)}")
+    except DockerNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to restart container: {str(e)}")
 
@@ -272,39 +255,131 @@ async def get_container_logs(
         tail: Number of lines to retrieve (default: 100)
     """
     try:
-        logs_output = run_docker_command([
-            "docker", "logs", "--tail", str(tail), container_id
-        ])
-
+        logs_output = (await get_exec_limits().run(
+            TARGET_DOCKER, get_docker_client().container_logs(container_id, tail=tail), timeout=30
+        )).strip()
         log_lines = logs_output.split('\n')
 
         return ContainerLogs(
             logs=logs_output,
             lines=len(log_lines)
         )
-    except subprocess.CalledProcessError:
+    except DockerNotFoundError:
         raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get container logs: {str(e)}")
 
 
+async def stream_log_events(lines: AsyncIterator, keepalive: float = LOG_STREAM_KEEPALIVE) -> AsyncIterator[str]:
+    """Format log lines as Server-Sent Events (`stdout`/`stderr`, then `end`)."""
+    yield ": connected\n\n"
+    try:
+        async for item in with_keepalive(lines, keepalive):
+            if item is None:
+                yield ": keepalive\n\n"
+            else:
+                yield format_sse(*item)
+    except DockerAPIError as e:
+        logger.warning(f"Log stream failed: {e}")
+        yield format_sse("error", str(e))
+        return
+    yield format_sse("end", None)
+
+
+async def stream_log_text(lines: AsyncIterator) -> AsyncIterator[str]:
+    """Format log lines as plain text."""
+    try:
+        async for _, line in lines:
+            yield line + "\n"
+    except DockerAPIError as e:
+        logger.warning(f"Log stream failed: {e}")
+        yield f"[log stream error: {e}]\n"
+
+
+@router.get("/containers/{container_id}/logs/stream")
+async def stream_container_logs(
+    container_id: str,
+    follow: bool = Query(False, description="Keep streaming new output"),
+    tail: str = Query("100", description="Number of lines from the end, or 'all'"),
+    since: Optional[str] = Query(None, description="Start time: Unix timestamp, ISO 8601 or relative (10m, 2h, 1d)"),
+    until: Optional[str] = Query(None, description="End time: Unix timestamp, ISO 8601 or relative (10m, 2h, 1d)"),
+    stdout: bool = Query(True, description="Include stdout"),
+    stderr: bool = Query(True, description="Include stderr"),
+    timestamps: bool = Query(False, description="Prefix lines with timestamps"),
+    grep: Optional[str] = Query(None, description="Only lines matching this regular expression"),
+    ignore_case: bool = Query(False, description="Case-insensitive grep"),
+    format: str = Query("sse", pattern="^(sse|text)$", description="sse (events per stream) or text (plain lines)"),
+):
+    """
+    Stream container logs as they are read from the Docker daemon.
+
+    Lines are sent as soon as they arrive (nothing is buffered whole), so
+    large logs start immediately and `follow` tails the container live.
+    SSE events are named after the stream (`stdout`/`stderr`) and carry the
+    line as JSON string; `end` marks the end of the logs.
+    """
+    if tail != "all" and not tail.isdigit():
+        raise HTTPException(status_code=400, detail="tail must be a number or 'all'")
+    if not stdout and not stderr:
+        raise HTTPException(status_code=400, detail="At least one of stdout and stderr is required")
+    try:
+        since_ts = parse_log_time(since) if since else None
+        until_ts = parse_log_time(until) if until else None
+        pattern = compile_filter(grep, ignore_case)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    client = get_docker_client()
+    try:
+        # Resolve errors before the response starts
+        await client.inspect_container(container_id)
+    except DockerNotFoundError:
+        raise HTTPException(status_code=404, detail=f"Container not found: {container_id}")
+    except DockerAPIError as e:
+        raise HTTPException(status_code=500, detail=f"Failed to get container logs: {str(e)}")
+
+    frames = client.stream_logs(
+        container_id,
+        follow=follow,
+        tail=tail,
+        since=since_ts,
+        until=until_ts,
+        stdout=stdout,
+        stderr=stderr,
+        timestamps=timestamps,
+    )
+    lines = iter_log_lines(frames, pattern)
+
+    if format == "text":
+        return StreamingResponse(
+            stream_log_text(lines),
+            media_type="text/plain; charset=utf-8",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+        )
+    return StreamingResponse(
+        stream_log_events(lines),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.get("/stats", response_model=DockerStats)
 async def get_docker_stats():
     """
-    Get Docker system statistics using docker commands.
+    Get Docker system statistics via the Docker Engine API.
     """
     try:
+        docker = get_docker_client()
+
         # Get container stats
-        all_output = run_docker_command(["docker", "ps", "-a", "--format", "{{.Status}}"])
-        all_statuses = [s.strip() for s in all_output.split('\n') if s.strip()]
+        all_states = [c.get("State", "") for c in await docker.list_containers(all=True)]
 
-        containers_running = sum(1 for s in all_statuses if "Up" in s)
-        containers_stopped = sum(1 for s in all_statuses if "Exited" in s)
-        containers_total = len(all_statuses)
+        containers_running = sum(1 for s in all_states if s in ("running", "paused"))
+        containers_stopped = sum(1 for s in all_states if s == "exited")
+        containers_total = len(all_states)
 
         # Get images count
-        images_output = run_docker_command(["docker", "images", "-q"])
-        images_count = len([img for img in images_output.split('\n') if img.strip()])
+        images_count = len(await docker.list_images())
 
         return DockerStats(
             containers_running=containers_running,
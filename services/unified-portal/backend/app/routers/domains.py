@@ -2,15 +2,30 @@
 from __future__ import annotations
 
 import csv
-import io
+import json
 import socket
-from typing import Dict, List, Optional
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
 
-import httpx
 from fastapi import APIRouter, File, HTTPException, Query, UploadFile
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 
 from app.config import get_settings
+from app.services.cloudflare_client import ZONES_PAGE_SIZE, CloudflareAPIError, get_cloudflare_client
+from app.services.cloudflare_dns_cache import DNS_RECORDS_PAGE_SIZE, get_cloudflare_dns_cache
+from app.services.dns_import import (
+    ACTION_CONFLICT,
+    ACTION_CREATE,
+    ACTION_DUPLICATE,
+    ACTION_UNCHANGED,
+    ACTION_UPDATE,
+    STATUS_APPLIED,
+    get_dns_importer,
+    iter_csv_rows,
+)
+from app.services.dns_propagation import PropagationResult, Resolver, get_propagation_checker
+from app.services.sse import format_sse
 
 router = APIRouter(prefix="/api/v1/domains", tags=["Domains"])
 settings = get_settings()
@@ -66,12 +81,32 @@ class DNSRecordImportError(BaseModel):
     error: str
 
 
+class DNSRecordImportRow(BaseModel):
+    """Planned action and outcome of one imported CSV row."""
+
+    row: int
+    action: str  # "create", "update", "unchanged", "duplicate", "conflict", "invalid"
+    status: str  # "planned", "applied", "failed", "skipped"
+    type: Optional[str] = None
+    name: Optional[str] = None
+    content: Optional[str] = None
+    record_id: Optional[str] = None
+    error: Optional[str] = None
+
+
 class DNSRecordImportResult(BaseModel):
     """DNS record import result."""
 
     success_count: int
     error_count: int
     errors: List[DNSRecordImportError]
+    dry_run: bool = False
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+    duplicates: int = 0
+    conflicts: int = 0
+    rows: List[DNSRecordImportRow] = []
 
 
 class DNSVerificationServerResult(BaseModel):
@@ -81,6 +116,9 @@ class DNSVerificationServerResult(BaseModel):
     status: str  # "success", "failed", "timeout"
     records: List[str]
     error: Optional[str] = None
+    protocol: Optional[str] = None  # "doh", "udp", "tcp"
+    matched: bool = False
+    elapsed_ms: Optional[float] = None
 
 
 class DNSVerificationResult(BaseModel):
@@ -91,20 +129,18 @@ class DNSVerificationResult(BaseModel):
     servers: List[DNSVerificationServerResult]
     propagated: bool
     expected_content: Optional[str] = None
+    checks: int = 1
+    elapsed_seconds: float = 0.0
+    timed_out: bool = False
 
 
 # Helper functions
-async def get_zone_id(domain: str) -> str:
-    """Get Cloudflare zone ID from domain name.
-
-    Args:
-        domain: Domain name (e.g., kuma8088.com)
-
-    Returns:
-        Zone ID
+@contextmanager
+def cloudflare_errors() -> Iterator[None]:
+    """Check the API token and map Cloudflare API errors to HTTP errors.
 
     Raises:
-        HTTPException: If zone not found or API error
+        HTTPException: If the token is missing or the API returns an error
     """
     if not settings.cloudflare_api_token:
         raise HTTPException(
@@ -112,145 +148,229 @@ async def get_zone_id(domain: str) -> str:
             detail="Cloudflare API token not configured",
         )
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.cloudflare.com/client/v4/zones?name={domain}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
+    try:
+        yield
+    except CloudflareAPIError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Cloudflare API error: {e.message}",
         )
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
 
-        data = response.json()
+async def cloudflare_request(
+    method: str,
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    json: Any = None,
+) -> Any:
+    """Call the Cloudflare API through the shared client.
 
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
+    Args:
+        method: HTTP method
+        path: API path (e.g. /zones)
+        params: Query parameters
+        json: JSON body
 
-        result = data.get("result", [])
-        if not result:
-            raise HTTPException(
-                status_code=404,
-                detail=f"Zone not found for domain: {domain}",
-            )
+    Returns:
+        The response `result`
+
+    Raises:
+        HTTPException: If the token is missing or the API returns an error
+    """
+    with cloudflare_errors():
+        data = await get_cloudflare_client().request(method, path, params=params, json=json)
+    return data.get("result")
 
-        return result[0]["id"]
+
+async def cloudflare_pages(
+    path: str,
+    per_page: int,
+    params: Optional[Dict[str, Any]] = None,
+) -> AsyncIterator[List[dict]]:
+    """Pages of a Cloudflare list endpoint, fetched concurrently.
+
+    The first page is fetched before returning, so token and API errors
+    still become HTTP errors when the result is streamed.
+
+    Raises:
+        HTTPException: If the token is missing or the first page fails
+    """
+    pages = get_cloudflare_client().paginate(path, params=params, per_page=per_page)
+    with cloudflare_errors():
+        first = await anext(pages)
+
+    async def all_pages() -> AsyncIterator[List[dict]]:
+        yield first
+        async for page in pages:
+            yield page
+
+    return all_pages()
+
+
+def ndjson_response(pages: AsyncIterator[List[dict]], to_model: Callable[[dict], BaseModel]) -> StreamingResponse:
+    """Stream items of Cloudflare pages as newline-delimited JSON.
+
+    A failure after the response has started is reported as a final
+    `{"error": ...}` line.
+    """
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for page in pages:
+                yield "".join(to_model(item).model_dump_json() + "\n" for item in page)
+        except CloudflareAPIError as e:
+            yield json.dumps({"error": f"Cloudflare API error: {e.message}"}) + "\n"
+
+    return StreamingResponse(
+        lines(),
+        media_type="application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def to_zone(zone: dict) -> Zone:
+    """Convert a Cloudflare zone to the response model."""
+    return Zone(
+        id=zone["id"],
+        name=zone["name"],
+        status=zone["status"],
+        name_servers=zone.get("name_servers", []),
+    )
+
+
+def to_dns_record(record: dict) -> DNSRecord:
+    """Convert a Cloudflare DNS record to the response model."""
+    return DNSRecord(
+        id=record["id"],
+        type=record["type"],
+        name=record["name"],
+        content=record["content"],
+        ttl=record["ttl"],
+        proxied=record.get("proxied", False),
+        priority=record.get("priority"),
+    )
+
+
+async def get_zone_id(domain: str) -> str:
+    """Get Cloudflare zone ID from domain name.
+
+    Args:
+        domain: Domain name (e.g., kuma8088.com)
+
+    Returns:
+        Zone ID
+
+    Raises:
+        HTTPException: If zone not found or API error
+    """
+    with cloudflare_errors():
+        zone_id = await get_cloudflare_dns_cache().zone_id(domain)
+    if zone_id is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Zone not found for domain: {domain}",
+        )
+
+    return zone_id
 
 
 # API endpoints
 @router.get("/zones", response_model=List[Zone])
-async def list_zones():
+async def list_zones(
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json (list) or ndjson (streamed lines)"),
+):
     """List all Cloudflare zones (domains).
 
+    All pages are fetched (concurrently once the page count is known).
+
+    Args:
+        format: json returns one list, ndjson streams one zone per line
+
     Returns:
         List of zones
     """
-    if not settings.cloudflare_api_token:
-        raise HTTPException(
-            status_code=500,
-            detail="Cloudflare API token not configured",
-        )
+    cache = get_cloudflare_dns_cache()
+    pages = await cloudflare_pages("/zones", per_page=ZONES_PAGE_SIZE)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            "https://api.cloudflare.com/client/v4/zones",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-        )
+    async def primed() -> AsyncIterator[List[dict]]:
+        async for page in pages:
+            cache.prime_zones(page)
+            yield page
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
+    if format == "ndjson":
+        return ndjson_response(primed(), to_zone)
 
-        data = response.json()
+    zones: List[Zone] = []
+    with cloudflare_errors():
+        async for page in primed():
+            zones.extend(to_zone(zone) for zone in page)
+    return zones
 
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
 
-        result = data.get("result", [])
-        return [
-            Zone(
-                id=zone["id"],
-                name=zone["name"],
-                status=zone["status"],
-                name_servers=zone.get("name_servers", []),
-            )
-            for zone in result
-        ]
+@router.get("/cloudflare/metrics")
+async def get_cloudflare_metrics():
+    """Get Cloudflare API client metrics.
+
+    Returns:
+        Remaining rate-limit tokens and per-endpoint request counts,
+        retries, throttling and p50/p95 latency
+    """
+    return get_cloudflare_client().metrics()
 
 
 @router.get("/{domain}/dns", response_model=List[DNSRecord])
 async def get_dns_records(
     domain: str,
     record_type: Optional[str] = Query(None, description="Filter by DNS record type"),
+    refresh: bool = Query(False, description="Reload records from Cloudflare instead of the cache"),
+    format: str = Query("json", pattern="^(json|ndjson)$", description="json (list) or ndjson (streamed lines)"),
 ):
     """Get DNS records for a domain.
 
+    The json format answers from the zone's record cache. The ndjson format
+    streams the records page by page straight from Cloudflare (for exports
+    and audits of very large zones), without holding the zone in memory.
+
     Args:
         domain: Domain name
         record_type: Optional filter by record type (A, MX, etc.)
+        refresh: Bypass the DNS record cache
+        format: json returns one list, ndjson streams one record per line
 
     Returns:
         List of DNS records
     """
     zone_id = await get_zone_id(domain)
 
-    params = {}
-    if record_type:
-        params["type"] = record_type
-
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-            params=params,
-        )
+    if format == "ndjson":
+        params = {"type": record_type.upper()} if record_type else None
+        pages = await cloudflare_pages(f"/zones/{zone_id}/dns_records", per_page=DNS_RECORDS_PAGE_SIZE, params=params)
+        return ndjson_response(pages, to_dns_record)
 
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
+    cache = get_cloudflare_dns_cache()
+    with cloudflare_errors():
+        if refresh:
+            await cache.records(zone_id, refresh=True)
+        result = await cache.find_records(zone_id, record_type=record_type or None)
+    return [to_dns_record(record) for record in result]
 
-        data = response.json()
 
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
+@router.post("/{domain}/dns/refresh")
+async def refresh_dns_records(domain: str):
+    """Reload the cached zone ID and DNS records of a domain.
 
-        result = data.get("result", [])
-        return [
-            DNSRecord(
-                id=record["id"],
-                type=record["type"],
-                name=record["name"],
-                content=record["content"],
-                ttl=record["ttl"],
-                proxied=record.get("proxied", False),
-                priority=record.get("priority"),
-            )
-            for record in result
-        ]
+    Args:
+        domain: Domain name
+
+    Returns:
+        Number of records loaded
+    """
+    cache = get_cloudflare_dns_cache()
+    cache.invalidate_zone_id(domain)
+    zone_id = await get_zone_id(domain)
+
+    with cloudflare_errors():
+        records = await cache.records(zone_id, refresh=True)
+    return {"success": True, "zone_id": zone_id, "records": len(records)}
 
 
 @router.post("/{domain}/dns", response_model=DNSRecord)
@@ -277,40 +397,9 @@ async def create_dns_record(domain: str, record: DNSRecordCreate):
     if record.priority is not None:
         payload["priority"] = record.priority
 
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
-
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
-
-        data = response.json()
-
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
-
-        result = data["result"]
-        return DNSRecord(
-            id=result["id"],
-            type=result["type"],
-            name=result["name"],
-            content=result["content"],
-            ttl=result["ttl"],
-            proxied=result.get("proxied", False),
-            priority=result.get("priority"),
-        )
+    result = await cloudflare_request("POST", f"/zones/{zone_id}/dns_records", json=payload)
+    get_cloudflare_dns_cache().record_created(zone_id, result)
+    return to_dns_record(result)
 
 
 @router.put("/{domain}/dns/{record_id}", response_model=DNSRecord)
@@ -329,77 +418,29 @@ async def update_dns_record(
     """
     zone_id = await get_zone_id(domain)
 
-    # Get existing record first
-    async with httpx.AsyncClient() as client:
-        get_response = await client.get(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_id}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-        )
-
-        if get_response.status_code != 200:
-            raise HTTPException(
-                status_code=get_response.status_code,
-                detail=f"Cloudflare API error: {get_response.text}",
-            )
-
-        existing_data = get_response.json()
-        if not existing_data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {existing_data.get('errors')}",
-            )
-
-        existing = existing_data["result"]
-
-        # Prepare update payload (merge with existing)
-        payload = {
-            "type": existing["type"],
-            "name": existing["name"],
-            "content": record.content or existing["content"],
-            "ttl": record.ttl or existing["ttl"],
-            "proxied": record.proxied if record.proxied is not None else existing.get("proxied", False),
-        }
-
-        if "priority" in existing or record.priority is not None:
-            payload["priority"] = record.priority or existing.get("priority")
-
-        # Update record
-        put_response = await client.put(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_id}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-            json=payload,
-        )
-
-        if put_response.status_code != 200:
-            raise HTTPException(
-                status_code=put_response.status_code,
-                detail=f"Cloudflare API error: {put_response.text}",
-            )
+    # Get existing record first (from the cache, falling back to the API)
+    cache = get_cloudflare_dns_cache()
+    with cloudflare_errors():
+        existing = await cache.get_record(zone_id, record_id)
+    if existing is None:
+        existing = await cloudflare_request("GET", f"/zones/{zone_id}/dns_records/{record_id}")
 
-        data = put_response.json()
+    # Prepare update payload (merge with existing)
+    payload = {
+        "type": existing["type"],
+        "name": existing["name"],
+        "content": record.content or existing["content"],
+        "ttl": record.ttl or existing["ttl"],
+        "proxied": record.proxied if record.proxied is not None else existing.get("proxied", False),
+    }
 
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
+    if "priority" in existing or record.priority is not None:
+        payload["priority"] = record.priority or existing.get("priority")
 
-        result = data["result"]
-        return DNSRecord(
-            id=result["id"],
-            type=result["type"],
-            name=result["name"],
-            content=result["content"],
-            ttl=result["ttl"],
-            proxied=result.get("proxied", False),
-            priority=result.get("priority"),
-        )
+    # Update record
+    result = await cloudflare_request("PUT", f"/zones/{zone_id}/dns_records/{record_id}", json=payload)
+    cache.record_updated(zone_id, result)
+    return to_dns_record(result)
 
 
 @router.delete("/{domain}/dns/{record_id}")
@@ -415,45 +456,33 @@ async def delete_dns_record(domain: str, record_id: str):
     """
     zone_id = await get_zone_id(domain)
 
-    async with httpx.AsyncClient() as client:
-        response = await client.delete(
-            f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records/{record_id}",
-            headers={
-                "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                "Content-Type": "application/json",
-            },
-        )
-
-        if response.status_code != 200:
-            raise HTTPException(
-                status_code=response.status_code,
-                detail=f"Cloudflare API error: {response.text}",
-            )
-
-        data = response.json()
-
-        if not data.get("success"):
-            raise HTTPException(
-                status_code=400,
-                detail=f"Cloudflare API error: {data.get('errors')}",
-            )
-
-        return {"success": True, "message": "DNS record deleted successfully"}
+    await cloudflare_request("DELETE", f"/zones/{zone_id}/dns_records/{record_id}")
+    get_cloudflare_dns_cache().record_deleted(zone_id, record_id)
+    return {"success": True, "message": "DNS record deleted successfully"}
 
 
 @router.post("/{domain}/dns/import", response_model=DNSRecordImportResult)
-async def import_dns_records(domain: str, file: UploadFile = File(...)):
+async def import_dns_records(
+    domain: str,
+    file: UploadFile = File(...),
+    dry_run: bool = Query(False, description="Only report what would change"),
+    mode: str = Query("batch", pattern="^(batch|concurrent)$", description="batch (atomic chunks) or concurrent"),
+):
     """Import DNS records from CSV file.
 
+    The CSV is parsed while it is read and diffed against the zone's
+    records: identical records and repeated rows are skipped, changed
+    TTL/proxy/priority (or CNAME targets) are updated, the rest created.
+
     Args:
         domain: Domain name
         file: CSV file with DNS records (Type, Name, Content, TTL, Proxied, Priority)
+        dry_run: Return the planned actions without changing the zone
+        mode: Apply through the batch endpoint or with concurrent requests
 
     Returns:
-        Import result with success/error counts
+        Import result with success/error counts and a per-row report
     """
-    zone_id = await get_zone_id(domain)
-
     # Validate file type
     if not file.filename.endswith(".csv"):
         raise HTTPException(
@@ -461,81 +490,94 @@ async def import_dns_records(domain: str, file: UploadFile = File(...)):
             detail="File must be a CSV file",
         )
 
-    # Read CSV file
-    contents = await file.read()
-    csv_text = contents.decode("utf-8")
-    csv_reader = csv.DictReader(io.StringIO(csv_text))
-
-    # Process records
-    success_count = 0
-    error_count = 0
-    errors: List[DNSRecordImportError] = []
-
-    async with httpx.AsyncClient() as client:
-        for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 (header is row 1)
-            try:
-                # Validate required fields
-                if not all(key in row for key in ["Type", "Name", "Content"]):
-                    raise ValueError("Missing required fields (Type, Name, Content)")
-
-                # Parse row data
-                record_type = row["Type"].strip()
-                name = row["Name"].strip()
-                content = row["Content"].strip()
-                ttl = int(row.get("TTL", "1").strip() or "1")
-                proxied_str = row.get("Proxied", "No").strip().lower()
-                proxied = proxied_str in ("yes", "true", "1")
-                priority = None
-
-                if "Priority" in row and row["Priority"].strip():
-                    priority = int(row["Priority"].strip())
-
-                # Prepare payload
-                payload = {
-                    "type": record_type,
-                    "name": name,
-                    "content": content,
-                    "ttl": ttl,
-                    "proxied": proxied,
-                }
-
-                if priority is not None:
-                    payload["priority"] = priority
-
-                # Create record via Cloudflare API
-                response = await client.post(
-                    f"https://api.cloudflare.com/client/v4/zones/{zone_id}/dns_records",
-                    headers={
-                        "Authorization": f"Bearer {settings.cloudflare_api_token}",
-                        "Content-Type": "application/json",
-                    },
-                    json=payload,
-                )
-
-                if response.status_code != 200:
-                    raise ValueError(f"Cloudflare API error: {response.text}")
-
-                data = response.json()
-
-                if not data.get("success"):
-                    raise ValueError(f"Cloudflare API error: {data.get('errors')}")
-
-                success_count += 1
-
-            except Exception as err:
-                error_count += 1
-                errors.append(
-                    DNSRecordImportError(
-                        row=row_num,
-                        record=dict(row),
-                        error=str(err),
-                    )
-                )
+    zone_id = await get_zone_id(domain)
 
+    try:
+        with cloudflare_errors():
+            report = await get_dns_importer().run(
+                zone_id, domain, iter_csv_rows(file.read), dry_run=dry_run, mode=mode
+            )
+    except (UnicodeDecodeError, csv.Error) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid CSV file: {e}")
+
+    errors = [
+        DNSRecordImportError(row=row.row, record=row.record, error=row.error or "")
+        for row in report.error_rows
+    ]
     return DNSRecordImportResult(
-        success_count=success_count,
-        error_count=error_count,
+        success_count=sum(1 for row in report.rows if row.status == STATUS_APPLIED or row.action == ACTION_UNCHANGED),
+        error_count=len(errors),
         errors=errors,
+        dry_run=report.dry_run,
+        created=report.count(ACTION_CREATE),
+        updated=report.count(ACTION_UPDATE),
+        unchanged=report.count(ACTION_UNCHANGED),
+        duplicates=report.count(ACTION_DUPLICATE),
+        conflicts=report.count(ACTION_CONFLICT),
+        rows=[
+            DNSRecordImportRow(
+                row=row.row,
+                action=row.action,
+                status=row.status,
+                type=row.payload["type"] if row.payload else None,
+                name=row.payload["name"] if row.payload else None,
+                content=row.payload["content"] if row.payload else None,
+                record_id=row.record_id,
+                error=row.error,
+            )
+            for row in report.rows
+        ],
+    )
+
+
+def qualify_record_name(record_name: str, domain: str) -> str:
+    """Fully qualified record name ("@" and relative names are joined to the domain)."""
+    name = record_name.strip().rstrip(".")
+    if name in ("@", ""):
+        return domain
+    if name != domain and not name.endswith(f".{domain}"):
+        return f"{name}.{domain}"
+    return name
+
+
+async def select_resolvers(domain: str, resolvers: Optional[str], authoritative: bool) -> List[Resolver]:
+    """Resolvers for a verification request.
+
+    Raises:
+        HTTPException: If a resolver is invalid or no nameserver is found
+    """
+    checker = get_propagation_checker()
+    try:
+        selected = checker.resolve_names(resolvers.split(",")) if resolvers else list(checker.resolvers)
+        if authoritative:
+            selected += await checker.authoritative_resolvers(domain)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return selected
+
+
+def to_verification_result(result: PropagationResult) -> DNSVerificationResult:
+    """Convert a propagation result to the response model."""
+    return DNSVerificationResult(
+        record_type=result.record_type,
+        name=result.name,
+        servers=[
+            DNSVerificationServerResult(
+                server=answer.server,
+                status=answer.status,
+                records=answer.records,
+                error=answer.error,
+                protocol=answer.protocol,
+                matched=answer.matched,
+                elapsed_ms=answer.elapsed_ms,
+            )
+            for answer in result.answers
+        ],
+        propagated=result.propagated,
+        expected_content=result.expected_content,
+        checks=result.checks,
+        elapsed_seconds=result.elapsed_seconds,
+        timed_out=result.timed_out,
     )
 
 
@@ -545,129 +587,77 @@ async def verify_dns_record(
     record_type: str = Query(..., description="DNS record type (A, AAAA, MX, TXT, etc.)"),
     record_name: str = Query(..., description="DNS record name"),
     expected_content: Optional[str] = Query(None, description="Expected content (optional)"),
+    resolvers: Optional[str] = Query(
+        None, description="Comma-separated resolver names or specs ([name=]doh:URL, udp:IP, tcp:IP)"
+    ),
+    authoritative: bool = Query(False, description="Also query the domain's authoritative nameservers"),
+    wait: bool = Query(False, description="Poll until every resolver agrees or the timeout passes"),
+    timeout: float = Query(120.0, ge=1, le=900, description="Seconds to wait when wait=true"),
 ):
-    """Verify DNS record propagation across multiple public DNS servers.
+    """Verify DNS record propagation across multiple DNS servers.
+
+    All resolvers are queried concurrently. With wait=true the request
+    stays open and re-queries the resolvers that do not see the record yet
+    (with backoff) until all agree or the timeout passes.
 
     Args:
         domain: Domain name
         record_type: DNS record type (A, AAAA, MX, TXT, etc.)
-        record_name: DNS record name (FQDN)
+        record_name: DNS record name (FQDN, or relative to the domain)
         expected_content: Expected content to verify (optional)
+        resolvers: Resolvers to query (defaults to the configured set)
+        authoritative: Include the authoritative nameservers
+        wait: Poll until propagated
+        timeout: Polling deadline in seconds
 
     Returns:
         DNS verification result from multiple servers
     """
-    # Public DNS servers (DNS-over-HTTPS endpoints)
-    dns_servers = {
-        "Google": "https://dns.google/resolve",
-        "Cloudflare": "https://cloudflare-dns.com/dns-query",
-        "Quad9": "https://dns.quad9.net/dns-query",
-    }
-
-    servers_results: List[DNSVerificationServerResult] = []
-    propagated = True
-
-    async with httpx.AsyncClient(timeout=10.0) as client:
-        for server_name, server_url in dns_servers.items():
-            try:
-                # Query DNS using DNS-over-HTTPS
-                params = {
-                    "name": record_name,
-                    "type": record_type,
-                }
-
-                response = await client.get(
-                    server_url,
-                    params=params,
-                    headers={"Accept": "application/dns-json"},
-                )
-
-                if response.status_code != 200:
-                    servers_results.append(
-                        DNSVerificationServerResult(
-                            server=server_name,
-                            status="failed",
-                            records=[],
-                            error=f"HTTP {response.status_code}",
-                        )
-                    )
-                    propagated = False
-                    continue
-
-                data = response.json()
-
-                # Extract records from response
-                records = []
-                if "Answer" in data:
-                    for answer in data["Answer"]:
-                        if answer.get("type") == _get_dns_type_number(record_type):
-                            records.append(answer.get("data", ""))
-
-                # Check if records match expected content
-                if expected_content:
-                    if expected_content not in records:
-                        propagated = False
-
-                servers_results.append(
-                    DNSVerificationServerResult(
-                        server=server_name,
-                        status="success" if records else "failed",
-                        records=records,
-                        error=None if records else "No records found",
-                    )
-                )
-
-                if not records:
-                    propagated = False
-
-            except httpx.TimeoutException:
-                servers_results.append(
-                    DNSVerificationServerResult(
-                        server=server_name,
-                        status="timeout",
-                        records=[],
-                        error="Request timeout",
-                    )
-                )
-                propagated = False
-            except Exception as err:
-                servers_results.append(
-                    DNSVerificationServerResult(
-                        server=server_name,
-                        status="failed",
-                        records=[],
-                        error=str(err),
-                    )
-                )
-                propagated = False
-
-    return DNSVerificationResult(
-        record_type=record_type,
-        name=record_name,
-        servers=servers_results,
-        propagated=propagated,
-        expected_content=expected_content,
-    )
+    checker = get_propagation_checker()
+    selected = await select_resolvers(domain, resolvers, authoritative)
+    name = qualify_record_name(record_name, domain)
 
+    if wait:
+        result = await checker.wait(name, record_type, expected_content, selected, deadline_seconds=timeout)
+    else:
+        result = await checker.check(name, record_type, expected_content, selected)
+    return to_verification_result(result)
 
-def _get_dns_type_number(record_type: str) -> int:
-    """Get DNS type number from record type string.
 
-    Args:
-        record_type: DNS record type (A, AAAA, MX, etc.)
+@router.get("/{domain}/dns/verify/stream")
+async def stream_dns_verification(
+    domain: str,
+    record_type: str = Query(..., description="DNS record type (A, AAAA, MX, TXT, etc.)"),
+    record_name: str = Query(..., description="DNS record name"),
+    expected_content: Optional[str] = Query(None, description="Expected content (optional)"),
+    resolvers: Optional[str] = Query(
+        None, description="Comma-separated resolver names or specs ([name=]doh:URL, udp:IP, tcp:IP)"
+    ),
+    authoritative: bool = Query(False, description="Also query the domain's authoritative nameservers"),
+    timeout: float = Query(300.0, ge=1, le=1800, description="Seconds to keep polling"),
+):
+    """Stream DNS propagation progress as Server-Sent Events.
 
-    Returns:
-        DNS type number
+    Each polling round is sent as a `check` event; the stream ends with a
+    `propagated` or `timeout` event carrying the final result.
     """
-    dns_types = {
-        "A": 1,
-        "AAAA": 28,
-        "CNAME": 5,
-        "MX": 15,
-        "TXT": 16,
-        "NS": 2,
-        "SOA": 6,
-        "PTR": 12,
-        "SRV": 33,
-    }
-    return dns_types.get(record_type.upper(), 1)
+    checker = get_propagation_checker()
+    selected = await select_resolvers(domain, resolvers, authoritative)
+    name = qualify_record_name(record_name, domain)
+
+    async def events() -> AsyncIterator[str]:
+        yield ": connected\n\n"
+        async for result in checker.watch(name, record_type, expected_content, selected, deadline_seconds=timeout):
+            data = to_verification_result(result).model_dump()
+            if result.propagated:
+                yield format_sse("propagated", data)
+            elif result.timed_out:
+                yield format_sse("timeout", data)
+            else:
+                yield format_sse("check", data)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -5,9 +5,11 @@ PHP management API endpoints.
 from typing import List
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import subprocess
 import re
 
+from app.services.async_exec import TARGET_DOCKER, get_exec_limits
+from app.services.docker_client import get_docker_client
+
 
 router = APIRouter(prefix="/api/v1/php", tags=["PHP"])
 
@@ -45,8 +47,8 @@ class PHPStats(BaseModel):
 
 
 # Helper Functions
-def run_php_command(command: List[str]) -> str:
-    """Execute PHP command via docker exec.
+async def run_php_command(command: List[str]) -> str:
+    """Execute PHP command via the Docker exec API.
 
     Args:
         command: Command to execute in WordPress container
@@ -54,26 +56,17 @@ def run_php_command(command: List[str]) -> str:
     Returns:
         Command output as string
     """
-    # Execute via docker exec directly with container name
-    full_command = [
-        "docker", "exec", "-i", "blog-wordpress"
-    ] + command
-
     try:
-        result = subprocess.run(
-            full_command,
-            capture_output=True,
-            text=True,
-            timeout=30
+        result = await get_exec_limits().run(
+            TARGET_DOCKER, get_docker_client().exec("blog-wordpress", command, timeout=30), timeout=30
         )
-        if result.returncode != 0:
-            raise RuntimeError(f"PHP command failed: {result.stderr}")
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("PHP command timed out")
     except Exception as e:
         raise RuntimeError(f"PHP command error: {str(e)}")
 
+    if result.exit_code != 0:
+        raise RuntimeError(f"PHP command failed: {result.stderr}")
+    return result.stdout.strip()
+
 
 # API Endpoints
 @router.get("/version", response_model=PHPVersion)
@@ -86,7 +79,7 @@ async def get_php_version():
     """
     try:
         # Get PHP version
-        version_output = run_php_command(["php", "-v"])
+        version_output = await run_php_command(["php", "-v"])
 
         # Parse version from output (e.g., "PHP 8.3.27 (cli)...")
         version_match = re.search(r'PHP (\d+)\.(\d+)\.(\d+)', version_output)
@@ -119,7 +112,7 @@ async def list_php_modules():
     """
     try:
         # Get list of loaded PHP modules
-        modules_output = run_php_command(["php", "-m"])
+        modules_output = await run_php_command(["php", "-m"])
 
         modules = []
         lines = modules_output.split('\n')
@@ -139,7 +132,7 @@ async def list_php_modules():
                 # Get module version if available
                 try:
                     version_cmd = f"php -r \"echo phpversion('{line}');\""
-                    version = run_php_command(["sh", "-c", version_cmd])
+                    version = await run_php_command(["sh", "-c", version_cmd])
                     if not version or version == "0":
                         version = "n/a"
                 except:
@@ -174,7 +167,7 @@ async def get_php_config():
         echo 'error_reporting=' . ini_get('error_reporting') . PHP_EOL;
         " """
 
-        config_output = run_php_command(["sh", "-c", config_cmd])
+        config_output = await run_php_command(["sh", "-c", config_cmd])
 
         # Parse configuration
         config = {}
@@ -205,12 +198,12 @@ async def get_php_stats():
     """
     try:
         # Get PHP version
-        version_output = run_php_command(["php", "-v"])
+        version_output = await run_php_command(["php", "-v"])
         version_match = re.search(r'PHP (\d+\.\d+\.\d+)', version_output)
         version = version_match.group(1) if version_match else "unknown"
 
         # Get modules count
-        modules_output = run_php_command(["php", "-m"])
+        modules_output = await run_php_command(["php", "-m"])
         modules_count = 0
         in_modules_section = False
         for line in modules_output.split('\n'):
@@ -225,7 +218,7 @@ async def get_php_stats():
 
         # Get memory limit
         memory_cmd = "php -r \"echo ini_get('memory_limit');\""
-        memory_limit = run_php_command(["sh", "-c", memory_cmd])
+        memory_limit = await run_php_command(["sh", "-c", memory_cmd])
 
         return PHPStats(
             version=version,
@@ -5,11 +5,13 @@ Security management API endpoints.
 from typing import List, Dict, Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-import subprocess
+import asyncio
 import os
-import requests
 
 from app.config import get_settings
+from app.services.async_exec import TARGET_DOCKER, get_exec_limits
+from app.services.cloudflare_client import get_cloudflare_client
+from app.services.docker_client import get_docker_client
 
 settings = get_settings()
 router = APIRouter(prefix="/api/v1/security", tags=["Security"])
@@ -53,25 +55,13 @@ def get_cloudflare_api_token() -> str:
     return token
 
 
-def run_docker_command(service: str, command: List[str]) -> str:
-    """Execute command in Docker container."""
-    blog_dir = "/opt/onprem-infra-system/project-root-infra/services/blog"
-
-    full_command = [
-        "docker", "compose", "-f", f"{blog_dir}/docker-compose.yml",
-        "exec", "-T", service
-    ] + command
-
+async def run_docker_command(service: str, command: List[str]) -> str:
+    """Execute command in a blog service container."""
     try:
-        result = subprocess.run(
-            full_command,
-            capture_output=True,
-            text=True,
-            timeout=30
+        result = await get_exec_limits().run(
+            TARGET_DOCKER, get_docker_client().exec(f"blog-{service}", command, timeout=30), timeout=30
         )
         return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("Command timed out")
     except Exception as e:
         raise RuntimeError(f"Command error: {str(e)}")
 
@@ -97,7 +87,7 @@ async def list_ssl_certificates():
         check_cmd = ["ls", "-la", ssl_cert_path]
 
         try:
-            output = run_docker_command("nginx", check_cmd)
+            output = await run_docker_command("nginx", check_cmd)
 
             # Parse domains from output (simplified)
             # In production, you would parse actual certificate details
@@ -134,41 +124,26 @@ async def get_cloudflare_ssl_status():
         Cloudflare SSL status information
     """
     try:
-        api_token = get_cloudflare_api_token()
-
-        headers = {
-            "Authorization": f"Bearer {api_token}",
-            "Content-Type": "application/json"
-        }
+        get_cloudflare_api_token()
+        cloudflare = get_cloudflare_client()
 
         # Get zones
-        response = requests.get(
-            "https://api.cloudflare.com/client/v4/zones",
-            headers=headers,
-            timeout=10
-        )
+        zones_data = await cloudflare.get_all("/zones")
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Cloudflare API error: {response.status_code}")
+        # Get SSL settings for all zones concurrently (shared pool, rate limited)
+        ssl_settings = await asyncio.gather(
+            *(cloudflare.get(f"/zones/{zone['id']}/settings/ssl") for zone in zones_data),
+            return_exceptions=True,
+        )
 
-        zones_data = response.json()
         zones = []
 
-        for zone in zones_data.get("result", []):
-            # Get SSL settings for each zone
-            zone_id = zone["id"]
-            ssl_response = requests.get(
-                f"https://api.cloudflare.com/client/v4/zones/{zone_id}/settings/ssl",
-                headers=headers,
-                timeout=10
-            )
-
-            ssl_data = ssl_response.json() if ssl_response.status_code == 200 else {}
-            ssl_mode = ssl_data.get("result", {}).get("value", "unknown")
+        for zone, ssl_setting in zip(zones_data, ssl_settings):
+            ssl_mode = ssl_setting.get("value", "unknown") if isinstance(ssl_setting, dict) else "unknown"
 
             zones.append({
                 "name": zone["name"],
-                "id": zone_id,
+                "id": zone["id"],
                 "ssl_mode": ssl_mode,
                 "status": zone["status"]
             })
@@ -224,23 +199,11 @@ async def get_security_stats():
 
         # Get Cloudflare zones count
         try:
-            api_token = get_cloudflare_api_token()
-            headers = {
-                "Authorization": f"Bearer {api_token}",
-                "Content-Type": "application/json"
-            }
-
-            response = requests.get(
-                "https://api.cloudflare.com/client/v4/zones",
-                headers=headers,
-                timeout=10
-            )
-
-            if response.status_code == 200:
-                zones_data = response.json()
-                cloudflare_zones_count = len(zones_data.get("result", []))
-            else:
-                cloudflare_zones_count = 0
+            get_cloudflare_api_token()
+            # total_count covers all pages without listing them
+            zones_data = await get_cloudflare_client().request("GET", "/zones", params={"per_page": 5})
+            result_info = zones_data.get("result_info") or {}
+            cloudflare_zones_count = result_info.get("total_count", len(zones_data.get("result") or []))
         except Exception:
             cloudflare_zones_count = 0
 
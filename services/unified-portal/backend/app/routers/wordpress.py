@@ -2,7 +2,7 @@
 WordPress management API endpoints.
 
 Provides two types of operations:
-1. Existing site management (17 sites from Phase A-1/A-2)
+1. Existing site management (all sites in the site registry)
 2. New site lifecycle management (create/delete/update sites)
 """
 
@@ -10,54 +10,40 @@ from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
-import subprocess
+import asyncio
 import json
+import logging
 
 from app.auth import get_current_user, get_current_user_optional
+from app.config import get_settings
 from app.database import get_db
 from app.schemas.wordpress import (
+    NginxRegenerateResult,
     WordPressCacheOperation,
+    WordPressPhpMigration,
+    WordPressPhpMigrationResult,
     WordPressSiteCreate,
     WordPressSiteResponse,
     WordPressSiteStats as WordPressSiteStatsSchema,
     WordPressSiteUpdate,
 )
+from app.services.async_exec import TARGET_WP_CLI, get_exec_limits
+from app.services.docker_client import DockerAPIError, ExecResult, get_docker_client
+from app.services.http_prober import HttpProber, ProbeTarget, SiteProbeStats
+from app.services.site_health_crawler import SiteHealth, SiteHealthCrawler
+from app.services.site_registry import SiteRecord, get_site_registry
 from app.services.wordpress_service import get_wordpress_service
+from app.services.wp_cli_service import (
+    build_batch_args,
+    get_wp_cli_pool,
+    parse_batch_output,
+    wp_cli_user_args,
+)
 
 
 router = APIRouter(prefix="/api/v1/wordpress", tags=["WordPress"])
-
-
-# WordPress site definitions (17 sites - includes kuma8088 root)
-# URLs updated to Phase A-2 production domains (2025-11-12)
-WORDPRESS_SITES = [
-    # fx-trader-life.com domain (4 sites)
-    {"name": "fx-trader-life", "url": "https://fx-trader-life.com"},
-    {"name": "fx-trader-life-4line", "url": "https://4line.fx-trader-life.com"},
-    {"name": "fx-trader-life-lp", "url": "https://lp.fx-trader-life.com"},
-    {"name": "fx-trader-life-mfkc", "url": "https://mfkc.fx-trader-life.com"},
-
-    # webmakeprofit.org domain (2 sites)
-    {"name": "webmakeprofit", "url": "https://webmakeprofit.org"},
-    {"name": "webmakeprofit-coconala", "url": "https://coconala.webmakeprofit.org"},
-
-    # webmakesprofit.com domain (1 site)
-    {"name": "webmakesprofit", "url": "https://webmakesprofit.com"},
-
-    # toyota-phv.jp domain (1 site)
-    {"name": "toyota-phv", "url": "https://toyota-phv.jp"},
-
-    # kuma8088.com domain (9 sites)
-    {"name": "kuma8088", "url": "https://kuma8088.com"},
-    {"name": "kuma8088-cameramanual", "url": "https://camera.kuma8088.com"},
-    {"name": "kuma8088-cameramanual-gwpbk492", "url": "https://gwpbk492.kuma8088.com"},  # Legacy site
-    {"name": "kuma8088-elementordemo1", "url": "https://demo1.kuma8088.com"},
-    {"name": "kuma8088-elementordemo02", "url": "https://demo2.kuma8088.com"},
-    {"name": "kuma8088-elementor-demo-03", "url": "https://demo3.kuma8088.com"},
-    {"name": "kuma8088-elementor-demo-04", "url": "https://demo4.kuma8088.com"},
-    {"name": "kuma8088-ec02test", "url": "https://ec-test.kuma8088.com"},
-    {"name": "kuma8088-test", "url": "https://test.kuma8088.com"},
-]
+logger = logging.getLogger(__name__)
+settings = get_settings()
 
 
 # Pydantic Models
@@ -66,6 +52,40 @@ class WordPressSiteBase(BaseModel):
     name: str
     url: str
     status: str
+    last_checked: Optional[float] = None  # Unix time of the last health check
+
+
+class WordPressSiteHealth(WordPressSiteBase):
+    """Cached health and metadata of a WordPress site."""
+    wp_version: str
+    php_version: str
+    theme: str
+    plugin_count: int
+    plugin_updates: int
+    redis_connected: bool
+    http_status: Optional[int] = None
+    response_p50_ms: Optional[float] = None
+    response_p95_ms: Optional[float] = None
+    tls_days_left: Optional[float] = None
+    tls_error: Optional[str] = None
+    error: Optional[str] = None
+
+
+class WordPressSiteProbe(BaseModel):
+    """HTTP probe history of a site URL."""
+    name: str
+    url: str
+    status: str  # up, down, unknown
+    status_code: Optional[int] = None
+    error: Optional[str] = None
+    response_p50_ms: Optional[float] = None
+    response_p95_ms: Optional[float] = None
+    availability: Optional[float] = None  # Percentage of probes without a server error
+    status_codes: List[Optional[int]] = []
+    tls_expires_at: Optional[float] = None
+    tls_days_left: Optional[float] = None
+    tls_error: Optional[str] = None  # Handshake or certificate verification error
+    last_checked: Optional[float] = None
 
 
 class WordPressSiteDetail(WordPressSiteBase):
@@ -109,58 +129,96 @@ class WordPressStats(BaseModel):
 
 
 # Helper Functions
-def run_wp_cli(site_path: str, command: List[str]) -> str:
-    """Execute wp-cli command for a specific site.
+async def exec_wp_cli(site_path: str, command: List[str]) -> ExecResult:
+    """Execute wp-cli command for a specific site and return the raw result.
+
+    Runs on the persistent wp-cli worker pool, falling back to a one-off
+    exec if no worker session can be established.
 
     Args:
         site_path: WordPress site directory name
         command: wp-cli command arguments
 
     Returns:
-        Command output as string
+        Exec result
+
+    Raises:
+        RuntimeError: If the command could not be executed
     """
-    blog_dir = "/opt/onprem-infra-system/project-root-infra/services/blog"
-    full_command = [
-        "docker", "compose", "-f", f"{blog_dir}/docker-compose.yml",
-        "exec", "-T", "wordpress",
-        "wp", "--path=/var/www/html/" + site_path, "--allow-root"
-    ] + command
+    args = ["--path=/var/www/html/" + site_path] + wp_cli_user_args() + command
+
+    async def execute() -> ExecResult:
+        try:
+            return await get_wp_cli_pool().run(args, timeout=30)
+        except (ConnectionError, OSError, DockerAPIError) as e:
+            logger.warning(f"wp-cli worker unavailable, using one-off exec: {e}")
+            return await get_docker_client().exec(
+                settings.wordpress_container_name, ["wp"] + args, user=settings.wp_cli_user, timeout=30
+            )
 
     try:
-        result = subprocess.run(
-            full_command,
-            capture_output=True,
-            text=True,
-            timeout=30
-        )
-        if result.returncode != 0:
-            raise RuntimeError(f"wp-cli command failed: {result.stderr}")
-        return result.stdout.strip()
-    except subprocess.TimeoutExpired:
-        raise RuntimeError("wp-cli command timed out")
+        return await get_exec_limits().run(TARGET_WP_CLI, execute(), timeout=60)
+    except asyncio.TimeoutError:
+        raise RuntimeError("wp-cli command error: timed out")
     except Exception as e:
         raise RuntimeError(f"wp-cli command error: {str(e)}")
 
 
-def get_site_by_name(site_name: str) -> dict:
-    """Get site configuration by name.
+async def run_wp_cli(site_path: str, command: List[str]) -> str:
+    """Execute wp-cli command for a specific site.
+
+    Args:
+        site_path: WordPress site directory name
+        command: wp-cli command arguments
+
+    Returns:
+        Command output as string
+    """
+    result = await exec_wp_cli(site_path, command)
+    if result.exit_code != 0:
+        raise RuntimeError(f"wp-cli command failed: {result.stderr}")
+    return result.stdout.strip()
+
+
+async def run_wp_cli_batch(site_path: str, commands: List[List[str]]) -> List[ExecResult]:
+    """Execute several wp-cli commands for a site in one WordPress bootstrap.
+
+    Args:
+        site_path: WordPress site directory name
+        commands: wp-cli commands (arguments without the leading "wp")
+
+    Returns:
+        Per-command exec results (a failing command does not stop the batch)
+
+    Raises:
+        RuntimeError: If the batch could not run (e.g. WordPress failed to load)
+    """
+    result = await exec_wp_cli(site_path, build_batch_args(commands))
+    results = parse_batch_output(result)
+    if results is None:
+        raise RuntimeError(f"wp-cli command failed: {result.stderr.strip() or result.stdout.strip()}")
+    return results
+
+
+def get_site_by_name(site_name: str) -> SiteRecord:
+    """Get site by name from the site registry.
 
     Args:
         site_name: WordPress site directory name
 
     Returns:
-        Site configuration dictionary
+        SiteRecord of the site
 
     Raises:
         HTTPException: If site not found
     """
-    for site in WORDPRESS_SITES:
-        if site["name"] == site_name:
-            return site
-    raise HTTPException(status_code=404, detail=f"Site not found: {site_name}")
+    site = get_site_registry().get(site_name)
+    if site is None:
+        raise HTTPException(status_code=404, detail=f"Site not found: {site_name}")
+    return site
 
 
-def check_site_status(site_name: str) -> str:
+async def check_site_status(site_name: str) -> str:
     """Check if WordPress site is accessible.
 
     Args:
@@ -170,36 +228,242 @@ def check_site_status(site_name: str) -> str:
         Status string: "online" or "offline"
     """
     try:
-        run_wp_cli(site_name, ["core", "version"])
+        await run_wp_cli(site_name, ["core", "version"])
         return "online"
     except Exception:
         return "offline"
 
 
+async def probe_targets() -> List[ProbeTarget]:
+    """Get the URLs of all enabled sites to probe.
+
+    Returns:
+        Probe targets
+    """
+    registry = get_site_registry()
+    await registry.load()
+    return [ProbeTarget(name=site.name, url=site.url) for site in registry.all(enabled_only=True)]
+
+
+# Background HTTP prober (started from main.py lifespan)
+_http_prober: Optional[HttpProber] = None
+
+
+def get_http_prober() -> HttpProber:
+    """Get HTTP prober singleton.
+
+    Returns:
+        HttpProber instance probing all site URLs
+    """
+    global _http_prober
+    if _http_prober is None:
+        _http_prober = HttpProber(targets=probe_targets)
+    return _http_prober
+
+
+async def collect_site_health(site: SiteRecord) -> SiteHealth:
+    """Check health and metadata of a site (one wp-cli bootstrap plus one HTTP probe).
+
+    Args:
+        site: Site to check
+
+    Returns:
+        SiteHealth of the site
+    """
+    http_check = asyncio.create_task(get_http_prober().probe(ProbeTarget(name=site.name, url=site.url)))
+    try:
+        try:
+            version, php, theme, plugins, redis_status = await run_wp_cli_batch(site.name, [
+                ["core", "version"],
+                ["eval", "echo PHP_VERSION;"],
+                ["theme", "list", "--status=active", "--field=name"],
+                ["plugin", "list", "--format=json"],
+                ["redis", "status"],
+            ])
+        except RuntimeError as e:
+            probe = await http_check
+            return SiteHealth(name=site.name, url=site.url, status="offline", http_status=probe.latest.status_code, error=str(e))
+        http_status = (await http_check).latest.status_code
+    finally:
+        # Never leave the probe running (or its exception unretrieved)
+        http_check.cancel()
+        await asyncio.gather(http_check, return_exceptions=True)
+
+    installed_plugins = []
+    if plugins.exit_code == 0:
+        try:
+            installed_plugins = json.loads(plugins.stdout or "[]")
+        except json.JSONDecodeError as e:
+            # PHP notices printed before the JSON; the site itself is fine
+            logger.warning(f"Unparsable plugin list for {site.name}: {e}")
+
+    plugin_list = []
+    for plugin in installed_plugins:
+        plugin_list.append({
+            "name": plugin.get("name", "unknown"),
+            "status": plugin.get("status", "unknown"),
+            "version": plugin.get("version", "unknown"),
+            "update_available": plugin.get("update", "none") != "none",
+        })
+
+    redis_output = redis_status.stdout if redis_status.exit_code == 0 else ""
+
+    error = None
+    if version.exit_code != 0:
+        status = "offline"
+        error = version.stderr.strip() or "wp core version failed"
+    # WordPress loads but the URL is not served correctly
+    elif http_status is None or http_status >= 500:
+        status = "degraded"
+    else:
+        status = "online"
+
+    return SiteHealth(
+        name=site.name,
+        url=site.url,
+        status=status,
+        wp_version=version.stdout.strip(),
+        php_version=php.stdout.strip(),
+        theme=theme.stdout.strip(),
+        plugins=plugin_list,
+        redis_connected="connected" in redis_output.lower(),
+        http_status=http_status,
+        error=error,
+    )
+
+
+# Background site health crawler (started from main.py lifespan)
+_site_health_crawler: Optional[SiteHealthCrawler] = None
+
+
+def get_site_health_crawler() -> SiteHealthCrawler:
+    """Get site health crawler singleton.
+
+    Returns:
+        SiteHealthCrawler instance checking all WordPress sites
+    """
+    global _site_health_crawler
+    if _site_health_crawler is None:
+        _site_health_crawler = SiteHealthCrawler(
+            sites=lambda: get_site_registry().all(enabled_only=True),
+            check=collect_site_health,
+            interval=settings.wordpress_health_interval_seconds,
+            ttl=settings.wordpress_health_ttl_seconds,
+            concurrency=settings.wordpress_health_concurrency,
+        )
+    return _site_health_crawler
+
+
 # API Endpoints
 @router.get("/sites", response_model=List[WordPressSiteBase])
 async def list_wordpress_sites():
     """
-    List all WordPress sites (17 sites).
+    List all enabled WordPress sites in the site registry.
 
-    Performance optimization: Skip individual wp-cli checks (too slow for 17 sites).
-    Assumes all sites are online if the blog-wordpress container is running.
+    Status comes from the background site health crawler; sites that have
+    not been checked yet (or whose check expired) are reported as "unknown".
 
     Returns:
         List of WordPress site information
     """
-    sites_list = []
+    return [
+        WordPressSiteBase(
+            name=health.name,
+            url=health.url,
+            status=health.status,
+            last_checked=health.last_checked or None
+        )
+        for health in get_site_health_crawler().all()
+    ]
+
+
+@router.post("/health/refresh", response_model=List[WordPressSiteBase])
+async def refresh_wordpress_site_health(site_name: Optional[str] = None):
+    """
+    Check sites now instead of waiting for the next crawl.
+
+    Args:
+        site_name: Site to check (all sites if omitted)
+
+    Returns:
+        Fresh status of the checked sites
+    """
+    if site_name is not None:
+        get_site_by_name(site_name)  # Validate site exists
+
+    results = await get_site_health_crawler().refresh([site_name] if site_name else None)
+    return [
+        WordPressSiteBase(name=health.name, url=health.url, status=health.status, last_checked=health.last_checked)
+        for health in results
+    ]
+
+
+def probe_summary(stats: SiteProbeStats) -> WordPressSiteProbe:
+    """Build the API representation of a site's probe history."""
+    latest = stats.latest
+    return WordPressSiteProbe(
+        name=stats.name,
+        url=stats.url,
+        status=stats.status,
+        status_code=latest.status_code if latest else None,
+        error=latest.error if latest else None,
+        response_p50_ms=stats.p50_ms,
+        response_p95_ms=stats.p95_ms,
+        availability=stats.availability,
+        status_codes=stats.status_codes,
+        tls_expires_at=stats.tls_expires_at,
+        tls_days_left=stats.tls_days_left,
+        tls_error=stats.tls_error,
+        last_checked=latest.checked_at if latest else None,
+    )
+
+
+@router.get("/probes", response_model=List[WordPressSiteProbe])
+async def list_wordpress_site_probes():
+    """
+    Get availability, response times and TLS expiry of all site URLs.
+
+    Covers the existing sites and managed sites, probed in the background.
+
+    Returns:
+        List of site probe summaries
+    """
+    return [probe_summary(stats) for stats in get_http_prober().all()]
 
-    for site in WORDPRESS_SITES:
-        # Optimization: Assume online if container is running
-        # Individual wp-cli checks take 30s+ per site (17 sites = 8.5+ minutes)
-        sites_list.append(WordPressSiteBase(
-            name=site["name"],
-            url=site["url"],
-            status="online"
+
+@router.get("/health", response_model=List[WordPressSiteHealth])
+async def list_wordpress_site_health():
+    """
+    Get cached health and metadata of all WordPress sites.
+
+    Returns:
+        List of site health entries
+    """
+    prober = get_http_prober()
+    results = []
+
+    for health in get_site_health_crawler().all():
+        probe = prober.get(health.name)
+        results.append(WordPressSiteHealth(
+            name=health.name,
+            url=health.url,
+            status=health.status,
+            last_checked=health.last_checked or None,
+            wp_version=health.wp_version,
+            php_version=health.php_version,
+            theme=health.theme,
+            plugin_count=len(health.plugins),
+            plugin_updates=health.plugin_updates,
+            redis_connected=health.redis_connected,
+            http_status=health.http_status,
+            response_p50_ms=probe.p50_ms if probe else None,
+            response_p95_ms=probe.p95_ms if probe else None,
+            tls_days_left=probe.tls_days_left if probe else None,
+            tls_error=probe.tls_error if probe else None,
+            error=health.error
         ))
 
-    return sites_list
+    return results
 
 
 @router.get("/sites/{site_name}", response_model=WordPressSiteDetail)
@@ -216,33 +480,31 @@ async def get_wordpress_site_detail(site_name: str):
     site = get_site_by_name(site_name)
 
     try:
-        # Get WordPress version
-        wp_version = run_wp_cli(site_name, ["core", "version"])
-
-        # Get PHP version
-        php_version = run_wp_cli(site_name, ["eval", "echo PHP_VERSION;"])
-
-        # Get active theme
-        theme = run_wp_cli(site_name, ["theme", "list", "--status=active", "--field=name"])
-
-        # Get database name
-        db_name = run_wp_cli(site_name, ["config", "get", "DB_NAME"])
-
-        # Check Redis Object Cache status
-        try:
-            redis_status = run_wp_cli(site_name, ["redis", "status"])
-            redis_enabled = "Connected" in redis_status or "connected" in redis_status.lower()
-        except Exception:
-            redis_enabled = False
+        # All queries share one WordPress bootstrap
+        version, php, theme, db_name, redis_status = await run_wp_cli_batch(site_name, [
+            ["core", "version"],
+            ["eval", "echo PHP_VERSION;"],
+            ["theme", "list", "--status=active", "--field=name"],
+            ["config", "get", "DB_NAME"],
+            ["redis", "status"],
+        ])
+
+        for result in (version, php, theme, db_name):
+            if result.exit_code != 0:
+                raise RuntimeError(f"wp-cli command failed: {result.stderr}")
+
+        # Redis Object Cache may not be installed
+        redis_output = redis_status.stdout if redis_status.exit_code == 0 else ""
+        redis_enabled = "Connected" in redis_output or "connected" in redis_output.lower()
 
         return WordPressSiteDetail(
-            name=site["name"],
-            url=site["url"],
+            name=site.name,
+            url=site.url,
             status="online",
-            wp_version=wp_version,
-            php_version=php_version,
-            theme=theme,
-            db_name=db_name,
+            wp_version=version.stdout.strip(),
+            php_version=php.stdout.strip(),
+            theme=theme.stdout.strip(),
+            db_name=db_name.stdout.strip(),
             redis_enabled=redis_enabled
         )
     except RuntimeError as e:
@@ -268,7 +530,7 @@ async def list_wordpress_plugins(site_name: str):
 
     try:
         # Get plugins list in JSON format
-        plugins_json = run_wp_cli(site_name, ["plugin", "list", "--format=json"])
+        plugins_json = await run_wp_cli(site_name, ["plugin", "list", "--format=json"])
         plugins_data = json.loads(plugins_json)
 
         plugins_list = []
@@ -308,17 +570,16 @@ async def clear_wordpress_cache(site_name: str):
     get_site_by_name(site_name)  # Validate site exists
 
     try:
-        # Flush Redis Object Cache
-        try:
-            run_wp_cli(site_name, ["redis", "flush"])
-        except Exception:
-            pass  # Redis might not be enabled
+        # Redis Object Cache flush (might not be enabled), transients, rewrite rules
+        _, transients, rewrite = await run_wp_cli_batch(site_name, [
+            ["redis", "flush"],
+            ["transient", "delete", "--all"],
+            ["rewrite", "flush"],
+        ])
 
-        # Clear WordPress transients
-        run_wp_cli(site_name, ["transient", "delete", "--all"])
-
-        # Flush rewrite rules
-        run_wp_cli(site_name, ["rewrite", "flush"])
+        for result in (transients, rewrite):
+            if result.exit_code != 0:
+                raise RuntimeError(f"wp-cli command failed: {result.stderr}")
 
         return CacheOperation(
             success=True,
@@ -347,9 +608,14 @@ async def get_smtp_status(site_name: str):
     get_site_by_name(site_name)  # Validate site exists
 
     try:
-        # Check if WP Mail SMTP plugin is active
-        plugins_json = run_wp_cli(site_name, ["plugin", "list", "--status=active", "--format=json"])
-        plugins = json.loads(plugins_json)
+        # Active plugins and SMTP configuration in one bootstrap
+        plugins_result, option_result = await run_wp_cli_batch(site_name, [
+            ["plugin", "list", "--status=active", "--format=json"],
+            ["option", "get", "wp_mail_smtp", "--format=json"],
+        ])
+        if plugins_result.exit_code != 0:
+            raise RuntimeError(f"wp-cli command failed: {plugins_result.stderr}")
+        plugins = json.loads(plugins_result.stdout)
 
         wp_mail_smtp_active = any(p.get("name") == "wp-mail-smtp" for p in plugins)
 
@@ -358,8 +624,9 @@ async def get_smtp_status(site_name: str):
 
         # Get SMTP configuration
         try:
-            from_email = run_wp_cli(site_name, ["option", "get", "wp_mail_smtp", "--format=json"])
-            smtp_config = json.loads(from_email)
+            if option_result.exit_code != 0:
+                raise RuntimeError(option_result.stderr)
+            smtp_config = json.loads(option_result.stdout)
 
             return SMTPStatus(
                 configured=True,
@@ -382,22 +649,19 @@ async def get_wordpress_stats():
     """
     Get WordPress system statistics across all sites.
 
-    Performance optimization: Skip individual wp-cli checks (too slow for 17 sites).
-    Returns high-level statistics assuming container is running.
+    Served from the background site health crawler cache.
 
     Returns:
         WordPress system statistics
     """
     try:
-        # Optimization: Skip wp-cli checks for stats API
-        # Individual checks take 30s+ per site (17 sites = 8.5+ minutes)
-        # Assume all sites online and Redis enabled if container running
+        sites = get_site_health_crawler().all()
 
         return WordPressStats(
-            total_sites=len(WORDPRESS_SITES),
-            sites_online=len(WORDPRESS_SITES),  # Assume all online
-            total_plugins=0,  # Skip slow plugin count
-            redis_enabled_sites=len(WORDPRESS_SITES)  # Assume all have Redis
+            total_sites=len(sites),
+            sites_online=sum(1 for health in sites if health.status == "online"),
+            total_plugins=sum(len(health.plugins) for health in sites),
+            redis_enabled_sites=sum(1 for health in sites if health.redis_connected)
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get WordPress stats: {str(e)}")
@@ -500,8 +764,71 @@ async def create_managed_wordpress_site(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+@router.post("/managed-sites/php-version", response_model=WordPressPhpMigrationResult)
+async def migrate_managed_sites_php_version(
+    migration: WordPressPhpMigration,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Switch several managed sites to a PHP version.
+
+    All Nginx configurations are regenerated together and applied with a
+    single `nginx -t` and reload; if the test fails nothing is changed.
+
+    Args:
+        migration: Site IDs and target PHP version
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Migrated and unchanged sites
+
+    Raises:
+        HTTPException: If a site is not found or the migration fails
+    """
+    service = get_wordpress_service(db)
+
+    try:
+        return await service.migrate_php_version(migration.site_ids, migration.php_version)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.post("/managed-sites/nginx/regenerate", response_model=NginxRegenerateResult)
+async def regenerate_managed_sites_nginx(
+    dry_run: bool = True,
+    db: Session = Depends(get_db),
+    current_user: str = Depends(get_current_user),
+):
+    """
+    Regenerate the Nginx configurations of all managed sites.
+
+    Configurations are rendered from the current templates and compared
+    with the deployed files; only changed files are written, with a single
+    `nginx -t` and reload for the whole batch.
+
+    Args:
+        dry_run: Only report changes and diffs (default: True)
+        db: Database session
+        current_user: Current authenticated user
+
+    Returns:
+        Changed and unchanged files with diffs
+
+    Raises:
+        HTTPException: If regeneration fails
+    """
+    service = get_wordpress_service(db)
+
+    try:
+        return vars(await service.regenerate_nginx_configs(dry_run=dry_run))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
 @router.put("/managed-sites/{site_id}", response_model=WordPressSiteResponse)
-def update_managed_wordpress_site(
+async def update_managed_wordpress_site(
     site_id: int,
     site_update: WordPressSiteUpdate,
     db: Session = Depends(get_db),
@@ -525,7 +852,7 @@ def update_managed_wordpress_site(
     service = get_wordpress_service(db)
 
     try:
-        site = service.update_site(site_id, site_update)
+        site = await service.update_site(site_id, site_update)
         return site
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -2,9 +2,12 @@
 from __future__ import annotations
 
 from datetime import datetime
-from typing import Optional
+from typing import Dict, List, Optional
 
-from pydantic import BaseModel, Field, validator
+from pydantic import BaseModel, Field, root_validator, validator
+
+# Upstream URL of the reverse-proxy Nginx variant (no whitespace or ";")
+PROXY_PASS_PATTERN = r"^https?://[A-Za-z0-9.\-]+(:\d{1,5})?(/[A-Za-z0-9._~/\-]*)?$"
 
 
 class WordPressSiteBase(BaseModel):
@@ -23,6 +26,21 @@ class WordPressSiteCreate(WordPressSiteBase):
     admin_password: str = Field(..., min_length=8, description="WordPress admin password")
     admin_email: str = Field(..., description="WordPress admin email")
     title: Optional[str] = Field(None, description="Site title (defaults to domain)")
+    nginx_variant: str = Field(
+        "wordpress",
+        pattern=r"^(wordpress|wordpress-fastcgi-cache|static|reverse-proxy)$",
+        description="Nginx template variant",
+    )
+    proxy_pass: Optional[str] = Field(
+        None, max_length=255, pattern=PROXY_PASS_PATTERN, description="Upstream URL (reverse-proxy variant only)"
+    )
+
+    @root_validator(skip_on_failure=True)
+    def validate_proxy_pass(cls, values):
+        """Require an upstream URL for the reverse-proxy variant."""
+        if values.get("nginx_variant") == "reverse-proxy" and not values.get("proxy_pass"):
+            raise ValueError("proxy_pass is required for the reverse-proxy variant")
+        return values
 
     @validator("php_version")
     def validate_php_version(cls, v):
@@ -37,6 +55,9 @@ class WordPressSiteUpdate(BaseModel):
     """Schema for updating a WordPress site."""
 
     php_version: Optional[str] = Field(None, pattern=r"^\d+\.\d+$", description="PHP version")
+    proxy_pass: Optional[str] = Field(
+        None, max_length=255, pattern=PROXY_PASS_PATTERN, description="Upstream URL (reverse-proxy variant only)"
+    )
     enabled: Optional[bool] = Field(None, description="Site enabled status")
 
     @validator("php_version")
@@ -49,10 +70,46 @@ class WordPressSiteUpdate(BaseModel):
         return v
 
 
+class WordPressPhpMigration(BaseModel):
+    """Schema for switching several sites to a PHP version."""
+
+    site_ids: List[int] = Field(..., min_length=1, description="Site IDs to migrate")
+    php_version: str = Field(..., pattern=r"^\d+\.\d+$", description="Target PHP version")
+
+    @validator("php_version")
+    def validate_php_version(cls, v):
+        """Validate PHP version format."""
+        valid_versions = ["7.4", "8.0", "8.1", "8.2"]
+        if v not in valid_versions:
+            raise ValueError(f"PHP version must be one of: {', '.join(valid_versions)}")
+        return v
+
+
+class WordPressPhpMigrationResult(BaseModel):
+    """Schema for PHP version migration results."""
+
+    php_version: str
+    migrated: List[str] = Field(default_factory=list, description="Sites switched to the version")
+    unchanged: List[str] = Field(default_factory=list, description="Sites already on the version")
+    failed: Dict[str, str] = Field(default_factory=dict, description="Error per site whose config could not be rendered")
+    nginx_reloaded: bool = Field(False, description="Whether Nginx was reloaded (once for all sites)")
+
+
+class NginxRegenerateResult(BaseModel):
+    """Schema for Nginx configuration regeneration results."""
+
+    changed: List[str] = Field(default_factory=list, description="Config files that differ from the deployed ones")
+    unchanged: List[str] = Field(default_factory=list, description="Config files already up to date")
+    failed: Dict[str, str] = Field(default_factory=dict, description="Error per config file that could not be rendered")
+    diffs: Dict[str, str] = Field(default_factory=dict, description="Unified diff per changed file")
+    reloaded: bool = Field(False, description="Whether Nginx was reloaded")
+
+
 class WordPressSiteResponse(WordPressSiteBase):
     """Schema for WordPress site response."""
 
     id: int
+    proxy_pass: Optional[str] = None
     enabled: bool
     created_at: datetime
     updated_at: datetime
@@ -0,0 +1,470 @@
+"""Incremental nginx access-log analytics per WordPress site."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import partial
+from itertools import groupby
+from operator import itemgetter
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.async_exec import run_scan
+
+logger = logging.getLogger(__name__)
+
+# Site log names: portal-generated configs use {site}_access.log, older ones {conf}-access.log
+LOG_SUFFIXES = ("_access.log", "-access.log")
+
+# Upper bounds (seconds) of the upstream response time histogram; one more bucket for slower
+UPSTREAM_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+READ_CHUNK_BYTES = 4 * 1024 * 1024
+# Unterminated data beyond this is not a log line; it is dropped
+MAX_LINE_BYTES = 64 * 1024
+
+# Matches `combined`, `main` and `portal` (adds rt=/urt=) log formats, one
+# match per line. Captures: client, minute, offset, path, status, bytes
+# (empty for "-") and the first upstream time (empty if none).
+_LINE_RE = re.compile(
+    rb'^(\S+) \S+ \S+ \[(\d\d/\w{3}/\d{4}:\d\d:\d\d):\d\d ([+-]\d{4})\] '
+    rb'"(?:[A-Z]+ )?([^ "?]*)[^"]*" (\d{3}) (?:(\d+)|-) "[^"]*" "[^"]*"'
+    rb'(?: "[^"]*")?(?: rt=[\d.]+ urt="([\d.]*)[^"]*")?',
+    re.MULTILINE,
+)
+
+_upstream_bucket = partial(bisect_left, UPSTREAM_BOUNDS)
+
+
+class _Bucket:
+    """Aggregates of one site over one time bucket."""
+
+    __slots__ = ("requests", "bytes_sent", "statuses", "paths", "clients", "upstream", "compacted")
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.bytes_sent = 0
+        self.statuses: Counter = Counter()
+        self.paths: Counter = Counter()
+        self.clients: Counter = Counter()
+        self.upstream = [0] * (len(UPSTREAM_BOUNDS) + 1)
+        self.compacted = False
+
+    def add_rows(self, rows: List[tuple]) -> None:
+        """Add parsed log rows (the counting runs in C via Counter/map)."""
+        clients, _, _, paths, statuses, sizes, upstream = zip(*rows)
+        self.requests += len(rows)
+        self.bytes_sent += sum(map(int, filter(None, sizes)))
+        self.statuses.update(statuses)
+        self.paths.update(paths)
+        self.clients.update(clients)
+        for index, count in Counter(map(_upstream_bucket, map(float, filter(None, upstream)))).items():
+            self.upstream[index] += count
+
+    def merge(self, other: _Bucket) -> None:
+        """Add the aggregates of another bucket."""
+        self.requests += other.requests
+        self.bytes_sent += other.bytes_sent
+        self.statuses.update(other.statuses)
+        self.paths.update(other.paths)
+        self.clients.update(other.clients)
+        self.upstream = [a + b for a, b in zip(self.upstream, other.upstream)]
+
+    def compact(self, top_size: int) -> None:
+        """Keep only the most frequent paths and clients of a closed bucket."""
+        if len(self.paths) > top_size:
+            self.paths = Counter(dict(self.paths.most_common(top_size)))
+        if len(self.clients) > top_size:
+            self.clients = Counter(dict(self.clients.most_common(top_size)))
+        self.compacted = True
+
+
+@dataclass
+class _LogFile:
+    """Read position and aggregates of one access log."""
+
+    name: str
+    path: str
+    inode: Optional[int] = None
+    offset: int = 0
+    rest: bytes = b""
+    lines: int = 0
+    last_read: float = 0.0
+    buckets: Dict[int, _Bucket] = field(default_factory=dict)
+
+
+@dataclass
+class TrafficPoint:
+    """Traffic of one site in one time bucket."""
+
+    timestamp: float
+    requests: int
+    bytes_sent: int
+    client_errors: int
+    server_errors: int
+
+
+@dataclass
+class TrafficSummary:
+    """Traffic of one site over a time window.
+
+    Attributes:
+        name: Log name (site name for portal-generated configs)
+        window_seconds: Length of the window
+        requests: Requests in the window
+        requests_per_second: Average request rate
+        bytes_sent: Response body bytes
+        status_codes: Requests per status code
+        status_classes: Requests per status class (2xx, 3xx, 4xx, 5xx)
+        top_paths: Most requested paths with counts
+        top_clients: Most active client IPs with counts
+        upstream_histogram: (upper bound in seconds or None for slower, count) pairs
+        upstream_p50_ms: Estimated median upstream response time
+        upstream_p95_ms: Estimated 95th percentile upstream response time
+        last_read: Unix time of the last log read
+    """
+
+    name: str
+    window_seconds: float
+    requests: int = 0
+    requests_per_second: float = 0.0
+    bytes_sent: int = 0
+    status_codes: Dict[str, int] = field(default_factory=dict)
+    status_classes: Dict[str, int] = field(default_factory=dict)
+    top_paths: List[Tuple[str, int]] = field(default_factory=list)
+    top_clients: List[Tuple[str, int]] = field(default_factory=list)
+    upstream_histogram: List[Tuple[Optional[float], int]] = field(default_factory=list)
+    upstream_p50_ms: Optional[float] = None
+    upstream_p95_ms: Optional[float] = None
+    last_read: float = 0.0
+
+
+def histogram_percentile(counts: List[int], pct: float) -> Optional[float]:
+    """Estimate a percentile (in seconds) as the upper bound of its histogram bucket.
+
+    Args:
+        counts: Counts per UPSTREAM_BOUNDS bucket (plus the overflow bucket)
+        pct: Percentile (0-100)
+
+    Returns:
+        Upper bound of the bucket containing the percentile (the largest
+        bound for the overflow bucket), or None without samples
+    """
+    total = sum(counts)
+    if total == 0:
+        return None
+    rank = total * pct / 100
+    cumulative = 0
+    for index, count in enumerate(counts):
+        cumulative += count
+        if cumulative >= rank:
+            break
+    return UPSTREAM_BOUNDS[min(index, len(UPSTREAM_BOUNDS) - 1)]
+
+
+class AccessLogAnalytics:
+    """Tails the nginx access logs of all sites into rolling per-site aggregates.
+
+    Each log is read from its last offset on every pass; rotation is
+    detected by inode (the rest of a renamed log is read from `<log>.1`) and
+    truncation by size. Lines are parsed chunk-wise with one precompiled
+    regex and counted into time buckets; closed buckets keep only their top
+    paths and clients, and buckets older than the retention are dropped, so
+    memory is bounded regardless of log size.
+    """
+
+    def __init__(
+        self,
+        log_dir: str,
+        interval: float = 10.0,
+        bucket_seconds: int = 300,
+        retention_seconds: float = 86400.0,
+        top_size: int = 50,
+        clock: Callable[[], float] = time.time,
+    ):
+        """Initialize access log analytics.
+
+        Args:
+            log_dir: Directory containing the nginx access logs
+            interval: Seconds between reads in the background
+            bucket_seconds: Bucket length (a multiple of 60)
+            retention_seconds: How long buckets are kept
+            top_size: Paths and clients kept per closed bucket
+            clock: Time source (for tests)
+
+        Raises:
+            ValueError: If bucket_seconds is not a positive multiple of 60
+        """
+        if bucket_seconds <= 0 or bucket_seconds % 60:
+            raise ValueError("bucket_seconds must be a positive multiple of 60")
+        self.log_dir = log_dir
+        self.interval = interval
+        self.bucket_seconds = bucket_seconds
+        self.retention_seconds = retention_seconds
+        self.top_size = top_size
+        self.clock = clock
+        self._logs: Dict[str, _LogFile] = {}
+        self._minutes: Dict[Tuple[bytes, bytes], Optional[int]] = {}
+        self._lock = threading.Lock()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background ingest task is active."""
+        return self._task is not None and not self._task.done()
+
+    def _discover(self) -> None:
+        """Track access logs that appeared in the log directory."""
+        try:
+            filenames = os.listdir(self.log_dir)
+        except OSError:
+            return
+        for filename in filenames:
+            for suffix in LOG_SUFFIXES:
+                if filename.endswith(suffix) and len(filename) > len(suffix):
+                    name = filename[:-len(suffix)]
+                    if name not in self._logs:
+                        self._logs[name] = _LogFile(name=name, path=os.path.join(self.log_dir, filename))
+                    break
+
+    def _bucket_start(self, minute: bytes, offset: bytes) -> Optional[int]:
+        """Start of the bucket containing a log minute (cached; lines arrive in order)."""
+        key = (minute, offset)
+        start = self._minutes.get(key, -1)
+        if start == -1:
+            try:
+                timestamp = datetime.strptime(f"{minute.decode()} {offset.decode()}", "%d/%b/%Y:%H:%M %z").timestamp()
+                start = int(timestamp) // self.bucket_seconds * self.bucket_seconds
+            except ValueError:
+                start = None
+            if len(self._minutes) > 10000:
+                self._minutes.clear()
+            self._minutes[key] = start
+        return start
+
+    def parse(self, data: bytes) -> Tuple[Dict[int, _Bucket], int]:
+        """Aggregate complete log lines into buckets.
+
+        Args:
+            data: Log content (complete lines)
+
+        Returns:
+            Buckets by start time, and the number of lines counted
+        """
+        cutoff = self.clock() - self.retention_seconds
+        buckets: Dict[int, _Bucket] = {}
+        counted = 0
+        for (minute, offset), group in groupby(_LINE_RE.findall(data), key=itemgetter(1, 2)):
+            start = self._bucket_start(minute, offset)
+            if start is None or start + self.bucket_seconds <= cutoff:
+                continue
+            rows = list(group)
+            bucket = buckets.get(start)
+            if bucket is None:
+                bucket = buckets[start] = _Bucket()
+            bucket.add_rows(rows)
+            counted += len(rows)
+        return buckets, counted
+
+    def _read_from(self, log: _LogFile, path: str, offset: int) -> int:
+        """Read and aggregate a file from an offset to its end.
+
+        Returns:
+            Offset after the last byte read
+        """
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while True:
+                chunk = f.read(READ_CHUNK_BYTES)
+                if not chunk:
+                    break
+                offset += len(chunk)
+                data = log.rest + chunk
+                end = data.rfind(b"\n") + 1
+                log.rest = data[end:]
+                if len(log.rest) > MAX_LINE_BYTES:
+                    log.rest = b""
+                if end:
+                    buckets, counted = self.parse(data[:end])
+                    self._merge(log, buckets, counted)
+        return offset
+
+    def _merge(self, log: _LogFile, buckets: Dict[int, _Bucket], counted: int) -> None:
+        """Merge freshly parsed buckets into a log's aggregates."""
+        with self._lock:
+            for start, bucket in buckets.items():
+                existing = log.buckets.get(start)
+                if existing is None:
+                    log.buckets[start] = bucket
+                else:
+                    existing.merge(bucket)
+            log.lines += counted
+
+    def _expire(self, log: _LogFile) -> None:
+        """Compact closed buckets and drop buckets past the retention."""
+        now = self.clock()
+        current = int(now) // self.bucket_seconds * self.bucket_seconds
+        cutoff = now - self.retention_seconds
+        with self._lock:
+            for start in list(log.buckets):
+                bucket = log.buckets[start]
+                if start + self.bucket_seconds <= cutoff:
+                    del log.buckets[start]
+                elif start < current and not bucket.compacted:
+                    bucket.compact(self.top_size)
+
+    def ingest(self, log: _LogFile) -> None:
+        """Read new lines of one log, following rotation and truncation."""
+        try:
+            stat = os.stat(log.path)
+        except FileNotFoundError:
+            return
+
+        if log.inode is not None and stat.st_ino != log.inode:
+            # Rotated: finish the old file if it was renamed to <log>.1
+            rotated = f"{log.path}.1"
+            try:
+                if os.stat(rotated).st_ino == log.inode:
+                    self._read_from(log, rotated, log.offset)
+            except OSError:
+                pass
+            log.offset = 0
+            log.rest = b""
+        elif stat.st_size < log.offset:
+            # Truncated in place (copytruncate)
+            log.offset = 0
+            log.rest = b""
+
+        log.inode = stat.st_ino
+        try:
+            log.offset = self._read_from(log, log.path, log.offset)
+        except OSError as e:
+            logger.warning(f"Cannot read access log {log.path}: {e}")
+        log.last_read = self.clock()
+        self._expire(log)
+
+    def ingest_all(self) -> None:
+        """Read new lines of all access logs (blocking)."""
+        self._discover()
+        for log in list(self._logs.values()):
+            self.ingest(log)
+
+    async def refresh(self) -> None:
+        """Read new lines of all access logs on the scan pool."""
+        await run_scan(self.ingest_all)
+
+    def names(self) -> List[str]:
+        """Names of all tracked logs."""
+        return sorted(self._logs)
+
+    def summary(self, name: str, window_seconds: float = 3600.0, top: int = 10) -> TrafficSummary:
+        """Summarize the traffic of a log over the most recent window.
+
+        Args:
+            name: Log name
+            window_seconds: Window length (whole buckets overlapping it are included)
+            top: Number of top paths and clients
+
+        Returns:
+            TrafficSummary
+
+        Raises:
+            KeyError: If the log is unknown
+        """
+        log = self._logs[name]
+        since = self.clock() - window_seconds
+        total = _Bucket()
+        with self._lock:
+            for start, bucket in log.buckets.items():
+                if start + self.bucket_seconds > since:
+                    total.merge(bucket)
+
+        status_codes = {status.decode(): count for status, count in sorted(total.statuses.items())}
+        status_classes: Dict[str, int] = {}
+        for status, count in status_codes.items():
+            status_classes[f"{status[0]}xx"] = status_classes.get(f"{status[0]}xx", 0) + count
+
+        p50 = histogram_percentile(total.upstream, 50)
+        p95 = histogram_percentile(total.upstream, 95)
+        return TrafficSummary(
+            name=name,
+            window_seconds=window_seconds,
+            requests=total.requests,
+            requests_per_second=round(total.requests / window_seconds, 3) if window_seconds > 0 else 0.0,
+            bytes_sent=total.bytes_sent,
+            status_codes=status_codes,
+            status_classes=status_classes,
+            top_paths=[(path.decode(errors="replace"), count) for path, count in total.paths.most_common(top)],
+            top_clients=[(client.decode(errors="replace"), count) for client, count in total.clients.most_common(top)],
+            upstream_histogram=list(zip([*UPSTREAM_BOUNDS, None], total.upstream)),
+            upstream_p50_ms=p50 * 1000 if p50 is not None else None,
+            upstream_p95_ms=p95 * 1000 if p95 is not None else None,
+            last_read=log.last_read,
+        )
+
+    def timeline(self, name: str, window_seconds: float = 3600.0) -> List[TrafficPoint]:
+        """Per-bucket traffic of a log over the most recent window.
+
+        Args:
+            name: Log name
+            window_seconds: Window length
+
+        Returns:
+            TrafficPoints in time order (buckets without traffic are omitted)
+
+        Raises:
+            KeyError: If the log is unknown
+        """
+        log = self._logs[name]
+        since = self.clock() - window_seconds
+        points = []
+        with self._lock:
+            for start in sorted(log.buckets):
+                if start + self.bucket_seconds <= since:
+                    continue
+                bucket = log.buckets[start]
+                points.append(TrafficPoint(
+                    timestamp=float(start),
+                    requests=bucket.requests,
+                    bytes_sent=bucket.bytes_sent,
+                    client_errors=sum(c for s, c in bucket.statuses.items() if s[:1] == b"4"),
+                    server_errors=sum(c for s, c in bucket.statuses.items() if s[:1] == b"5"),
+                ))
+        return points
+
+    async def _run(self) -> None:
+        """Background ingest loop."""
+        while True:
+            started = time.monotonic()
+            try:
+                await self.refresh()
+                logger.debug(f"Access logs read in {time.monotonic() - started:.2f}s")
+            except Exception as e:
+                logger.error(f"Access log ingest failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background ingest task."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Access log analytics started (log dir: {self.log_dir}, interval: {self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the background ingest task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Access log analytics stopped")
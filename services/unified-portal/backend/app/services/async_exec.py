@@ -0,0 +1,277 @@
+"""Async execution layer: per-target limits, file I/O and scan pools, disconnect cancellation."""
+from __future__ import annotations
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, Optional, TypeVar
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+T = TypeVar("T")
+
+# Execution targets with their own concurrency limit
+TARGET_DOCKER = "docker"
+TARGET_WP_CLI = "wp-cli"
+TARGET_MYSQL = "mysql"
+
+
+class ExecTimeoutError(RuntimeError):
+    """Raised when a limited call does not finish within its timeout."""
+
+
+class ExecLimits:
+    """Per-target concurrency limits for calls into other containers.
+
+    Each target (docker, wp-cli, mysql) gets its own semaphore, so a burst
+    of slow wp-cli commands cannot starve docker or mysql calls, and the
+    portal never has more commands in flight against one target than that
+    target handles well. Callers waiting for a slot count against their
+    timeout.
+    """
+
+    def __init__(self, limits: Dict[str, int] | None = None):
+        """Initialize execution limits.
+
+        Args:
+            limits: Maximum concurrent calls per target (defaults to settings)
+        """
+        self.limits = limits or {
+            TARGET_DOCKER: settings.exec_limit_docker,
+            TARGET_WP_CLI: settings.exec_limit_wp_cli,
+            TARGET_MYSQL: settings.exec_limit_mysql,
+        }
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _semaphore(self, target: str) -> asyncio.Semaphore:
+        """Semaphore of a target, bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._semaphores = {}
+            self._loop = loop
+        semaphore = self._semaphores.get(target)
+        if semaphore is None:
+            if target not in self.limits:
+                raise ValueError(f"Unknown execution target: {target}")
+            semaphore = asyncio.Semaphore(self.limits[target])
+            self._semaphores[target] = semaphore
+        return semaphore
+
+    @asynccontextmanager
+    async def slot(self, target: str) -> AsyncIterator[None]:
+        """Hold one concurrency slot of a target.
+
+        Args:
+            target: Execution target
+        """
+        async with self._semaphore(target):
+            yield
+
+    async def run(self, target: str, call: Awaitable[T], timeout: float) -> T:
+        """Run a call within the target's concurrency limit and a timeout.
+
+        Args:
+            target: Execution target
+            call: Awaitable to run (e.g. a docker exec coroutine)
+            timeout: Seconds until the call (including waiting for a slot) is cancelled
+
+        Returns:
+            Result of the call
+
+        Raises:
+            ExecTimeoutError: If the call does not finish in time
+        """
+        async def limited() -> T:
+            async with self.slot(target):
+                return await call
+
+        try:
+            return await asyncio.wait_for(limited(), timeout=timeout)
+        except asyncio.TimeoutError:
+            raise ExecTimeoutError(f"{target} call timed out after {timeout:g}s")
+
+
+# Dedicated pool for short blocking file system work (procfs/cgroup reads,
+# SQLite, log tails), kept off the default executor.
+_io_pool: ThreadPoolExecutor | None = None
+
+# Separate pool for long-running scans (backup trees, access-log ingest),
+# so a few slow scans cannot occupy the threads the dashboard samplers need.
+_scan_pool: ThreadPoolExecutor | None = None
+
+
+def get_io_pool() -> ThreadPoolExecutor:
+    """Get the file I/O thread pool.
+
+    Returns:
+        ThreadPoolExecutor shared by all short blocking file operations
+    """
+    global _io_pool
+    if _io_pool is None:
+        _io_pool = ThreadPoolExecutor(max_workers=settings.file_io_workers, thread_name_prefix="file-io")
+    return _io_pool
+
+
+def get_scan_pool() -> ThreadPoolExecutor:
+    """Get the thread pool for long-running scans.
+
+    Returns:
+        ThreadPoolExecutor shared by all long-running scans
+    """
+    global _scan_pool
+    if _scan_pool is None:
+        _scan_pool = ThreadPoolExecutor(max_workers=settings.scan_workers, thread_name_prefix="scan")
+    return _scan_pool
+
+
+async def run_blocking(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a short blocking function on the file I/O thread pool.
+
+    Args:
+        func: Blocking function
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+
+    Returns:
+        Result of the function
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_io_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def run_scan(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Run a long-running blocking scan on the scan thread pool.
+
+    Args:
+        func: Blocking function
+        *args: Positional arguments
+        **kwargs: Keyword arguments
+
+    Returns:
+        Result of the function
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_scan_pool(), functools.partial(func, *args, **kwargs))
+
+
+def shutdown_io_pool() -> None:
+    """Shut down the file I/O and scan thread pools, dropping queued jobs."""
+    global _io_pool, _scan_pool
+    for pool in (_io_pool, _scan_pool):
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+    _io_pool = None
+    _scan_pool = None
+
+
+def discard_loop_client(client: Any, loop: asyncio.AbstractEventLoop | None) -> None:
+    """Close a pooled async client bound to another event loop before it is replaced.
+
+    The client's connections belong to `loop`, so they are closed there if
+    that loop still runs (in another thread). A stopped or closed loop can no
+    longer run the close; the client is dropped and its sockets are released
+    with their transports.
+
+    Args:
+        client: Async client with `aclose()` (e.g. httpx.AsyncClient), or None
+        loop: Event loop the client was created on
+    """
+    if client is None or getattr(client, "is_closed", False):
+        return
+    if loop is not None and not loop.is_closed() and loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+
+
+# Only read-only requests are cancelled; a dropped POST must still run to
+# completion (or its own cleanup) rather than stop halfway through a change.
+CANCELLABLE_METHODS = frozenset({"GET", "HEAD"})
+
+
+class CancelOnDisconnectMiddleware:
+    """ASGI middleware cancelling a request handler when the client goes away.
+
+    The connection is read by a watcher task that forwards request messages
+    to the handler; if `http.disconnect` arrives before the response is
+    complete, the handler task is cancelled, which cancels any exec, wp-cli
+    or file I/O await in progress. Handlers that wait for the disconnect
+    themselves (streaming responses) still receive it.
+
+    Only requests with a read-only method are cancelled; mutating requests
+    are passed through untouched.
+    """
+
+    def __init__(self, app: Callable, methods: Iterable[str] = CANCELLABLE_METHODS):
+        """Initialize middleware.
+
+        Args:
+            app: ASGI application
+            methods: HTTP methods whose handlers may be cancelled
+        """
+        self.app = app
+        self.methods = frozenset(method.upper() for method in methods)
+
+    async def __call__(self, scope: Dict[str, Any], receive: Callable, send: Callable) -> None:
+        if scope["type"] != "http" or scope.get("method") not in self.methods:
+            await self.app(scope, receive, send)
+            return
+
+        messages: asyncio.Queue = asyncio.Queue()
+        disconnected = asyncio.Event()
+        response_done = False
+
+        async def wrapped_receive() -> Dict[str, Any]:
+            if disconnected.is_set() and messages.empty():
+                return {"type": "http.disconnect"}
+            return await messages.get()
+
+        async def wrapped_send(message: Dict[str, Any]) -> None:
+            nonlocal response_done
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                response_done = True
+            await send(message)
+
+        handler = asyncio.create_task(self.app(scope, wrapped_receive, wrapped_send))
+
+        async def watch() -> None:
+            while True:
+                message = await receive()
+                messages.put_nowait(message)
+                if message["type"] == "http.disconnect":
+                    disconnected.set()
+                    if not response_done and not handler.done():
+                        logger.info(f"Client disconnected, cancelling {scope.get('method')} {scope.get('path')}")
+                        handler.cancel()
+                    return
+
+        watcher = asyncio.create_task(watch())
+        try:
+            await handler
+        except asyncio.CancelledError:
+            if not disconnected.is_set():
+                raise
+        finally:
+            watcher.cancel()
+            if not handler.done():
+                handler.cancel()
+
+
+# Singleton instance
+_exec_limits: Optional[ExecLimits] = None
+
+
+def get_exec_limits() -> ExecLimits:
+    """Get execution limits singleton.
+
+    Returns:
+        ExecLimits instance
+    """
+    global _exec_limits
+    if _exec_limits is None:
+        _exec_limits = ExecLimits()
+    return _exec_limits
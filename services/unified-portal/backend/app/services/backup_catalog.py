@@ -0,0 +1,228 @@
+"""Persistent catalog of backup directories and their sizes."""
+from __future__ import annotations
+
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional
+
+from app.config import get_settings
+from app.services.directory_sizer import DirectorySizer, DirectoryUsage
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Written by the backup scripts into every backup directory
+CHECKSUM_FILE = "checksums.sha256"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    path TEXT PRIMARY KEY,
+    root TEXT NOT NULL,
+    mtime REAL NOT NULL,
+    size_bytes INTEGER NOT NULL,
+    disk_bytes INTEGER NOT NULL,
+    exclusive_bytes INTEGER NOT NULL,
+    file_count INTEGER NOT NULL,
+    checksum_status TEXT NOT NULL,
+    scanned_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_backups_root ON backups (root);
+"""
+
+
+@dataclass
+class BackupEntry:
+    """Catalogued backup directory.
+
+    Attributes:
+        path: Backup directory path
+        root: Parent directory the backup was found in
+        mtime: Directory modification time
+        size_bytes: Apparent size of regular files (hard links counted once)
+        disk_bytes: Allocated disk space (hard links counted once)
+        exclusive_bytes: Disk space not shared with other backups via hard links
+        file_count: Number of regular files
+        checksum_status: "present" if checksums.sha256 exists, else "missing"
+        scanned_at: Unix time the directory was measured
+    """
+
+    path: str
+    root: str
+    mtime: float
+    size_bytes: int
+    disk_bytes: int
+    exclusive_bytes: int
+    file_count: int
+    checksum_status: str
+    scanned_at: float
+
+    @property
+    def name(self) -> str:
+        """Backup directory name (usually its date)."""
+        return os.path.basename(self.path)
+
+
+def measure_directory(path: str) -> DirectoryUsage:
+    """Measure a backup directory on a thread pool (hard links counted once).
+
+    Args:
+        path: Directory path
+
+    Returns:
+        DirectoryUsage of the directory
+    """
+    return DirectorySizer().measure(path)
+
+
+class BackupCatalog:
+    """SQLite index of backup directories.
+
+    Backup directories are immutable once written, so a directory is only
+    measured when it is new or its mtime changed. Directories modified within
+    `settle_seconds` of their last scan are treated as still being written
+    and measured again on the next scan.
+    """
+
+    def __init__(
+        self,
+        db_path: str | None = None,
+        measure: Callable[[str], DirectoryUsage] = measure_directory,
+        settle_seconds: float = 600.0,
+    ):
+        """Initialize backup catalog.
+
+        Args:
+            db_path: SQLite database path (defaults to settings.backup_catalog_path)
+            measure: Callable returning the DirectoryUsage of a directory
+            settle_seconds: Minimum age of a directory before its size is trusted
+        """
+        self.db_path = db_path or settings.backup_catalog_path
+        self.measure = measure
+        self.settle_seconds = settle_seconds
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the catalog database, falling back to an in-memory one."""
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Backup catalog {self.db_path} unavailable, using in-memory catalog: {e}")
+            conn = sqlite3.connect(":memory:", check_same_thread=False)
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(backups)")]
+        if columns and "exclusive_bytes" not in columns:
+            # Catalog from before hard link aware sizing: rebuild
+            conn.execute("DROP TABLE backups")
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def _load(self, root: str) -> Dict[str, BackupEntry]:
+        """Load catalogued entries of a root directory."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path, root, mtime, size_bytes, disk_bytes, exclusive_bytes, file_count, "
+                "checksum_status, scanned_at "
+                "FROM backups WHERE root = ?",
+                (root,),
+            ).fetchall()
+        return {row[0]: BackupEntry(*row) for row in rows}
+
+    def _is_current(self, entry: Optional[BackupEntry], mtime: float) -> bool:
+        """Whether a catalogued entry can be reused for a directory."""
+        if entry is None or entry.mtime != mtime:
+            return False
+        return entry.scanned_at - entry.mtime >= self.settle_seconds
+
+    def scan(self, root: str) -> List[BackupEntry]:
+        """Get all backup directories of a root, measuring only new or changed ones.
+
+        Args:
+            root: Directory containing one subdirectory per backup
+
+        Returns:
+            Backup entries sorted by name, newest first
+        """
+        if not os.path.isdir(root):
+            return []
+
+        known = self._load(root)
+        entries = []
+        updated = []
+        seen = set()
+
+        with os.scandir(root) as it:
+            for dir_entry in it:
+                if dir_entry.name.startswith(".") or not dir_entry.is_dir(follow_symlinks=False):
+                    continue
+
+                path = dir_entry.path
+                seen.add(path)
+                mtime = dir_entry.stat(follow_symlinks=False).st_mtime
+                entry = known.get(path)
+
+                if not self._is_current(entry, mtime):
+                    usage = self.measure(path)
+                    checksum_status = "present" if os.path.isfile(os.path.join(path, CHECKSUM_FILE)) else "missing"
+                    entry = BackupEntry(
+                        path=path,
+                        root=root,
+                        mtime=mtime,
+                        size_bytes=usage.apparent_bytes,
+                        disk_bytes=usage.disk_bytes,
+                        exclusive_bytes=usage.exclusive_bytes,
+                        file_count=usage.file_count,
+                        checksum_status=checksum_status,
+                        scanned_at=time.time(),
+                    )
+                    updated.append(entry)
+
+                entries.append(entry)
+
+        removed = [path for path in known if path not in seen]
+
+        if updated or removed:
+            with self._lock, self._conn:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO backups "
+                    "(path, root, mtime, size_bytes, disk_bytes, exclusive_bytes, file_count, "
+                    "checksum_status, scanned_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    [
+                        (e.path, e.root, e.mtime, e.size_bytes, e.disk_bytes, e.exclusive_bytes,
+                         e.file_count, e.checksum_status, e.scanned_at)
+                        for e in updated
+                    ],
+                )
+                self._conn.executemany("DELETE FROM backups WHERE path = ?", [(path,) for path in removed])
+            logger.info(f"Backup catalog {root}: {len(updated)} measured, {len(removed)} removed")
+
+        entries.sort(key=lambda e: e.name, reverse=True)
+        return entries
+
+
+# Singleton instance
+_backup_catalog: BackupCatalog | None = None
+
+
+def get_backup_catalog() -> BackupCatalog:
+    """Get backup catalog singleton.
+
+    Returns:
+        BackupCatalog instance
+    """
+    global _backup_catalog
+    if _backup_catalog is None:
+        _backup_catalog = BackupCatalog()
+    return _backup_catalog
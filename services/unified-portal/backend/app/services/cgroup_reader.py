@@ -0,0 +1,342 @@
+"""Container resource counters read directly from cgroup v2 and procfs."""
+from __future__ import annotations
+
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.docker_client import (
+    calculate_block_io,
+    calculate_memory_usage,
+    calculate_network_io,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# CPU% sample series of the callers sharing the reader singleton
+BASELINE_DEFAULT = "default"
+BASELINE_DASHBOARD = "dashboard"
+BASELINE_CONTAINER_DETAIL = "container-detail"
+
+
+class CgroupNotFoundError(FileNotFoundError):
+    """No cgroup v2 directory found for a container."""
+
+
+@dataclass
+class ContainerResources:
+    """Raw resource counters of a single container.
+
+    Counters are cumulative since container start; clients compute rates
+    from two samples using `timestamp_ns`.
+
+    Attributes:
+        timestamp_ns: Unix time of the sample in nanoseconds
+        cpu_usage_ns: Total CPU time consumed
+        cpu_user_ns: CPU time spent in user mode
+        cpu_system_ns: CPU time spent in kernel mode
+        memory_usage_bytes: Memory usage excluding inactive page cache
+        memory_limit_bytes: Memory limit (host memory when unlimited)
+        block_read_bytes: Bytes read from block devices
+        block_write_bytes: Bytes written to block devices
+        network_rx_bytes: Bytes received on all non-loopback interfaces
+        network_tx_bytes: Bytes transmitted on all non-loopback interfaces
+        source: Where the counters came from ("cgroup" or "docker_api")
+    """
+
+    timestamp_ns: int
+    cpu_usage_ns: int = 0
+    cpu_user_ns: int = 0
+    cpu_system_ns: int = 0
+    memory_usage_bytes: int = 0
+    memory_limit_bytes: int = 0
+    block_read_bytes: int = 0
+    block_write_bytes: int = 0
+    network_rx_bytes: int = 0
+    network_tx_bytes: int = 0
+    source: str = "cgroup"
+
+    @classmethod
+    def from_stats(cls, stats: Dict[str, Any]) -> "ContainerResources":
+        """Build resources from a Docker stats API response.
+
+        Used as a fallback when the cgroup filesystem is not available.
+
+        Args:
+            stats: Stats API response
+
+        Returns:
+            ContainerResources instance
+        """
+        cpu_usage = (stats.get("cpu_stats") or {}).get("cpu_usage") or {}
+        mem_used, mem_limit = calculate_memory_usage(stats)
+        rx_bytes, tx_bytes = calculate_network_io(stats)
+        read_bytes, write_bytes = calculate_block_io(stats)
+
+        return cls(
+            timestamp_ns=time.time_ns(),
+            cpu_usage_ns=cpu_usage.get("total_usage", 0),
+            cpu_user_ns=cpu_usage.get("usage_in_usermode", 0),
+            cpu_system_ns=cpu_usage.get("usage_in_kernelmode", 0),
+            memory_usage_bytes=mem_used,
+            memory_limit_bytes=mem_limit,
+            block_read_bytes=read_bytes,
+            block_write_bytes=write_bytes,
+            network_rx_bytes=rx_bytes,
+            network_tx_bytes=tx_bytes,
+            source="docker_api",
+        )
+
+
+def _read_text(path: str) -> str:
+    """Read a small pseudo-file."""
+    with open(path, "r") as f:
+        return f.read()
+
+
+def _read_flat_keyed(path: str) -> Dict[str, int]:
+    """Parse a flat keyed cgroup file (e.g. cpu.stat, memory.stat)."""
+    values = {}
+    for line in _read_text(path).splitlines():
+        parts = line.split()
+        if len(parts) == 2 and parts[1].isdigit():
+            values[parts[0]] = int(parts[1])
+    return values
+
+
+class CgroupReader:
+    """Reads per-container counters from /sys/fs/cgroup and /proc.
+
+    Only cgroup v2 is supported. Both the systemd (`system.slice/docker-<id>.scope`)
+    and cgroupfs (`docker/<id>`) cgroup drivers are recognised. Reads are a
+    handful of small pseudo-file reads, cheap enough to poll every second.
+    """
+
+    def __init__(self, cgroup_root: str | None = None, proc_root: str | None = None):
+        """Initialize cgroup reader.
+
+        Args:
+            cgroup_root: Host cgroup v2 mount (defaults to settings.cgroup_root)
+            proc_root: Host procfs mount (defaults to settings.host_proc_root)
+        """
+        self.cgroup_root = cgroup_root or settings.cgroup_root
+        self.proc_root = proc_root or settings.host_proc_root
+        self._paths: Dict[str, str] = {}
+        # Previous CPU sample per (baseline, container ID)
+        self._last_cpu: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+    def cgroup_path(self, container_id: str) -> str:
+        """Find the cgroup directory of a container.
+
+        Args:
+            container_id: Full container ID
+
+        Returns:
+            Absolute cgroup directory path
+
+        Raises:
+            CgroupNotFoundError: If no cgroup directory exists for the container
+        """
+        path = self._paths.get(container_id)
+        if path and os.path.isdir(path):
+            return path
+
+        candidates = [
+            os.path.join(self.cgroup_root, "system.slice", f"docker-{container_id}.scope"),
+            os.path.join(self.cgroup_root, "docker", container_id),
+        ]
+        for candidate in candidates:
+            if os.path.isfile(os.path.join(candidate, "cgroup.controllers")):
+                self._paths[container_id] = candidate
+                return candidate
+
+        self._paths.pop(container_id, None)
+        raise CgroupNotFoundError(f"No cgroup v2 directory for container {container_id[:12]}")
+
+    def _read_memory(self, path: str) -> Tuple[int, int]:
+        """Read memory usage (excluding inactive file cache) and limit."""
+        usage = int(_read_text(os.path.join(path, "memory.current")).strip())
+        stat = _read_flat_keyed(os.path.join(path, "memory.stat"))
+        inactive_file = stat.get("inactive_file", 0)
+        if inactive_file < usage:
+            usage -= inactive_file
+
+        limit_raw = _read_text(os.path.join(path, "memory.max")).strip()
+        if limit_raw == "max":
+            limit = self._host_memory_total()
+        else:
+            limit = int(limit_raw)
+        return usage, limit
+
+    def _host_memory_total(self) -> int:
+        """Read total host memory in bytes (reported as the limit when unlimited)."""
+        try:
+            for line in _read_text(os.path.join(self.proc_root, "meminfo")).splitlines():
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+        return 0
+
+    def _read_io(self, path: str) -> Tuple[int, int]:
+        """Sum bytes read and written over all block devices from io.stat."""
+        read_bytes = 0
+        write_bytes = 0
+        try:
+            content = _read_text(os.path.join(path, "io.stat"))
+        except FileNotFoundError:
+            # io controller not enabled for this cgroup
+            return 0, 0
+
+        for line in content.splitlines():
+            for field in line.split()[1:]:
+                key, _, value = field.partition("=")
+                if key == "rbytes":
+                    read_bytes += int(value)
+                elif key == "wbytes":
+                    write_bytes += int(value)
+        return read_bytes, write_bytes
+
+    def _read_network(self, path: str) -> Tuple[int, int]:
+        """Sum network counters of the container's network namespace.
+
+        The namespace is reached through the first process of the cgroup.
+        """
+        pids = _read_text(os.path.join(path, "cgroup.procs")).split()
+        if not pids:
+            return 0, 0
+
+        rx_bytes = 0
+        tx_bytes = 0
+        content = _read_text(os.path.join(self.proc_root, pids[0], "net", "dev"))
+        # Skip the two header lines
+        for line in content.splitlines()[2:]:
+            interface, _, counters = line.partition(":")
+            if interface.strip() == "lo":
+                continue
+            fields = counters.split()
+            if len(fields) >= 9:
+                rx_bytes += int(fields[0])
+                tx_bytes += int(fields[8])
+        return rx_bytes, tx_bytes
+
+    def read(self, container_id: str) -> ContainerResources:
+        """Read the resource counters of a container.
+
+        Args:
+            container_id: Full container ID
+
+        Returns:
+            ContainerResources instance
+
+        Raises:
+            CgroupNotFoundError: If the container has no cgroup (not running,
+                or cgroup filesystem not mounted)
+            OSError: If a counter file cannot be read
+        """
+        path = self.cgroup_path(container_id)
+        timestamp_ns = time.time_ns()
+
+        cpu = _read_flat_keyed(os.path.join(path, "cpu.stat"))
+        memory_usage, memory_limit = self._read_memory(path)
+        read_bytes, write_bytes = self._read_io(path)
+
+        try:
+            rx_bytes, tx_bytes = self._read_network(path)
+        except OSError as e:
+            logger.debug(f"Network counters unavailable for {container_id[:12]}: {e}")
+            rx_bytes, tx_bytes = 0, 0
+
+        return ContainerResources(
+            timestamp_ns=timestamp_ns,
+            cpu_usage_ns=cpu.get("usage_usec", 0) * 1000,
+            cpu_user_ns=cpu.get("user_usec", 0) * 1000,
+            cpu_system_ns=cpu.get("system_usec", 0) * 1000,
+            memory_usage_bytes=memory_usage,
+            memory_limit_bytes=memory_limit,
+            block_read_bytes=read_bytes,
+            block_write_bytes=write_bytes,
+            network_rx_bytes=rx_bytes,
+            network_tx_bytes=tx_bytes,
+        )
+
+    def read_many(self, container_ids: List[str]) -> Dict[str, ContainerResources]:
+        """Read counters of several containers, skipping unreadable ones.
+
+        State kept for containers that have since been removed is pruned.
+
+        Args:
+            container_ids: Full container IDs
+
+        Returns:
+            Mapping of container ID to resources
+        """
+        resources = {}
+        for container_id in container_ids:
+            try:
+                resources[container_id] = self.read(container_id)
+            except OSError as e:
+                logger.debug(f"Cgroup read failed for {container_id[:12]}: {e}")
+        self.prune()
+        return resources
+
+    def prune(self) -> None:
+        """Forget cgroup paths and CPU samples of containers whose cgroup is gone."""
+        for container_id, path in list(self._paths.items()):
+            if not os.path.isdir(path):
+                self._paths.pop(container_id, None)
+        for key in [key for key in self._last_cpu if key[1] not in self._paths]:
+            self._last_cpu.pop(key, None)
+
+    def cpu_percent(
+        self,
+        container_id: str,
+        resources: ContainerResources,
+        baseline: str = BASELINE_DEFAULT,
+    ) -> Optional[float]:
+        """Calculate CPU% against the previous sample of the same container.
+
+        The value has the same scale as `docker stats` (100% per busy core).
+        Each caller passes its own `baseline`, so callers sampling at
+        different times do not overwrite each other's previous sample (which
+        would shorten the measured interval and make the value noisy).
+
+        Args:
+            container_id: Full container ID
+            resources: Current sample
+            baseline: Name of the caller's sample series
+
+        Returns:
+            CPU usage percentage, or None for the first sample of a container
+        """
+        key = (baseline, container_id)
+        previous = self._last_cpu.get(key)
+        self._last_cpu[key] = (resources.cpu_usage_ns, resources.timestamp_ns)
+        if previous is None:
+            return None
+
+        cpu_delta = resources.cpu_usage_ns - previous[0]
+        time_delta = resources.timestamp_ns - previous[1]
+        if cpu_delta < 0 or time_delta <= 0:
+            return None
+        return cpu_delta / time_delta * 100.0
+
+
+# Singleton instance
+_cgroup_reader: CgroupReader | None = None
+
+
+def get_cgroup_reader() -> CgroupReader:
+    """Get cgroup reader singleton.
+
+    Returns:
+        CgroupReader instance
+    """
+    global _cgroup_reader
+    if _cgroup_reader is None:
+        _cgroup_reader = CgroupReader()
+    return _cgroup_reader
@@ -0,0 +1,425 @@
+"""Shared Cloudflare API client with connection pooling and rate limiting."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+import re
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+from app.services.async_exec import discard_loop_client
+from app.services.http_prober import HTTP2_AVAILABLE, percentile
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+CLOUDFLARE_API_URL = "https://api.cloudflare.com/client/v4"
+
+# Largest page size accepted by the zones list endpoint
+ZONES_PAGE_SIZE = 50
+
+# Methods that are safe to repeat after a server error
+_IDEMPOTENT_METHODS = {"GET", "PUT", "DELETE", "PATCH"}
+
+# Zone, record, account and tunnel IDs in paths (grouped in endpoint metrics)
+_ID_SEGMENT_RE = re.compile(r"/(?:[0-9a-f]{32}|[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12})(?=/|$)")
+
+
+class CloudflareAPIError(RuntimeError):
+    """Raised when the Cloudflare API returns an error or cannot be reached."""
+
+    def __init__(self, status_code: int, message: str, errors: Optional[List[Any]] = None):
+        self.status_code = status_code
+        self.message = message
+        self.errors = errors or []
+        super().__init__(f"Cloudflare API error ({status_code}): {message}")
+
+
+class TokenBucket:
+    """Token bucket mirroring the Cloudflare API request budget.
+
+    Cloudflare allows 1200 requests per 5 minutes per user; the bucket
+    refills at `rate` tokens per second up to `capacity`. A 429 response
+    empties the bucket and blocks until its Retry-After has passed.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        """Initialize token bucket.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available."""
+        self._refill(time.monotonic())
+        return self._tokens
+
+    async def acquire(self) -> float:
+        """Take one token, waiting until one is available.
+
+        Returns:
+            Seconds spent waiting
+        """
+        waited = 0.0
+        while True:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                delay = self._blocked_until - now
+            else:
+                self._refill(now)
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return waited
+                delay = (1 - self._tokens) / self.rate
+            await asyncio.sleep(delay)
+            waited += delay
+
+    def block(self, seconds: float) -> None:
+        """Empty the bucket and pause all requests (after a 429)."""
+        now = time.monotonic()
+        self._tokens = 0.0
+        self._updated = now
+        self._blocked_until = max(self._blocked_until, now + seconds)
+
+
+@dataclass
+class EndpointStats:
+    """Request statistics of one endpoint (method and path template)."""
+
+    endpoint: str
+    requests: int = 0
+    errors: int = 0
+    retries: int = 0
+    throttled: int = 0
+    latencies_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+
+    def summary(self) -> Dict[str, Any]:
+        """Counters with p50/p95 latency of the recent requests."""
+        latencies = list(self.latencies_ms)
+        return {
+            "endpoint": self.endpoint,
+            "requests": self.requests,
+            "errors": self.errors,
+            "retries": self.retries,
+            "throttled": self.throttled,
+            "p50_ms": percentile(latencies, 50),
+            "p95_ms": percentile(latencies, 95),
+        }
+
+
+def endpoint_name(method: str, path: str) -> str:
+    """Metrics key of a request, with IDs replaced by {id}."""
+    return f"{method} {_ID_SEGMENT_RE.sub('/{id}', path.split('?', 1)[0])}"
+
+
+class CloudflareClient:
+    """Long-lived Cloudflare API v4 client.
+
+    One pooled (HTTP/2 when available) connection set is shared by the
+    domains router, tunnel service and security router. Every request takes
+    a token from the rate-limit bucket; 429 responses pause the bucket for
+    Retry-After, and 429/5xx/connection errors are retried with exponential
+    backoff (server errors only for idempotent methods).
+    """
+
+    def __init__(
+        self,
+        api_token: str | None = None,
+        base_url: str = CLOUDFLARE_API_URL,
+        timeout: float | None = None,
+        max_retries: int | None = None,
+        rate: float | None = None,
+        burst: int | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """Initialize Cloudflare client.
+
+        Args:
+            api_token: API token (defaults to settings)
+            base_url: API base URL
+            timeout: Request timeout in seconds (defaults to settings)
+            max_retries: Retries after 429/5xx/connection errors (defaults to settings)
+            rate: Sustained requests per second (defaults to settings)
+            burst: Token bucket capacity (defaults to settings)
+            transport: Optional httpx transport (for tests)
+        """
+        self.api_token = api_token if api_token is not None else settings.cloudflare_api_token
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout if timeout is not None else settings.cloudflare_timeout_seconds
+        self.max_retries = max_retries if max_retries is not None else settings.cloudflare_max_retries
+        self.bucket = TokenBucket(
+            rate if rate is not None else settings.cloudflare_rate_limit_per_second,
+            burst if burst is not None else settings.cloudflare_rate_limit_burst,
+        )
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._stats: Dict[str, EndpointStats] = {}
+
+    @property
+    def configured(self) -> bool:
+        """Whether an API token is configured."""
+        return bool(self.api_token) and self.api_token != "your-cloudflare-api-token"
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            discard_loop_client(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                http2=HTTP2_AVAILABLE and self._transport is None,
+                timeout=self.timeout,
+                headers={
+                    "Authorization": f"Bearer {self.api_token}",
+                    "Content-Type": "application/json",
+                },
+                limits=httpx.Limits(max_connections=20, max_keepalive_connections=10, keepalive_expiry=120.0),
+                transport=self._transport,
+            )
+            self._loop = loop
+        return self._client
+
+    def _backoff(self, attempt: int, response: httpx.Response | None) -> float:
+        """Delay before a retry: Retry-After if given, else exponential with jitter."""
+        if response is not None:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return min(float(retry_after), 60.0)
+                except ValueError:
+                    pass
+        return min(0.5 * 2 ** attempt, 8.0) * (0.5 + random.random() / 2)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] | None = None,
+        json: Any = None,
+    ) -> Dict[str, Any]:
+        """Send an API request.
+
+        Args:
+            method: HTTP method
+            path: Path below the API base URL (e.g. /zones)
+            params: Query parameters
+            json: JSON body
+
+        Returns:
+            Parsed response body (with `result`, `result_info`, ...)
+
+        Raises:
+            CloudflareAPIError: On HTTP errors, unsuccessful responses or
+                when retries are exhausted
+        """
+        if not self.configured:
+            raise CloudflareAPIError(500, "Cloudflare API token not configured")
+
+        method = method.upper()
+        stats = self._stats.get(endpoint_name(method, path))
+        if stats is None:
+            stats = self._stats[endpoint_name(method, path)] = EndpointStats(endpoint_name(method, path))
+
+        attempt = 0
+        while True:
+            await self.bucket.acquire()
+            stats.requests += 1
+            started = time.perf_counter()
+            response: httpx.Response | None = None
+            try:
+                response = await self.client.request(method, path, params=params, json=json)
+                error = None
+            except httpx.TimeoutException as e:
+                error = CloudflareAPIError(504, f"Request timed out: {method} {path}")
+                cause = e
+            except httpx.TransportError as e:
+                error = CloudflareAPIError(503, f"Cloudflare API unreachable: {e}")
+                cause = e
+            stats.latencies_ms.append((time.perf_counter() - started) * 1000)
+
+            if response is not None:
+                if response.status_code == 429:
+                    stats.throttled += 1
+                    delay = self._backoff(attempt, response)
+                    self.bucket.block(delay)
+                    retryable = True
+                else:
+                    retryable = response.status_code >= 500 and method in _IDEMPOTENT_METHODS
+                if not retryable or attempt >= self.max_retries:
+                    return self._parse(response, stats)
+            else:
+                # Connection errors before the request was sent are always safe to retry
+                retryable = isinstance(cause, httpx.ConnectError) or method in _IDEMPOTENT_METHODS
+                if not retryable or attempt >= self.max_retries:
+                    stats.errors += 1
+                    raise error
+
+            attempt += 1
+            stats.retries += 1
+            delay = self._backoff(attempt - 1, response)
+            logger.warning(
+                f"Cloudflare {method} {path} failed "
+                f"({response.status_code if response is not None else error.message}), "
+                f"retry {attempt}/{self.max_retries} in {delay:.1f}s"
+            )
+            if response is None or response.status_code != 429:
+                await asyncio.sleep(delay)
+
+    def _parse(self, response: httpx.Response, stats: EndpointStats) -> Dict[str, Any]:
+        """Parse a final response, raising CloudflareAPIError on failure."""
+        try:
+            data = response.json()
+        except ValueError:
+            data = None
+
+        if response.status_code >= 400 or not isinstance(data, dict) or not data.get("success", False):
+            stats.errors += 1
+            errors = data.get("errors", []) if isinstance(data, dict) else []
+            message = "; ".join(str(e.get("message", e)) if isinstance(e, dict) else str(e) for e in errors) or response.text
+            status_code = response.status_code if response.status_code >= 400 else 400
+            raise CloudflareAPIError(status_code, message, errors)
+        return data
+
+    async def get(self, path: str, params: Dict[str, Any] | None = None) -> Any:
+        """GET a resource and return its `result`."""
+        return (await self.request("GET", path, params=params)).get("result")
+
+    async def post(self, path: str, json: Any = None) -> Any:
+        """POST to a resource and return its `result`."""
+        return (await self.request("POST", path, json=json)).get("result")
+
+    async def put(self, path: str, json: Any = None) -> Any:
+        """PUT a resource and return its `result`."""
+        return (await self.request("PUT", path, json=json)).get("result")
+
+    async def patch(self, path: str, json: Any = None) -> Any:
+        """PATCH a resource and return its `result`."""
+        return (await self.request("PATCH", path, json=json)).get("result")
+
+    async def delete(self, path: str) -> Any:
+        """DELETE a resource and return its `result`."""
+        return (await self.request("DELETE", path)).get("result")
+
+    async def paginate(
+        self,
+        path: str,
+        params: Dict[str, Any] | None = None,
+        per_page: int = ZONES_PAGE_SIZE,
+        concurrency: int | None = None,
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield every page of a list endpoint, in order.
+
+        The first page reports `total_pages`; the remaining pages are then
+        fetched concurrently, keeping at most `concurrency` requests ahead of
+        the consumer so memory stays bounded for very large listings.
+
+        Args:
+            path: List endpoint path (e.g. /zones)
+            params: Query parameters (filters)
+            per_page: Page size
+            concurrency: Pages fetched ahead (defaults to settings)
+
+        Yields:
+            The `result` list of each page
+
+        Raises:
+            CloudflareAPIError: If a page cannot be fetched
+        """
+        params = {**(params or {}), "per_page": per_page}
+        first = await self.request("GET", path, params={**params, "page": 1})
+        yield first.get("result") or []
+
+        total_pages = (first.get("result_info") or {}).get("total_pages") or 1
+        pages = iter(range(2, total_pages + 1))
+        window = deque(
+            asyncio.ensure_future(self.request("GET", path, params={**params, "page": page}))
+            for page in islice(pages, concurrency or settings.cloudflare_page_concurrency)
+        )
+        try:
+            while window:
+                data = await window.popleft()
+                page = next(pages, None)
+                if page is not None:
+                    window.append(asyncio.ensure_future(self.request("GET", path, params={**params, "page": page})))
+                yield data.get("result") or []
+        finally:
+            for task in window:
+                task.cancel()
+            await asyncio.gather(*window, return_exceptions=True)
+
+    async def get_all(
+        self,
+        path: str,
+        params: Dict[str, Any] | None = None,
+        per_page: int = ZONES_PAGE_SIZE,
+    ) -> List[Dict[str, Any]]:
+        """Fetch all pages of a list endpoint.
+
+        Args:
+            path: List endpoint path (e.g. /zones)
+            params: Query parameters (filters)
+            per_page: Page size
+
+        Returns:
+            Results of all pages
+        """
+        results: List[Dict[str, Any]] = []
+        async for page in self.paginate(path, params=params, per_page=per_page):
+            results.extend(page)
+        return results
+
+    def metrics(self) -> Dict[str, Any]:
+        """Rate-limit budget and per-endpoint request statistics."""
+        return {
+            "http2": HTTP2_AVAILABLE,
+            "tokens_available": round(self.bucket.available, 1),
+            "endpoints": [stats.summary() for stats in sorted(self._stats.values(), key=lambda s: s.endpoint)],
+        }
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except RuntimeError:
+                # Client belonged to an event loop that is already closed
+                pass
+        self._client = None
+        self._loop = None
+
+
+# Singleton instance
+_cloudflare_client: CloudflareClient | None = None
+
+
+def get_cloudflare_client() -> CloudflareClient:
+    """Get Cloudflare client singleton.
+
+    Returns:
+        CloudflareClient instance
+    """
+    global _cloudflare_client
+    if _cloudflare_client is None:
+        _cloudflare_client = CloudflareClient()
+    return _cloudflare_client
@@ -0,0 +1,246 @@
+"""In-memory cache of Cloudflare zone IDs and DNS records."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.cloudflare_client import CloudflareClient, get_cloudflare_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Largest page size accepted by the DNS records list endpoint
+DNS_RECORDS_PAGE_SIZE = 5000
+
+
+@dataclass
+class ZoneRecords:
+    """Cached DNS records of one zone, indexed by ID and name."""
+
+    loaded_at: float
+    by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    by_name: Dict[str, Dict[str, Dict[str, Any]]] = field(default_factory=dict)
+
+    def put(self, record: Dict[str, Any]) -> None:
+        """Insert or replace a record."""
+        self.remove(record["id"])
+        self.by_id[record["id"]] = record
+        self.by_name.setdefault(record["name"].lower(), {})[record["id"]] = record
+
+    def remove(self, record_id: str) -> None:
+        """Remove a record if present."""
+        record = self.by_id.pop(record_id, None)
+        if record is not None:
+            named = self.by_name.get(record["name"].lower(), {})
+            named.pop(record_id, None)
+            if not named:
+                self.by_name.pop(record["name"].lower(), None)
+
+
+class CloudflareDNSCache:
+    """TTL cache of zone name -> ID and of each zone's DNS records.
+
+    Zone IDs rarely change and are kept for `zone_ttl` seconds. A zone's
+    records are loaded in full on first use and served from memory until
+    `records_ttl` passes or `refresh`/`invalidate` is called. Mutations made
+    through the portal are written through with `record_created`,
+    `record_updated` and `record_deleted`, so the cache stays current
+    without re-listing the zone; mutations that land while the zone is
+    being listed are replayed onto the fresh records once the load
+    finishes. Concurrent loads of the same zone share one API request.
+    """
+
+    def __init__(
+        self,
+        client: CloudflareClient | None = None,
+        zone_ttl: float | None = None,
+        records_ttl: float | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Initialize DNS cache.
+
+        Args:
+            client: Cloudflare API client (defaults to the shared client)
+            zone_ttl: Seconds to keep zone IDs (defaults to settings)
+            records_ttl: Seconds to keep zone records (defaults to settings)
+            clock: Monotonic time source (for tests)
+        """
+        self.client = client or get_cloudflare_client()
+        self.zone_ttl = zone_ttl if zone_ttl is not None else settings.cloudflare_zone_cache_seconds
+        self.records_ttl = records_ttl if records_ttl is not None else settings.cloudflare_dns_cache_seconds
+        self._clock = clock
+        self._zones: Dict[str, Tuple[str, float]] = {}
+        self._records: Dict[str, ZoneRecords] = {}
+        self._loading: Dict[str, asyncio.Task] = {}
+        self._pending: Dict[str, List[Callable[[ZoneRecords], None]]] = {}
+
+    # Zone IDs
+
+    def prime_zones(self, zones: List[Dict[str, Any]]) -> None:
+        """Store zone IDs from a zone listing."""
+        expires = self._clock() + self.zone_ttl
+        for zone in zones:
+            self._zones[zone["name"].lower()] = (zone["id"], expires)
+
+    async def zone_id(self, domain: str) -> Optional[str]:
+        """Get the zone ID of a domain.
+
+        Args:
+            domain: Zone name (e.g., kuma8088.com)
+
+        Returns:
+            Zone ID, or None if the zone does not exist
+
+        Raises:
+            CloudflareAPIError: If the lookup fails
+        """
+        key = domain.lower()
+        cached = self._zones.get(key)
+        if cached is not None and cached[1] > self._clock():
+            return cached[0]
+
+        zones = await self.client.get("/zones", params={"name": domain}) or []
+        if not zones:
+            self._zones.pop(key, None)
+            return None
+        self.prime_zones(zones[:1])
+        return zones[0]["id"]
+
+    def invalidate_zone_id(self, domain: str) -> None:
+        """Forget the cached zone ID of a domain."""
+        self._zones.pop(domain.lower(), None)
+
+    # DNS records
+
+    async def _load(self, zone_id: str) -> ZoneRecords:
+        """Fetch all records of a zone."""
+        records = ZoneRecords(loaded_at=self._clock())
+        pending = self._pending.setdefault(zone_id, [])
+        try:
+            async for page in self.client.paginate(f"/zones/{zone_id}/dns_records", per_page=DNS_RECORDS_PAGE_SIZE):
+                for record in page:
+                    records.put(record)
+        finally:
+            if self._pending.get(zone_id) is pending:
+                del self._pending[zone_id]
+
+        # The listing may predate write-throughs made while it was running
+        for apply in pending:
+            apply(records)
+        self._records[zone_id] = records
+        logger.debug(f"Cached {len(records.by_id)} DNS records of zone {zone_id}")
+        return records
+
+    async def _zone_records(self, zone_id: str, refresh: bool = False) -> ZoneRecords:
+        """Cached records of a zone, loading them if missing or expired."""
+        cached = self._records.get(zone_id)
+        if not refresh and cached is not None and cached.loaded_at + self.records_ttl > self._clock():
+            return cached
+
+        # Share an in-flight load on the same event loop
+        task = self._loading.get(zone_id)
+        if task is None or task.done() or task.get_loop() is not asyncio.get_running_loop():
+            task = asyncio.ensure_future(self._load(zone_id))
+            self._loading[zone_id] = task
+
+            def loaded(done: asyncio.Task) -> None:
+                if self._loading.get(zone_id) is done:
+                    del self._loading[zone_id]
+
+            task.add_done_callback(loaded)
+        return await asyncio.shield(task)
+
+    async def records(self, zone_id: str, refresh: bool = False) -> List[Dict[str, Any]]:
+        """All DNS records of a zone.
+
+        Args:
+            zone_id: Cloudflare zone ID
+            refresh: Reload from the API even if cached
+
+        Returns:
+            List of DNS records
+
+        Raises:
+            CloudflareAPIError: If loading the zone fails
+        """
+        return list((await self._zone_records(zone_id, refresh)).by_id.values())
+
+    async def find_records(
+        self,
+        zone_id: str,
+        name: str | None = None,
+        record_type: str | None = None,
+    ) -> List[Dict[str, Any]]:
+        """Find DNS records by name and/or type.
+
+        Args:
+            zone_id: Cloudflare zone ID
+            name: Fully qualified record name
+            record_type: Record type (A, CNAME, ...)
+
+        Returns:
+            Matching DNS records
+        """
+        zone = await self._zone_records(zone_id)
+        if name is not None:
+            candidates = list(zone.by_name.get(name.lower(), {}).values())
+        else:
+            candidates = list(zone.by_id.values())
+        if record_type is not None:
+            candidates = [record for record in candidates if record["type"] == record_type.upper()]
+        return candidates
+
+    async def get_record(self, zone_id: str, record_id: str) -> Optional[Dict[str, Any]]:
+        """Get a DNS record by ID, or None if it is not in the zone."""
+        return (await self._zone_records(zone_id)).by_id.get(record_id)
+
+    # Write-through
+
+    def _write_through(self, zone_id: str, apply: Callable[[ZoneRecords], None]) -> None:
+        """Apply a mutation to a cached zone and to any load in flight."""
+        zone = self._records.get(zone_id)
+        if zone is not None:
+            apply(zone)
+        pending = self._pending.get(zone_id)
+        if pending is not None:
+            pending.append(apply)
+
+    def record_created(self, zone_id: str, record: Dict[str, Any]) -> None:
+        """Add a record created through the API to a cached zone."""
+        self._write_through(zone_id, lambda zone: zone.put(record))
+
+    def record_updated(self, zone_id: str, record: Dict[str, Any]) -> None:
+        """Replace a record updated through the API in a cached zone."""
+        self.record_created(zone_id, record)
+
+    def record_deleted(self, zone_id: str, record_id: str) -> None:
+        """Remove a record deleted through the API from a cached zone."""
+        self._write_through(zone_id, lambda zone: zone.remove(record_id))
+
+    def invalidate(self, zone_id: str | None = None) -> None:
+        """Drop cached records of one zone, or all zones and zone IDs."""
+        if zone_id is None:
+            self._records.clear()
+            self._zones.clear()
+        else:
+            self._records.pop(zone_id, None)
+
+
+# Singleton instance
+_dns_cache: CloudflareDNSCache | None = None
+
+
+def get_cloudflare_dns_cache() -> CloudflareDNSCache:
+    """Get Cloudflare DNS cache singleton.
+
+    Returns:
+        CloudflareDNSCache instance
+    """
+    global _dns_cache
+    if _dns_cache is None:
+        _dns_cache = CloudflareDNSCache()
+    return _dns_cache
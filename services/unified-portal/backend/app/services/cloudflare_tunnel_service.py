@@ -1,12 +1,13 @@
 """Cloudflare Tunnel service for managing Public Hostnames."""
 from __future__ import annotations
 
+import asyncio
 import logging
 from typing import Any
 
-import httpx
-
 from app.config import get_settings
+from app.services.cloudflare_client import CloudflareClient, get_cloudflare_client
+from app.services.cloudflare_dns_cache import CloudflareDNSCache, get_cloudflare_dns_cache
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
@@ -24,6 +25,7 @@ class CloudflareTunnelService:
         account_id: str | None = None,
         tunnel_id: str | None = None,
         api_token: str | None = None,
+        client: CloudflareClient | None = None,
     ):
         """Initialize Cloudflare Tunnel service.
 
@@ -31,11 +33,21 @@ class CloudflareTunnelService:
             account_id: Cloudflare Account ID (defaults to settings)
             tunnel_id: Cloudflare Tunnel ID (defaults to settings)
             api_token: Cloudflare API Token (defaults to settings)
+            client: Cloudflare API client (defaults to the shared client,
+                or a dedicated one if api_token is given)
         """
         self.account_id = account_id or settings.cloudflare_account_id
         self.tunnel_id = tunnel_id or settings.cloudflare_tunnel_id
-        self.api_token = api_token or settings.cloudflare_api_token
-        self.base_url = "https://api.cloudflare.com/client/v4"
+        if client is None and not api_token:
+            self.client = get_cloudflare_client()
+            self.dns_cache = get_cloudflare_dns_cache()
+        else:
+            self.client = client or CloudflareClient(api_token=api_token)
+            self.dns_cache = CloudflareDNSCache(self.client)
+
+    @property
+    def _configurations_path(self) -> str:
+        return f"/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
 
     async def get_tunnel_config(self) -> dict[str, Any]:
         """Get current Cloudflare Tunnel configuration.
@@ -44,28 +56,11 @@ class CloudflareTunnelService:
             Current tunnel configuration with ingress rules
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
-        url = f"{self.base_url}/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Retrieved tunnel configuration: {len(data['result']['config']['ingress'])} ingress rules")
-            return data["result"]
+        result = await self.client.get(self._configurations_path)
+        logger.info(f"Retrieved tunnel configuration: {len(result['config']['ingress'])} ingress rules")
+        return result
 
     async def add_public_hostname(
         self,
@@ -84,7 +79,7 @@ class CloudflareTunnelService:
             Updated tunnel configuration
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
             ValueError: If configuration is invalid
         """
         # Get current configuration
@@ -121,27 +116,9 @@ class CloudflareTunnelService:
             }
         }
 
-        url = f"{self.base_url}/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                json=updated_config,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Added Public Hostname: {hostname} → {service}")
-            return data["result"]
+        result = await self.client.put(self._configurations_path, json=updated_config)
+        logger.info(f"Added Public Hostname: {hostname} → {service}")
+        return result
 
     async def remove_public_hostname(self, hostname: str) -> dict[str, Any]:
         """Remove a Public Hostname from Cloudflare Tunnel.
@@ -153,7 +130,7 @@ class CloudflareTunnelService:
             Updated tunnel configuration
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
             ValueError: If hostname not found
         """
         # Get current configuration
@@ -186,27 +163,9 @@ class CloudflareTunnelService:
             }
         }
 
-        url = f"{self.base_url}/accounts/{self.account_id}/cfd_tunnel/{self.tunnel_id}/configurations"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.put(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                json=updated_config,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Removed Public Hostname: {hostname}")
-            return data["result"]
+        result = await self.client.put(self._configurations_path, json=updated_config)
+        logger.info(f"Removed Public Hostname: {hostname}")
+        return result
 
     async def get_zone_id(self, domain: str) -> str:
         """Get Cloudflare Zone ID for a domain.
@@ -218,34 +177,15 @@ class CloudflareTunnelService:
             Zone ID
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
             ValueError: If zone not found
         """
-        url = f"{self.base_url}/zones?name={domain}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            zones = data.get("result", [])
-            if not zones:
-                raise ValueError(f"Zone not found: {domain}")
+        zone_id = await self.dns_cache.zone_id(domain)
+        if zone_id is None:
+            raise ValueError(f"Zone not found: {domain}")
 
-            zone_id = zones[0]["id"]
-            logger.info(f"Retrieved Zone ID for {domain}: {zone_id}")
-            return zone_id
+        logger.info(f"Retrieved Zone ID for {domain}: {zone_id}")
+        return zone_id
 
     async def create_dns_record(
         self,
@@ -264,7 +204,7 @@ class CloudflareTunnelService:
             Created DNS record
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
         tunnel_cname = f"{self.tunnel_id}.cfargotunnel.com"
 
@@ -280,27 +220,10 @@ class CloudflareTunnelService:
             "ttl": 1,  # Auto (when proxied=True)
         }
 
-        url = f"{self.base_url}/zones/{zone_id}/dns_records"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                json=dns_record,
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Created DNS CNAME record: {hostname} → {tunnel_cname}")
-            return data["result"]
+        result = await self.client.post(f"/zones/{zone_id}/dns_records", json=dns_record)
+        self.dns_cache.record_created(zone_id, result)
+        logger.info(f"Created DNS CNAME record: {hostname} → {tunnel_cname}")
+        return result
 
     async def find_dns_record(self, zone_id: str, hostname: str) -> dict[str, Any] | None:
         """Find DNS record by hostname.
@@ -313,33 +236,15 @@ class CloudflareTunnelService:
             DNS record dict or None if not found
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
-        url = f"{self.base_url}/zones/{zone_id}/dns_records?name={hostname}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
+        records = await self.dns_cache.find_records(zone_id, name=hostname)
+        if records:
+            logger.info(f"Found DNS record for {hostname}: {records[0]['id']}")
+            return records[0]
 
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            records = data.get("result", [])
-            if records:
-                logger.info(f"Found DNS record for {hostname}: {records[0]['id']}")
-                return records[0]
-
-            logger.info(f"No DNS record found for {hostname}")
-            return None
+        logger.info(f"No DNS record found for {hostname}")
+        return None
 
     async def delete_dns_record(self, zone_id: str, record_id: str) -> bool:
         """Delete DNS record.
@@ -352,28 +257,12 @@ class CloudflareTunnelService:
             True if deletion successful
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
-        url = f"{self.base_url}/zones/{zone_id}/dns_records/{record_id}"
-
-        async with httpx.AsyncClient() as client:
-            response = await client.delete(
-                url,
-                headers={
-                    "Authorization": f"Bearer {self.api_token}",
-                    "Content-Type": "application/json",
-                },
-                timeout=30.0,
-            )
-            response.raise_for_status()
-            data = response.json()
-
-            if not data.get("success"):
-                errors = data.get("errors", [])
-                raise ValueError(f"Cloudflare API error: {errors}")
-
-            logger.info(f"Deleted DNS record: {record_id}")
-            return True
+        await self.client.delete(f"/zones/{zone_id}/dns_records/{record_id}")
+        self.dns_cache.record_deleted(zone_id, record_id)
+        logger.info(f"Deleted DNS record: {record_id}")
+        return True
 
     async def setup_site_routing(
         self,
@@ -392,20 +281,20 @@ class CloudflareTunnelService:
             Dictionary with tunnel_config and dns_record
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
         try:
-            # 1. Add Public Hostname to Tunnel
-            tunnel_config = await self.add_public_hostname(
-                hostname=hostname,
-                service=service,
-                http_host_header=hostname,
+            # 1. Add Public Hostname to Tunnel, 2. Get Zone ID (read-only, overlaps the PUT)
+            tunnel_config, zone_id = await asyncio.gather(
+                self.add_public_hostname(
+                    hostname=hostname,
+                    service=service,
+                    http_host_header=hostname,
+                ),
+                self.get_zone_id(domain),
             )
 
-            # 2. Get Zone ID
-            zone_id = await self.get_zone_id(domain)
-
-            # 3. Create DNS CNAME record
+            # 3. Create DNS CNAME record only once the tunnel routes the hostname
             dns_record = await self.create_dns_record(
                 zone_id=zone_id,
                 hostname=hostname,
@@ -438,7 +327,7 @@ class CloudflareTunnelService:
             Dictionary with removal results
 
         Raises:
-            httpx.HTTPError: If API request fails
+            CloudflareAPIError: If API request fails
         """
         results = {
             "tunnel_removed": False,
@@ -446,7 +335,7 @@ class CloudflareTunnelService:
             "errors": [],
         }
 
-        try:
+        async def remove_hostname() -> None:
             # 1. Remove Public Hostname from Tunnel
             try:
                 await self.remove_public_hostname(hostname)
@@ -457,6 +346,7 @@ class CloudflareTunnelService:
                 logger.warning(error_msg)
                 results["errors"].append(error_msg)
 
+        async def remove_cname() -> None:
             # 2. Get Zone ID and find DNS record
             try:
                 zone_id = await self.get_zone_id(domain)
@@ -475,6 +365,9 @@ class CloudflareTunnelService:
                 logger.warning(error_msg)
                 results["errors"].append(error_msg)
 
+        try:
+            await asyncio.gather(remove_hostname(), remove_cname())
+
             if results["tunnel_removed"] and results["dns_removed"]:
                 logger.info(f"✅ Site routing teardown complete for {hostname}")
             else:
@@ -0,0 +1,100 @@
+"""Batched container stats sampling for the dashboard."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+from app.services.docker_client import DockerClient, get_docker_client
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerStatsSampler:
+    """Samples stats for many containers in one concurrent pass.
+
+    `docker stats --no-stream` blocks for a full sampling window per
+    container to compute CPU%. The sampler instead requests one-shot stats
+    (no window) for all containers concurrently and computes CPU% against
+    the sample cached from the previous pass. Containers seen for the first
+    time fall back to a regular two-sample request, still issued
+    concurrently, so a pass never takes longer than one sampling window.
+    """
+
+    def __init__(self, docker: DockerClient | None = None, max_concurrency: int = 32):
+        """Initialize stats sampler.
+
+        Args:
+            docker: Docker client (defaults to the shared client)
+            max_concurrency: Maximum number of concurrent stats requests
+        """
+        self.docker = docker or get_docker_client()
+        self.max_concurrency = max_concurrency
+        self._previous: Dict[str, Dict[str, Any]] = {}
+
+    async def _sample_one(self, container_id: str, semaphore: asyncio.Semaphore) -> Dict[str, Any]:
+        """Get a stats sample for one container with precpu_stats filled in.
+
+        Args:
+            container_id: Container ID
+            semaphore: Concurrency limiter
+
+        Returns:
+            Stats API response
+        """
+        previous = self._previous.get(container_id)
+
+        async with semaphore:
+            stats = await self.docker.container_stats(container_id, one_shot=previous is not None)
+
+        if previous is not None:
+            stats["precpu_stats"] = previous
+
+        self._previous[container_id] = stats.get("cpu_stats") or {}
+        return stats
+
+    async def sample(self, container_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Sample stats for all given containers in one pass.
+
+        Args:
+            container_ids: Container IDs to sample
+
+        Returns:
+            Mapping of container ID to stats (containers that failed are omitted)
+        """
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        results = await asyncio.gather(
+            *(self._sample_one(container_id, semaphore) for container_id in container_ids),
+            return_exceptions=True,
+        )
+
+        # Forget containers that are gone
+        for container_id in list(self._previous):
+            if container_id not in container_ids:
+                del self._previous[container_id]
+
+        stats_by_id = {}
+        for container_id, result in zip(container_ids, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Failed to get stats for container {container_id[:12]}: {result}")
+                self._previous.pop(container_id, None)
+                continue
+            stats_by_id[container_id] = result
+
+        return stats_by_id
+
+
+# Singleton instance
+_stats_sampler: ContainerStatsSampler | None = None
+
+
+def get_stats_sampler() -> ContainerStatsSampler:
+    """Get container stats sampler singleton.
+
+    Returns:
+        ContainerStatsSampler instance
+    """
+    global _stats_sampler
+    if _stats_sampler is None:
+        _stats_sampler = ContainerStatsSampler()
+    return _stats_sampler
@@ -0,0 +1,407 @@
+"""Bulk DNS record import: streaming CSV parse, diff and batched apply."""
+from __future__ import annotations
+
+import asyncio
+import codecs
+import csv
+import logging
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import get_settings
+from app.services.cloudflare_client import CloudflareAPIError, CloudflareClient, get_cloudflare_client
+from app.services.cloudflare_dns_cache import CloudflareDNSCache, get_cloudflare_dns_cache
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+REQUIRED_COLUMNS = ("Type", "Name", "Content")
+
+# Types that allow a single record per name (a changed value is an update)
+SINGLE_VALUE_TYPES = {"CNAME"}
+
+# Row actions and statuses reported per CSV row
+ACTION_CREATE = "create"
+ACTION_UPDATE = "update"
+ACTION_UNCHANGED = "unchanged"
+ACTION_DUPLICATE = "duplicate"
+ACTION_CONFLICT = "conflict"
+ACTION_INVALID = "invalid"
+
+STATUS_PLANNED = "planned"
+STATUS_APPLIED = "applied"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+IMPORT_MODES = ("batch", "concurrent")
+
+
+@dataclass
+class ImportRow:
+    """One CSV row with its planned action and outcome."""
+
+    row: int
+    record: Dict[str, str]
+    payload: Optional[Dict[str, Any]] = None
+    action: str = ACTION_CREATE
+    status: str = STATUS_PLANNED
+    record_id: Optional[str] = None
+    error: Optional[str] = None
+
+
+@dataclass
+class ImportReport:
+    """Result of an import (or a dry-run plan)."""
+
+    rows: List[ImportRow] = field(default_factory=list)
+    dry_run: bool = False
+
+    def count(self, action: str) -> int:
+        """Number of rows with the given action."""
+        return sum(1 for row in self.rows if row.action == action)
+
+    @property
+    def error_rows(self) -> List[ImportRow]:
+        """Invalid and conflicting rows and rows whose change failed."""
+        return [
+            row for row in self.rows
+            if row.action in (ACTION_INVALID, ACTION_CONFLICT) or row.status == STATUS_FAILED
+        ]
+
+
+class CSVRowReader:
+    """Incremental CSV parser for uploads read in chunks.
+
+    Bytes are decoded incrementally (UTF-8, optional BOM) and complete
+    records are parsed as soon as their closing line arrives; a quoted field
+    spanning several lines is held until its quotes balance.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")()
+        self._partial = ""
+        self._record: List[str] = []
+        self._quotes = 0
+
+    def _parse(self, lines: List[str]) -> List[List[str]]:
+        rows = []
+        for line in lines:
+            self._record.append(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2:
+                continue
+            text = "".join(self._record)
+            self._record = []
+            self._quotes = 0
+            if text.strip():
+                rows.append(next(csv.reader([text])))
+        return rows
+
+    def feed(self, chunk: bytes) -> List[List[str]]:
+        """Parse the complete records in a chunk.
+
+        Raises:
+            UnicodeDecodeError: If the upload is not UTF-8
+        """
+        *lines, self._partial = (self._partial + self._decoder.decode(chunk)).split("\n")
+        return self._parse([line + "\n" for line in lines])
+
+    def flush(self) -> List[List[str]]:
+        """Parse the final record at end of input."""
+        tail = self._partial + self._decoder.decode(b"", final=True)
+        self._partial = ""
+        rows = self._parse([tail] if tail else [])
+        if self._record:
+            # Unbalanced quote at end of input; let csv parse what is there
+            rows.append(next(csv.reader(["".join(self._record)])))
+            self._record = []
+        return rows
+
+
+async def iter_csv_rows(
+    read: Callable[[int], Awaitable[bytes]],
+    chunk_size: int = 65536,
+) -> AsyncIterator[Tuple[int, Dict[str, str]]]:
+    """Stream (row number, record) pairs from a CSV upload.
+
+    Args:
+        read: Async read function (e.g. UploadFile.read)
+        chunk_size: Bytes per read
+
+    Yields:
+        Row number (the header is row 1) and the record keyed by header
+    """
+    reader = CSVRowReader()
+    header: Optional[List[str]] = None
+    row_num = 1
+    while True:
+        chunk = await read(chunk_size)
+        rows = reader.feed(chunk) if chunk else reader.flush()
+        for values in rows:
+            if header is None:
+                header = [name.strip() for name in values]
+                continue
+            row_num += 1
+            yield row_num, {name: (values[i] if i < len(values) else "") for i, name in enumerate(header)}
+        if not chunk:
+            return
+
+
+def build_payload(record: Dict[str, str], zone_name: str) -> Dict[str, Any]:
+    """Build a Cloudflare record payload from a CSV record.
+
+    Args:
+        record: CSV record (Type, Name, Content, TTL, Proxied, Priority)
+        zone_name: Zone name, used to qualify relative names
+
+    Returns:
+        Record payload with a fully qualified name
+
+    Raises:
+        ValueError: If required fields are missing or values are invalid
+    """
+    if not all(record.get(key, "").strip() for key in REQUIRED_COLUMNS):
+        raise ValueError("Missing required fields (Type, Name, Content)")
+
+    name = record["Name"].strip().rstrip(".").lower()
+    if name in ("@", zone_name):
+        name = zone_name
+    elif not name.endswith(f".{zone_name}"):
+        name = f"{name}.{zone_name}"
+
+    payload = {
+        "type": record["Type"].strip().upper(),
+        "name": name,
+        "content": record["Content"].strip(),
+        "ttl": int(record.get("TTL", "").strip() or "1"),
+        "proxied": record.get("Proxied", "").strip().lower() in ("yes", "true", "1"),
+    }
+    if record.get("Priority", "").strip():
+        payload["priority"] = int(record["Priority"].strip())
+    return payload
+
+
+def _content_key(record_type: str, content: str) -> str:
+    """Content as compared when diffing (hostnames are case-insensitive)."""
+    return content if record_type == "TXT" else content.rstrip(".").lower()
+
+
+def _same_settings(existing: Dict[str, Any], payload: Dict[str, Any]) -> bool:
+    """Whether an existing record already has the payload's TTL, proxy and priority."""
+    # Proxied records always have automatic TTL
+    ttl = 1 if payload["proxied"] else payload["ttl"]
+    return (
+        existing.get("ttl") == ttl
+        and bool(existing.get("proxied", False)) == payload["proxied"]
+        and ("priority" not in payload or existing.get("priority") == payload["priority"])
+    )
+
+
+class DNSImporter:
+    """Imports DNS records into a zone from CSV.
+
+    Rows are parsed while the upload streams in and diffed against the
+    zone's records, freshly loaded for each import (a cached copy may be
+    minutes old): identical records and repeated rows are skipped, a second
+    value for a CNAME name is reported as a conflict, changed
+    TTL/proxy/priority (or CNAME targets) become updates, and the rest are
+    creates. Changes are applied through the batch DNS endpoint,
+    each chunk as one atomic transaction, or as individual requests with
+    bounded concurrency.
+    """
+
+    def __init__(
+        self,
+        client: CloudflareClient | None = None,
+        cache: CloudflareDNSCache | None = None,
+        concurrency: int | None = None,
+        batch_size: int | None = None,
+    ):
+        """Initialize DNS importer.
+
+        Args:
+            client: Cloudflare API client (defaults to the shared client)
+            cache: DNS record cache (defaults to the shared cache)
+            concurrency: Parallel requests in concurrent mode (defaults to settings)
+            batch_size: Changes per batch request (defaults to settings)
+        """
+        self.client = client or get_cloudflare_client()
+        self.cache = cache or get_cloudflare_dns_cache()
+        self.concurrency = concurrency or settings.cloudflare_import_concurrency
+        self.batch_size = batch_size or settings.cloudflare_dns_batch_size
+
+    async def plan(
+        self,
+        zone_id: str,
+        zone_name: str,
+        records: AsyncIterator[Tuple[int, Dict[str, str]]],
+    ) -> List[ImportRow]:
+        """Diff CSV records against the zone's current records.
+
+        Args:
+            zone_id: Cloudflare zone ID
+            zone_name: Zone name
+            records: (row number, CSV record) pairs
+
+        Returns:
+            One ImportRow per CSV record
+
+        Raises:
+            CloudflareAPIError: If the zone's records cannot be loaded
+        """
+        existing: Dict[Tuple[str, str], List[Dict[str, Any]]] = {}
+        # Always reload: the diff must reflect the zone as it is now
+        for record in await self.cache.records(zone_id, refresh=True):
+            existing.setdefault((record["type"], record["name"].lower()), []).append(record)
+
+        zone_name = zone_name.lower()
+        seen = set()
+        # First row per single-value (e.g. CNAME) name; later rows with
+        # another value would create or update the same record twice
+        single_value_rows: Dict[Tuple[str, str], int] = {}
+        rows = []
+        async for row_num, record in records:
+            row = ImportRow(row=row_num, record=record)
+            rows.append(row)
+            try:
+                row.payload = payload = build_payload(record, zone_name)
+            except ValueError as e:
+                row.action, row.status, row.error = ACTION_INVALID, STATUS_SKIPPED, str(e)
+                continue
+
+            key = (payload["type"], payload["name"])
+            content = _content_key(payload["type"], payload["content"])
+            if key + (content,) in seen:
+                row.action, row.status = ACTION_DUPLICATE, STATUS_SKIPPED
+                continue
+            seen.add(key + (content,))
+
+            if payload["type"] in SINGLE_VALUE_TYPES:
+                first = single_value_rows.setdefault(key, row_num)
+                if first != row_num:
+                    row.action, row.status = ACTION_CONFLICT, STATUS_SKIPPED
+                    row.error = f"Conflicts with row {first}: only one {payload['type']} record allowed per name"
+                    continue
+
+            candidates = existing.get(key, [])
+            match = next((r for r in candidates if _content_key(r["type"], r["content"]) == content), None)
+            if match is None and payload["type"] in SINGLE_VALUE_TYPES and candidates:
+                match = candidates[0]
+
+            if match is None:
+                row.action = ACTION_CREATE
+            elif _content_key(match["type"], match["content"]) == content and _same_settings(match, payload):
+                row.action, row.status, row.record_id = ACTION_UNCHANGED, STATUS_SKIPPED, match["id"]
+            else:
+                row.action, row.record_id = ACTION_UPDATE, match["id"]
+        return rows
+
+    async def _apply_batch(self, zone_id: str, changes: List[ImportRow]) -> None:
+        """Apply changes through the batch endpoint, one transaction per chunk."""
+        for start in range(0, len(changes), self.batch_size):
+            chunk = changes[start:start + self.batch_size]
+            patches = [row for row in chunk if row.action == ACTION_UPDATE]
+            posts = [row for row in chunk if row.action == ACTION_CREATE]
+            body: Dict[str, Any] = {}
+            if patches:
+                body["patches"] = [{"id": row.record_id, **row.payload} for row in patches]
+            if posts:
+                body["posts"] = [row.payload for row in posts]
+
+            try:
+                result = await self.client.post(f"/zones/{zone_id}/dns_records/batch", json=body) or {}
+            except CloudflareAPIError as e:
+                # The chunk was rolled back as a whole
+                for row in chunk:
+                    row.status, row.error = STATUS_FAILED, f"Cloudflare API error: {e.message}"
+                continue
+
+            for row, record in zip(patches, result.get("patches") or []):
+                row.status = STATUS_APPLIED
+                self.cache.record_updated(zone_id, record)
+            for row, record in zip(posts, result.get("posts") or []):
+                row.status, row.record_id = STATUS_APPLIED, record["id"]
+                self.cache.record_created(zone_id, record)
+
+    async def _apply_concurrent(self, zone_id: str, changes: List[ImportRow]) -> None:
+        """Apply changes as individual requests with bounded concurrency."""
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def apply(row: ImportRow) -> None:
+            async with semaphore:
+                try:
+                    if row.action == ACTION_UPDATE:
+                        record = await self.client.patch(
+                            f"/zones/{zone_id}/dns_records/{row.record_id}", json=row.payload
+                        )
+                        self.cache.record_updated(zone_id, record)
+                    else:
+                        record = await self.client.post(f"/zones/{zone_id}/dns_records", json=row.payload)
+                        self.cache.record_created(zone_id, record)
+                except CloudflareAPIError as e:
+                    row.status, row.error = STATUS_FAILED, f"Cloudflare API error: {e.message}"
+                    return
+                row.status, row.record_id = STATUS_APPLIED, record["id"]
+
+        await asyncio.gather(*(apply(row) for row in changes))
+
+    async def run(
+        self,
+        zone_id: str,
+        zone_name: str,
+        records: AsyncIterator[Tuple[int, Dict[str, str]]],
+        dry_run: bool = False,
+        mode: str = "batch",
+    ) -> ImportReport:
+        """Plan and (unless dry_run) apply an import.
+
+        Args:
+            zone_id: Cloudflare zone ID
+            zone_name: Zone name
+            records: (row number, CSV record) pairs
+            dry_run: Only report the planned actions
+            mode: "batch" (atomic chunks) or "concurrent" (per-record requests)
+
+        Returns:
+            ImportReport with one entry per CSV row
+
+        Raises:
+            ValueError: If mode is unknown
+            CloudflareAPIError: If the zone's records cannot be loaded
+        """
+        if mode not in IMPORT_MODES:
+            raise ValueError(f"Unknown import mode: {mode} (expected one of {', '.join(IMPORT_MODES)})")
+
+        rows = await self.plan(zone_id, zone_name, records)
+        report = ImportReport(rows=rows, dry_run=dry_run)
+        changes = [row for row in rows if row.action in (ACTION_CREATE, ACTION_UPDATE)]
+        if dry_run or not changes:
+            return report
+
+        if mode == "batch":
+            await self._apply_batch(zone_id, changes)
+        else:
+            await self._apply_concurrent(zone_id, changes)
+
+        failed = sum(1 for row in changes if row.status == STATUS_FAILED)
+        logger.info(
+            f"Imported DNS records into {zone_name}: {len(changes) - failed} applied, "
+            f"{failed} failed, {report.count(ACTION_UNCHANGED)} unchanged"
+        )
+        return report
+
+
+# Singleton instance
+_dns_importer: DNSImporter | None = None
+
+
+def get_dns_importer() -> DNSImporter:
+    """Get DNS importer singleton.
+
+    Returns:
+        DNSImporter instance
+    """
+    global _dns_importer
+    if _dns_importer is None:
+        _dns_importer = DNSImporter()
+    return _dns_importer
@@ -0,0 +1,387 @@
+"""DNS propagation checks across DoH, plain DNS and authoritative resolvers."""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Dict, List, Optional
+
+import httpx
+
+from app.config import get_settings
+from app.services.async_exec import discard_loop_client
+from app.services.http_prober import HTTP2_AVAILABLE
+
+DNSPYTHON_AVAILABLE = importlib.util.find_spec("dns") is not None
+if DNSPYTHON_AVAILABLE:
+    import dns.asyncquery
+    import dns.exception
+    import dns.flags
+    import dns.message
+    import dns.rcode
+    import dns.rdatatype
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+RESOLVER_PROTOCOLS = ("doh", "udp", "tcp")
+
+DNS_TYPES = {
+    "A": 1,
+    "AAAA": 28,
+    "CNAME": 5,
+    "MX": 15,
+    "TXT": 16,
+    "NS": 2,
+    "SOA": 6,
+    "PTR": 12,
+    "SRV": 33,
+    "CAA": 257,
+}
+
+DNS_RCODES = {0: "NOERROR", 1: "FORMERR", 2: "SERVFAIL", 3: "NXDOMAIN", 4: "NOTIMP", 5: "REFUSED"}
+
+
+@dataclass(frozen=True)
+class Resolver:
+    """A DNS server to query: DoH JSON endpoint or plain DNS over UDP/TCP."""
+
+    name: str
+    protocol: str  # "doh", "udp", "tcp"
+    address: str  # DoH URL, or IP address with optional :port
+    recursive: bool = True
+
+
+@dataclass
+class ResolverAnswer:
+    """Answer of one resolver."""
+
+    server: str
+    protocol: str
+    status: str  # "success", "failed", "timeout"
+    records: List[str] = field(default_factory=list)
+    error: Optional[str] = None
+    matched: bool = False
+    elapsed_ms: Optional[float] = None
+
+
+@dataclass
+class PropagationResult:
+    """Answers of all resolvers for one check round."""
+
+    record_type: str
+    name: str
+    answers: List[ResolverAnswer]
+    expected_content: Optional[str] = None
+    checks: int = 1
+    elapsed_seconds: float = 0.0
+    timed_out: bool = False
+
+    @property
+    def propagated(self) -> bool:
+        """Whether every resolver returns the record (with the expected content)."""
+        return bool(self.answers) and all(answer.matched for answer in self.answers)
+
+
+def parse_resolver(spec: str) -> Resolver:
+    """Parse a resolver spec.
+
+    Formats: `name=doh:https://host/path`, `name=udp:1.1.1.1`,
+    `name=tcp:9.9.9.9:53`. The name is optional.
+
+    Raises:
+        ValueError: If the spec is malformed
+    """
+    name, target = "", spec.strip()
+    if "=" in target.split(":", 1)[0]:
+        name, _, target = target.partition("=")
+    protocol, _, address = target.partition(":")
+    protocol = protocol.lower()
+    if protocol not in RESOLVER_PROTOCOLS or not address:
+        raise ValueError(f"Invalid resolver '{spec}' (expected [name=]doh:URL, udp:IP[:port] or tcp:IP[:port])")
+    if protocol == "doh" and not address.startswith("https://"):
+        raise ValueError(f"Invalid resolver '{spec}': DoH address must be an https:// URL")
+    return Resolver(name=name.strip() or address, protocol=protocol, address=address)
+
+
+def normalize_record(record_type: str, content: str) -> str:
+    """Record content as compared across resolvers (no quotes/trailing dots)."""
+    content = content.strip()
+    if record_type == "TXT":
+        return "".join(part.strip('"') for part in content.split('" "')) if content.startswith('"') else content
+    return content.rstrip(".").lower()
+
+
+def matches(record_type: str, records: List[str], expected: Optional[str]) -> bool:
+    """Whether an answer contains the expected content (or any record if none given)."""
+    if expected is None:
+        return bool(records)
+    want = normalize_record(record_type, expected)
+    for record in records:
+        got = normalize_record(record_type, record)
+        # MX answers carry the preference; accept the bare exchange host
+        if got == want or (record_type == "MX" and got.split(" ", 1)[-1] == want):
+            return True
+    return False
+
+
+class DNSPropagationChecker:
+    """Queries a set of resolvers concurrently and polls until they agree.
+
+    DoH resolvers use the JSON API over one pooled HTTP/2 client; UDP/TCP
+    and authoritative nameservers use dnspython's asyncio queries (they
+    report an error if dnspython is not installed). `watch` re-queries the
+    resolvers that do not see the record yet with exponential backoff until
+    all of them agree or the deadline passes.
+    """
+
+    def __init__(
+        self,
+        resolvers: List[Resolver] | None = None,
+        timeout: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """Initialize propagation checker.
+
+        Args:
+            resolvers: Default resolvers (defaults to settings)
+            timeout: Per-query timeout in seconds (defaults to settings)
+            transport: Optional httpx transport for DoH (for tests)
+        """
+        self.resolvers = resolvers or [parse_resolver(spec) for spec in settings.dns_propagation_resolvers]
+        self.timeout = timeout or settings.dns_propagation_timeout_seconds
+        self._transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """DoH client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            discard_loop_client(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE and self._transport is None,
+                timeout=self.timeout,
+                headers={"Accept": "application/dns-json"},
+                transport=self._transport,
+            )
+            self._loop = loop
+        return self._client
+
+    def resolve_names(self, names: List[str]) -> List[Resolver]:
+        """Select resolvers by configured name or parse ad-hoc specs.
+
+        Raises:
+            ValueError: If a name is unknown and not a valid spec
+        """
+        known = {resolver.name.lower(): resolver for resolver in self.resolvers}
+        return [known.get(name.strip().lower()) or parse_resolver(name) for name in names if name.strip()]
+
+    async def _query_doh(self, resolver: Resolver, name: str, record_type: str) -> ResolverAnswer:
+        response = await self.client.get(resolver.address, params={"name": name, "type": record_type})
+        if response.status_code != 200:
+            return ResolverAnswer(resolver.name, resolver.protocol, "failed", error=f"HTTP {response.status_code}")
+
+        data = response.json()
+        type_number = DNS_TYPES.get(record_type, 1)
+        records = [answer.get("data", "") for answer in data.get("Answer", []) if answer.get("type") == type_number]
+        status = data.get("Status", 0)
+        error = None if status == 0 else DNS_RCODES.get(status, f"RCODE {status}")
+        return ResolverAnswer(resolver.name, resolver.protocol, "success" if records else "failed", records, error)
+
+    async def _query_dns(self, resolver: Resolver, name: str, record_type: str) -> ResolverAnswer:
+        if not DNSPYTHON_AVAILABLE:
+            return ResolverAnswer(resolver.name, resolver.protocol, "failed", error="dnspython is not installed")
+
+        host, _, port = resolver.address.rpartition(":") if resolver.address.count(":") == 1 else (resolver.address, "", "")
+        query = dns.message.make_query(name, record_type)
+        if not resolver.recursive:
+            query.flags &= ~dns.flags.RD
+        if resolver.protocol == "udp":
+            response, _ = await dns.asyncquery.udp_with_fallback(query, host, timeout=self.timeout, port=int(port or 53))
+        else:
+            response = await dns.asyncquery.tcp(query, host, timeout=self.timeout, port=int(port or 53))
+
+        rdtype = dns.rdatatype.from_text(record_type)
+        records = [rdata.to_text() for rrset in response.answer if rrset.rdtype == rdtype for rdata in rrset]
+        rcode = response.rcode()
+        error = None if rcode == dns.rcode.NOERROR else dns.rcode.to_text(rcode)
+        return ResolverAnswer(resolver.name, resolver.protocol, "success" if records else "failed", records, error)
+
+    async def query(
+        self,
+        resolver: Resolver,
+        name: str,
+        record_type: str,
+        expected: Optional[str] = None,
+    ) -> ResolverAnswer:
+        """Query one resolver, never raising.
+
+        Returns:
+            ResolverAnswer (status "timeout" or "failed" with an error on failure)
+        """
+        started = time.perf_counter()
+        try:
+            if resolver.protocol == "doh":
+                answer = await asyncio.wait_for(self._query_doh(resolver, name, record_type), self.timeout + 1)
+            else:
+                answer = await asyncio.wait_for(self._query_dns(resolver, name, record_type), self.timeout + 1)
+        except (httpx.TimeoutException, asyncio.TimeoutError):
+            answer = ResolverAnswer(resolver.name, resolver.protocol, "timeout", error="Request timeout")
+        except Exception as e:
+            if DNSPYTHON_AVAILABLE and isinstance(e, dns.exception.Timeout):
+                answer = ResolverAnswer(resolver.name, resolver.protocol, "timeout", error="Request timeout")
+            else:
+                answer = ResolverAnswer(resolver.name, resolver.protocol, "failed", error=str(e) or type(e).__name__)
+
+        if answer.status == "success" and not answer.records:
+            answer.status = "failed"
+        if answer.status == "failed" and answer.error is None:
+            answer.error = "No records found"
+        answer.matched = answer.status == "success" and matches(record_type, answer.records, expected)
+        answer.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+        return answer
+
+    async def authoritative_resolvers(self, zone: str) -> List[Resolver]:
+        """Nameservers of a zone as non-recursive UDP resolvers.
+
+        NS and address lookups go through the first DoH resolver.
+
+        Raises:
+            ValueError: If no DoH resolver is configured or no nameserver resolves
+        """
+        doh = next((resolver for resolver in self.resolvers if resolver.protocol == "doh"), None)
+        if doh is None:
+            raise ValueError("Authoritative lookup needs a DoH resolver")
+
+        ns_answer = await self.query(doh, zone, "NS")
+        hosts = [record.rstrip(".") for record in ns_answer.records]
+        addresses = await asyncio.gather(*(self.query(doh, host, "A") for host in hosts))
+        resolvers = [
+            Resolver(name=host, protocol="udp", address=answer.records[0], recursive=False)
+            for host, answer in zip(hosts, addresses)
+            if answer.records
+        ]
+        if not resolvers:
+            raise ValueError(f"No authoritative nameservers found for {zone}")
+        return resolvers
+
+    async def check(
+        self,
+        name: str,
+        record_type: str,
+        expected: Optional[str] = None,
+        resolvers: List[Resolver] | None = None,
+    ) -> PropagationResult:
+        """Query all resolvers concurrently once.
+
+        Args:
+            name: Fully qualified record name
+            record_type: Record type (A, AAAA, MX, TXT, ...)
+            expected: Content every resolver must return (any record if None)
+            resolvers: Resolvers to query (defaults to the configured set)
+
+        Returns:
+            PropagationResult with one answer per resolver
+        """
+        record_type = record_type.upper()
+        started = time.monotonic()
+        answers = await asyncio.gather(
+            *(self.query(resolver, name, record_type, expected) for resolver in resolvers or self.resolvers)
+        )
+        return PropagationResult(
+            record_type=record_type,
+            name=name,
+            answers=list(answers),
+            expected_content=expected,
+            elapsed_seconds=round(time.monotonic() - started, 3),
+        )
+
+    async def watch(
+        self,
+        name: str,
+        record_type: str,
+        expected: Optional[str] = None,
+        resolvers: List[Resolver] | None = None,
+        deadline_seconds: float | None = None,
+        initial_interval: float | None = None,
+        max_interval: float | None = None,
+    ) -> AsyncIterator[PropagationResult]:
+        """Poll until every resolver agrees or the deadline passes.
+
+        Only resolvers that do not see the record yet are queried again;
+        the interval between rounds doubles up to `max_interval`.
+
+        Yields:
+            PropagationResult after each round (the last one is propagated
+            or has timed_out set)
+        """
+        resolvers = resolvers or self.resolvers
+        deadline_seconds = deadline_seconds if deadline_seconds is not None else settings.dns_propagation_wait_seconds
+        interval = initial_interval or settings.dns_propagation_poll_initial_seconds
+        max_interval = max_interval or settings.dns_propagation_poll_max_seconds
+        started = time.monotonic()
+        deadline = started + deadline_seconds
+
+        answers: Dict[Resolver, ResolverAnswer] = {}
+        checks = 0
+        while True:
+            pending = [resolver for resolver in resolvers if resolver not in answers or not answers[resolver].matched]
+            result = await self.check(name, record_type, expected, pending)
+            answers.update(zip(pending, result.answers))
+            checks += 1
+
+            result = PropagationResult(
+                record_type=result.record_type,
+                name=name,
+                answers=[answers[resolver] for resolver in resolvers],
+                expected_content=expected,
+                checks=checks,
+                elapsed_seconds=round(time.monotonic() - started, 3),
+            )
+            remaining = deadline - time.monotonic()
+            if not result.propagated and remaining <= 0:
+                result.timed_out = True
+            yield result
+            if result.propagated or result.timed_out:
+                return
+
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
+    async def wait(self, *args, **kwargs) -> PropagationResult:
+        """Poll like `watch` and return the final result."""
+        result = None
+        async for result in self.watch(*args, **kwargs):
+            pass
+        return result
+
+    async def close(self) -> None:
+        """Close the DoH client."""
+        if self._client is not None:
+            try:
+                await self._client.aclose()
+            except RuntimeError:
+                # Client belonged to an event loop that is already closed
+                pass
+        self._client = None
+        self._loop = None
+
+
+# Singleton instance
+_propagation_checker: DNSPropagationChecker | None = None
+
+
+def get_propagation_checker() -> DNSPropagationChecker:
+    """Get DNS propagation checker singleton.
+
+    Returns:
+        DNSPropagationChecker instance
+    """
+    global _propagation_checker
+    if _propagation_checker is None:
+        _propagation_checker = DNSPropagationChecker()
+    return _propagation_checker
@@ -0,0 +1,746 @@
+"""Docker Engine API client over the local Docker socket."""
+from __future__ import annotations
+
+import asyncio
+import io
+import json
+import logging
+import posixpath
+import struct
+import tarfile
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Dict, Iterator, List, Tuple
+
+import httpx
+
+from app.config import get_settings
+from app.services.async_exec import discard_loop_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Multiplexed stream header: stream type (1 byte), padding (3 bytes), size (uint32 BE)
+_STREAM_HEADER = struct.Struct(">BxxxL")
+STREAM_STDOUT = 1
+STREAM_STDERR = 2
+
+
+class DockerAPIError(Exception):
+    """Docker Engine API request failed."""
+
+    def __init__(self, status_code: int, message: str):
+        """Initialize Docker API error.
+
+        Args:
+            status_code: HTTP status code returned by the Docker daemon
+            message: Error message returned by the Docker daemon
+        """
+        super().__init__(message)
+        self.status_code = status_code
+        self.message = message
+
+
+class DockerNotFoundError(DockerAPIError):
+    """Container, image or exec instance does not exist."""
+
+
+@dataclass
+class ExecResult:
+    """Result of a command executed inside a container."""
+
+    exit_code: int
+    stdout: str
+    stderr: str
+
+
+def iter_stream_frames(data: bytes) -> Iterator[Tuple[int, bytes]]:
+    """Iterate over frames of a multiplexed Docker stream.
+
+    Containers without a TTY return logs and exec output as frames with an
+    8-byte header. Streams from TTY containers are raw and yielded as a
+    single stdout frame.
+
+    Args:
+        data: Raw stream bytes
+
+    Yields:
+        Tuples of (stream type, payload)
+    """
+    offset = 0
+    size = len(data)
+
+    while offset < size:
+        if size - offset < _STREAM_HEADER.size or data[offset] not in (0, 1, 2) or data[offset + 1:offset + 4] != b"\x00\x00\x00":
+            # Not a multiplexed stream (TTY enabled)
+            yield STREAM_STDOUT, data[offset:]
+            return
+
+        stream_type, length = _STREAM_HEADER.unpack_from(data, offset)
+        offset += _STREAM_HEADER.size
+        yield stream_type, data[offset:offset + length]
+        offset += length
+
+
+async def read_stream_frame(reader: asyncio.StreamReader) -> Tuple[int, bytes]:
+    """Read one frame of a multiplexed stream from a hijacked connection.
+
+    Args:
+        reader: Stream reader of an attached exec session
+
+    Returns:
+        Tuple of (stream type, payload)
+
+    Raises:
+        asyncio.IncompleteReadError: If the connection was closed
+    """
+    header = await reader.readexactly(_STREAM_HEADER.size)
+    stream_type, length = _STREAM_HEADER.unpack(header)
+    return stream_type, await reader.readexactly(length)
+
+
+class StreamDemuxer:
+    """Incremental parser of a multiplexed Docker stream.
+
+    Unlike iter_stream_frames this accepts the stream in arbitrary chunks, so
+    a streamed response can be demultiplexed without buffering it whole.
+    """
+
+    def __init__(self):
+        """Initialize demuxer."""
+        self._buffer = bytearray()
+        self._raw: bool | None = None  # None until the stream format is known
+
+    def feed(self, data: bytes) -> List[Tuple[int, bytes]]:
+        """Add a chunk and return the frames it completes.
+
+        Args:
+            data: Next chunk of the stream
+
+        Returns:
+            Complete frames as (stream type, payload)
+        """
+        self._buffer += data
+        frames: List[Tuple[int, bytes]] = []
+
+        if self._raw is None:
+            if len(self._buffer) < _STREAM_HEADER.size:
+                return frames
+            self._raw = self._buffer[0] not in (0, 1, 2) or self._buffer[1:4] != b"\x00\x00\x00"
+
+        if self._raw:
+            # TTY enabled: pass output through as stdout
+            frames.append((STREAM_STDOUT, bytes(self._buffer)))
+            self._buffer.clear()
+            return frames
+
+        while len(self._buffer) >= _STREAM_HEADER.size:
+            stream_type, length = _STREAM_HEADER.unpack_from(self._buffer)
+            end = _STREAM_HEADER.size + length
+            if len(self._buffer) < end:
+                break
+            frames.append((stream_type, bytes(self._buffer[_STREAM_HEADER.size:end])))
+            del self._buffer[:end]
+
+        return frames
+
+    def flush(self) -> List[Tuple[int, bytes]]:
+        """Return what is left at the end of the stream.
+
+        Returns:
+            The remaining bytes as a stdout frame if the stream was too short
+            to tell its format, otherwise nothing (a truncated frame is dropped)
+        """
+        frames = []
+        if self._buffer and self._raw is None:
+            frames.append((STREAM_STDOUT, bytes(self._buffer)))
+        self._buffer.clear()
+        return frames
+
+
+def demux_stream(data: bytes) -> Tuple[bytes, bytes]:
+    """Split a multiplexed Docker stream into stdout and stderr.
+
+    Args:
+        data: Raw stream bytes
+
+    Returns:
+        Tuple of (stdout, stderr) bytes
+    """
+    stdout = bytearray()
+    stderr = bytearray()
+    for stream_type, payload in iter_stream_frames(data):
+        if stream_type == STREAM_STDERR:
+            stderr += payload
+        else:
+            stdout += payload
+    return bytes(stdout), bytes(stderr)
+
+
+def calculate_cpu_percent(stats: Dict[str, Any]) -> float:
+    """Calculate CPU usage percentage the same way as `docker stats`.
+
+    Args:
+        stats: Stats API response (with cpu_stats and precpu_stats)
+
+    Returns:
+        CPU usage percentage
+    """
+    cpu_stats = stats.get("cpu_stats") or {}
+    precpu_stats = stats.get("precpu_stats") or {}
+
+    cpu_delta = (cpu_stats.get("cpu_usage", {}).get("total_usage", 0)
+                 - precpu_stats.get("cpu_usage", {}).get("total_usage", 0))
+    system_delta = cpu_stats.get("system_cpu_usage", 0) - precpu_stats.get("system_cpu_usage", 0)
+    online_cpus = cpu_stats.get("online_cpus") or len(cpu_stats.get("cpu_usage", {}).get("percpu_usage") or []) or 1
+
+    if cpu_delta <= 0 or system_delta <= 0:
+        return 0.0
+    return cpu_delta / system_delta * online_cpus * 100.0
+
+
+def calculate_memory_usage(stats: Dict[str, Any]) -> Tuple[int, int]:
+    """Calculate memory usage (excluding page cache) and limit in bytes.
+
+    Args:
+        stats: Stats API response
+
+    Returns:
+        Tuple of (usage, limit) in bytes
+    """
+    memory_stats = stats.get("memory_stats") or {}
+    usage = memory_stats.get("usage", 0)
+    detail = memory_stats.get("stats") or {}
+
+    # cgroup v2 reports inactive_file, cgroup v1 total_inactive_file
+    cache = detail.get("inactive_file", detail.get("total_inactive_file", 0))
+    if cache < usage:
+        usage -= cache
+
+    return usage, memory_stats.get("limit", 0)
+
+
+def calculate_network_io(stats: Dict[str, Any]) -> Tuple[int, int]:
+    """Sum received and transmitted bytes over all container interfaces.
+
+    Args:
+        stats: Stats API response
+
+    Returns:
+        Tuple of (rx_bytes, tx_bytes)
+    """
+    rx_bytes = 0
+    tx_bytes = 0
+    for interface in (stats.get("networks") or {}).values():
+        rx_bytes += interface.get("rx_bytes", 0)
+        tx_bytes += interface.get("tx_bytes", 0)
+    return rx_bytes, tx_bytes
+
+
+def calculate_block_io(stats: Dict[str, Any]) -> Tuple[int, int]:
+    """Sum block device bytes read and written.
+
+    Args:
+        stats: Stats API response
+
+    Returns:
+        Tuple of (read_bytes, write_bytes)
+    """
+    read_bytes = 0
+    write_bytes = 0
+    entries = (stats.get("blkio_stats") or {}).get("io_service_bytes_recursive") or []
+    for entry in entries:
+        op = entry.get("op", "").lower()
+        if op == "read":
+            read_bytes += entry.get("value", 0)
+        elif op == "write":
+            write_bytes += entry.get("value", 0)
+    return read_bytes, write_bytes
+
+
+def format_binary_size(size: float) -> str:
+    """Format bytes with binary units (e.g. 12.3MiB), matching `docker stats`."""
+    units = ["B", "KiB", "MiB", "GiB", "TiB"]
+    index = 0
+    while size >= 1024 and index < len(units) - 1:
+        size /= 1024
+        index += 1
+    return f"{size:.4g}{units[index]}"
+
+
+def format_decimal_size(size: float) -> str:
+    """Format bytes with decimal units (e.g. 1.2kB), matching `docker stats`."""
+    units = ["B", "kB", "MB", "GB", "TB"]
+    index = 0
+    while size >= 1000 and index < len(units) - 1:
+        size /= 1000
+        index += 1
+    return f"{size:.3g}{units[index]}"
+
+
+def _raise_for_status(response: httpx.Response) -> None:
+    """Raise DockerAPIError (or DockerNotFoundError) for an error response."""
+    if response.status_code < 400:
+        return
+    try:
+        message = response.json().get("message", response.text)
+    except ValueError:
+        message = response.text
+    if response.status_code == 404:
+        raise DockerNotFoundError(404, message)
+    raise DockerAPIError(response.status_code, message)
+
+
+class DockerClient:
+    """Async Docker Engine API client.
+
+    Talks HTTP to the Docker daemon socket (settings.docker_host) over a
+    pooled connection instead of forking the `docker` CLI per call.
+    """
+
+    def __init__(
+        self,
+        docker_host: str | None = None,
+        timeout: float = 30.0,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """Initialize Docker client.
+
+        Args:
+            docker_host: Docker daemon address (unix:///path or tcp://host:port)
+            timeout: Default request timeout in seconds
+            transport: Custom HTTP transport (overrides docker_host, for testing)
+        """
+        self.docker_host = docker_host or settings.docker_host
+        self.timeout = timeout
+        self.transport = transport
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    def _create_client(self) -> httpx.AsyncClient:
+        """Create the underlying HTTP client for the configured Docker host."""
+        limits = httpx.Limits(max_connections=20, max_keepalive_connections=10)
+
+        if self.transport is not None:
+            return httpx.AsyncClient(transport=self.transport, base_url="http://docker", timeout=self.timeout)
+
+        if self.docker_host.startswith("unix://"):
+            transport = httpx.AsyncHTTPTransport(uds=self.docker_host[len("unix://"):], limits=limits)
+            return httpx.AsyncClient(transport=transport, base_url="http://docker", timeout=self.timeout)
+
+        base_url = self.docker_host.replace("tcp://", "http://", 1)
+        return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=self.timeout)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Pooled HTTP client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._client.is_closed or self._loop is not loop:
+            discard_loop_client(self._client, self._loop)
+            self._client = self._create_client()
+            self._loop = loop
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: Dict[str, Any] | None = None,
+        json: Any = None,
+        content: bytes | None = None,
+        timeout: float | None = None,
+    ) -> httpx.Response:
+        """Send a request to the Docker daemon.
+
+        Args:
+            method: HTTP method
+            path: API path (e.g. /containers/json)
+            params: Query parameters
+            json: JSON body
+            content: Raw body
+            timeout: Request timeout (defaults to client timeout)
+
+        Returns:
+            HTTP response
+
+        Raises:
+            DockerNotFoundError: If the resource does not exist
+            DockerAPIError: If the daemon returns an error or is unreachable
+        """
+        try:
+            response = await self.client.request(
+                method,
+                path,
+                params=params,
+                json=json,
+                content=content,
+                timeout=timeout if timeout is not None else self.timeout,
+            )
+        except httpx.TimeoutException:
+            raise DockerAPIError(504, f"Docker API request timed out: {method} {path}")
+        except httpx.HTTPError as e:
+            raise DockerAPIError(503, f"Docker daemon unavailable: {e}")
+
+        _raise_for_status(response)
+        return response
+
+    async def list_containers(self, all: bool = True, filters: Dict[str, List[str]] | None = None) -> List[Dict[str, Any]]:
+        """List containers (equivalent to `docker ps`).
+
+        Args:
+            all: Include stopped containers
+            filters: Docker filters (e.g. {"name": ["blog-"]})
+
+        Returns:
+            List of container summaries
+        """
+        params: Dict[str, Any] = {"all": "true" if all else "false"}
+        if filters:
+            params["filters"] = json.dumps(filters)
+        response = await self._request("GET", "/containers/json", params=params)
+        return response.json()
+
+    async def inspect_container(self, container: str) -> Dict[str, Any]:
+        """Inspect a container (equivalent to `docker inspect`).
+
+        Args:
+            container: Container ID or name
+
+        Returns:
+            Container details
+        """
+        response = await self._request("GET", f"/containers/{container}/json")
+        return response.json()
+
+    async def container_stats(self, container: str, one_shot: bool = False) -> Dict[str, Any]:
+        """Get a single stats sample (equivalent to `docker stats --no-stream`).
+
+        Args:
+            container: Container ID or name
+            one_shot: Skip the second sample; precpu_stats will be empty
+
+        Returns:
+            Stats API response
+        """
+        params = {"stream": "false"}
+        if one_shot:
+            params["one-shot"] = "true"
+        response = await self._request("GET", f"/containers/{container}/stats", params=params)
+        return response.json()
+
+    async def container_logs(self, container: str, tail: int = 100, timestamps: bool = False) -> str:
+        """Get container logs (equivalent to `docker logs --tail N`).
+
+        Args:
+            container: Container ID or name
+            tail: Number of lines from the end of the logs
+            timestamps: Prefix each line with its timestamp
+
+        Returns:
+            stdout and stderr log output in their original order
+        """
+        params = {
+            "stdout": "true",
+            "stderr": "true",
+            "tail": str(tail),
+            "timestamps": "true" if timestamps else "false",
+        }
+        response = await self._request("GET", f"/containers/{container}/logs", params=params)
+        output = b"".join(payload for _, payload in iter_stream_frames(response.content))
+        return output.decode("utf-8", errors="replace")
+
+    async def stream_logs(
+        self,
+        container: str,
+        follow: bool = False,
+        tail: str = "all",
+        since: float | None = None,
+        until: float | None = None,
+        stdout: bool = True,
+        stderr: bool = True,
+        timestamps: bool = False,
+    ) -> AsyncIterator[Tuple[int, bytes]]:
+        """Stream container logs (equivalent to `docker logs [-f]`).
+
+        Frames are yielded as they arrive; the response is never buffered
+        whole, so memory use does not depend on the log size.
+
+        Args:
+            container: Container ID or name
+            follow: Keep streaming new output until the container stops
+            tail: Number of lines from the end of the logs ("all" for everything)
+            since: Only logs after this Unix time
+            until: Only logs before this Unix time
+            stdout: Include stdout
+            stderr: Include stderr
+            timestamps: Prefix each line with its timestamp
+
+        Yields:
+            Tuples of (stream type, payload)
+
+        Raises:
+            DockerNotFoundError: If the container does not exist
+            DockerAPIError: If the daemon returns an error or is unreachable
+        """
+        params = {
+            "follow": "true" if follow else "false",
+            "stdout": "true" if stdout else "false",
+            "stderr": "true" if stderr else "false",
+            "tail": str(tail),
+            "timestamps": "true" if timestamps else "false",
+        }
+        if since is not None:
+            params["since"] = f"{since:.9f}"
+        if until is not None:
+            params["until"] = f"{until:.9f}"
+
+        # Followed streams may be idle for a long time
+        timeout = httpx.Timeout(self.timeout, read=None if follow else self.timeout)
+        path = f"/containers/{container}/logs"
+        demuxer = StreamDemuxer()
+
+        try:
+            async with self.client.stream("GET", path, params=params, timeout=timeout) as response:
+                if response.status_code >= 400:
+                    await response.aread()
+                    _raise_for_status(response)
+                async for chunk in response.aiter_bytes():
+                    for item in demuxer.feed(chunk):
+                        yield item
+        except httpx.TimeoutException:
+            raise DockerAPIError(504, f"Docker API request timed out: GET {path}")
+        except httpx.HTTPError as e:
+            raise DockerAPIError(503, f"Docker daemon unavailable: {e}")
+
+        for item in demuxer.flush():
+            yield item
+
+    async def exec(
+        self,
+        container: str,
+        cmd: List[str],
+        env: List[str] | None = None,
+        workdir: str | None = None,
+        user: str | None = None,
+        timeout: float | None = None,
+    ) -> ExecResult:
+        """Run a command inside a running container (equivalent to `docker exec`).
+
+        Args:
+            container: Container ID or name
+            cmd: Command and arguments
+            env: Environment variables (KEY=value)
+            workdir: Working directory inside the container
+            user: User to run the command as
+            timeout: Timeout for the command to finish
+
+        Returns:
+            ExecResult with exit code, stdout and stderr
+        """
+        config: Dict[str, Any] = {
+            "AttachStdout": True,
+            "AttachStderr": True,
+            "Tty": False,
+            "Cmd": cmd,
+        }
+        if env:
+            config["Env"] = env
+        if workdir:
+            config["WorkingDir"] = workdir
+        if user:
+            config["User"] = user
+
+        response = await self._request("POST", f"/containers/{container}/exec", json=config)
+        exec_id = response.json()["Id"]
+
+        response = await self._request(
+            "POST",
+            f"/exec/{exec_id}/start",
+            json={"Detach": False, "Tty": False},
+            timeout=timeout,
+        )
+        stdout, stderr = demux_stream(response.content)
+
+        response = await self._request("GET", f"/exec/{exec_id}/json")
+        exit_code = response.json().get("ExitCode")
+
+        return ExecResult(
+            exit_code=exit_code if exit_code is not None else -1,
+            stdout=stdout.decode("utf-8", errors="replace"),
+            stderr=stderr.decode("utf-8", errors="replace"),
+        )
+
+    async def exec_attach(
+        self,
+        container: str,
+        cmd: List[str],
+        env: List[str] | None = None,
+        workdir: str | None = None,
+        user: str | None = None,
+    ) -> Tuple[asyncio.StreamReader, asyncio.StreamWriter]:
+        """Start a long-lived exec session with stdin attached.
+
+        The Docker API upgrades the exec start request to a raw bidirectional
+        stream: stdin is written as-is, stdout/stderr come back as
+        multiplexed frames (see read_stream_frame).
+
+        Args:
+            container: Container ID or name
+            cmd: Command and arguments
+            env: Environment variables (KEY=value)
+            workdir: Working directory inside the container
+            user: User to run the command as
+
+        Returns:
+            Tuple of (reader, writer) of the hijacked connection
+
+        Raises:
+            DockerAPIError: If the session cannot be started
+        """
+        config: Dict[str, Any] = {
+            "AttachStdin": True,
+            "AttachStdout": True,
+            "AttachStderr": True,
+            "Tty": False,
+            "Cmd": cmd,
+        }
+        if env:
+            config["Env"] = env
+        if workdir:
+            config["WorkingDir"] = workdir
+        if user:
+            config["User"] = user
+
+        response = await self._request("POST", f"/containers/{container}/exec", json=config)
+        exec_id = response.json()["Id"]
+
+        if self.docker_host.startswith("unix://"):
+            reader, writer = await asyncio.open_unix_connection(self.docker_host[len("unix://"):])
+            host = "docker"
+        else:
+            address = self.docker_host.split("://", 1)[-1]
+            hostname, _, port = address.partition(":")
+            reader, writer = await asyncio.open_connection(hostname, int(port or 2375))
+            host = address
+
+        body = json.dumps({"Detach": False, "Tty": False}).encode()
+        writer.write(
+            f"POST /exec/{exec_id}/start HTTP/1.1\r\n"
+            f"Host: {host}\r\n"
+            "Content-Type: application/json\r\n"
+            "Connection: Upgrade\r\n"
+            "Upgrade: tcp\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n".encode() + body
+        )
+        await writer.drain()
+
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), timeout=self.timeout)
+        status_line = head.split(b"\r\n", 1)[0].decode("latin-1")
+        status = int(status_line.split()[1]) if len(status_line.split()) > 1 else 0
+        if status not in (101, 200):
+            writer.close()
+            raise DockerAPIError(status, f"Failed to attach exec session: {status_line}")
+
+        return reader, writer
+
+    async def start_container(self, container: str) -> None:
+        """Start a container (equivalent to `docker start`)."""
+        await self._request("POST", f"/containers/{container}/start")
+
+    async def stop_container(self, container: str, timeout: int = 10) -> None:
+        """Stop a container (equivalent to `docker stop`)."""
+        await self._request("POST", f"/containers/{container}/stop", params={"t": timeout}, timeout=timeout + self.timeout)
+
+    async def restart_container(self, container: str, timeout: int = 10) -> None:
+        """Restart a container (equivalent to `docker restart`)."""
+        await self._request("POST", f"/containers/{container}/restart", params={"t": timeout}, timeout=timeout + self.timeout)
+
+    async def list_images(self) -> List[Dict[str, Any]]:
+        """List images (equivalent to `docker images`)."""
+        response = await self._request("GET", "/images/json")
+        return response.json()
+
+    async def put_file(self, container: str, path: str, content: str, mode: int = 0o644) -> None:
+        """Write a file inside a container via the archive endpoint.
+
+        Args:
+            container: Container ID or name
+            path: Absolute file path inside the container
+            content: File content
+            mode: File permission bits
+        """
+        await self.put_files(container, posixpath.dirname(path), {posixpath.basename(path): content}, mode=mode)
+
+    async def put_files(self, container: str, directory: str, files: Dict[str, str], mode: int = 0o644) -> None:
+        """Write several files into one container directory with a single archive upload.
+
+        Args:
+            container: Container ID or name
+            directory: Absolute directory path inside the container
+            files: Mapping of filename to content
+            mode: File permission bits
+        """
+        buffer = io.BytesIO()
+        now = int(time.time())
+        with tarfile.open(fileobj=buffer, mode="w") as tar:
+            for name, content in files.items():
+                data = content.encode("utf-8")
+                info = tarfile.TarInfo(name=name)
+                info.size = len(data)
+                info.mode = mode
+                info.mtime = now
+                tar.addfile(info, io.BytesIO(data))
+
+        await self._request(
+            "PUT",
+            f"/containers/{container}/archive",
+            params={"path": directory},
+            content=buffer.getvalue(),
+        )
+
+    async def get_files(self, container: str, directory: str) -> Dict[str, str]:
+        """Read the regular files directly inside a container directory.
+
+        Args:
+            container: Container ID or name
+            directory: Absolute directory path inside the container
+
+        Returns:
+            Mapping of filename to content
+        """
+        response = await self._request("GET", f"/containers/{container}/archive", params={"path": directory})
+
+        files = {}
+        with tarfile.open(fileobj=io.BytesIO(response.content), mode="r") as tar:
+            for member in tar:
+                parts = member.name.split("/")
+                if not member.isfile() or len(parts) != 2:
+                    continue
+                data = tar.extractfile(member)
+                if data is not None:
+                    files[parts[1]] = data.read().decode("utf-8", errors="replace")
+        return files
+
+
+# Singleton instance
+_docker_client: DockerClient | None = None
+
+
+def get_docker_client() -> DockerClient:
+    """Get Docker client singleton.
+
+    Returns:
+        DockerClient instance
+    """
+    global _docker_client
+    if _docker_client is None:
+        _docker_client = DockerClient()
+    return _docker_client
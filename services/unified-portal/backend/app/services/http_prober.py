@@ -0,0 +1,468 @@
+"""Concurrent HTTP availability, latency and TLS expiry probes for site URLs."""
+from __future__ import annotations
+
+import asyncio
+import importlib.util
+import logging
+import ssl
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import timezone
+from typing import Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+from cryptography import x509
+
+from app.config import get_settings
+from app.services.async_exec import discard_loop_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# HTTP/2 needs the optional `h2` package (httpx[http2])
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+
+@dataclass
+class ProbeTarget:
+    """A URL to probe.
+
+    Attributes:
+        name: Site identifier
+        url: Public site URL
+    """
+
+    name: str
+    url: str
+
+
+@dataclass
+class TlsCheck:
+    """Result of a TLS certificate check.
+
+    Attributes:
+        expires_at: Unix time the certificate expires (None if it could not be read)
+        error: Handshake or verification error (None if the certificate is valid)
+    """
+
+    expires_at: Optional[float]
+    error: Optional[str] = None
+
+
+@dataclass
+class ProbeResult:
+    """Result of a single probe.
+
+    Attributes:
+        status_code: HTTP status code (None if the request failed)
+        latency_ms: Time until the response headers arrived
+        checked_at: Unix time of the probe
+        error: Error message if the request failed
+    """
+
+    status_code: Optional[int]
+    latency_ms: float
+    checked_at: float
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        """Whether the site answered without a server error."""
+        return self.status_code is not None and self.status_code < 500
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile.
+
+    Args:
+        values: Samples
+        pct: Percentile (0-100)
+
+    Returns:
+        Percentile value, or None without samples
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))  # ceil
+    return ordered[int(rank) - 1]
+
+
+@dataclass
+class SiteProbeStats:
+    """Probe history of a site.
+
+    Attributes:
+        name: Site identifier
+        url: Public site URL
+        history: Most recent probe results, oldest first
+        tls_expires_at: Unix time the TLS certificate expires (None if unknown)
+        tls_error: Handshake or verification error of the last TLS check
+    """
+
+    name: str
+    url: str
+    history: Deque[ProbeResult] = field(default_factory=deque)
+    tls_expires_at: Optional[float] = None
+    tls_error: Optional[str] = None
+
+    @property
+    def latest(self) -> Optional[ProbeResult]:
+        """Most recent probe result."""
+        return self.history[-1] if self.history else None
+
+    @property
+    def status(self) -> str:
+        """Probe status: "up", "down" or "unknown" (not probed yet)."""
+        if self.latest is None:
+            return "unknown"
+        return "up" if self.latest.ok else "down"
+
+    def _latencies(self) -> List[float]:
+        return [result.latency_ms for result in self.history if result.status_code is not None]
+
+    @property
+    def p50_ms(self) -> Optional[float]:
+        """Median response time of successful requests."""
+        return percentile(self._latencies(), 50)
+
+    @property
+    def p95_ms(self) -> Optional[float]:
+        """95th percentile response time of successful requests."""
+        return percentile(self._latencies(), 95)
+
+    @property
+    def availability(self) -> Optional[float]:
+        """Percentage of probes without a server error."""
+        if not self.history:
+            return None
+        return round(sum(1 for result in self.history if result.ok) / len(self.history) * 100, 2)
+
+    @property
+    def status_codes(self) -> List[Optional[int]]:
+        """Status code history, oldest first (None for failed requests)."""
+        return [result.status_code for result in self.history]
+
+    @property
+    def tls_days_left(self) -> Optional[float]:
+        """Days until the TLS certificate expires."""
+        if self.tls_expires_at is None:
+            return None
+        return round((self.tls_expires_at - time.time()) / 86400, 1)
+
+
+def certificate_expiry(der: bytes) -> float:
+    """Get the expiry time of a DER encoded certificate.
+
+    Args:
+        der: Certificate in DER form
+
+    Returns:
+        Unix time of notAfter
+    """
+    cert = x509.load_der_x509_certificate(der)
+    return cert.not_valid_after.replace(tzinfo=timezone.utc).timestamp()
+
+
+class HttpProber:
+    """Probes all site URLs concurrently over one shared keep-alive client.
+
+    Requests reuse pooled connections (HTTP/2 when available), so periodic
+    probes of sites behind the same front end skip the TCP and TLS handshake.
+    With `via_url` set, requests go to the local nginx with the site's Host
+    header instead of through DNS and Cloudflare, which measures the origin
+    only. TLS expiry is checked on a separate connection (the pooled client
+    does not expose certificates) and cached for `tls_cache_seconds`; the
+    certificate is read without verification so expired or invalid
+    certificates still report their expiry, and verification problems are
+    reported separately.
+    """
+
+    def __init__(
+        self,
+        targets: Callable[[], Awaitable[List[ProbeTarget]]] | None = None,
+        via_url: str | None = None,
+        timeout: float | None = None,
+        concurrency: int | None = None,
+        history_size: int | None = None,
+        interval: float | None = None,
+        tls_cache_seconds: float | None = None,
+        verify: bool = True,
+    ):
+        """Initialize HTTP prober.
+
+        Args:
+            targets: Coroutine function returning the URLs to probe in the background loop
+            via_url: Base URL of a local reverse proxy to send requests to
+                (defaults to settings.http_probe_via_url; empty probes public URLs)
+            timeout: Request timeout in seconds
+            concurrency: Maximum number of requests in flight
+            history_size: Number of results kept per site
+            interval: Seconds between background probe rounds
+            tls_cache_seconds: Seconds a certificate expiry is cached
+            verify: Verify TLS certificates of probed URLs
+        """
+        self.targets = targets
+        self.via_url = (settings.http_probe_via_url if via_url is None else via_url).rstrip("/")
+        self.timeout = timeout or settings.http_probe_timeout_seconds
+        self.concurrency = concurrency or settings.http_probe_concurrency
+        self.history_size = history_size or settings.http_probe_history_size
+        self.interval = interval or settings.http_probe_interval_seconds
+        self.tls_cache_seconds = settings.http_probe_tls_cache_seconds if tls_cache_seconds is None else tls_cache_seconds
+        self.verify = verify
+        self._targets: List[ProbeTarget] = []
+        self._stats: Dict[str, SiteProbeStats] = {}
+        self._tls_cache: Dict[Tuple[str, int], Tuple[float, TlsCheck]] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """Shared HTTP client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            discard_loop_client(self._client, self._loop)
+            self._client = httpx.AsyncClient(
+                http2=HTTP2_AVAILABLE,
+                verify=self.verify,
+                timeout=self.timeout,
+                follow_redirects=False,
+                limits=httpx.Limits(
+                    max_connections=self.concurrency,
+                    max_keepalive_connections=self.concurrency,
+                    keepalive_expiry=max(self.interval * 2, 30.0),
+                ),
+                headers={"User-Agent": "unified-portal-prober/1.0"},
+            )
+            self._loop = loop
+        return self._client
+
+    @property
+    def running(self) -> bool:
+        """Whether the background probe task is active."""
+        return self._task is not None and not self._task.done()
+
+    def _request_args(self, url: str) -> Tuple[str, Dict[str, str]]:
+        """Request URL and headers, rewritten for the local proxy if configured."""
+        if not self.via_url:
+            return url, {}
+        parts = urlsplit(url)
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        headers = {"Host": parts.netloc}
+        if parts.scheme == "https":
+            # Cloudflare terminates TLS; tell WordPress the original scheme
+            headers["X-Forwarded-Proto"] = "https"
+        return f"{self.via_url}{path}", headers
+
+    async def _request(self, url: str) -> ProbeResult:
+        """Send one probe request."""
+        request_url, headers = self._request_args(url)
+        started = time.perf_counter()
+        try:
+            async with self.client.stream("GET", request_url, headers=headers) as response:
+                # Response time is time to headers; the body is still drained
+                # so the connection can go back to the pool
+                latency_ms = round((time.perf_counter() - started) * 1000, 2)
+                await response.aread()
+            return ProbeResult(
+                status_code=response.status_code,
+                latency_ms=latency_ms,
+                checked_at=time.time(),
+            )
+        except httpx.HTTPError as e:
+            return ProbeResult(
+                status_code=None,
+                latency_ms=round((time.perf_counter() - started) * 1000, 2),
+                checked_at=time.time(),
+                error=f"{type(e).__name__}: {e}",
+            )
+
+    async def _verify_tls(self, host: str, port: int) -> Optional[str]:
+        """Handshake with certificate and hostname verification.
+
+        Returns:
+            Verification or handshake error, or None if the certificate is valid
+        """
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=ssl.create_default_context(), server_hostname=host),
+                timeout=self.timeout,
+            )
+        except ssl.SSLCertVerificationError as e:
+            return f"Certificate verification failed: {e.verify_message}"
+        except (OSError, asyncio.TimeoutError) as e:
+            return f"TLS handshake failed: {type(e).__name__}: {e}"
+        writer.close()
+        return None
+
+    async def _fetch_tls(self, host: str, port: int) -> TlsCheck:
+        """Connect to a host, read its certificate expiry and check its validity."""
+        # Only the expiry is read here, so accept any certificate: a verifying
+        # handshake would fail for exactly the expired certificates to report
+        context = ssl.create_default_context()
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+        try:
+            _, writer = await asyncio.wait_for(
+                asyncio.open_connection(host, port, ssl=context, server_hostname=host),
+                timeout=self.timeout,
+            )
+        except (OSError, asyncio.TimeoutError) as e:
+            logger.debug(f"TLS check failed for {host}:{port}: {e}")
+            return TlsCheck(expires_at=None, error=f"TLS handshake failed: {type(e).__name__}: {e}")
+        try:
+            der = writer.get_extra_info("ssl_object").getpeercert(binary_form=True)
+        finally:
+            writer.close()
+        if not der:
+            return TlsCheck(expires_at=None, error="No peer certificate")
+
+        try:
+            expires_at = certificate_expiry(der)
+        except ValueError as e:
+            return TlsCheck(expires_at=None, error=f"Unreadable certificate: {e}")
+        if expires_at <= time.time():
+            return TlsCheck(expires_at=expires_at, error="Certificate expired")
+        error = await self._verify_tls(host, port) if self.verify else None
+        return TlsCheck(expires_at=expires_at, error=error)
+
+    async def tls_check(self, url: str) -> Optional[TlsCheck]:
+        """Get the (cached) certificate check of an https URL.
+
+        Args:
+            url: Site URL
+
+        Returns:
+            TlsCheck, or None for http URLs
+        """
+        parts = urlsplit(url)
+        if parts.scheme != "https" or not parts.hostname:
+            return None
+        key = (parts.hostname, parts.port or 443)
+        cached = self._tls_cache.get(key)
+        if cached is not None and time.time() - cached[0] < self.tls_cache_seconds:
+            return cached[1]
+        check = await self._fetch_tls(*key)
+        self._tls_cache[key] = (time.time(), check)
+        return check
+
+    async def tls_expiry(self, url: str) -> Optional[float]:
+        """Get the (cached) certificate expiry of an https URL.
+
+        Args:
+            url: Site URL
+
+        Returns:
+            Unix time the certificate expires, or None for http URLs or failures
+        """
+        check = await self.tls_check(url)
+        return check.expires_at if check is not None else None
+
+    async def probe(self, target: ProbeTarget) -> SiteProbeStats:
+        """Probe a site and record the result.
+
+        Args:
+            target: Site to probe
+
+        Returns:
+            Updated SiteProbeStats of the site
+        """
+        result, tls = await asyncio.gather(self._request(target.url), self.tls_check(target.url))
+
+        stats = self._stats.get(target.name)
+        if stats is None or stats.url != target.url:
+            stats = SiteProbeStats(name=target.name, url=target.url, history=deque(maxlen=self.history_size))
+            self._stats[target.name] = stats
+        stats.history.append(result)
+        if tls is not None:
+            if tls.expires_at is not None:
+                stats.tls_expires_at = tls.expires_at
+            stats.tls_error = tls.error
+        return stats
+
+    async def probe_all(self, targets: List[ProbeTarget] | None = None) -> List[SiteProbeStats]:
+        """Probe sites concurrently.
+
+        Args:
+            targets: Sites to probe (defaults to the configured targets)
+
+        Returns:
+            SiteProbeStats of the probed sites, in target order (a site whose
+            probe raised keeps its previous stats)
+        """
+        if targets is None:
+            targets = await self.targets() if self.targets is not None else []
+            self._targets = targets
+            # Forget sites that are no longer configured
+            names = {target.name for target in targets}
+            for name in list(self._stats):
+                if name not in names:
+                    del self._stats[name]
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def bounded(target: ProbeTarget) -> SiteProbeStats:
+            # One failing site must not abort the round for the others
+            async with semaphore:
+                try:
+                    return await self.probe(target)
+                except Exception as e:
+                    logger.error(f"Probe of {target.name} failed: {e}")
+                    return self._stats.get(target.name) or SiteProbeStats(name=target.name, url=target.url)
+
+        return list(await asyncio.gather(*(bounded(target) for target in targets)))
+
+    def get(self, name: str) -> Optional[SiteProbeStats]:
+        """Get the probe history of a site.
+
+        Args:
+            name: Site identifier
+
+        Returns:
+            SiteProbeStats, or None if the site was never probed
+        """
+        return self._stats.get(name)
+
+    def all(self) -> List[SiteProbeStats]:
+        """Get probe histories of the targets of the last background round."""
+        return [
+            self._stats.get(target.name) or SiteProbeStats(name=target.name, url=target.url)
+            for target in self._targets
+        ]
+
+    async def _run(self) -> None:
+        """Background probe loop."""
+        while True:
+            started = time.monotonic()
+            try:
+                results = await self.probe_all()
+                logger.debug(f"Probed {len(results)} sites in {time.monotonic() - started:.2f}s")
+            except Exception as e:
+                logger.error(f"HTTP probe round failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background probe task."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"HTTP prober started (interval: {self.interval}s, http2: {HTTP2_AVAILABLE})")
+
+    async def stop(self) -> None:
+        """Stop the background probe task and close pooled connections."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            logger.info("HTTP prober stopped")
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
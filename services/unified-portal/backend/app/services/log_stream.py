@@ -0,0 +1,190 @@
+"""Line splitting, filtering and time parsing for streamed container logs."""
+from __future__ import annotations
+
+import asyncio
+import re
+import time
+from datetime import datetime, timezone
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Pattern, Tuple
+
+from app.services.docker_client import STREAM_STDERR
+
+# Longer lines are split so a runaway writer cannot grow the buffer
+MAX_LINE_BYTES = 64 * 1024
+
+_RELATIVE_RE = re.compile(r"^(\d+(?:\.\d+)?)([smhd])$")
+_UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_log_time(value: str, now: float | None = None) -> float:
+    """Parse a `since`/`until` value into a Unix timestamp.
+
+    Accepts Unix timestamps ("1700000000"), ISO 8601 ("2025-11-12T10:00:00Z")
+    and durations relative to now ("30s", "10m", "2h", "1d").
+
+    Args:
+        value: Time value
+        now: Reference time for relative values (defaults to current time)
+
+    Returns:
+        Unix timestamp
+
+    Raises:
+        ValueError: If the value cannot be parsed
+    """
+    value = value.strip()
+    match = _RELATIVE_RE.match(value)
+    if match:
+        reference = time.time() if now is None else now
+        return reference - float(match.group(1)) * _UNIT_SECONDS[match.group(2)]
+
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        raise ValueError(f"Invalid time: {value!r} (use a Unix timestamp, ISO 8601 or e.g. 10m, 2h, 1d)")
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def compile_filter(pattern: str | None, ignore_case: bool = False) -> Optional[Pattern[str]]:
+    """Compile a grep pattern.
+
+    Args:
+        pattern: Regular expression (None or empty for no filtering)
+        ignore_case: Match case-insensitively
+
+    Returns:
+        Compiled pattern or None
+
+    Raises:
+        ValueError: If the pattern is not a valid regular expression
+    """
+    if not pattern:
+        return None
+    try:
+        return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+    except re.error as e:
+        raise ValueError(f"Invalid grep pattern: {e}")
+
+
+class LineSplitter:
+    """Splits stdout/stderr frame payloads into complete lines.
+
+    Frames do not align with lines, so each stream keeps the bytes of its
+    unfinished last line until the newline arrives.
+    """
+
+    def __init__(self, max_line_bytes: int = MAX_LINE_BYTES):
+        """Initialize line splitter.
+
+        Args:
+            max_line_bytes: Lines longer than this are emitted in pieces
+        """
+        self.max_line_bytes = max_line_bytes
+        self._partial: Dict[int, bytearray] = {}
+
+    def feed(self, stream_type: int, payload: bytes) -> List[Tuple[int, str]]:
+        """Add a frame payload and return the lines it completes.
+
+        Args:
+            stream_type: STREAM_STDOUT or STREAM_STDERR
+            payload: Frame payload
+
+        Returns:
+            List of (stream type, line) tuples
+        """
+        buffer = self._partial.setdefault(stream_type, bytearray())
+        buffer.extend(payload)
+        lines = []
+
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            lines.append((stream_type, _decode(buffer[start:end])))
+            start = end + 1
+        del buffer[:start]
+
+        while len(buffer) > self.max_line_bytes:
+            lines.append((stream_type, _decode(buffer[:self.max_line_bytes])))
+            del buffer[:self.max_line_bytes]
+
+        return lines
+
+    def flush(self) -> List[Tuple[int, str]]:
+        """Return unfinished last lines at the end of the stream."""
+        lines = [(stream_type, _decode(buffer)) for stream_type, buffer in self._partial.items() if buffer]
+        self._partial.clear()
+        return lines
+
+
+def _decode(data: bytes | bytearray) -> str:
+    """Decode a log line, dropping a trailing carriage return."""
+    return bytes(data).decode("utf-8", errors="replace").rstrip("\r")
+
+
+def filter_lines(lines: List[Tuple[int, str]], pattern: Pattern[str] | None) -> Iterator[Tuple[str, str]]:
+    """Name the streams of lines and drop those not matching the pattern."""
+    for stream_type, line in lines:
+        if pattern is None or pattern.search(line):
+            yield ("stderr" if stream_type == STREAM_STDERR else "stdout"), line
+
+
+async def iter_log_lines(
+    frames: AsyncIterator[Tuple[int, bytes]],
+    pattern: Pattern[str] | None = None,
+) -> AsyncIterator[Tuple[str, str]]:
+    """Turn demultiplexed log frames into filtered lines.
+
+    Args:
+        frames: (stream type, payload) frames, e.g. DockerClient.stream_logs()
+        pattern: Only yield lines matching this pattern
+
+    Yields:
+        Tuples of ("stdout" or "stderr", line)
+    """
+    splitter = LineSplitter()
+    async for stream_type, payload in frames:
+        for item in filter_lines(splitter.feed(stream_type, payload), pattern):
+            yield item
+    for item in filter_lines(splitter.flush(), pattern):
+        yield item
+
+
+async def with_keepalive(items: AsyncIterator, interval: float) -> AsyncIterator:
+    """Yield items from an iterator, and None whenever it is idle for `interval`.
+
+    Lets followed streams send keepalives so proxies do not close quiet
+    connections. The pending read is never cancelled by a keepalive.
+
+    Args:
+        items: Source iterator
+        interval: Idle seconds between keepalives
+    """
+    iterator = items.__aiter__()
+    pending: asyncio.Task | None = None
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(iterator.__anext__())
+            done, _ = await asyncio.wait({pending}, timeout=interval)
+            if not done:
+                yield None
+                continue
+            try:
+                item = pending.result()
+            except StopAsyncIteration:
+                return
+            finally:
+                pending = None
+            yield item
+    finally:
+        if pending is not None:
+            pending.cancel()
@@ -0,0 +1,294 @@
+"""Background metrics collector for the dashboard."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Set
+
+from app.services.async_exec import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class MetricsSample:
+    """Last collected value of a single metrics source.
+
+    Attributes:
+        value: Collected value (None until the first successful collection)
+        collected_at: Unix timestamp of the last successful collection
+        error: Error message of the last failed collection, if any
+    """
+
+    value: Any = None
+    collected_at: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds elapsed since the last successful collection."""
+        if not self.collected_at:
+            return 0.0
+        return max(time.time() - self.collected_at, 0.0)
+
+
+def to_plain(value: Any) -> Any:
+    """Convert a collected value (pydantic models, lists, dicts) to JSON types."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(mode="json")
+    if isinstance(value, dict):
+        return {key: to_plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [to_plain(item) for item in value]
+    return value
+
+
+def _keyed(value: Any) -> Any:
+    """Turn lists of named records into dicts keyed by name so they diff per item."""
+    if isinstance(value, list) and value and all(isinstance(item, dict) and "name" in item for item in value):
+        return {item["name"]: item for item in value}
+    return value
+
+
+def diff_values(old: Any, new: Any) -> Any:
+    """Compute the changed fields between two plain values.
+
+    Dicts (and lists of named records) are compared field by field; removed
+    keys are reported as None. Other values are replaced as a whole.
+
+    Args:
+        old: Previous plain value
+        new: Current plain value
+
+    Returns:
+        Changed fields, or None if nothing changed
+    """
+    old = _keyed(old)
+    new = _keyed(new)
+    if isinstance(old, dict) and isinstance(new, dict):
+        changes = {}
+        for key, item in new.items():
+            if key not in old:
+                changes[key] = item
+            else:
+                changed = diff_values(old[key], item)
+                if changed is not None:
+                    changes[key] = changed
+        for key in old:
+            if key not in new:
+                changes[key] = None
+        return changes or None
+    return None if old == new else new
+
+
+class MetricsCollector:
+    """Refreshes dashboard metrics sources into a shared in-memory snapshot.
+
+    Each source is either a coroutine function (Docker API, ...) or a blocking
+    callable (reads /proc, ...), which is run in a worker thread. The collector
+    refreshes them on a fixed interval so that dashboard endpoints only read
+    the latest snapshot.
+
+    Subscribers (e.g. live dashboard streams) receive the changed fields of
+    each refresh through a queue; the delta is computed once per refresh
+    regardless of the number of subscribers.
+    """
+
+    def __init__(
+        self,
+        sources: Dict[str, Callable[[], Any]],
+        interval: float = 10.0,
+        timeout: Optional[float] = None,
+    ):
+        """Initialize metrics collector.
+
+        Args:
+            sources: Mapping of source name to collection callable
+            interval: Refresh interval in seconds
+            timeout: Per-source collection timeout in seconds (None for no limit)
+        """
+        self.sources = sources
+        self.interval = interval
+        self.timeout = timeout
+        self._samples: Dict[str, MetricsSample] = {name: MetricsSample() for name in sources}
+        self._task: asyncio.Task | None = None
+        self._plain: Dict[str, Any] = {}
+        self._subscribers: Set[asyncio.Queue] = set()
+
+    @property
+    def running(self) -> bool:
+        """Whether the background refresh task is active."""
+        return self._task is not None and not self._task.done()
+
+    def is_stale(self, sample: MetricsSample) -> bool:
+        """Whether a sample failed its last refresh or missed several refreshes."""
+        return sample.error is not None or sample.age_seconds > self.interval * 3
+
+    async def _call(self, name: str) -> Any:
+        """Run a source without blocking the event loop.
+
+        Args:
+            name: Source name
+
+        Returns:
+            Collected value
+
+        Raises:
+            TimeoutError: If the source exceeds the collection timeout
+        """
+        func = self.sources[name]
+        if asyncio.iscoroutinefunction(func):
+            call = func()
+        else:
+            call = run_blocking(func)
+        try:
+            return await asyncio.wait_for(call, timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f"timed out after {self.timeout}s")
+
+    async def _store(self, name: str) -> MetricsSample:
+        """Collect a source and store its result.
+
+        A failed collection keeps the previous value and records the error.
+
+        Args:
+            name: Source name
+
+        Returns:
+            Updated sample
+        """
+        sample = self._samples[name]
+        try:
+            value = await self._call(name)
+        except Exception as e:
+            error = getattr(e, "detail", None) or str(e)
+            logger.warning(f"Metrics source '{name}' failed: {error}")
+            sample = MetricsSample(value=sample.value, collected_at=sample.collected_at, error=error)
+        else:
+            sample = MetricsSample(value=value, collected_at=time.time())
+            self._publish(name, sample)
+        self._samples[name] = sample
+        return sample
+
+    def subscribe(self, maxsize: int = 100) -> asyncio.Queue:
+        """Subscribe to snapshot deltas.
+
+        The queue receives dicts with `source`, `changes` and `collected_at`.
+        If a subscriber falls behind, its queue is cleared and a None
+        sentinel is queued, meaning the subscriber should resync from the
+        full snapshot.
+
+        Args:
+            maxsize: Maximum number of pending deltas
+
+        Returns:
+            Queue receiving deltas
+        """
+        queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """Remove a subscriber queue."""
+        self._subscribers.discard(queue)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the latest collected values of all sources as plain JSON types."""
+        return {
+            name: to_plain(sample.value)
+            for name, sample in self._samples.items()
+            if sample.value is not None
+        }
+
+    def _publish(self, name: str, sample: MetricsSample) -> None:
+        """Compute the delta of a source and push it to all subscribers."""
+        plain = to_plain(sample.value)
+        previous = self._plain.get(name)
+        self._plain[name] = plain
+
+        changes = plain if previous is None else diff_values(previous, plain)
+        if changes is None or not self._subscribers:
+            return
+
+        delta = {"source": name, "changes": changes, "collected_at": sample.collected_at}
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(delta)
+            except asyncio.QueueFull:
+                # Slow subscriber: drop pending deltas and ask for a resync
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(None)
+
+    async def refresh(self) -> None:
+        """Refresh all sources once, concurrently.
+
+        A refresh takes as long as the slowest source (bounded by the timeout).
+        """
+        await asyncio.gather(*(self._store(name) for name in self.sources))
+
+    def peek(self, name: str) -> MetricsSample:
+        """Get the latest sample without collecting.
+
+        Args:
+            name: Source name
+
+        Returns:
+            Latest sample (value is None if nothing has been collected yet)
+        """
+        return self._samples[name]
+
+    async def get(self, name: str) -> MetricsSample:
+        """Get the latest sample for a source.
+
+        Falls back to an inline collection when nothing has been collected yet
+        (e.g. before the first background refresh, or when the collector is
+        not running).
+
+        Args:
+            name: Source name
+
+        Returns:
+            Latest sample
+
+        Raises:
+            Exception: Source error if no value has been collected yet
+        """
+        sample = self._samples[name]
+        if sample.value is None:
+            # Errors (e.g. HTTPException) propagate to the caller
+            value = await self._call(name)
+            sample = MetricsSample(value=value, collected_at=time.time())
+            self._publish(name, sample)
+            self._samples[name] = sample
+        return sample
+
+    async def _run(self) -> None:
+        """Background refresh loop."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Metrics refresh failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background refresh task."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Metrics collector started (interval: {self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the background refresh task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Metrics collector stopped")
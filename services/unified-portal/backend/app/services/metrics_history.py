@@ -0,0 +1,327 @@
+"""In-memory time-series store for dashboard metrics history."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.async_exec import run_blocking
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Tier:
+    """Resolution tier of a time series.
+
+    Attributes:
+        name: Resolution name used by the API (e.g. "1m")
+        step: Bucket width in seconds
+        capacity: Number of buckets kept
+    """
+
+    name: str
+    step: int
+    capacity: int
+
+
+# 1 hour at 1s, 1 day at 1m, 30 days at 1h
+DEFAULT_TIERS = (
+    Tier("1s", 1, 3600),
+    Tier("1m", 60, 1440),
+    Tier("1h", 3600, 720),
+)
+
+
+class RingBuffer:
+    """Fixed-size circular buffer of (timestamp, value) pairs.
+
+    Backed by two preallocated `array('d')`, so memory per buffer is fixed
+    (16 bytes per slot) regardless of how long the process runs.
+    """
+
+    def __init__(self, capacity: int):
+        """Initialize ring buffer.
+
+        Args:
+            capacity: Number of slots
+        """
+        self.capacity = capacity
+        self._timestamps = array("d", bytes(8 * capacity))
+        self._values = array("d", bytes(8 * capacity))
+        self._head = 0
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: float) -> None:
+        """Append a point, overwriting the oldest one when full."""
+        self._timestamps[self._head] = timestamp
+        self._values[self._head] = value
+        self._head = (self._head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def range(self, since: float = 0.0, until: float = math.inf) -> Tuple[List[float], List[float]]:
+        """Get points with since <= timestamp <= until in chronological order.
+
+        Args:
+            since: Start timestamp (inclusive)
+            until: End timestamp (inclusive)
+
+        Returns:
+            Tuple of (timestamps, values)
+        """
+        timestamps = []
+        values = []
+        start = (self._head - self._count) % self.capacity
+        for offset in range(self._count):
+            index = (start + offset) % self.capacity
+            timestamp = self._timestamps[index]
+            if since <= timestamp <= until:
+                timestamps.append(timestamp)
+                values.append(self._values[index])
+        return timestamps, values
+
+
+class _TierBuffer:
+    """Ring buffer of one tier plus the bucket currently being averaged."""
+
+    def __init__(self, tier: Tier):
+        self.tier = tier
+        self.buffer = RingBuffer(tier.capacity)
+        self.bucket_start: Optional[float] = None
+        self.bucket_sum = 0.0
+        self.bucket_count = 0
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a raw sample, flushing the previous bucket when a new one starts."""
+        bucket_start = float(int(timestamp // self.tier.step) * self.tier.step)
+        if self.bucket_start is not None and bucket_start != self.bucket_start:
+            self.flush()
+        self.bucket_start = bucket_start
+        self.bucket_sum += value
+        self.bucket_count += 1
+
+    def flush(self) -> None:
+        """Store the average of the current bucket."""
+        if self.bucket_start is not None and self.bucket_count:
+            self.buffer.append(self.bucket_start, self.bucket_sum / self.bucket_count)
+        self.bucket_start = None
+        self.bucket_sum = 0.0
+        self.bucket_count = 0
+
+    def range(self, since: float, until: float) -> Tuple[List[float], List[float]]:
+        """Get stored buckets plus the partially filled current bucket."""
+        timestamps, values = self.buffer.range(since, until)
+        if self.bucket_count and since <= self.bucket_start <= until:
+            timestamps.append(self.bucket_start)
+            values.append(self.bucket_sum / self.bucket_count)
+        return timestamps, values
+
+
+class TimeSeries:
+    """A metric downsampled into several resolution tiers.
+
+    Every raw sample is averaged into each tier's bucket, so the 1m tier
+    holds per-minute means and the 1h tier per-hour means.
+    """
+
+    def __init__(self, tiers: Tuple[Tier, ...] = DEFAULT_TIERS):
+        """Initialize time series.
+
+        Args:
+            tiers: Resolution tiers
+        """
+        self._tiers: Dict[str, _TierBuffer] = {tier.name: _TierBuffer(tier) for tier in tiers}
+
+    @property
+    def resolutions(self) -> List[str]:
+        """Available resolution names."""
+        return list(self._tiers)
+
+    def add(self, timestamp: float, value: float) -> None:
+        """Add a raw sample to all tiers."""
+        for tier in self._tiers.values():
+            tier.add(timestamp, value)
+
+    def range(self, resolution: str, since: float = 0.0, until: float = math.inf) -> Tuple[List[float], List[float]]:
+        """Get points of a tier in a time range.
+
+        Args:
+            resolution: Tier name (e.g. "1s", "1m", "1h")
+            since: Start timestamp (inclusive)
+            until: End timestamp (inclusive)
+
+        Returns:
+            Tuple of (timestamps, values)
+
+        Raises:
+            ValueError: If the resolution does not exist
+        """
+        tier = self._tiers.get(resolution)
+        if tier is None:
+            raise ValueError(f"Unknown resolution: {resolution}")
+        return tier.range(since, until)
+
+
+class MetricsHistory:
+    """Collection of named time series."""
+
+    def __init__(self, tiers: Tuple[Tier, ...] = DEFAULT_TIERS):
+        """Initialize metrics history.
+
+        Args:
+            tiers: Resolution tiers used for every series
+        """
+        self.tiers = tiers
+        self._series: Dict[str, TimeSeries] = {}
+
+    def record(self, values: Dict[str, float], timestamp: Optional[float] = None) -> None:
+        """Record one sample for several series.
+
+        Args:
+            values: Mapping of series name to value
+            timestamp: Sample time (defaults to now)
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        for name, value in values.items():
+            series = self._series.get(name)
+            if series is None:
+                series = self._series[name] = TimeSeries(self.tiers)
+            series.add(timestamp, float(value))
+
+    def series_names(self) -> List[str]:
+        """Names of all recorded series."""
+        return sorted(self._series)
+
+    def query(
+        self,
+        name: str,
+        resolution: str = "1s",
+        since: float = 0.0,
+        until: float = math.inf,
+    ) -> Tuple[List[float], List[float]]:
+        """Get points of a series.
+
+        Args:
+            name: Series name
+            resolution: Tier name
+            since: Start timestamp (inclusive)
+            until: End timestamp (inclusive)
+
+        Returns:
+            Tuple of (timestamps, values)
+
+        Raises:
+            KeyError: If the series does not exist
+            ValueError: If the resolution does not exist
+        """
+        return self._series[name].range(resolution, since, until)
+
+
+class CpuUsageTracker:
+    """Host CPU utilization from consecutive /proc/stat readings.
+
+    /proc/stat counters are cumulative since boot; utilization over an
+    interval is the ratio of non-idle to total jiffies between two reads.
+    """
+
+    def __init__(self, proc_root: str = "/proc"):
+        """Initialize CPU usage tracker.
+
+        Args:
+            proc_root: procfs mount point
+        """
+        self.proc_root = proc_root
+        self._previous: Optional[Tuple[float, float]] = None
+
+    def _read(self) -> Tuple[float, float]:
+        """Read (total, idle) jiffies of the aggregate cpu line."""
+        with open(f"{self.proc_root}/stat", "r") as f:
+            cpu_values = [float(x) for x in f.readline().split()[1:]]
+        # idle + iowait
+        idle = cpu_values[3] + (cpu_values[4] if len(cpu_values) > 4 else 0.0)
+        return sum(cpu_values), idle
+
+    def percent(self) -> float:
+        """CPU utilization since the previous call.
+
+        The first call returns the average since boot.
+
+        Returns:
+            CPU usage percentage
+        """
+        total, idle = self._read()
+        previous = self._previous or (0.0, 0.0)
+        self._previous = (total, idle)
+
+        total_delta = total - previous[0]
+        idle_delta = idle - previous[1]
+        if total_delta <= 0:
+            return 0.0
+        return 100.0 * (1.0 - idle_delta / total_delta)
+
+
+class HistoryRecorder:
+    """Background task recording samples into a MetricsHistory."""
+
+    def __init__(
+        self,
+        history: MetricsHistory,
+        sample: Callable[[], Dict[str, float]],
+        interval: float = 1.0,
+    ):
+        """Initialize history recorder.
+
+        Args:
+            history: Target metrics history
+            sample: Blocking callable returning series values (run in a worker thread)
+            interval: Sampling interval in seconds
+        """
+        self.history = history
+        self.sample = sample
+        self.interval = interval
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background task is active."""
+        return self._task is not None and not self._task.done()
+
+    async def record_once(self) -> None:
+        """Take one sample and record it."""
+        values = await run_blocking(self.sample)
+        self.history.record(values)
+
+    async def _run(self) -> None:
+        """Background sampling loop aligned to the interval."""
+        while True:
+            try:
+                await self.record_once()
+            except Exception as e:
+                logger.warning(f"Metrics history sample failed: {e}")
+            await asyncio.sleep(self.interval - (time.time() % self.interval))
+
+    def start(self) -> None:
+        """Start the background task."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Metrics history recorder started (interval: {self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the background task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Metrics history recorder stopped")
@@ -1,40 +1,48 @@
 """Nginx configuration service."""
 from __future__ import annotations
 
+import asyncio
+import difflib
 import logging
-import subprocess
+import re
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any
+from typing import Any, Dict, List, Optional, Set
 
-from jinja2 import Template
+from jinja2 import DictLoader, Environment, StrictUndefined
 
 from app.config import get_settings
+from app.services.async_exec import TARGET_DOCKER, get_exec_limits
+from app.services.docker_client import ExecResult, get_docker_client
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
-# Nginx configuration template for WordPress sites
-NGINX_WORDPRESS_TEMPLATE = """
-# WordPress site: {{ site_name }} ({{ domain }})
+# Nginx site configuration templates. Variants extend "base.conf.j2";
+# the variant name is recorded in the header so regenerations keep it.
+NGINX_TEMPLATES = {
+    "base.conf.j2": """\
+# {% block title %}WordPress site{% endblock %}: {{ site_name }} ({{ domain }})
 # PHP version: {{ php_version }}
+# Variant: {{ variant }}
 # Generated by Unified Portal
 
 server {
     listen 80;
     server_name {{ domain }}{% if www_redirect %} www.{{ domain }}{% endif %};
-
+{% block root %}
     root /var/www/html/{{ site_name }};
     index index.php index.html index.htm;
-
-    access_log /var/log/nginx/{{ site_name }}_access.log;
+{% endblock %}
+    access_log /var/log/nginx/{{ site_name }}_access.log portal;
     error_log /var/log/nginx/{{ site_name }}_error.log;
 
     # Security headers
     add_header X-Frame-Options "SAMEORIGIN" always;
     add_header X-Content-Type-Options "nosniff" always;
     add_header X-XSS-Protection "1; mode=block" always;
-
+{% block headers %}{% endblock %}
     # Cloudflare HTTPS detection (for proxied sites)
     set $https_forwarded "";
     if ($http_x_forwarded_proto = "https") {
@@ -42,41 +50,281 @@ server {
     }
 
     # Client max body size (for uploads)
-    client_max_body_size {{ max_upload_size | default('64M') }};
-
+    client_max_body_size {{ max_upload_size }};
+{% block locations %}{% endblock %}
+    # Deny access to sensitive files
+    location ~ /\\. {
+        deny all;
+    }
+}
+""",
+    "wordpress.conf.j2": """\
+{% extends "base.conf.j2" %}
+{% block locations %}
     location / {
         try_files $uri $uri/ /index.php?$args;
     }
 
     # PHP handling
-    location ~ \.php$ {
+    location ~ \\.php$ {
         try_files $uri =404;
-        fastcgi_split_path_info ^(.+\.php)(/.+)$;
-        fastcgi_pass wordpress:9000;
+        fastcgi_split_path_info ^(.+\\.php)(/.+)$;
+        fastcgi_pass {{ php_upstream }};
         fastcgi_index index.php;
         fastcgi_param SCRIPT_FILENAME $document_root$fastcgi_script_name;
         fastcgi_param HTTPS $https_forwarded;
         fastcgi_param HTTP_X_FORWARDED_PROTO https;
         include fastcgi_params;
+{%- block php_cache %}{% endblock %}
     }
 
-    # Deny access to sensitive files
-    location ~ /\. {
+    location ~* /(?:uploads|files)/.*\\.php$ {
         deny all;
     }
-
-    location ~* /(?:uploads|files)/.*\.php$ {
-        deny all;
+{% include "static-files.conf.j2" %}
+{%- endblock %}
+""",
+    "wordpress-fastcgi-cache.conf.j2": """\
+{% extends "wordpress.conf.j2" %}
+{% block title %}WordPress site (FastCGI cache){% endblock %}
+{% block headers %}
+    # FastCGI page cache (zone WORDPRESS defined in nginx.conf)
+    set $skip_cache 0;
+    if ($request_method = POST) {
+        set $skip_cache 1;
+    }
+    if ($query_string != "") {
+        set $skip_cache 1;
+    }
+    if ($request_uri ~* "/wp-admin/|/wp-json/|/xmlrpc.php|wp-.*\\.php|/feed/|sitemap(_index)?\\.xml") {
+        set $skip_cache 1;
+    }
+    if ($http_cookie ~* "comment_author|wordpress_[a-f0-9]+|wp-postpass|wordpress_no_cache|wordpress_logged_in|woocommerce_items_in_cart") {
+        set $skip_cache 1;
+    }
+    add_header X-FastCGI-Cache $upstream_cache_status always;
+{% endblock %}
+{% block php_cache %}
+        fastcgi_cache WORDPRESS;
+        fastcgi_cache_valid 200 301 302 {{ cache_valid }};
+        fastcgi_cache_use_stale error timeout updating http_500 http_503;
+        fastcgi_cache_lock on;
+        fastcgi_cache_bypass $skip_cache;
+        fastcgi_no_cache $skip_cache;
+{%- endblock %}
+""",
+    "static.conf.j2": """\
+{% extends "base.conf.j2" %}
+{% block title %}Static site{% endblock %}
+{% block root %}
+    root /var/www/html/{{ site_name }};
+    index index.html index.htm;
+{% endblock %}
+{% block locations %}
+    location / {
+        try_files $uri $uri/ =404;
     }
 
+    location ~* \\.php$ {
+        return 404;
+    }
+{% include "static-files.conf.j2" %}
+{%- endblock %}
+""",
+    "reverse-proxy.conf.j2": """\
+{% extends "base.conf.j2" %}
+{% block title %}Reverse proxy{% endblock %}
+{% block root %}{% endblock %}
+{% block locations %}
+    location / {
+        proxy_pass {{ proxy_pass }};
+        proxy_http_version 1.1;
+        proxy_set_header Host $host;
+        proxy_set_header X-Real-IP $remote_addr;
+        proxy_set_header X-Forwarded-For $proxy_add_x_forwarded_for;
+        proxy_set_header X-Forwarded-Proto $http_x_forwarded_proto;
+        proxy_set_header Connection "";
+    }
+{% endblock %}
+""",
+    "static-files.conf.j2": """
     # Static file caching
-    location ~* \.(js|css|png|jpg|jpeg|gif|ico|svg|woff|woff2|ttf|eot)$ {
+    location ~* \\.(js|css|png|jpg|jpeg|gif|ico|svg|woff|woff2|ttf|eot)$ {
         expires max;
         log_not_found off;
         access_log off;
     }
+""",
 }
-"""
+
+# Selectable site variants (template name without .conf.j2)
+NGINX_VARIANTS = ("wordpress", "wordpress-fastcgi-cache", "static", "reverse-proxy")
+DEFAULT_VARIANT = "wordpress"
+
+# Upstream URLs accepted for the reverse-proxy variant (no whitespace or ";")
+_PROXY_PASS_RE = re.compile(r"^https?://[A-Za-z0-9.\-]+(:\d{1,5})?(/[A-Za-z0-9._~/\-]*)?$")
+
+_VARIANT_RE = re.compile(r"^# Variant: (\S+)$", re.MULTILINE)
+
+# Templates are compiled once and cached by the environment (never reloaded)
+_template_environment = Environment(
+    loader=DictLoader(NGINX_TEMPLATES),
+    undefined=StrictUndefined,
+    keep_trailing_newline=True,
+    auto_reload=False,
+    cache_size=-1,
+)
+
+
+def deployed_variant(content: str) -> Optional[str]:
+    """Variant recorded in a generated configuration (None if not generated by the portal)."""
+    match = _VARIANT_RE.search(content)
+    if match and match.group(1) in NGINX_VARIANTS:
+        return match.group(1)
+    return None
+
+
+def php_upstream(php_version: str) -> str:
+    """FastCGI upstream (host:port) serving a PHP version."""
+    return settings.nginx_php_upstreams.get(php_version, settings.nginx_default_php_upstream)
+
+
+@dataclass
+class SiteConfig:
+    """Parameters of one generated site configuration.
+
+    Attributes:
+        site_name: Site identifier (config filename without .conf)
+        domain: Site domain
+        php_version: PHP version
+        variant: Template variant (None keeps the deployed variant, or the default)
+        proxy_pass: Upstream URL (reverse-proxy variant only)
+    """
+
+    site_name: str
+    domain: str
+    php_version: str
+    variant: Optional[str] = None
+    proxy_pass: Optional[str] = None
+
+    @property
+    def filename(self) -> str:
+        """Configuration filename."""
+        return f"{self.site_name}.conf"
+
+
+@dataclass
+class RegenerateResult:
+    """Result of regenerating site configurations.
+
+    Attributes:
+        changed: Filenames whose rendered content differs from the deployed file
+        unchanged: Filenames already up to date (skipped)
+        failed: Error per filename that could not be rendered (skipped)
+        diffs: Unified diff per changed filename
+        reloaded: Whether nginx was reloaded (never in dry runs)
+    """
+
+    changed: List[str] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    failed: Dict[str, str] = field(default_factory=dict)
+    diffs: Dict[str, str] = field(default_factory=dict)
+    reloaded: bool = False
+
+
+# Nginx config directory inside the nginx container
+CONTAINER_CONFIG_DIR = "/etc/nginx/conf.d"
+
+
+@dataclass
+class NginxApplyResult:
+    """Result of an applied configuration transaction.
+
+    Attributes:
+        written: Filenames written
+        deleted: Filenames deleted
+        reloaded: Whether nginx was reloaded
+    """
+
+    written: List[str] = field(default_factory=list)
+    deleted: List[str] = field(default_factory=list)
+    reloaded: bool = False
+
+
+class NginxConfigTransaction:
+    """A set of config writes and deletes applied with one test and one reload.
+
+    Changes are only staged in memory until `apply()`: all writes go into
+    the container in one archive upload and all deletes in one exec, then
+    `nginx -t` runs once. If the test (or the reload) fails, every touched
+    file is restored to its previous content and the error is raised, so
+    the whole set is applied or none of it.
+
+    Use as `async with service.transaction() as tx: tx.write(...)`; the
+    transaction is applied when the block exits without an exception.
+    """
+
+    def __init__(self, service: NginxConfigService, reload: bool = True):
+        """Initialize transaction.
+
+        Args:
+            service: Nginx config service
+            reload: Reload nginx after a successful test
+        """
+        self.service = service
+        self.reload = reload
+        self._writes: Dict[str, str] = {}
+        self._deletes: Set[str] = set()
+        self.result: Optional[NginxApplyResult] = None
+
+    def write(self, filename: str, content: str) -> None:
+        """Stage a configuration write (replacing the file if it exists)."""
+        _check_filename(filename)
+        self._deletes.discard(filename)
+        self._writes[filename] = content
+
+    def delete(self, filename: str) -> None:
+        """Stage a configuration delete (missing files are ignored)."""
+        _check_filename(filename)
+        self._writes.pop(filename, None)
+        self._deletes.add(filename)
+
+    @property
+    def empty(self) -> bool:
+        """Whether no changes are staged."""
+        return not self._writes and not self._deletes
+
+    async def apply(self) -> NginxApplyResult:
+        """Apply all staged changes, test once and reload once.
+
+        Returns:
+            NginxApplyResult
+
+        Raises:
+            ValueError: If the configuration test or reload fails (changes rolled back)
+            IOError: If the files cannot be written
+        """
+        if self.result is not None:
+            return self.result
+        if self.empty:
+            self.result = NginxApplyResult()
+            return self.result
+
+        self.result = await self.service._apply(dict(self._writes), set(self._deletes), self.reload)
+        return self.result
+
+    async def __aenter__(self) -> NginxConfigTransaction:
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            await self.apply()
+
+
+def _check_filename(filename: str) -> None:
+    """Reject names that are not plain files in the config directory."""
+    if not filename or "/" in filename or filename in (".", ".."):
+        raise ValueError(f"Invalid nginx config filename: {filename!r}")
 
 
 class NginxConfigService:
@@ -95,6 +343,130 @@ class NginxConfigService:
         """
         self.config_dir = Path(config_dir or settings.nginx_config_dir)
         self.nginx_container = nginx_container or settings.nginx_container_name
+        self._lock: asyncio.Lock | None = None
+        self._lock_loop: asyncio.AbstractEventLoop | None = None
+
+    def _transaction_lock(self) -> asyncio.Lock:
+        """Lock serializing transactions, bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._lock is None or self._lock_loop is not loop:
+            self._lock = asyncio.Lock()
+            self._lock_loop = loop
+        return self._lock
+
+    def transaction(self, reload: bool = True) -> NginxConfigTransaction:
+        """Start a configuration transaction.
+
+        Args:
+            reload: Reload nginx after a successful test
+
+        Returns:
+            NginxConfigTransaction
+        """
+        return NginxConfigTransaction(self, reload=reload)
+
+    async def _remove_files(self, filenames: List[str]) -> None:
+        """Delete config files with one exec."""
+        if not filenames:
+            return
+        result = await self._exec(["rm", "-f", *(f"{CONTAINER_CONFIG_DIR}/{name}" for name in filenames)])
+        if result.exit_code != 0:
+            raise IOError(f"Docker exec delete failed: {result.stderr}")
+
+    async def _apply(self, writes: Dict[str, str], deletes: Set[str], reload: bool) -> NginxApplyResult:
+        """Apply changes in a task that runs to completion even if the caller is cancelled.
+
+        Once files are staged, stopping before the test (or the rollback)
+        would leave untested configuration behind for the next reload.
+        """
+        async def locked() -> NginxApplyResult:
+            async with self._transaction_lock():
+                return await self._apply_changes(writes, deletes, reload)
+
+        task = asyncio.ensure_future(locked())
+
+        def finished(done: asyncio.Task) -> None:
+            if not done.cancelled() and done.exception() is not None:
+                logger.debug(f"Nginx transaction finished with error: {done.exception()}")
+
+        # Retrieve the outcome even when nobody awaits it any more
+        task.add_done_callback(finished)
+        return await asyncio.shield(task)
+
+    async def _apply_changes(self, writes: Dict[str, str], deletes: Set[str], reload: bool) -> NginxApplyResult:
+        """Stage, test and reload; restore the previous files on failure."""
+        client = get_docker_client()
+        try:
+            previous = await client.get_files(self.nginx_container, CONTAINER_CONFIG_DIR)
+        except Exception as e:
+            raise IOError(f"Failed to read current Nginx configuration: {e}")
+
+        touched = set(writes) | deletes
+        to_delete = sorted(name for name in deletes if name in previous)
+        # Only rewrite files whose content changes
+        to_write = {name: content for name, content in writes.items() if previous.get(name) != content}
+
+        async def rollback() -> None:
+            restore = {name: previous[name] for name in touched if name in previous}
+            created = [name for name in touched if name not in previous]
+            try:
+                if restore:
+                    await client.put_files(self.nginx_container, CONTAINER_CONFIG_DIR, restore)
+                await self._remove_files(created)
+                logger.info(f"Nginx configuration rolled back ({len(touched)} files)")
+            except Exception as e:
+                logger.error(f"Nginx configuration rollback failed: {e}")
+
+        try:
+            if to_write:
+                await client.put_files(self.nginx_container, CONTAINER_CONFIG_DIR, to_write)
+            await self._remove_files(to_delete)
+        except asyncio.CancelledError:
+            await rollback()
+            raise
+        except Exception as e:
+            await rollback()
+            raise IOError(f"Failed to stage Nginx configuration: {e}")
+
+        result = NginxApplyResult(written=sorted(to_write), deleted=to_delete)
+        if not to_write and not to_delete:
+            logger.info("Nginx configuration unchanged, skipping test and reload")
+            return result
+
+        try:
+            test = await self._exec(["nginx", "-t"])
+            if test.exit_code != 0:
+                await rollback()
+                raise ValueError(f"Nginx configuration test failed, changes rolled back: {test.stderr.strip()}")
+
+            if reload:
+                if not await self.reload():
+                    await rollback()
+                    raise ValueError("Nginx reload failed, changes rolled back")
+                result.reloaded = True
+        except asyncio.CancelledError:
+            await rollback()
+            raise
+
+        logger.info(
+            f"Nginx configuration applied: {len(result.written)} written, "
+            f"{len(result.deleted)} deleted, reloaded={result.reloaded}"
+        )
+        return result
+
+    async def _exec(self, cmd: list[str], timeout: float = 10) -> ExecResult:
+        """Run a command in the nginx container.
+
+        Args:
+            cmd: Command and arguments
+            timeout: Timeout in seconds
+
+        Returns:
+            Exec result
+        """
+        return await get_exec_limits().run(
+            TARGET_DOCKER, get_docker_client().exec(self.nginx_container, cmd, timeout=timeout), timeout=timeout
+        )
 
     def generate_wordpress_config(
         self,
@@ -103,30 +475,111 @@ class NginxConfigService:
         php_version: str,
         www_redirect: bool = False,
         max_upload_size: str = "64M",
+        variant: str = DEFAULT_VARIANT,
+        proxy_pass: str | None = None,
+        cache_valid: str = "10m",
     ) -> str:
         """Generate Nginx configuration for a WordPress site.
 
         Args:
             site_name: Site identifier (e.g., kuma8088-main)
             domain: Site domain (e.g., kuma8088.com)
-            php_version: PHP version (e.g., 8.1)
+            php_version: PHP version (e.g., 8.1), selects the FastCGI upstream
             www_redirect: Include www.domain in server_name
             max_upload_size: Maximum upload size (e.g., 64M)
+            variant: Template variant (see NGINX_VARIANTS)
+            proxy_pass: Upstream URL (required for the reverse-proxy variant)
+            cache_valid: Page cache lifetime (FastCGI cache variant)
 
         Returns:
             Generated Nginx configuration string
+
+        Raises:
+            ValueError: If the variant is unknown or its parameters are missing or invalid
         """
-        template = Template(NGINX_WORDPRESS_TEMPLATE)
+        if variant not in NGINX_VARIANTS:
+            raise ValueError(f"Unknown nginx variant: {variant} (available: {', '.join(NGINX_VARIANTS)})")
+        if variant == "reverse-proxy" and not proxy_pass:
+            raise ValueError("The reverse-proxy variant requires proxy_pass")
+        if proxy_pass and not _PROXY_PASS_RE.match(proxy_pass):
+            raise ValueError(f"Invalid proxy_pass upstream URL: {proxy_pass}")
+
+        template = _template_environment.get_template(f"{variant}.conf.j2")
         return template.render(
             site_name=site_name,
             domain=domain,
             php_version=php_version,
+            php_upstream=php_upstream(php_version),
+            variant=variant,
             www_redirect=www_redirect,
             max_upload_size=max_upload_size,
+            proxy_pass=proxy_pass,
+            cache_valid=cache_valid,
         )
 
-    def write_config(self, filename: str, content: str) -> Path:
-        """Write Nginx configuration to file using docker exec.
+    async def regenerate_site_configs(self, sites: List[SiteConfig], dry_run: bool = False) -> RegenerateResult:
+        """Render configurations of many sites and apply only the changed ones.
+
+        The deployed files are read once and compared with the rendered
+        output; unchanged sites are skipped and all changed ones are applied
+        in a single transaction (one `nginx -t`, one reload). A site that
+        cannot be rendered is reported in `failed` and left as deployed.
+
+        Args:
+            sites: Sites to render
+            dry_run: Only report changes and diffs
+
+        Returns:
+            RegenerateResult
+
+        Raises:
+            IOError: If the deployed configuration cannot be read or written
+            ValueError: If nginx rejects the result (rolled back)
+        """
+        try:
+            deployed = await get_docker_client().get_files(self.nginx_container, CONTAINER_CONFIG_DIR)
+        except Exception as e:
+            raise IOError(f"Failed to read current Nginx configuration: {e}")
+
+        result = RegenerateResult()
+        rendered: Dict[str, str] = {}
+        for site in sites:
+            current = deployed.get(site.filename)
+            variant = site.variant or (deployed_variant(current) if current else None) or DEFAULT_VARIANT
+            try:
+                content = self.generate_wordpress_config(
+                    site.site_name, site.domain, site.php_version, variant=variant, proxy_pass=site.proxy_pass
+                )
+            except ValueError as e:
+                logger.warning(f"Skipping nginx config {site.filename}: {e}")
+                result.failed[site.filename] = str(e)
+                continue
+            if content == current:
+                result.unchanged.append(site.filename)
+                continue
+            result.changed.append(site.filename)
+            rendered[site.filename] = content
+            result.diffs[site.filename] = "".join(difflib.unified_diff(
+                (current or "").splitlines(keepends=True),
+                content.splitlines(keepends=True),
+                fromfile=f"a/{site.filename}",
+                tofile=f"b/{site.filename}",
+            ))
+
+        if rendered and not dry_run:
+            async with self.transaction() as tx:
+                for filename, content in rendered.items():
+                    tx.write(filename, content)
+            result.reloaded = tx.result.reloaded
+
+        logger.info(
+            f"Nginx configs regenerated: {len(result.changed)} changed, "
+            f"{len(result.unchanged)} unchanged, {len(result.failed)} failed (dry_run={dry_run})"
+        )
+        return result
+
+    async def write_config(self, filename: str, content: str) -> Path:
+        """Write Nginx configuration to file via the Docker archive API.
 
         Args:
             filename: Configuration filename (e.g., kuma8088-main.conf)
@@ -137,35 +590,22 @@ class NginxConfigService:
         """
         config_path = self.config_dir / filename
 
-        # Write config using docker exec to bypass read-only mount
+        # Write config inside the nginx container to bypass read-only mount
         # Host path: /opt/onprem-infra-system/project-root-infra/services/blog/config/nginx/conf.d/
         # Container path: /etc/nginx/conf.d/
         container_path = f"/etc/nginx/conf.d/{filename}"
 
         try:
-            # Use docker exec with tee to write file inside nginx container
-            result = subprocess.run(
-                ["docker", "exec", "-i", self.nginx_container, "tee", container_path],
-                input=content,
-                text=True,
-                capture_output=True,
-                timeout=10,
-            )
-
-            if result.returncode != 0:
-                raise IOError(f"Docker exec failed: {result.stderr}")
-
-            logger.info(f"Nginx configuration written via docker exec: {container_path}")
+            await get_docker_client().put_file(self.nginx_container, container_path, content)
+
+            logger.info(f"Nginx configuration written via Docker API: {container_path}")
             return config_path
-        except subprocess.TimeoutExpired:
-            logger.error(f"Timeout writing Nginx config")
-            raise IOError(f"Timeout writing Nginx configuration")
         except Exception as e:
             logger.error(f"Failed to write Nginx config: {e}")
             raise IOError(f"Failed to write Nginx configuration: {e}")
 
-    def delete_config(self, filename: str) -> None:
-        """Delete Nginx configuration file using docker exec.
+    async def delete_config(self, filename: str) -> None:
+        """Delete Nginx configuration file via the Docker exec API.
 
         Args:
             filename: Configuration filename
@@ -173,26 +613,18 @@ class NginxConfigService:
         container_path = f"/etc/nginx/conf.d/{filename}"
 
         try:
-            # Use docker exec to delete file inside nginx container
-            result = subprocess.run(
-                ["docker", "exec", self.nginx_container, "rm", "-f", container_path],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-
-            if result.returncode != 0 and "No such file" not in result.stderr:
+            # Delete file inside nginx container
+            result = await self._exec(["rm", "-f", container_path])
+
+            if result.exit_code != 0 and "No such file" not in result.stderr:
                 raise IOError(f"Docker exec delete failed: {result.stderr}")
 
-            logger.info(f"Nginx configuration deleted via docker exec: {container_path}")
-        except subprocess.TimeoutExpired:
-            logger.error(f"Timeout deleting Nginx config")
-            raise IOError(f"Timeout deleting Nginx configuration")
+            logger.info(f"Nginx configuration deleted via Docker API: {container_path}")
         except Exception as e:
             logger.error(f"Failed to delete Nginx config: {e}")
             raise IOError(f"Failed to delete Nginx configuration: {e}")
 
-    def test_config(self) -> bool:
+    async def test_config(self) -> bool:
         """Test Nginx configuration validity.
 
         Returns:
@@ -200,27 +632,19 @@ class NginxConfigService:
         """
         try:
             # Execute nginx -t inside the nginx container
-            result = subprocess.run(
-                ["docker", "exec", self.nginx_container, "nginx", "-t"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-
-            if result.returncode == 0:
+            result = await self._exec(["nginx", "-t"])
+
+            if result.exit_code == 0:
                 logger.info("Nginx configuration test successful")
                 return True
             else:
                 logger.error(f"Nginx configuration test failed: {result.stderr}")
                 return False
-        except subprocess.TimeoutExpired:
-            logger.error("Nginx configuration test timed out")
-            return False
         except Exception as e:
             logger.error(f"Nginx configuration test error: {e}")
             return False
 
-    def reload(self) -> bool:
+    async def reload(self) -> bool:
         """Reload Nginx configuration.
 
         Returns:
@@ -228,39 +652,33 @@ class NginxConfigService:
         """
         try:
             # Execute nginx -s reload inside the nginx container
-            result = subprocess.run(
-                ["docker", "exec", self.nginx_container, "nginx", "-s", "reload"],
-                capture_output=True,
-                text=True,
-                timeout=10,
-            )
-
-            if result.returncode == 0:
+            result = await self._exec(["nginx", "-s", "reload"])
+
+            if result.exit_code == 0:
                 logger.info("Nginx reloaded successfully")
                 return True
             else:
                 logger.error(f"Nginx reload failed: {result.stderr}")
                 return False
-        except subprocess.TimeoutExpired:
-            logger.error("Nginx reload timed out")
-            return False
         except Exception as e:
             logger.error(f"Nginx reload error: {e}")
             return False
 
-    def create_wordpress_site_config(
+    async def create_wordpress_site_config(
         self,
         site_name: str,
         domain: str,
         php_version: str,
+        reload: bool = False,
         **kwargs: Any,
     ) -> Path:
-        """Create and deploy WordPress site Nginx configuration.
+        """Create (or replace) and deploy WordPress site Nginx configuration.
 
         Args:
             site_name: Site identifier
             domain: Site domain
             php_version: PHP version
+            reload: Also reload nginx after a successful test
             **kwargs: Additional template variables
 
         Returns:
@@ -268,22 +686,13 @@ class NginxConfigService:
 
         Raises:
             IOError: If configuration write fails
-            ValueError: If configuration test fails
+            ValueError: If configuration test fails (changes rolled back)
         """
-        # Generate configuration
-        config = self.generate_wordpress_config(site_name, domain, php_version, **kwargs)
-
-        # Write configuration
         filename = f"{site_name}.conf"
-        config_path = self.write_config(filename, config)
-
-        # Test configuration
-        if not self.test_config():
-            # Rollback on test failure
-            self.delete_config(filename)
-            raise ValueError("Nginx configuration test failed, changes rolled back")
+        async with self.transaction(reload=reload) as tx:
+            tx.write(filename, self.generate_wordpress_config(site_name, domain, php_version, **kwargs))
 
-        return config_path
+        return self.config_dir / filename
 
 
 # Singleton instance
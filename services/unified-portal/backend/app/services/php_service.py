@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import logging
-import subprocess
 from pathlib import Path
 from typing import Any, Dict, List
 
@@ -10,6 +9,8 @@ from sqlalchemy.orm import Session
 
 from app.models.wordpress_site import WordPressSite
 from app.schemas.php import PhpVersionResponse
+from app.services.async_exec import TARGET_DOCKER, get_exec_limits
+from app.services.docker_client import DockerNotFoundError, get_docker_client
 
 logger = logging.getLogger(__name__)
 
@@ -32,7 +33,7 @@ class PhpService:
         self.docker_compose_bin = docker_compose_path
         self.available_versions = ["7.4", "8.0", "8.1", "8.2"]
 
-    def list_versions(self) -> List[PhpVersionResponse]:
+    async def list_versions(self) -> List[PhpVersionResponse]:
         """List PHP versions.
 
         Returns:
@@ -45,7 +46,7 @@ class PhpService:
             sites_count = self.db.query(WordPressSite).filter(WordPressSite.php_version == version).count()
 
             # Check Docker container status
-            container_status = self._get_container_status(version)
+            container_status = await self._get_container_status(version)
 
             versions.append(
                 PhpVersionResponse(
@@ -116,7 +117,7 @@ class PhpService:
             logger.error(f"Failed to remove PHP version: {e}")
             raise ValueError(f"Failed to remove PHP version: {e}")
 
-    def get_config(self, version: str) -> Dict[str, Any]:
+    async def get_config(self, version: str) -> Dict[str, Any]:
         """Get PHP configuration.
 
         Args:
@@ -128,27 +129,18 @@ class PhpService:
         Raises:
             ValueError: If version not found
         """
-        container_status = self._get_container_status(version)
+        container_status = await self._get_container_status(version)
 
         if container_status == "not_found":
             raise ValueError(f"PHP {version} container not found")
 
         try:
-            # Get php.ini contents via docker exec
-            result = subprocess.run(
-                [
-                    "docker",
-                    "exec",
-                    f"php-{version}",
-                    "php",
-                    "-i",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=10,
+            # Get php.ini contents via Docker exec API
+            result = await get_exec_limits().run(
+                TARGET_DOCKER, get_docker_client().exec(f"php-{version}", ["php", "-i"], timeout=10), timeout=10
             )
 
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 raise ValueError(f"Failed to get PHP info: {result.stderr}")
 
             # Parse phpinfo output
@@ -159,14 +151,11 @@ class PhpService:
                 "ini_file_path": f"/usr/local/etc/php/php.ini",
             }
 
-        except subprocess.TimeoutExpired:
-            logger.error("PHP config query timed out")
-            raise ValueError("PHP config query timed out")
         except Exception as e:
             logger.error(f"Failed to get PHP config: {e}")
             raise ValueError(f"Failed to get PHP config: {e}")
 
-    def update_config(self, version: str, settings: Dict[str, str]) -> bool:
+    async def update_config(self, version: str, settings: Dict[str, str]) -> bool:
         """Update PHP configuration.
 
         Args:
@@ -179,7 +168,7 @@ class PhpService:
         Raises:
             ValueError: If update fails
         """
-        container_status = self._get_container_status(version)
+        container_status = await self._get_container_status(version)
 
         if container_status == "not_found":
             raise ValueError(f"PHP {version} container not found")
@@ -195,7 +184,7 @@ class PhpService:
             logger.error(f"Failed to update PHP config: {e}")
             raise ValueError(f"Failed to update PHP config: {e}")
 
-    def _get_container_status(self, version: str) -> str:
+    async def _get_container_status(self, version: str) -> str:
         """Get Docker container status for PHP version.
 
         Args:
@@ -205,27 +194,12 @@ class PhpService:
             Container status (running, stopped, not_found)
         """
         try:
-            result = subprocess.run(
-                [
-                    "docker",
-                    "inspect",
-                    "--format={{.State.Status}}",
-                    f"php-{version}",
-                ],
-                capture_output=True,
-                text=True,
-                timeout=5,
-            )
-
-            if result.returncode == 0:
-                status = result.stdout.strip()
-                return "running" if status == "running" else "stopped"
-            else:
-                return "not_found"
+            container = await get_docker_client().inspect_container(f"php-{version}")
+            status = container["State"]["Status"]
+            return "running" if status == "running" else "stopped"
 
-        except subprocess.TimeoutExpired:
-            logger.warning(f"Container status check timed out for PHP {version}")
-            return "unknown"
+        except DockerNotFoundError:
+            return "not_found"
         except Exception as e:
             logger.warning(f"Failed to check container status: {e}")
             return "unknown"
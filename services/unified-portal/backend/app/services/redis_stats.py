@@ -0,0 +1,177 @@
+"""Blog Redis statistics over a pooled native Redis connection."""
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Any, Dict, List
+
+import redis.asyncio as aioredis
+
+from app.config import get_settings
+from app.services.async_exec import discard_loop_client
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# INFO sections needed for the dashboard (avoids the full INFO payload)
+INFO_SECTIONS = ("server", "clients", "memory", "stats", "keyspace")
+
+
+def summarize_redis_stats(
+    info: Dict[str, Any],
+    maxmemory: int,
+    slowlog: List[Dict[str, Any]],
+    slowlog_len: int,
+    latency: List[List[Any]],
+) -> Dict[str, Any]:
+    """Build dashboard Redis stats from raw Redis replies.
+
+    Args:
+        info: Merged parsed INFO sections
+        maxmemory: `maxmemory` setting in bytes (0 means no limit)
+        slowlog: SLOWLOG GET entries
+        slowlog_len: SLOWLOG LEN reply
+        latency: LATENCY LATEST reply
+
+    Returns:
+        Dictionary of Redis statistics
+    """
+    memory_used = int(info.get("used_memory", 0))
+    # Without maxmemory Redis may grow up to the host memory
+    memory_total = maxmemory or int(info.get("total_system_memory", 0))
+
+    keyspace = {}
+    for key, value in info.items():
+        if key.startswith("db") and key[2:].isdigit() and isinstance(value, dict):
+            keyspace[key] = {
+                "keys": int(value.get("keys", 0)),
+                "expires": int(value.get("expires", 0)),
+                "avg_ttl": int(value.get("avg_ttl", 0)),
+            }
+
+    keyspace_hits = int(info.get("keyspace_hits", 0))
+    keyspace_misses = int(info.get("keyspace_misses", 0))
+    total_requests = keyspace_hits + keyspace_misses
+
+    return {
+        "memory_used_mb": round(memory_used / (1024 * 1024), 2),
+        "memory_total_mb": round(memory_total / (1024 * 1024), 2),
+        "memory_percent": round(memory_used / memory_total * 100, 2) if memory_total else 0.0,
+        "total_keys": sum(db["keys"] for db in keyspace.values()),
+        "commands_processed": int(info.get("total_commands_processed", 0)),
+        "cache_hit_rate": round(keyspace_hits / total_requests * 100, 2) if total_requests else 0.0,
+        "connected_clients": int(info.get("connected_clients", 0)),
+        "uptime_days": int(info.get("uptime_in_seconds", 0)) // 86400,
+        "maxmemory_policy": str(info.get("maxmemory_policy", "")),
+        "evicted_keys": int(info.get("evicted_keys", 0)),
+        "expired_keys": int(info.get("expired_keys", 0)),
+        "keyspace": keyspace,
+        "latency_events": [
+            {"event": str(event), "timestamp": int(timestamp), "latest_ms": int(latest_ms), "max_ms": int(max_ms)}
+            for event, timestamp, latest_ms, max_ms in latency
+        ],
+        "slowlog_len": int(slowlog_len),
+        "slowlog": [
+            {
+                "id": int(entry.get("id", 0)),
+                "timestamp": int(entry.get("start_time", 0)),
+                "duration_us": int(entry.get("duration", 0)),
+                "command": str(entry.get("command", "")),
+            }
+            for entry in slowlog
+        ],
+    }
+
+
+class RedisStatsClient:
+    """Collects blog Redis statistics over a small connection pool.
+
+    All commands of one collection are sent in a single pipeline round trip.
+    """
+
+    def __init__(self, url: str | None = None, max_connections: int = 4, timeout: float = 2.0):
+        """Initialize Redis stats client.
+
+        Args:
+            url: Redis URL (defaults to settings.blog_redis_url)
+            max_connections: Connection pool size
+            timeout: Socket timeout in seconds
+        """
+        self.url = url or settings.blog_redis_url
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self._client: aioredis.Redis | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+
+    @property
+    def client(self) -> aioredis.Redis:
+        """Pooled Redis client bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._client is None or self._loop is not loop:
+            discard_loop_client(self._client, self._loop)
+            self._client = aioredis.Redis.from_url(
+                self.url,
+                max_connections=self.max_connections,
+                socket_timeout=self.timeout,
+                socket_connect_timeout=self.timeout,
+                decode_responses=True,
+            )
+            self._loop = loop
+        return self._client
+
+    async def close(self) -> None:
+        """Close pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+        self._client = None
+        self._loop = None
+
+    async def collect(self, slowlog_entries: int = 10) -> Dict[str, Any]:
+        """Collect Redis statistics.
+
+        Args:
+            slowlog_entries: Number of most recent slowlog entries to return
+
+        Returns:
+            Dictionary of Redis statistics (see summarize_redis_stats)
+
+        Raises:
+            redis.exceptions.RedisError: If Redis is unreachable
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for section in INFO_SECTIONS:
+            pipe.info(section)
+        pipe.config_get("maxmemory")
+        pipe.slowlog_get(slowlog_entries)
+        pipe.slowlog_len()
+        pipe.execute_command("LATENCY", "LATEST")
+        results = await pipe.execute()
+
+        info: Dict[str, Any] = {}
+        for section_info in results[:len(INFO_SECTIONS)]:
+            info.update(section_info)
+        config, slowlog, slowlog_len, latency = results[len(INFO_SECTIONS):]
+
+        return summarize_redis_stats(
+            info,
+            int(config.get("maxmemory", 0)),
+            slowlog,
+            slowlog_len,
+            latency or [],
+        )
+
+
+# Singleton instance
+_redis_stats_client: RedisStatsClient | None = None
+
+
+def get_redis_stats_client() -> RedisStatsClient:
+    """Get Redis stats client singleton.
+
+    Returns:
+        RedisStatsClient instance
+    """
+    global _redis_stats_client
+    if _redis_stats_client is None:
+        _redis_stats_client = RedisStatsClient()
+    return _redis_stats_client
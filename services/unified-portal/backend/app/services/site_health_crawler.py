@@ -0,0 +1,175 @@
+"""Background health and metadata crawler for WordPress sites."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from app.services.site_registry import SiteRecord
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SiteHealth:
+    """Last known health and metadata of a WordPress site.
+
+    Attributes:
+        name: Site directory name
+        url: Public site URL
+        status: "online", "degraded" (HTTP failing), "offline" or "unknown" (not checked yet)
+        wp_version: WordPress core version
+        php_version: PHP version used by wp-cli
+        theme: Active theme
+        plugins: Installed plugins (name, status, version, update_available)
+        redis_connected: Whether Redis Object Cache is connected
+        http_status: HTTP status code of the site URL (None if unreachable)
+        error: Error of the last check, if any
+        last_checked: Unix time of the last check (0 if never checked)
+    """
+
+    name: str
+    url: str
+    status: str = "unknown"
+    wp_version: str = ""
+    php_version: str = ""
+    theme: str = ""
+    plugins: List[Dict[str, Any]] = field(default_factory=list)
+    redis_connected: bool = False
+    http_status: Optional[int] = None
+    error: Optional[str] = None
+    last_checked: float = 0.0
+
+    @property
+    def plugin_updates(self) -> int:
+        """Number of plugins with an available update."""
+        return sum(1 for plugin in self.plugins if plugin.get("update_available"))
+
+
+class SiteHealthCrawler:
+    """Periodically checks all sites and caches the results.
+
+    Checks run with bounded concurrency so a crawl does not monopolise the
+    wp-cli workers. Endpoints read the cache and never wait for a check;
+    entries older than `ttl` are reported as "unknown".
+    """
+
+    def __init__(
+        self,
+        sites: Callable[[], List[SiteRecord]],
+        check: Callable[[SiteRecord], Awaitable[SiteHealth]],
+        interval: float = 300.0,
+        ttl: float = 900.0,
+        concurrency: int = 4,
+    ):
+        """Initialize site health crawler.
+
+        Args:
+            sites: Callable returning the sites to check
+            check: Coroutine function checking one site
+            interval: Seconds between crawls
+            ttl: Seconds after which a cached result is no longer trusted
+            concurrency: Maximum number of sites checked at once
+        """
+        self.sites = sites
+        self.check = check
+        self.interval = interval
+        self.ttl = ttl
+        self.concurrency = concurrency
+        self._cache: Dict[str, SiteHealth] = {}
+        self._task: asyncio.Task | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether the background crawl task is active."""
+        return self._task is not None and not self._task.done()
+
+    def get(self, site: SiteRecord) -> SiteHealth:
+        """Get the cached health of a site.
+
+        Args:
+            site: Site
+
+        Returns:
+            Cached SiteHealth, or an "unknown" entry if missing or expired
+        """
+        health = self._cache.get(site.name)
+        if health is None:
+            return SiteHealth(name=site.name, url=site.url)
+        if time.time() - health.last_checked > self.ttl:
+            return SiteHealth(
+                name=health.name,
+                url=health.url,
+                error="Health check expired",
+                last_checked=health.last_checked,
+            )
+        return health
+
+    def all(self) -> List[SiteHealth]:
+        """Get the cached health of all sites, in site order."""
+        return [self.get(site) for site in self.sites()]
+
+    async def _check_one(self, site: SiteRecord, semaphore: asyncio.Semaphore) -> SiteHealth:
+        """Check a site and store the result."""
+        async with semaphore:
+            try:
+                health = await self.check(site)
+            except Exception as e:
+                logger.warning(f"Health check failed for {site.name}: {e}")
+                health = SiteHealth(name=site.name, url=site.url, status="offline", error=str(e))
+        health.last_checked = time.time()
+        self._cache[site.name] = health
+        return health
+
+    async def refresh(self, names: Optional[List[str]] = None) -> List[SiteHealth]:
+        """Check sites now.
+
+        Args:
+            names: Site names to check (all sites if None)
+
+        Returns:
+            Fresh results of the checked sites
+        """
+        sites = [site for site in self.sites() if names is None or site.name in names]
+        semaphore = asyncio.Semaphore(self.concurrency)
+        results = await asyncio.gather(*(self._check_one(site, semaphore) for site in sites))
+
+        # Drop sites that no longer exist
+        current = {site.name for site in self.sites()}
+        for name in list(self._cache):
+            if name not in current:
+                del self._cache[name]
+
+        return list(results)
+
+    async def _run(self) -> None:
+        """Background crawl loop."""
+        while True:
+            started = time.monotonic()
+            try:
+                await self.refresh()
+                logger.info(f"Site health crawl finished in {time.monotonic() - started:.1f}s")
+            except Exception as e:
+                logger.error(f"Site health crawl failed: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """Start the background crawl task."""
+        if self.running:
+            return
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"Site health crawler started (interval: {self.interval}s)")
+
+    async def stop(self) -> None:
+        """Stop the background crawl task."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Site health crawler stopped")
@@ -0,0 +1,401 @@
+"""Indexed registry of all WordPress sites (existing, nginx-configured and managed)."""
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from app.config import get_settings
+from app.services.async_exec import run_blocking
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# Document root of all sites inside the WordPress and nginx containers
+SITES_ROOT = "/var/www/html/"
+
+# Existing sites (Phase A-1/A-2) that predate the portal database.
+# URLs updated to Phase A-2 production domains (2025-11-12)
+# Database naming pattern: wp_{site_name with hyphens converted to underscores}
+SEED_SITES = [
+    # fx-trader-life.com domain (4 sites)
+    {"name": "fx-trader-life", "url": "https://fx-trader-life.com", "database": "wp_fx_trader_life"},
+    {"name": "fx-trader-life-4line", "url": "https://4line.fx-trader-life.com", "database": "wp_fx_trader_life_4line"},
+    {"name": "fx-trader-life-lp", "url": "https://lp.fx-trader-life.com", "database": "wp_fx_trader_life_lp"},
+    {"name": "fx-trader-life-mfkc", "url": "https://mfkc.fx-trader-life.com", "database": "wp_fx_trader_life_mfkc"},
+
+    # webmakeprofit.org domain (2 sites)
+    {"name": "webmakeprofit", "url": "https://webmakeprofit.org", "database": "wp_webmakeprofit"},
+    {"name": "webmakeprofit-coconala", "url": "https://coconala.webmakeprofit.org", "database": "wp_webmakeprofit_coconala"},
+
+    # webmakesprofit.com domain (1 site)
+    {"name": "webmakesprofit", "url": "https://webmakesprofit.com", "database": "wp_webmakesprofit"},
+
+    # toyota-phv.jp domain (1 site)
+    {"name": "toyota-phv", "url": "https://toyota-phv.jp", "database": "wp_toyota_phv"},
+
+    # kuma8088.com domain (9 sites)
+    # Note: kuma8088 root site has no WordPress database
+    {"name": "kuma8088", "url": "https://kuma8088.com", "database": None},
+    {"name": "kuma8088-cameramanual", "url": "https://camera.kuma8088.com", "database": "wp_kuma8088_cameramanual"},
+    # Legacy site sharing the cameramanual database
+    {"name": "kuma8088-cameramanual-gwpbk492", "url": "https://gwpbk492.kuma8088.com", "database": "wp_kuma8088_cameramanual"},
+    {"name": "kuma8088-elementordemo1", "url": "https://demo1.kuma8088.com", "database": "wp_kuma8088_elementordemo1"},
+    {"name": "kuma8088-elementordemo02", "url": "https://demo2.kuma8088.com", "database": "wp_kuma8088_elementordemo02"},
+    {"name": "kuma8088-elementor-demo-03", "url": "https://demo3.kuma8088.com", "database": "wp_kuma8088_elementordemo03"},
+    {"name": "kuma8088-elementor-demo-04", "url": "https://demo4.kuma8088.com", "database": "wp_kuma8088_elementordemo04"},
+    {"name": "kuma8088-ec02test", "url": "https://ec-test.kuma8088.com", "database": "wp_kuma8088_ec02"},
+    {"name": "kuma8088-test", "url": "https://test.kuma8088.com", "database": "wp_kuma8088_test"},
+]
+
+_DIRECTIVE_RE = re.compile(r"^\s*(server_name|root)\s+([^;]+);", re.MULTILINE)
+
+
+@dataclass
+class SiteRecord:
+    """A WordPress site.
+
+    Attributes:
+        name: Site directory name under /var/www/html
+        url: Public site URL
+        database_name: MariaDB database name (None if unknown)
+        php_version: PHP version (managed sites only)
+        enabled: Whether the site is enabled
+        site_id: Portal database ID (managed sites only)
+        nginx_config: Nginx configuration filename serving the site
+        aliases: Additional server names from the nginx configuration
+        container: Container running the site's PHP code
+    """
+
+    name: str
+    url: str
+    database_name: Optional[str] = None
+    php_version: Optional[str] = None
+    enabled: bool = True
+    site_id: Optional[int] = None
+    nginx_config: Optional[str] = None
+    aliases: List[str] = field(default_factory=list)
+    container: str = field(default_factory=lambda: settings.wordpress_container_name)
+
+    @property
+    def domain(self) -> str:
+        """Host name of the public URL."""
+        return (urlsplit(self.url).hostname or "").lower()
+
+    @property
+    def managed(self) -> bool:
+        """Whether the site is managed through the portal database."""
+        return self.site_id is not None
+
+
+def parse_nginx_sites(text: str) -> List[Tuple[str, List[str]]]:
+    """Find WordPress document roots served by an nginx configuration.
+
+    Args:
+        text: Configuration content
+
+    Returns:
+        (site directory name, server names) per server block with a site root
+    """
+    sites: List[Tuple[str, List[str]]] = []
+    seen = set()
+    server_names: List[str] = []
+
+    for match in _DIRECTIVE_RE.finditer(text):
+        directive, value = match.group(1), match.group(2).strip()
+        if directive == "server_name":
+            server_names = value.lower().split()
+            continue
+        if not value.startswith(SITES_ROOT):
+            continue
+        site_dir = value[len(SITES_ROOT):].strip("/").split("/")[0]
+        if site_dir and (site_dir, tuple(server_names)) not in seen:
+            seen.add((site_dir, tuple(server_names)))
+            sites.append((site_dir, list(server_names)))
+
+    return sites
+
+
+def load_managed_sites() -> List[tuple]:
+    """Load managed sites from the portal database.
+
+    Returns:
+        (id, site_name, domain, database_name, php_version, enabled) rows
+    """
+    from app.database import SessionLocal
+    from app.models.wordpress_site import WordPressSite
+
+    db = SessionLocal()
+    try:
+        return db.query(
+            WordPressSite.id,
+            WordPressSite.site_name,
+            WordPressSite.domain,
+            WordPressSite.database_name,
+            WordPressSite.php_version,
+            WordPressSite.enabled,
+        ).all()
+    finally:
+        db.close()
+
+
+@dataclass
+class _Snapshot:
+    """Immutable set of indexes built from one load."""
+
+    sites: List[SiteRecord]
+    by_name: Dict[str, SiteRecord]
+    by_domain: Dict[str, SiteRecord]
+    by_database: Dict[str, List[SiteRecord]]
+    loaded_at: float
+    complete: bool  # False if the portal database could not be read
+    generation: int = 0  # Registry generation the snapshot was built for
+
+
+class SiteRegistry:
+    """In-memory registry of all sites with lookups by name, domain and database.
+
+    Sites are merged from three sources, later ones taking precedence: the
+    seed list of existing sites, nginx configurations (document root and
+    server names) and the portal database (managed sites). The merged set is
+    built once and indexed. Writers call `invalidate()`, which rebuilds it on
+    a worker thread while lookups keep serving the previous snapshot; async
+    callers that need the new data `await load()`. If the portal database is
+    unreachable the registry serves the other sources and retries after
+    `retry_seconds`.
+    """
+
+    def __init__(
+        self,
+        seed_sites: List[dict] | None = None,
+        nginx_conf_dir: str | None = None,
+        load_managed: Callable[[], List[tuple]] = load_managed_sites,
+        retry_seconds: float = 60.0,
+    ):
+        """Initialize site registry.
+
+        Args:
+            seed_sites: Existing sites (defaults to SEED_SITES)
+            nginx_conf_dir: Directory of blog nginx site configurations
+                (defaults to settings.blog_nginx_conf_dir)
+            load_managed: Callable returning managed site rows
+            retry_seconds: Seconds before retrying after a database failure
+        """
+        self.seed_sites = SEED_SITES if seed_sites is None else seed_sites
+        self.nginx_conf_dir = nginx_conf_dir if nginx_conf_dir is not None else settings.blog_nginx_conf_dir
+        self.load_managed = load_managed
+        self.retry_seconds = retry_seconds
+        self._snapshot: Optional[_Snapshot] = None
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._reloading: Optional[asyncio.Task] = None
+
+    def _read_nginx_sites(self) -> List[Tuple[str, str, List[str]]]:
+        """Read (config filename, site directory, server names) from nginx configs."""
+        if not self.nginx_conf_dir or not os.path.isdir(self.nginx_conf_dir):
+            return []
+
+        found = []
+        for filename in sorted(os.listdir(self.nginx_conf_dir)):
+            if not filename.endswith(".conf"):
+                continue
+            try:
+                with open(os.path.join(self.nginx_conf_dir, filename), encoding="utf-8", errors="replace") as f:
+                    text = f.read()
+            except OSError as e:
+                logger.warning(f"Cannot read nginx config {filename}: {e}")
+                continue
+            for site_dir, server_names in parse_nginx_sites(text):
+                found.append((filename, site_dir, server_names))
+        return found
+
+    def _build(self) -> _Snapshot:
+        """Merge all sources and build the indexes."""
+        sites: Dict[str, SiteRecord] = {}
+
+        for seed in self.seed_sites:
+            sites[seed["name"]] = SiteRecord(name=seed["name"], url=seed["url"], database_name=seed.get("database"))
+
+        for filename, site_dir, server_names in self._read_nginx_sites():
+            site = sites.get(site_dir)
+            if site is None:
+                if not server_names:
+                    continue
+                site = SiteRecord(name=site_dir, url=f"https://{server_names[0]}")
+                sites[site_dir] = site
+            if site.nginx_config is None:
+                site.nginx_config = filename
+            for server_name in server_names:
+                if server_name != site.domain and server_name not in site.aliases:
+                    site.aliases.append(server_name)
+
+        complete = True
+        try:
+            rows = self.load_managed()
+        except Exception as e:
+            logger.warning(f"Site registry: portal database unavailable, serving seed/nginx sites only: {e}")
+            rows = []
+            complete = False
+
+        for site_id, site_name, domain, database_name, php_version, enabled in rows:
+            site = sites.get(site_name)
+            if site is None:
+                site = SiteRecord(name=site_name, url=f"https://{domain}")
+                sites[site_name] = site
+            elif site.domain != domain.lower():
+                site.url = f"https://{domain}"
+            site.site_id = site_id
+            site.database_name = database_name
+            site.php_version = php_version
+            site.enabled = bool(enabled)
+
+        by_domain: Dict[str, SiteRecord] = {}
+        by_database: Dict[str, List[SiteRecord]] = {}
+        for site in sites.values():
+            for host in [site.domain, *site.aliases]:
+                by_domain.setdefault(host, site)
+            if site.database_name:
+                by_database.setdefault(site.database_name, []).append(site)
+
+        return _Snapshot(
+            sites=list(sites.values()),
+            by_name=sites,
+            by_domain=by_domain,
+            by_database=by_database,
+            loaded_at=time.time(),
+            complete=complete,
+        )
+
+    def _stale(self, snapshot: _Snapshot) -> bool:
+        """Whether a snapshot was invalidated (or is incomplete and due for a retry)."""
+        if snapshot.generation != self._generation:
+            return True
+        return not snapshot.complete and time.time() - snapshot.loaded_at >= self.retry_seconds
+
+    def _reload(self) -> _Snapshot:
+        """Rebuild the snapshot if stale (blocking).
+
+        Rebuilds again if the registry is invalidated while building.
+        """
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is not None and not self._stale(snapshot):
+                return snapshot
+            while True:
+                generation = self._generation
+                snapshot = self._build()
+                snapshot.generation = generation
+                self._snapshot = snapshot
+                logger.info(f"Site registry loaded: {len(snapshot.sites)} sites")
+                if generation == self._generation:
+                    return snapshot
+
+    def _schedule_reload(self) -> Optional[asyncio.Task]:
+        """Start (or share) a background reload on the running event loop.
+
+        Returns:
+            Reload task, or None if this thread has no running event loop
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return None
+        task = self._reloading
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(run_blocking(self._reload))
+            self._reloading = task
+        return task
+
+    def _current(self) -> _Snapshot:
+        """Current snapshot; a stale one is served while it is rebuilt off the event loop."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            # Nothing to serve yet (startup calls load() so this is rare)
+            return self._reload()
+        if self._stale(snapshot) and self._schedule_reload() is None:
+            # Worker thread: rebuilding inline does not block the event loop
+            return self._reload()
+        return snapshot
+
+    def invalidate(self) -> None:
+        """Mark the indexes stale and start reloading all sources.
+
+        Lookups keep returning the previous snapshot until the reload is done.
+        """
+        self._generation += 1
+        self._schedule_reload()
+
+    async def load(self) -> None:
+        """Load the registry on a worker thread (avoids blocking the event loop)."""
+        snapshot = self._snapshot
+        while snapshot is None or snapshot.generation != self._generation:
+            snapshot = await asyncio.shield(self._schedule_reload())
+        if not snapshot.complete and time.time() - snapshot.loaded_at >= self.retry_seconds:
+            await asyncio.shield(self._schedule_reload())
+
+    def all(self, enabled_only: bool = False) -> List[SiteRecord]:
+        """Get all sites.
+
+        Args:
+            enabled_only: Only return enabled sites
+
+        Returns:
+            Sites in registry order (seed sites first)
+        """
+        sites = self._current().sites
+        return [site for site in sites if site.enabled] if enabled_only else list(sites)
+
+    def get(self, name: str) -> Optional[SiteRecord]:
+        """Get a site by directory name.
+
+        Args:
+            name: Site directory name
+
+        Returns:
+            SiteRecord or None if not found
+        """
+        return self._current().by_name.get(name)
+
+    def by_domain(self, domain: str) -> Optional[SiteRecord]:
+        """Get the site serving a host name (primary domain or nginx alias).
+
+        Args:
+            domain: Host name
+
+        Returns:
+            SiteRecord or None if not found
+        """
+        return self._current().by_domain.get(domain.lower().rstrip("."))
+
+    def by_database(self, database_name: str) -> List[SiteRecord]:
+        """Get the sites using a database.
+
+        Args:
+            database_name: MariaDB database name
+
+        Returns:
+            Sites using the database (empty if none)
+        """
+        return list(self._current().by_database.get(database_name, []))
+
+
+# Singleton instance
+_site_registry: SiteRegistry | None = None
+
+
+def get_site_registry() -> SiteRegistry:
+    """Get site registry singleton.
+
+    Returns:
+        SiteRegistry instance
+    """
+    global _site_registry
+    if _site_registry is None:
+        _site_registry = SiteRegistry()
+    return _site_registry
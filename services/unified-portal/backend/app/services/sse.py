@@ -0,0 +1,18 @@
+"""Server-Sent Events message formatting shared by streaming endpoints."""
+from __future__ import annotations
+
+import json
+from typing import Any
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Format a Server-Sent Events message.
+
+    Args:
+        event: Event name
+        data: JSON-serializable payload
+
+    Returns:
+        SSE message (event and data lines, blank-line terminated)
+    """
+    return f"event: {event}\ndata: {json.dumps(data, separators=(',', ':'))}\n\n"
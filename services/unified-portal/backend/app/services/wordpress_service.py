@@ -2,7 +2,6 @@
 from __future__ import annotations
 
 import logging
-import subprocess
 from typing import List, Optional
 
 from sqlalchemy.orm import Session
@@ -10,10 +9,13 @@ from sqlalchemy.orm import Session
 from app.models.wordpress_site import WordPressSite
 from app.schemas.database import DatabaseCreate
 from app.schemas.wordpress import WordPressSiteCreate, WordPressSiteStats, WordPressSiteUpdate
+from app.services.async_exec import TARGET_DOCKER, get_exec_limits
 from app.services.cloudflare_tunnel_service import get_tunnel_service
 from app.services.database_service import get_database_service
+from app.services.docker_client import get_docker_client
 from app.services.encryption_service import get_encryption_service
-from app.services.nginx_config_service import get_nginx_service
+from app.services.nginx_config_service import RegenerateResult, SiteConfig, get_nginx_service
+from app.services.site_registry import get_site_registry
 from app.services.wp_install_service import get_wp_install_service
 
 logger = logging.getLogger(__name__)
@@ -119,7 +121,7 @@ class WordPressService:
             raise ValueError(f"データベース名 '{site_data.database_name}' は既に使用されています")
 
         # Check if WordPress site already exists on filesystem
-        if self.wp_install.site_exists(site_data.site_name):
+        if await self.wp_install.site_exists(site_data.site_name):
             raise ValueError(f"WordPress ファイルが既に存在します: '{site_data.site_name}'")
 
         # Create database record
@@ -128,6 +130,7 @@ class WordPressService:
             domain=site_data.domain,
             database_name=site_data.database_name,
             php_version=site_data.php_version,
+            proxy_pass=site_data.proxy_pass,
             enabled=True,
         )
 
@@ -155,7 +158,7 @@ class WordPressService:
 
             # Step 2: Install WordPress
             logger.info(f"Step 2/6: Installing WordPress at {site_data.site_name}")
-            self.wp_install.install_wordpress(
+            await self.wp_install.install_wordpress(
                 site_path=site_data.site_name,
                 domain=site_data.domain,
                 db_name=site_data.database_name,
@@ -181,7 +184,7 @@ class WordPressService:
             smtp_host = settings.smtp_host or "dell-workstation.tail67811d.ts.net"
             smtp_port = settings.smtp_port or 587
 
-            self.wp_install.configure_wp_mail_smtp(
+            await self.wp_install.configure_wp_mail_smtp(
                 site_path=site_data.site_name,
                 domain=site_data.domain,
                 from_email=from_email,
@@ -190,20 +193,17 @@ class WordPressService:
             )
             logger.info(f"WP Mail SMTP configured")
 
-            # Step 4: Generate Nginx configuration
-            logger.info(f"Step 4/6: Generating Nginx configuration")
-            config_path = self.nginx.create_wordpress_site_config(
+            # Step 4-5: Generate Nginx configuration, test and reload (rolled back on failure)
+            logger.info(f"Step 4-5/6: Generating Nginx configuration and reloading Nginx")
+            config_path = await self.nginx.create_wordpress_site_config(
                 site_name=site_data.site_name,
                 domain=site_data.domain,
                 php_version=site_data.php_version,
+                reload=True,
+                variant=site_data.nginx_variant,
+                proxy_pass=site_data.proxy_pass,
             )
-            logger.info(f"Nginx config created: {config_path}")
-
-            # Step 5: Reload Nginx
-            logger.info(f"Step 5/6: Reloading Nginx")
-            if not self.nginx.reload():
-                raise ValueError("Nginxのリロードに失敗しました。設定を確認してください")
-            logger.info(f"Nginx reloaded successfully")
+            logger.info(f"Nginx config created and reloaded: {config_path}")
 
             # Step 6: Setup Cloudflare Tunnel + DNS (automatic)
             logger.info(f"Step 6/6: Setting up Cloudflare Tunnel + DNS")
@@ -230,6 +230,8 @@ class WordPressService:
             # All external operations succeeded - NOW commit to database
             self.db.commit()
             self.db.refresh(site)
+            get_site_registry().invalidate()
+            await get_site_registry().load()
 
             logger.info(f"")
             logger.info(f"🎉 WordPress site created successfully: {site_data.site_name}")
@@ -253,7 +255,7 @@ class WordPressService:
 
             # Clean up Nginx config
             try:
-                self.nginx.delete_config(f"{site_data.site_name}.conf")
+                await self.nginx.delete_config(f"{site_data.site_name}.conf")
                 logger.info(f"Cleaned up Nginx config")
             except Exception as cleanup_error:
                 logger.warning(f"Failed to cleanup Nginx config: {cleanup_error}")
@@ -271,7 +273,7 @@ class WordPressService:
 
             raise ValueError(f"WordPressサイトの作成に失敗しました: {e}")
 
-    def update_site(self, site_id: int, site_update: WordPressSiteUpdate) -> WordPressSite:
+    async def update_site(self, site_id: int, site_update: WordPressSiteUpdate) -> WordPressSite:
         """Update WordPress site.
 
         Args:
@@ -289,24 +291,31 @@ class WordPressService:
             raise ValueError(f"Site with ID {site_id} not found")
 
         try:
-            # Update PHP version if changed
-            if site_update.php_version and site_update.php_version != site.php_version:
-                old_version = site.php_version
+            old_version = site.php_version
+            version_changed = bool(site_update.php_version) and site_update.php_version != site.php_version
+            proxy_changed = site_update.proxy_pass is not None and site_update.proxy_pass != site.proxy_pass
+            if version_changed:
                 site.php_version = site_update.php_version
+            if proxy_changed:
+                site.proxy_pass = site_update.proxy_pass
+
+            if version_changed or proxy_changed:
+                # Regenerate Nginx configuration (deployed variant kept, one test + reload)
+                regenerated = await self.nginx.regenerate_site_configs([
+                    SiteConfig(
+                        site_name=site.site_name,
+                        domain=site.domain,
+                        php_version=site.php_version,
+                        proxy_pass=site.proxy_pass,
+                    )
+                ])
+                if regenerated.failed:
+                    raise ValueError(f"Cannot render Nginx configuration: {regenerated.failed}")
 
-                # Regenerate Nginx configuration with new PHP version
-                self.nginx.delete_config(f"{site.site_name}.conf")
-                self.nginx.create_wordpress_site_config(
-                    site_name=site.site_name,
-                    domain=site.domain,
-                    php_version=site.php_version,
-                )
-
-                # Reload Nginx
-                if not self.nginx.reload():
-                    logger.warning("Nginx reload failed after PHP version change")
-
+            if version_changed:
                 logger.info(f"Updated PHP version for {site.site_name}: {old_version} → {site.php_version}")
+            if proxy_changed:
+                logger.info(f"Updated proxy upstream for {site.site_name}: {site.proxy_pass}")
 
             # Update enabled status
             if site_update.enabled is not None:
@@ -315,6 +324,8 @@ class WordPressService:
             # Save changes
             self.db.commit()
             self.db.refresh(site)
+            get_site_registry().invalidate()
+            await get_site_registry().load()
 
             logger.info(f"WordPress site updated: {site.site_name}")
             return site
@@ -388,15 +399,10 @@ class WordPressService:
             # Step 2: Delete Nginx configuration
             try:
                 logger.info(f"Step 2: Deleting Nginx config for {site.site_name}")
-                self.nginx.delete_config(f"{site.site_name}.conf")
+                async with self.nginx.transaction() as tx:
+                    tx.delete(f"{site.site_name}.conf")
                 results["nginx_deleted"] = True
-
-                # Test and reload Nginx
-                if self.nginx.test_config():
-                    self.nginx.reload()
-                    logger.info(f"✅ Nginx config deleted and reloaded")
-                else:
-                    logger.warning("Nginx configuration test failed after deletion")
+                logger.info(f"✅ Nginx config deleted and reloaded")
             except Exception as e:
                 error_msg = f"Nginx cleanup failed: {e}"
                 logger.warning(error_msg)
@@ -419,17 +425,13 @@ class WordPressService:
                 try:
                     logger.info(f"Step 4: Deleting WordPress files for {site.site_name}")
                     wp_path = f"/var/www/html/{site.site_name}"
-                    # Use docker exec to remove files inside container
-                    result = subprocess.run(
-                        [
-                            "docker", "exec", "blog-wordpress",
-                            "rm", "-rf", wp_path,
-                        ],
-                        capture_output=True,
-                        text=True,
+                    # Use Docker exec API to remove files inside container
+                    result = await get_exec_limits().run(
+                        TARGET_DOCKER,
+                        get_docker_client().exec("blog-wordpress", ["rm", "-rf", wp_path], timeout=60),
                         timeout=60,
                     )
-                    if result.returncode == 0:
+                    if result.exit_code == 0:
                         results["files_deleted"] = True
                         logger.info(f"✅ WordPress files deleted: {wp_path}")
                     else:
@@ -446,6 +448,8 @@ class WordPressService:
                 logger.info(f"Step 5: Deleting site record from portal database")
                 self.db.delete(site)
                 self.db.commit()
+                get_site_registry().invalidate()
+                await get_site_registry().load()
                 results["db_record_deleted"] = True
                 logger.info(f"✅ Site record deleted: {site.site_name}")
             except Exception as e:
@@ -463,6 +467,92 @@ class WordPressService:
             logger.error(f"Failed to delete WordPress site: {e}")
             raise ValueError(f"Failed to delete WordPress site: {e}")
 
+    async def migrate_php_version(self, site_ids: List[int], php_version: str) -> dict:
+        """Switch several sites to a PHP version with a single Nginx reload.
+
+        All configurations are regenerated in one Nginx transaction: one
+        `nginx -t` and one reload, or a rollback of every file if the test
+        fails (the database is then left unchanged).
+
+        Args:
+            site_ids: Site IDs
+            php_version: Target PHP version
+
+        Returns:
+            Dictionary with migrated, unchanged and failed site names and whether Nginx was reloaded
+
+        Raises:
+            ValueError: If a site is not found or the Nginx configuration is rejected
+        """
+        sites = self.db.query(WordPressSite).filter(WordPressSite.id.in_(site_ids)).all()
+        missing = sorted(set(site_ids) - {site.id for site in sites})
+        if missing:
+            raise ValueError(f"Sites not found: {', '.join(str(site_id) for site_id in missing)}")
+
+        changed = [site for site in sites if site.php_version != php_version]
+        try:
+            regenerated = await self.nginx.regenerate_site_configs([
+                SiteConfig(
+                    site_name=site.site_name, domain=site.domain, php_version=php_version, proxy_pass=site.proxy_pass
+                )
+                for site in changed
+            ])
+
+            failed = [site for site in changed if f"{site.site_name}.conf" in regenerated.failed]
+            changed = [site for site in changed if site not in failed]
+            for site in changed:
+                site.php_version = php_version
+            self.db.commit()
+            get_site_registry().invalidate()
+            await get_site_registry().load()
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"PHP version migration failed: {e}")
+            raise ValueError(f"PHP version migration failed: {e}")
+
+        logger.info(f"Migrated {len(changed)} sites to PHP {php_version} (nginx reloaded: {regenerated.reloaded})")
+        return {
+            "php_version": php_version,
+            "migrated": [site.site_name for site in changed],
+            "unchanged": [site.site_name for site in sites if site not in changed and site not in failed],
+            "failed": {site.site_name: regenerated.failed[f"{site.site_name}.conf"] for site in failed},
+            "nginx_reloaded": regenerated.reloaded,
+        }
+
+    async def regenerate_nginx_configs(self, dry_run: bool = False) -> RegenerateResult:
+        """Regenerate the Nginx configurations of all managed sites.
+
+        Each site keeps its deployed template variant; configurations that
+        render identically to the deployed file are skipped and the rest are
+        applied with a single test and reload.
+
+        Args:
+            dry_run: Only report changed files and their diffs
+
+        Returns:
+            RegenerateResult
+
+        Raises:
+            ValueError: If rendering or applying the configurations fails
+        """
+        sites = self.db.query(WordPressSite).order_by(WordPressSite.site_name).all()
+        try:
+            return await self.nginx.regenerate_site_configs(
+                [
+                    SiteConfig(
+                        site_name=site.site_name,
+                        domain=site.domain,
+                        php_version=site.php_version,
+                        proxy_pass=site.proxy_pass,
+                    )
+                    for site in sites
+                ],
+                dry_run=dry_run,
+            )
+        except (IOError, ValueError) as e:
+            logger.error(f"Nginx config regeneration failed: {e}")
+            raise ValueError(f"Nginx config regeneration failed: {e}")
+
     def get_site_stats(self, site_id: int) -> Optional[WordPressSiteStats]:
         """Get WordPress site statistics.
 
@@ -0,0 +1,329 @@
+"""Persistent wp-cli workers inside the WordPress container."""
+from __future__ import annotations
+
+import asyncio
+import base64
+import json
+import logging
+import shlex
+import uuid
+from typing import List, Optional
+
+from app.config import get_settings
+from app.services.docker_client import (
+    STREAM_STDERR,
+    DockerClient,
+    ExecResult,
+    get_docker_client,
+    read_stream_frame,
+)
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# PHP options for wp-cli: keep compiled WordPress/wp-cli code in a file-based
+# opcache shared by all wp-cli processes, so each run skips recompilation.
+# The cache lives in a private directory owned by the wp-cli user (see
+# ensure_opcache_dir) and cached files are checksum-verified on load.
+OPCACHE_DIR = "/var/cache/wp-cli-opcache"
+WP_CLI_PHP_ARGS = (
+    f"-d opcache.enable_cli=1 -d opcache.file_cache={OPCACHE_DIR} "
+    "-d opcache.file_cache_consistency_checks=1 -d opcache.validate_timestamps=1"
+)
+
+# Session setup: resolve wp-cli once and define the warm PHP invocation
+_SESSION_INIT = f'WP="php {WP_CLI_PHP_ARGS} $(command -v wp)"\n'
+
+# Run as root: create the opcache directory (its parent is root-owned, so
+# nobody else can pre-create it) and verify it is a private real directory.
+_OPCACHE_SETUP = """set -e
+dir="$1"; owner="$2"
+[ -e "$dir" ] || [ -L "$dir" ] || install -d -m 0700 -o "$owner" -g "$owner" "$dir"
+[ -d "$dir" ] && [ ! -L "$dir" ] && [ "$(stat -c '%U:%u %a' "$dir")" = "$owner:$(id -u "$owner") 700" ]
+"""
+
+# Batch runner: executes several wp-cli commands after a single WordPress
+# bootstrap (`wp eval`) and prints their results as JSON after a marker.
+# The code is passed inline, so there is no script file to tamper with.
+BATCH_MARKER = "__WPCLI_BATCH__"
+BATCH_PAYLOAD = "__WPCLI_PAYLOAD__"
+BATCH_SCRIPT = """
+$commands = json_decode(base64_decode('""" + BATCH_PAYLOAD + """'), true);
+$results = array();
+foreach ($commands as $command) {
+    $run = WP_CLI::runcommand($command, array(
+        'return' => 'all',
+        'launch' => false,
+        'exit_error' => false,
+    ));
+    $results[] = array(
+        'exit_code' => $run->return_code,
+        'stdout' => $run->stdout,
+        'stderr' => $run->stderr,
+    );
+}
+echo PHP_EOL . '""" + BATCH_MARKER + """' . json_encode($results);
+"""
+
+
+def wp_cli_user_args() -> List[str]:
+    """wp-cli arguments required for the configured wp-cli user.
+
+    Returns:
+        ["--allow-root"] if wp-cli is configured to run as root, else []
+    """
+    return ["--allow-root"] if settings.wp_cli_user == "root" else []
+
+
+def build_batch_args(commands: List[List[str]]) -> List[str]:
+    """Build wp-cli arguments running several commands in one bootstrap.
+
+    Args:
+        commands: wp-cli commands (arguments without the leading "wp")
+
+    Returns:
+        wp-cli arguments for `wp eval`
+    """
+    payload = json.dumps([shlex.join(command) for command in commands])
+    encoded = base64.b64encode(payload.encode()).decode()
+    return ["eval", BATCH_SCRIPT.replace(BATCH_PAYLOAD, encoded)]
+
+
+def parse_batch_output(result: ExecResult) -> Optional[List[ExecResult]]:
+    """Parse per-command results of a batch run.
+
+    Args:
+        result: Result of the `wp eval` batch run
+
+    Returns:
+        Per-command results, or None if the batch did not run (e.g. WordPress
+        failed to bootstrap)
+    """
+    index = result.stdout.rfind(BATCH_MARKER)
+    if index == -1:
+        return None
+
+    results = json.loads(result.stdout[index + len(BATCH_MARKER):])
+    return [
+        ExecResult(
+            exit_code=item.get("exit_code", -1),
+            stdout=item.get("stdout") or "",
+            stderr=item.get("stderr") or "",
+        )
+        for item in results
+    ]
+
+
+async def ensure_opcache_dir(docker: DockerClient, container: str, user: str) -> None:
+    """Create the private opcache directory, or verify an existing one.
+
+    Args:
+        docker: Docker client
+        container: WordPress container name
+        user: User owning the directory (the user wp-cli runs as)
+
+    Raises:
+        PermissionError: If the directory exists but is not a 0700
+            directory owned by `user`
+    """
+    result = await docker.exec(
+        container, ["sh", "-c", _OPCACHE_SETUP, "sh", OPCACHE_DIR, user], user="root", timeout=30
+    )
+    if result.exit_code != 0:
+        raise PermissionError(
+            f"wp-cli opcache directory {OPCACHE_DIR} is not private to {user}: "
+            f"{result.stderr.strip()}"
+        )
+
+
+class WpCliWorker:
+    """A long-lived shell session in the WordPress container running wp-cli.
+
+    Commands are written to the shell's stdin and delimited by a per-command
+    marker echoed on stdout (with the exit code) and stderr. This avoids an
+    exec create/start/inspect round trip per command.
+    """
+
+    def __init__(self, docker: DockerClient, container: str, user: str | None = None):
+        """Initialize wp-cli worker.
+
+        Args:
+            docker: Docker client
+            container: WordPress container name
+            user: User the session runs as (defaults to settings.wp_cli_user)
+        """
+        self.docker = docker
+        self.container = container
+        self.user = user or settings.wp_cli_user
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @property
+    def alive(self) -> bool:
+        """Whether the session is connected."""
+        return self._writer is not None and not self._writer.is_closing()
+
+    async def start(self) -> None:
+        """Start the shell session.
+
+        Raises:
+            PermissionError: If the opcache directory is not private
+        """
+        await ensure_opcache_dir(self.docker, self.container, self.user)
+        self._reader, self._writer = await self.docker.exec_attach(self.container, ["sh"], user=self.user)
+        self._writer.write(_SESSION_INIT.encode())
+        await self._writer.drain()
+
+    def close(self) -> None:
+        """Close the session (the shell exits on stdin EOF)."""
+        if self._writer is not None:
+            self._writer.close()
+        self._reader = None
+        self._writer = None
+
+    async def _read_until_markers(self, marker: bytes) -> ExecResult:
+        """Read frames until the marker was seen on both stdout and stderr."""
+        stdout = bytearray()
+        stderr = bytearray()
+        exit_code: Optional[int] = None
+        stderr_done = False
+
+        while exit_code is None or not stderr_done:
+            stream_type, payload = await read_stream_frame(self._reader)
+            if stream_type == STREAM_STDERR:
+                stderr += payload
+                index = stderr.find(marker)
+                if index != -1:
+                    del stderr[index:]
+                    stderr_done = True
+            else:
+                stdout += payload
+                index = stdout.find(marker + b" ")
+                if index != -1 and stdout.endswith(b"\n"):
+                    exit_code = int(stdout[index + len(marker) + 1:].strip() or -1)
+                    del stdout[index:]
+
+        return ExecResult(
+            exit_code=exit_code,
+            stdout=stdout.decode("utf-8", errors="replace"),
+            stderr=stderr.decode("utf-8", errors="replace"),
+        )
+
+    async def run(self, args: List[str], timeout: float) -> ExecResult:
+        """Run a wp-cli command in the session.
+
+        Args:
+            args: wp-cli arguments (without the leading "wp")
+            timeout: Timeout in seconds
+
+        Returns:
+            ExecResult of the command
+
+        Raises:
+            asyncio.TimeoutError: If the command does not finish in time
+            ConnectionError: If the session is gone
+        """
+        if not self.alive:
+            raise ConnectionError("wp-cli worker is not running")
+
+        marker = f"__WPCLI_DONE_{uuid.uuid4().hex}"
+        line = (
+            f"$WP {shlex.join(args)} </dev/null; "
+            f"echo \"{marker} $?\"; echo \"{marker}\" >&2\n"
+        )
+        self._writer.write(line.encode())
+        await self._writer.drain()
+
+        try:
+            return await asyncio.wait_for(self._read_until_markers(marker.encode()), timeout=timeout)
+        except asyncio.IncompleteReadError:
+            self.close()
+            raise ConnectionError("wp-cli worker session closed")
+
+
+class WpCliPool:
+    """Pool of persistent wp-cli workers.
+
+    Up to `size` commands run concurrently; workers are started lazily and
+    replaced after a failure or timeout (the session is then in an unknown
+    state).
+    """
+
+    def __init__(self, docker: DockerClient | None = None, container: str | None = None, size: int | None = None):
+        """Initialize wp-cli pool.
+
+        Args:
+            docker: Docker client (defaults to the shared client)
+            container: WordPress container name (defaults to settings.wordpress_container_name)
+            size: Number of workers (defaults to settings.wp_cli_workers)
+        """
+        self.docker = docker or get_docker_client()
+        self.container = container or settings.wordpress_container_name
+        self.size = size or settings.wp_cli_workers
+        self._idle: Optional[asyncio.Queue] = None
+        self._workers: List[WpCliWorker] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _queue(self) -> asyncio.Queue:
+        """Idle worker queue bound to the running event loop."""
+        loop = asyncio.get_running_loop()
+        if self._idle is None or self._loop is not loop:
+            for worker in self._workers:
+                worker.close()
+            self._workers = [WpCliWorker(self.docker, self.container) for _ in range(self.size)]
+            self._idle = asyncio.Queue()
+            for worker in self._workers:
+                self._idle.put_nowait(worker)
+            self._loop = loop
+        return self._idle
+
+    async def run(self, args: List[str], timeout: float = 30.0) -> ExecResult:
+        """Run a wp-cli command on an idle worker.
+
+        Args:
+            args: wp-cli arguments (without the leading "wp")
+            timeout: Timeout in seconds
+
+        Returns:
+            ExecResult of the command
+
+        Raises:
+            asyncio.TimeoutError: If the command does not finish in time
+            ConnectionError: If no worker session can be established
+        """
+        idle = self._queue()
+        worker = await idle.get()
+        try:
+            if not worker.alive:
+                await worker.start()
+            return await worker.run(args, timeout)
+        except BaseException:
+            # Discard the session; a fresh one is started on next use
+            worker.close()
+            raise
+        finally:
+            idle.put_nowait(worker)
+
+    async def close(self) -> None:
+        """Close all worker sessions."""
+        for worker in self._workers:
+            worker.close()
+        self._workers = []
+        self._idle = None
+        self._loop = None
+
+
+# Singleton instance
+_wp_cli_pool: WpCliPool | None = None
+
+
+def get_wp_cli_pool() -> WpCliPool:
+    """Get wp-cli worker pool singleton.
+
+    Returns:
+        WpCliPool instance
+    """
+    global _wp_cli_pool
+    if _wp_cli_pool is None:
+        _wp_cli_pool = WpCliPool()
+    return _wp_cli_pool
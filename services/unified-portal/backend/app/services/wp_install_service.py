@@ -3,8 +3,11 @@ from __future__ import annotations
 
 import json
 import logging
-import subprocess
-from typing import Dict, Optional
+from typing import Dict, List, Optional
+
+from app.services.async_exec import TARGET_WP_CLI, get_exec_limits
+from app.services.docker_client import ExecResult, get_docker_client
+from app.services.wp_cli_service import build_batch_args, parse_batch_output
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +16,7 @@ class WordPressInstallService:
     """Service for installing WordPress sites using wp-cli.
 
     Handles WordPress core installation, plugin installation, and configuration.
-    Uses docker exec to run wp-cli commands in WordPress container.
+    Uses the Docker exec API to run wp-cli commands in WordPress container.
     """
 
     # Docker container name for blog WordPress
@@ -33,7 +36,20 @@ class WordPressInstallService:
         self.wp_container = wp_container
         self.wp_user = wp_user
 
-    def _run_wp_cli(self, args: list[str], site_path: str) -> subprocess.CompletedProcess:
+    async def _exec(self, cmd: list[str]) -> ExecResult:
+        """Run a command in WordPress container.
+
+        Args:
+            cmd: Command and arguments
+
+        Returns:
+            Exec result
+        """
+        return await get_exec_limits().run(
+            TARGET_WP_CLI, get_docker_client().exec(self.wp_container, cmd, timeout=600), timeout=600
+        )
+
+    async def _run_wp_cli(self, args: list[str], site_path: str) -> ExecResult:
         """Run wp-cli command in WordPress container.
 
         Args:
@@ -41,10 +57,9 @@ class WordPressInstallService:
             site_path: Path to WordPress installation
 
         Returns:
-            Completed process result
+            Exec result
         """
         cmd = [
-            "docker", "exec", self.wp_container,
             "wp", *args,
             f"--path=/var/www/html/{site_path}",
             "--allow-root"
@@ -52,14 +67,29 @@ class WordPressInstallService:
 
         logger.debug(f"Running wp-cli command: {' '.join(cmd)}")
 
-        return subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            check=False,
-        )
+        return await self._exec(cmd)
+
+    async def _run_wp_cli_batch(self, commands: List[List[str]], site_path: str) -> List[ExecResult]:
+        """Run several wp-cli commands in one WordPress bootstrap.
 
-    def install_wordpress(
+        Args:
+            commands: wp-cli commands (arguments without the leading "wp")
+            site_path: Path to WordPress installation
+
+        Returns:
+            Per-command exec results
+
+        Raises:
+            ValueError: If the batch could not run
+        """
+        result = await self._run_wp_cli(build_batch_args(commands), site_path)
+
+        results = parse_batch_output(result)
+        if results is None:
+            raise ValueError(f"wp-cli batch failed: {result.stderr.strip() or result.stdout.strip()}")
+        return results
+
+    async def install_wordpress(
         self,
         site_path: str,
         domain: str,
@@ -104,28 +134,22 @@ class WordPressInstallService:
 
             # Step 1: Create WordPress directory
             logger.info(f"Creating WordPress directory: {site_path}")
-            result = subprocess.run(
-                [
-                    "docker", "exec", self.wp_container,
-                    "mkdir", "-p", f"/var/www/html/{site_path}"
-                ],
-                capture_output=True,
-                text=True,
-                check=False,
+            result = await self._exec(
+                ["mkdir", "-p", f"/var/www/html/{site_path}"]
             )
 
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 logger.error(f"Failed to create directory: {result.stderr}")
                 raise ValueError(f"Failed to create directory: {result.stderr}")
 
             # Step 2: Download WordPress core
             logger.info("Downloading WordPress core files...")
-            result = self._run_wp_cli(
+            result = await self._run_wp_cli(
                 ["core", "download", f"--locale={locale}"],
                 site_path
             )
 
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 logger.error(f"Failed to download WordPress: {result.stderr}")
                 raise ValueError(f"Failed to download WordPress: {result.stderr}")
 
@@ -133,7 +157,7 @@ class WordPressInstallService:
 
             # Step 3: Create wp-config.php
             logger.info("Creating wp-config.php...")
-            result = self._run_wp_cli(
+            result = await self._run_wp_cli(
                 [
                     "config", "create",
                     f"--dbname={db_name}",
@@ -145,7 +169,7 @@ class WordPressInstallService:
                 site_path
             )
 
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 logger.error(f"Failed to create wp-config.php: {result.stderr}")
                 raise ValueError(f"Failed to create wp-config.php: {result.stderr}")
 
@@ -153,7 +177,7 @@ class WordPressInstallService:
 
             # Step 4: Install WordPress
             logger.info("Installing WordPress...")
-            result = self._run_wp_cli(
+            result = await self._run_wp_cli(
                 [
                     "core", "install",
                     f"--url={site_url}",
@@ -165,7 +189,7 @@ class WordPressInstallService:
                 site_path
             )
 
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 logger.error(f"Failed to install WordPress: {result.stderr}")
                 raise ValueError(f"Failed to install WordPress: {result.stderr}")
 
@@ -173,17 +197,11 @@ class WordPressInstallService:
 
             # Step 5: Set correct permissions (www-data:www-data for plugin updates)
             logger.info("Setting correct permissions...")
-            result = subprocess.run(
-                [
-                    "docker", "exec", self.wp_container,
-                    "chown", "-R", "www-data:www-data", f"/var/www/html/{site_path}"
-                ],
-                capture_output=True,
-                text=True,
-                check=False,
+            result = await self._exec(
+                ["chown", "-R", "www-data:www-data", f"/var/www/html/{site_path}"]
             )
 
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 logger.warning(f"Failed to set permissions: {result.stderr}")
             else:
                 logger.info(f"Permissions set to www-data:www-data for {site_path}")
@@ -195,7 +213,7 @@ class WordPressInstallService:
             logger.error(f"Error installing WordPress: {e}")
             raise ValueError(f"WordPress installation failed: {e}")
 
-    def configure_wp_mail_smtp(
+    async def configure_wp_mail_smtp(
         self,
         site_path: str,
         domain: str,
@@ -223,26 +241,6 @@ class WordPressInstallService:
         try:
             site_url = f"https://{domain}"
 
-            # Step 1: Install WP Mail SMTP plugin
-            logger.info("Installing WP Mail SMTP plugin...")
-            result = self._run_wp_cli(
-                ["plugin", "install", "wp-mail-smtp", "--activate", f"--url={site_url}"],
-                site_path
-            )
-
-            if result.returncode != 0:
-                logger.warning(f"Plugin installation failed: {result.stderr}")
-                # Try to activate if already installed
-                result = self._run_wp_cli(
-                    ["plugin", "activate", "wp-mail-smtp", f"--url={site_url}"],
-                    site_path
-                )
-
-            logger.info("WP Mail SMTP plugin installed/activated")
-
-            # Step 2: Configure SMTP settings
-            logger.info("Configuring SMTP settings...")
-
             smtp_config = {
                 "mail": {
                     "from_email": from_email,
@@ -261,35 +259,43 @@ class WordPressInstallService:
 
             smtp_config_json = json.dumps(smtp_config)
 
-            result = self._run_wp_cli(
+            # Install plugin and configure SMTP settings in one bootstrap
+            logger.info("Installing WP Mail SMTP plugin and configuring SMTP settings...")
+            install_result, activate_result, option_result = await self._run_wp_cli_batch(
                 [
-                    "option", "update", "wp_mail_smtp",
-                    smtp_config_json,
-                    "--format=json",
-                    f"--url={site_url}"
+                    ["plugin", "install", "wp-mail-smtp", "--activate", f"--url={site_url}"],
+                    # No-op if the install above activated it; covers an already installed plugin
+                    ["plugin", "activate", "wp-mail-smtp", f"--url={site_url}"],
+                    [
+                        "option", "update", "wp_mail_smtp",
+                        smtp_config_json,
+                        "--format=json",
+                        f"--url={site_url}"
+                    ],
                 ],
                 site_path
             )
 
-            if result.returncode != 0:
-                logger.error(f"Failed to configure SMTP: {result.stderr}")
-                raise ValueError(f"Failed to configure SMTP: {result.stderr}")
+            if install_result.exit_code != 0:
+                logger.warning(f"Plugin installation failed: {install_result.stderr}")
+                if activate_result.exit_code != 0:
+                    logger.warning(f"Plugin activation failed: {activate_result.stderr}")
+
+            logger.info("WP Mail SMTP plugin installed/activated")
+
+            if option_result.exit_code != 0:
+                logger.error(f"Failed to configure SMTP: {option_result.stderr}")
+                raise ValueError(f"Failed to configure SMTP: {option_result.stderr}")
 
             logger.info("SMTP configuration complete")
 
             # Fix permissions after plugin installation (upgrade directory created by wp-cli)
             logger.info("Fixing permissions after plugin installation...")
-            result = subprocess.run(
-                [
-                    "docker", "exec", self.wp_container,
-                    "chown", "-R", "www-data:www-data", f"/var/www/html/{site_path}"
-                ],
-                capture_output=True,
-                text=True,
-                check=False,
+            result = await self._exec(
+                ["chown", "-R", "www-data:www-data", f"/var/www/html/{site_path}"]
             )
 
-            if result.returncode != 0:
+            if result.exit_code != 0:
                 logger.warning(f"Failed to fix permissions: {result.stderr}")
             else:
                 logger.info(f"Permissions fixed for {site_path}")
@@ -300,7 +306,7 @@ class WordPressInstallService:
             logger.error(f"Error configuring WP Mail SMTP: {e}")
             raise ValueError(f"WP Mail SMTP configuration failed: {e}")
 
-    def site_exists(self, site_path: str) -> bool:
+    async def site_exists(self, site_path: str) -> bool:
         """Check if WordPress site exists.
 
         Args:
@@ -310,17 +316,11 @@ class WordPressInstallService:
             True if site exists
         """
         try:
-            result = subprocess.run(
-                [
-                    "docker", "exec", self.wp_container,
-                    "test", "-d", f"/var/www/html/{site_path}"
-                ],
-                capture_output=True,
-                text=True,
-                check=False,
+            result = await self._exec(
+                ["test", "-d", f"/var/www/html/{site_path}"]
             )
 
-            return result.returncode == 0
+            return result.exit_code == 0
 
         except Exception as e:
             logger.error(f"Error checking site existence: {e}")
@@ -0,0 +1,7 @@
+-- Migration: 003_add_wordpress_site_proxy_pass.sql
+-- Purpose: Store the upstream URL of sites using the reverse-proxy Nginx variant
+-- Database: blog_management (Blog MariaDB)
+-- Date: 2026-10-18
+
+ALTER TABLE wordpress_sites
+    ADD COLUMN IF NOT EXISTS proxy_pass VARCHAR(255) NULL COMMENT 'Upstream URL (reverse-proxy Nginx variant only)' AFTER php_version;
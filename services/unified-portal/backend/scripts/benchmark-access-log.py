@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Script: benchmark-access-log.py
+Purpose: Measure access log ingest throughput on a synthetic nginx log
+Usage: python3 benchmark-access-log.py [--lines 5000000] [--keep FILE]
+Date: 2026-10-18
+"""
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path to import app modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.services.access_log_analytics import AccessLogAnalytics
+
+PATHS = ["/", "/wp-login.php", "/wp-admin/admin-ajax.php", "/feed/", "/wp-json/wp/v2/posts"] + [
+    f"/{year}/{month:02d}/post-{n}/" for year in (2024, 2025) for month in range(1, 13) for n in range(20)
+]
+STATUSES = ["200"] * 80 + ["301", "302", "304"] * 4 + ["404"] * 6 + ["500", "502"]
+AGENTS = [
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0 Safari/537.36",
+    "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)",
+]
+
+
+def write_log(path: str, lines: int) -> int:
+    """Write a synthetic `portal` format log covering the last hour.
+
+    Returns:
+        File size in bytes
+    """
+    rng = random.Random(42)
+    clients = [f"203.0.113.{n}" for n in range(1, 255)] + [f"198.51.100.{n}" for n in range(1, 255)]
+    start = time.time() - 3600
+    step = 3600 / lines
+
+    with open(path, "w") as f:
+        batch = []
+        for i in range(lines):
+            stamp = time.strftime("%d/%b/%Y:%H:%M:%S +0000", time.gmtime(start + i * step))
+            status = rng.choice(STATUSES)
+            upstream = f"{rng.expovariate(20):.3f}"
+            batch.append(
+                f'{rng.choice(clients)} - - [{stamp}] "GET {rng.choice(PATHS)}?ver=6.4 HTTP/1.1" {status} '
+                f'{rng.randint(200, 90000)} "-" "{rng.choice(AGENTS)}" rt={upstream} urt="{upstream}"\n'
+            )
+            if len(batch) == 10000:
+                f.writelines(batch)
+                batch = []
+        f.writelines(batch)
+    return os.path.getsize(path)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--lines", type=int, default=5_000_000, help="Number of log lines")
+    parser.add_argument("--keep", help="Write the log to this file and keep it")
+    args = parser.parse_args()
+
+    log_dir = tempfile.mkdtemp()
+    log_path = os.path.join(log_dir, "benchmark_access.log")
+    print(f"Writing {args.lines:,} lines...")
+    size = write_log(log_path, args.lines)
+
+    analytics = AccessLogAnalytics(log_dir, bucket_seconds=60)
+    started = time.perf_counter()
+    analytics.ingest_all()
+    elapsed = time.perf_counter() - started
+
+    summary = analytics.summary("benchmark", window_seconds=7200)
+    print(f"Ingested {size / 1024 / 1024:,.0f} MiB in {elapsed:.2f}s "
+          f"({size / 1024 / 1024 / elapsed:,.0f} MiB/s, {args.lines / elapsed:,.0f} lines/s)")
+    print(f"Counted {summary.requests:,} requests, status classes {summary.status_classes}, "
+          f"upstream p50/p95 {summary.upstream_p50_ms}/{summary.upstream_p95_ms} ms")
+
+    if args.keep:
+        os.replace(log_path, args.keep)
+    else:
+        os.remove(log_path)
+    os.rmdir(log_dir)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,15 @@
 """Pytest configuration and fixtures."""
 
+import asyncio
+import json
+
+import httpx
 import pytest
 from fastapi.testclient import TestClient
 from app.main import app
+from app.services.cloudflare_client import CloudflareClient
+
+CLOUDFLARE_ZONE_ID = "0123456789abcdef0123456789abcdef"
 
 
 @pytest.fixture
@@ -32,3 +39,75 @@ def mock_docker_containers():
             "ports": ["3306:3306"],
         },
     ]
+
+
+class FakeCloudflare:
+    """Mock Cloudflare API transport serving zones and DNS records.
+
+    List endpoints paginate like the API (`per_page` overrides the page size
+    requested by the client). DNS record writes, single or batched, echo the
+    record back with a generated ID.
+    """
+
+    def __init__(self, zones=None, records=None, per_page=None, fail_batch=False):
+        if zones is None:
+            zones = [{"id": CLOUDFLARE_ZONE_ID, "name": "example.com", "status": "active", "name_servers": []}]
+        self.zones = list(zones)
+        self.records = list(records or [])
+        self.per_page = per_page
+        self.fail_batch = fail_batch
+        self.fail_page = None
+        self.requests = []
+        self.pages = []
+
+    async def __call__(self, request):
+        self.requests.append(request)
+        await asyncio.sleep(0)
+        path = request.url.path
+        params = request.url.params
+
+        if request.method == "GET":
+            if path.endswith("/zones") and params.get("name"):
+                zones = [zone for zone in self.zones if zone["name"] == params["name"]]
+                return httpx.Response(200, json={"success": True, "result": zones})
+
+            items = self.zones if path.endswith("/zones") else self.records
+            if params.get("type"):
+                items = [item for item in items if item["type"] == params["type"]]
+            page = int(params.get("page", 1))
+            per_page = self.per_page or int(params.get("per_page", 20))
+            self.pages.append(page)
+            if page == self.fail_page:
+                return httpx.Response(400, json={"success": False, "errors": [{"message": "page failed"}]})
+            return httpx.Response(200, json={
+                "success": True,
+                "result": items[(page - 1) * per_page:page * per_page],
+                "result_info": {"page": page, "per_page": per_page, "total_count": len(items),
+                                "total_pages": max(1, -(-len(items) // per_page))},
+            })
+
+        body = json.loads(request.content) if request.content else {}
+        if path.endswith("/batch"):
+            if self.fail_batch:
+                return httpx.Response(400, json={"success": False, "errors": [{"message": "invalid record"}]})
+            return httpx.Response(200, json={"success": True, "result": {
+                "patches": body.get("patches", []),
+                "posts": [{"id": f"new{i}", **post} for i, post in enumerate(body.get("posts", []))],
+            }})
+        if request.method == "PATCH":
+            return httpx.Response(200, json={"success": True, "result": {"id": path.rsplit("/", 1)[1], **body}})
+        return httpx.Response(200, json={"success": True, "result": {"id": f"new-{body['name']}", **body}})
+
+
+@pytest.fixture
+def cloudflare_fake(request):
+    """Fake Cloudflare API (parametrize indirectly with FakeCloudflare kwargs)."""
+    return FakeCloudflare(**getattr(request, "param", {}))
+
+
+@pytest.fixture
+def cloudflare_client(cloudflare_fake):
+    """Cloudflare client over the fake API without rate limiting delays."""
+    return CloudflareClient(
+        api_token="token", rate=1000.0, burst=1000, transport=httpx.MockTransport(cloudflare_fake)
+    )
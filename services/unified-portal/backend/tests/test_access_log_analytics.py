@@ -0,0 +1,147 @@
+"""Tests for the nginx access-log analytics."""
+
+import os
+import time
+
+import pytest
+
+from app.services.access_log_analytics import AccessLogAnalytics, histogram_percentile
+
+NOW = 1700000000.0  # 14/Nov/2023:22:13:20 +0000
+
+
+def line(path="/", status=200, size=512, client="203.0.113.7", at=NOW, upstream=None):
+    """Build an access log line (portal format if upstream is given, else combined)."""
+    stamp = time.strftime("%d/%b/%Y:%H:%M:%S +0000", time.gmtime(at))
+    text = f'{client} - - [{stamp}] "GET {path}?p=1 HTTP/1.1" {status} {size} "-" "curl/8.0"'
+    if upstream is not None:
+        text += f' rt={upstream} urt="{upstream}"'
+    return text + "\n"
+
+
+def make_analytics(tmp_path, **kwargs):
+    """Analytics over tmp_path with a fixed clock."""
+    return AccessLogAnalytics(str(tmp_path), bucket_seconds=60, clock=lambda: NOW + 30, **kwargs)
+
+
+class TestHistogramPercentile:
+    """Tests for histogram percentile estimates."""
+
+    def test_percentile(self):
+        """Test the upper bound of the bucket holding the rank is returned."""
+        counts = [0] * 12
+        counts[2] = 90  # <= 25ms
+        counts[6] = 10  # <= 500ms
+
+        assert histogram_percentile(counts, 50) == 0.025
+        assert histogram_percentile(counts, 95) == 0.5
+        assert histogram_percentile([0] * 12, 50) is None
+
+
+class TestAccessLogAnalytics:
+    """Tests for AccessLogAnalytics."""
+
+    def test_aggregates(self, tmp_path):
+        """Test requests, status mix, bytes, top paths/clients and upstream times."""
+        (tmp_path / "blog_access.log").write_text(
+            line("/", upstream="0.020")
+            + line("/", status=404, size=100, client="198.51.100.1", upstream="0.300")
+            + line("/feed/", status=502, size=0, upstream="-")
+            + line("/old/", status=301)
+        )
+        analytics = make_analytics(tmp_path)
+
+        analytics.ingest_all()
+        summary = analytics.summary("blog", window_seconds=600)
+
+        assert analytics.names() == ["blog"]
+        assert summary.requests == 4
+        assert summary.bytes_sent == 1124
+        assert summary.status_codes == {"200": 1, "301": 1, "404": 1, "502": 1}
+        assert summary.status_classes == {"2xx": 1, "3xx": 1, "4xx": 1, "5xx": 1}
+        assert summary.top_paths[0] == ("/", 2)
+        assert summary.top_clients[0] == ("203.0.113.7", 3)
+        assert summary.upstream_p50_ms == 25.0
+        assert summary.upstream_p95_ms == 500.0
+
+    def test_incremental_reads(self, tmp_path):
+        """Test only new complete lines are counted on each pass."""
+        path = tmp_path / "blog-access.log"
+        path.write_text(line() + line()[:20])
+        analytics = make_analytics(tmp_path)
+
+        analytics.ingest_all()
+        assert analytics.summary("blog").requests == 1
+
+        with open(path, "a") as f:
+            f.write(line()[20:] + line())
+        analytics.ingest_all()
+
+        assert analytics.summary("blog").requests == 3
+
+    def test_rotation_by_rename(self, tmp_path):
+        """Test the rest of a rotated log is read before the new file."""
+        path = tmp_path / "blog_access.log"
+        path.write_text(line())
+        analytics = make_analytics(tmp_path)
+        analytics.ingest_all()
+
+        with open(path, "a") as f:
+            f.write(line())
+        os.rename(path, f"{path}.1")
+        path.write_text(line() + line())
+        analytics.ingest_all()
+
+        assert analytics.summary("blog").requests == 4
+
+    def test_truncation(self, tmp_path):
+        """Test a log truncated in place is read from the start."""
+        path = tmp_path / "blog_access.log"
+        path.write_text(line() + line() + line())
+        analytics = make_analytics(tmp_path)
+        analytics.ingest_all()
+
+        path.write_text(line())
+        analytics.ingest_all()
+
+        assert analytics.summary("blog").requests == 4
+
+    def test_window_and_retention(self, tmp_path):
+        """Test windows select buckets and old lines are dropped."""
+        (tmp_path / "blog_access.log").write_text(
+            line(at=NOW - 7200) + line(at=NOW - 1800) + line(at=NOW)
+        )
+        analytics = make_analytics(tmp_path, retention_seconds=3600)
+
+        analytics.ingest_all()
+
+        assert analytics.summary("blog", window_seconds=600).requests == 1
+        assert analytics.summary("blog", window_seconds=3600).requests == 2
+        timeline = analytics.timeline("blog", window_seconds=3600)
+        assert [point.timestamp for point in timeline] == [NOW - 1800 - 20, NOW - 20]
+
+    def test_closed_buckets_are_compacted(self, tmp_path):
+        """Test closed buckets keep only their top paths."""
+        (tmp_path / "blog_access.log").write_text(
+            "".join(line(f"/post-{n}/", at=NOW - 120) for n in range(10)) + line("/post-0/", at=NOW - 120)
+        )
+        analytics = make_analytics(tmp_path, top_size=2)
+
+        analytics.ingest_all()
+        summary = analytics.summary("blog", top=10)
+
+        assert summary.requests == 11
+        assert len(summary.top_paths) == 2
+        assert summary.top_paths[0] == ("/post-0/", 2)
+
+    def test_unknown_log(self, tmp_path):
+        """Test unknown logs raise KeyError."""
+        analytics = make_analytics(tmp_path)
+
+        with pytest.raises(KeyError):
+            analytics.summary("missing")
+
+    def test_invalid_bucket_size(self, tmp_path):
+        """Test bucket sizes must be whole minutes."""
+        with pytest.raises(ValueError):
+            AccessLogAnalytics(str(tmp_path), bucket_seconds=90)
@@ -0,0 +1,184 @@
+"""Tests for the async execution layer."""
+
+import asyncio
+import threading
+
+import pytest
+
+from app.services.async_exec import (
+    CancelOnDisconnectMiddleware,
+    ExecLimits,
+    ExecTimeoutError,
+    get_scan_pool,
+    run_blocking,
+    run_scan,
+)
+
+
+class TestExecLimits:
+    """Tests for ExecLimits."""
+
+    @pytest.mark.asyncio
+    async def test_concurrency_per_target(self):
+        """Test that each target is limited independently."""
+        limits = ExecLimits({"mysql": 2, "docker": 1})
+        active = {"mysql": 0, "docker": 0}
+        peak = {"mysql": 0, "docker": 0}
+
+        async def call(target):
+            active[target] += 1
+            peak[target] = max(peak[target], active[target])
+            await asyncio.sleep(0.01)
+            active[target] -= 1
+            return target
+
+        results = await asyncio.gather(
+            *(limits.run("mysql", call("mysql"), timeout=5) for _ in range(6)),
+            *(limits.run("docker", call("docker"), timeout=5) for _ in range(3)),
+        )
+
+        assert results.count("mysql") == 6
+        assert peak == {"mysql": 2, "docker": 1}
+
+    @pytest.mark.asyncio
+    async def test_timeout(self):
+        """Test that slow calls raise ExecTimeoutError and free their slot."""
+        limits = ExecLimits({"wp-cli": 1})
+
+        with pytest.raises(ExecTimeoutError, match="wp-cli call timed out"):
+            await limits.run("wp-cli", asyncio.sleep(1), timeout=0.01)
+
+        assert await limits.run("wp-cli", asyncio.sleep(0, result="ok"), timeout=1) == "ok"
+
+    @pytest.mark.asyncio
+    async def test_unknown_target(self):
+        """Test that unknown targets are rejected."""
+        limits = ExecLimits({"docker": 1})
+        call = asyncio.sleep(0)
+
+        with pytest.raises(ValueError):
+            await limits.run("ssh", call, timeout=1)
+        call.close()
+
+
+class TestRunBlocking:
+    """Tests for run_blocking."""
+
+    @pytest.mark.asyncio
+    async def test_runs_on_io_pool(self):
+        """Test that blocking functions run off the event loop thread."""
+        name = await run_blocking(lambda: threading.current_thread().name)
+
+        assert name.startswith("file-io")
+
+    @pytest.mark.asyncio
+    async def test_scans_do_not_block_io_pool(self):
+        """Test that a saturated scan pool leaves the file I/O pool free."""
+        release = threading.Event()
+        scans = [
+            asyncio.ensure_future(run_scan(release.wait, 5))
+            for _ in range(get_scan_pool()._max_workers)
+        ]
+        try:
+            name = await asyncio.wait_for(run_blocking(lambda: threading.current_thread().name), timeout=1)
+        finally:
+            release.set()
+        names = await asyncio.gather(*(run_scan(lambda: threading.current_thread().name) for _ in range(2)))
+        await asyncio.gather(*scans)
+
+        assert name.startswith("file-io")
+        assert all(n.startswith("scan") for n in names)
+
+
+class TestCancelOnDisconnectMiddleware:
+    """Tests for CancelOnDisconnectMiddleware."""
+
+    @pytest.mark.asyncio
+    async def test_cancels_handler_on_disconnect(self):
+        """Test that a slow handler is cancelled when the client disconnects."""
+        cancelled = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await receive()
+            try:
+                await asyncio.sleep(10)
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        messages = [{"type": "http.request", "body": b"", "more_body": False}]
+        disconnect = asyncio.Event()
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await disconnect.wait()
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            pass
+
+        middleware = CancelOnDisconnectMiddleware(app)
+        task = asyncio.create_task(middleware({"type": "http", "method": "GET", "path": "/slow"}, receive, send))
+        await asyncio.sleep(0.01)
+        disconnect.set()
+        await asyncio.wait_for(task, timeout=1)
+
+        assert cancelled.is_set()
+
+    @pytest.mark.asyncio
+    async def test_completed_response_not_cancelled(self):
+        """Test that work after a complete response is not cancelled."""
+        finished = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+            await asyncio.sleep(0.02)  # e.g. background tasks
+            finished.set()
+
+        response_sent = asyncio.Event()
+
+        async def receive():
+            # Servers report a disconnect once the response is complete
+            await response_sent.wait()
+            return {"type": "http.disconnect"}
+
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+            if message["type"] == "http.response.body":
+                response_sent.set()
+
+        middleware = CancelOnDisconnectMiddleware(app)
+        await middleware({"type": "http", "method": "GET", "path": "/"}, receive, send)
+
+        assert finished.is_set()
+        assert sent[-1]["body"] == b"ok"
+
+    @pytest.mark.asyncio
+    async def test_mutating_request_not_cancelled(self):
+        """Test that a POST runs to completion after the client disconnects."""
+        finished = asyncio.Event()
+
+        async def app(scope, receive, send):
+            await receive()
+            await asyncio.sleep(0.05)
+            finished.set()
+
+        messages = [
+            {"type": "http.request", "body": b"", "more_body": False},
+            {"type": "http.disconnect"},
+        ]
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            pass
+
+        middleware = CancelOnDisconnectMiddleware(app)
+        await asyncio.wait_for(middleware({"type": "http", "method": "POST", "path": "/"}, receive, send), timeout=1)
+
+        assert finished.is_set()
@@ -0,0 +1,70 @@
+"""Tests for the backup catalog index."""
+
+import os
+
+import pytest
+
+from app.services.backup_catalog import BackupCatalog, measure_directory
+
+
+@pytest.fixture
+def backup_root(tmp_path):
+    """Create a backup root with two backups."""
+    root = tmp_path / "daily"
+    for name, size in [("2025-01-01", 100), ("2025-01-02", 200)]:
+        backup = root / name / "mail"
+        backup.mkdir(parents=True)
+        (backup / "data.bin").write_bytes(b"x" * size)
+    (root / "2025-01-02" / "checksums.sha256").write_text("")
+    return root
+
+
+def make_catalog(tmp_path, calls):
+    """Create a catalog that records which directories were measured."""
+    def measure(path):
+        calls.append(os.path.basename(path))
+        return measure_directory(path)
+
+    return BackupCatalog(db_path=str(tmp_path / "catalog.db"), measure=measure, settle_seconds=0)
+
+
+class TestBackupCatalog:
+    """Tests for BackupCatalog."""
+
+    def test_scan_measures_and_sorts(self, tmp_path, backup_root):
+        """Test that a first scan measures every backup."""
+        calls = []
+        entries = make_catalog(tmp_path, calls).scan(str(backup_root))
+
+        assert [e.name for e in entries] == ["2025-01-02", "2025-01-01"]
+        assert entries[0].size_bytes == 200
+        assert entries[0].file_count == 2
+        assert entries[0].checksum_status == "present"
+        assert entries[1].checksum_status == "missing"
+        assert sorted(calls) == ["2025-01-01", "2025-01-02"]
+
+    def test_rescan_only_new_directories(self, tmp_path, backup_root):
+        """Test that known backups are served from the index, even after restart."""
+        make_catalog(tmp_path, []).scan(str(backup_root))
+        (backup_root / "2025-01-03").mkdir()
+
+        calls = []
+        entries = make_catalog(tmp_path, calls).scan(str(backup_root))
+
+        assert calls == ["2025-01-03"]
+        assert len(entries) == 3
+
+    def test_removed_directories_are_dropped(self, tmp_path, backup_root):
+        """Test that deleted backups disappear from the index."""
+        catalog = make_catalog(tmp_path, [])
+        catalog.scan(str(backup_root))
+
+        (backup_root / "2025-01-01" / "mail" / "data.bin").unlink()
+        (backup_root / "2025-01-01" / "mail").rmdir()
+        (backup_root / "2025-01-01").rmdir()
+
+        assert [e.name for e in catalog.scan(str(backup_root))] == ["2025-01-02"]
+
+    def test_missing_root(self, tmp_path):
+        """Test that a missing root returns no backups."""
+        assert make_catalog(tmp_path, []).scan(str(tmp_path / "missing")) == []
@@ -0,0 +1,113 @@
+"""Tests for the cgroup v2 container resource reader."""
+
+import pytest
+
+from app.services.cgroup_reader import CgroupNotFoundError, CgroupReader, ContainerResources
+
+CONTAINER_ID = "abc123" * 10 + "abcd"
+
+NET_DEV = """Inter-|   Receive                                                |  Transmit
+ face |bytes    packets errs drop fifo frame compressed multicast|bytes    packets errs drop fifo colls carrier compressed
+    lo:     500       5    0    0    0     0          0         0      500       5    0    0    0     0       0          0
+  eth0:    1000      10    0    0    0     0          0         0     2000      20    0    0    0     0       0          0
+"""
+
+
+@pytest.fixture
+def host(tmp_path):
+    """Build a fake host cgroup v2 and procfs tree."""
+    cgroup = tmp_path / "cgroup" / "system.slice" / f"docker-{CONTAINER_ID}.scope"
+    cgroup.mkdir(parents=True)
+    (cgroup / "cgroup.controllers").write_text("cpu io memory pids\n")
+    (cgroup / "cgroup.procs").write_text("4242\n4243\n")
+    (cgroup / "cpu.stat").write_text("usage_usec 1500\nuser_usec 1000\nsystem_usec 500\n")
+    (cgroup / "memory.current").write_text("10485760\n")
+    (cgroup / "memory.max").write_text("max\n")
+    (cgroup / "memory.stat").write_text("anon 4194304\nfile 6291456\ninactive_file 2097152\n")
+    (cgroup / "io.stat").write_text("8:0 rbytes=100 wbytes=200 rios=1 wios=2\n8:16 rbytes=1 wbytes=2 rios=1 wios=1\n")
+
+    proc = tmp_path / "proc"
+    (proc / "4242" / "net").mkdir(parents=True)
+    (proc / "4242" / "net" / "dev").write_text(NET_DEV)
+    (proc / "meminfo").write_text("MemTotal:        1024 kB\nMemFree:          512 kB\n")
+
+    return CgroupReader(cgroup_root=str(tmp_path / "cgroup"), proc_root=str(proc))
+
+
+class TestCgroupReader:
+    """Tests for CgroupReader."""
+
+    def test_read_counters(self, host):
+        """Test counters are parsed into bytes and nanoseconds."""
+        resources = host.read(CONTAINER_ID)
+
+        assert resources.cpu_usage_ns == 1_500_000
+        assert resources.cpu_user_ns == 1_000_000
+        assert resources.cpu_system_ns == 500_000
+        assert resources.memory_usage_bytes == 10485760 - 2097152
+        assert resources.memory_limit_bytes == 1024 * 1024
+        assert resources.block_read_bytes == 101
+        assert resources.block_write_bytes == 202
+        assert resources.network_rx_bytes == 1000
+        assert resources.network_tx_bytes == 2000
+        assert resources.source == "cgroup"
+
+    def test_missing_cgroup(self, host):
+        """Test unknown containers raise CgroupNotFoundError."""
+        with pytest.raises(CgroupNotFoundError):
+            host.read("f" * 64)
+
+        assert host.read_many(["f" * 64]) == {}
+
+    def test_cpu_percent_from_two_samples(self, host):
+        """Test CPU% needs a previous sample and uses wall-clock delta."""
+        first = ContainerResources(timestamp_ns=1_000_000_000, cpu_usage_ns=0)
+        second = ContainerResources(timestamp_ns=2_000_000_000, cpu_usage_ns=500_000_000)
+
+        assert host.cpu_percent(CONTAINER_ID, first) is None
+        assert host.cpu_percent(CONTAINER_ID, second) == pytest.approx(50.0)
+
+    def test_cpu_percent_baselines_are_independent(self, host):
+        """Test interleaved callers each measure over their own interval."""
+        samples = [
+            ContainerResources(timestamp_ns=t * 1_000_000_000, cpu_usage_ns=cpu)
+            for t, cpu in [(0, 0), (1, 100_000_000), (10, 1_000_000_000), (11, 1_900_000_000)]
+        ]
+
+        assert host.cpu_percent(CONTAINER_ID, samples[0], baseline="dashboard") is None
+        assert host.cpu_percent(CONTAINER_ID, samples[1], baseline="detail") is None
+        assert host.cpu_percent(CONTAINER_ID, samples[2], baseline="dashboard") == pytest.approx(10.0)
+        assert host.cpu_percent(CONTAINER_ID, samples[3], baseline="detail") == pytest.approx(18.0)
+
+    def test_removed_containers_are_pruned(self, host, tmp_path):
+        """Test paths and CPU samples of removed containers do not accumulate."""
+        resources = host.read_many([CONTAINER_ID])[CONTAINER_ID]
+        host.cpu_percent(CONTAINER_ID, resources, baseline="dashboard")
+        host.cpu_percent(CONTAINER_ID, resources, baseline="detail")
+
+        host.read_many([CONTAINER_ID])
+        assert len(host._last_cpu) == 2
+
+        cgroup = tmp_path / "cgroup" / "system.slice" / f"docker-{CONTAINER_ID}.scope"
+        for child in cgroup.iterdir():
+            child.unlink()
+        cgroup.rmdir()
+        host.read_many([])
+
+        assert host._paths == {}
+        assert host._last_cpu == {}
+
+    def test_from_stats_fallback(self):
+        """Test resources can be built from a Docker stats API response."""
+        stats = {
+            "cpu_stats": {"cpu_usage": {"total_usage": 42, "usage_in_usermode": 40, "usage_in_kernelmode": 2}},
+            "memory_stats": {"usage": 300, "limit": 1000, "stats": {"inactive_file": 100}},
+            "networks": {"eth0": {"rx_bytes": 5, "tx_bytes": 6}},
+        }
+
+        resources = ContainerResources.from_stats(stats)
+
+        assert resources.cpu_usage_ns == 42
+        assert resources.memory_usage_bytes == 200
+        assert resources.network_tx_bytes == 6
+        assert resources.source == "docker_api"
@@ -0,0 +1,226 @@
+"""Tests for the shared Cloudflare API client."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.services.cloudflare_client import CloudflareAPIError, CloudflareClient, TokenBucket, endpoint_name
+from app.services.cloudflare_tunnel_service import CloudflareTunnelService
+from tests.conftest import CLOUDFLARE_ZONE_ID as ZONE_ID
+
+
+def ok(result):
+    """Successful Cloudflare API response."""
+    return httpx.Response(200, json={"success": True, "errors": [], "result": result})
+
+
+def make_client(handler, **kwargs):
+    """Client over a mock transport without rate limiting delays."""
+    kwargs.setdefault("rate", 1000.0)
+    kwargs.setdefault("burst", 1000)
+    return CloudflareClient(api_token="token", transport=httpx.MockTransport(handler), **kwargs)
+
+
+class TestTokenBucket:
+    """Tests for TokenBucket."""
+
+    @pytest.mark.asyncio
+    async def test_burst_then_rate(self):
+        """Test the burst is immediate and further tokens follow the rate."""
+        bucket = TokenBucket(rate=50.0, capacity=3)
+
+        waits = [await bucket.acquire() for _ in range(4)]
+
+        assert waits[:3] == [0.0, 0.0, 0.0]
+        assert 0.01 < waits[3] < 0.1
+
+    @pytest.mark.asyncio
+    async def test_block(self):
+        """Test a block pauses acquisition for its duration."""
+        bucket = TokenBucket(rate=1000.0, capacity=10)
+        bucket.block(0.05)
+
+        started = time.monotonic()
+        await bucket.acquire()
+
+        assert time.monotonic() - started >= 0.05
+
+
+class TestCloudflareClient:
+    """Tests for CloudflareClient."""
+
+    @pytest.mark.asyncio
+    async def test_request_reuses_client_and_sends_token(self):
+        """Test requests share one pooled client with the bearer token."""
+        seen = []
+
+        def handler(request):
+            seen.append(request)
+            return ok([{"id": ZONE_ID}])
+
+        client = make_client(handler)
+        pooled = None
+        for _ in range(3):
+            assert await client.get("/zones", params={"name": "example.com"}) == [{"id": ZONE_ID}]
+            assert pooled is None or client.client is pooled
+            pooled = client.client
+        await client.close()
+
+        assert seen[0].headers["Authorization"] == "Bearer token"
+        assert seen[0].url.params["name"] == "example.com"
+        assert str(seen[0].url).startswith("https://api.cloudflare.com/client/v4/zones")
+
+    @pytest.mark.asyncio
+    async def test_retries_429_after_retry_after(self):
+        """Test throttled requests wait for Retry-After and are retried."""
+        calls = []
+
+        def handler(request):
+            calls.append(time.monotonic())
+            if len(calls) == 1:
+                return httpx.Response(429, headers={"Retry-After": "0.05"}, json={"success": False})
+            return ok({"id": "r1"})
+
+        client = make_client(handler)
+        result = await client.post(f"/zones/{ZONE_ID}/dns_records", json={"type": "A"})
+
+        assert result == {"id": "r1"}
+        assert calls[1] - calls[0] >= 0.05
+        stats = client.metrics()["endpoints"][0]
+        assert stats["endpoint"] == "POST /zones/{id}/dns_records"
+        assert stats["throttled"] == 1
+        assert stats["retries"] == 1
+
+    @pytest.mark.asyncio
+    async def test_server_errors_retry_only_idempotent(self):
+        """Test 5xx responses are retried for GET but not for POST."""
+        calls = {"GET": 0, "POST": 0}
+
+        def handler(request):
+            calls[request.method] += 1
+            return httpx.Response(502, text="bad gateway")
+
+        client = make_client(handler, max_retries=2)
+        client._backoff = lambda attempt, response: 0.0
+
+        with pytest.raises(CloudflareAPIError) as get_error:
+            await client.get("/zones")
+        with pytest.raises(CloudflareAPIError):
+            await client.post("/zones", json={})
+
+        assert calls == {"GET": 3, "POST": 1}
+        assert get_error.value.status_code == 502
+
+    @pytest.mark.asyncio
+    async def test_unsuccessful_response(self):
+        """Test success=false bodies raise with the API error messages."""
+        def handler(request):
+            return httpx.Response(
+                400, json={"success": False, "errors": [{"code": 81057, "message": "Record already exists."}]}
+            )
+
+        client = make_client(handler)
+
+        with pytest.raises(CloudflareAPIError, match="Record already exists") as error:
+            await client.post(f"/zones/{ZONE_ID}/dns_records", json={})
+
+        assert error.value.status_code == 400
+        assert error.value.errors[0]["code"] == 81057
+
+    @pytest.mark.asyncio
+    async def test_missing_token(self):
+        """Test requests fail before sending without an API token."""
+        client = CloudflareClient(api_token="", transport=httpx.MockTransport(lambda request: ok(None)))
+
+        with pytest.raises(CloudflareAPIError) as error:
+            await client.get("/zones")
+
+        assert error.value.status_code == 500
+
+    @pytest.mark.asyncio
+    async def test_paginate_fetches_ahead_in_order(self):
+        """Test later pages are fetched concurrently (bounded) and yielded in order."""
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            page = int(request.url.params["page"])
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.01 * (7 - page))  # later pages answer first
+            in_flight -= 1
+            return httpx.Response(200, json={
+                "success": True, "result": [page], "result_info": {"page": page, "total_pages": 6},
+            })
+
+        client = make_client(handler)
+
+        pages = [page async for page in client.paginate("/zones", concurrency=3)]
+
+        assert pages == [[1], [2], [3], [4], [5], [6]]
+        assert peak == 3
+        assert await client.get_all("/zones") == [1, 2, 3, 4, 5, 6]
+
+    def test_endpoint_name(self):
+        """Test IDs are grouped in endpoint names."""
+        assert endpoint_name("GET", f"/zones/{ZONE_ID}/dns_records/{ZONE_ID}?name=a") == "GET /zones/{id}/dns_records/{id}"
+        assert endpoint_name("GET", "/zones") == "GET /zones"
+
+
+class TestCloudflareTunnelService:
+    """Tests for CloudflareTunnelService over the shared client."""
+
+    @pytest.mark.asyncio
+    async def test_setup_site_routing_creates_cname_after_tunnel(self):
+        """Test the zone lookup overlaps the tunnel update and the CNAME follows it."""
+        calls = []
+        in_flight = 0
+        peak = 0
+
+        async def handler(request):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.02)
+            in_flight -= 1
+            calls.append((request.method, request.url.path))
+            if request.url.path.endswith("/configurations"):
+                return ok({"config": {"ingress": [{"service": "http_status:404"}]}})
+            if request.url.path.endswith("/zones"):
+                return ok([{"id": ZONE_ID, "name": "example.com"}])
+            return ok({"id": "r1", "name": "blog.example.com"})
+
+        service = CloudflareTunnelService(account_id="acc", tunnel_id="tun", client=make_client(handler))
+
+        result = await service.setup_site_routing("blog.example.com", domain="example.com")
+
+        assert result["dns_record"]["id"] == "r1"
+        assert result["tunnel_config"]["config"]["ingress"][0]["service"] == "http_status:404"
+        assert peak == 2
+        put = calls.index(("PUT", "/client/v4/accounts/acc/cfd_tunnel/tun/configurations"))
+        assert calls[-1][0] == "POST" and put < len(calls) - 1
+
+    @pytest.mark.asyncio
+    async def test_setup_site_routing_no_cname_when_tunnel_fails(self):
+        """Test a failed tunnel update leaves no dangling CNAME."""
+        methods = []
+
+        async def handler(request):
+            methods.append(request.method)
+            if request.method == "PUT":
+                return httpx.Response(400, json={"success": False, "errors": [{"code": 1, "message": "bad"}], "result": None})
+            if request.url.path.endswith("/configurations"):
+                return ok({"config": {"ingress": [{"service": "http_status:404"}]}})
+            if request.url.path.endswith("/zones"):
+                return ok([{"id": ZONE_ID, "name": "example.com"}])
+            return ok({"id": "r1"})
+
+        service = CloudflareTunnelService(account_id="acc", tunnel_id="tun", client=make_client(handler))
+
+        with pytest.raises(CloudflareAPIError):
+            await service.setup_site_routing("blog.example.com", domain="example.com")
+
+        assert "POST" not in methods
@@ -0,0 +1,120 @@
+"""Tests for the Cloudflare zone ID and DNS record cache."""
+
+import asyncio
+
+import pytest
+
+from app.services.cloudflare_dns_cache import CloudflareDNSCache
+from tests.conftest import CLOUDFLARE_ZONE_ID as ZONE_ID
+
+
+def record(record_id, name, record_type="A", content="192.0.2.1"):
+    return {"id": record_id, "name": name, "type": record_type, "content": content, "ttl": 1}
+
+
+def make_cache(client, clock=lambda: 0.0):
+    return CloudflareDNSCache(client, zone_ttl=3600, records_ttl=300, clock=clock)
+
+
+def zone(*records, per_page=None):
+    """Indirect parametrization of the fake API serving these records."""
+    return pytest.mark.parametrize("cloudflare_fake", [{"records": list(records), "per_page": per_page}], indirect=True)
+
+
+class TestCloudflareDNSCache:
+    """Tests for CloudflareDNSCache."""
+
+    @pytest.mark.asyncio
+    async def test_zone_id_is_cached(self, cloudflare_fake, cloudflare_client):
+        """Test zone IDs are looked up once and unknown zones are not cached."""
+        cache = make_cache(cloudflare_client)
+
+        assert await cache.zone_id("example.com") == ZONE_ID
+        assert await cache.zone_id("Example.com") == ZONE_ID
+        assert await cache.zone_id("missing.com") is None
+        assert await cache.zone_id("missing.com") is None
+
+        assert len(cloudflare_fake.requests) == 3
+
+    @pytest.mark.asyncio
+    @zone(record("r1", "www.example.com"), record("r2", "www.example.com", "AAAA", "2001:db8::1"),
+          record("r3", "mail.example.com", "MX"), per_page=2)
+    async def test_lookups_are_memory_hits(self, cloudflare_fake, cloudflare_client):
+        """Test a zone is listed once (all pages) and then searched in memory."""
+        cache = make_cache(cloudflare_client)
+
+        assert len(await cache.records(ZONE_ID)) == 3
+        www = await cache.find_records(ZONE_ID, name="WWW.example.com")
+        mx = await cache.find_records(ZONE_ID, record_type="mx")
+        by_id = await cache.get_record(ZONE_ID, "r2")
+
+        assert {r["id"] for r in www} == {"r1", "r2"}
+        assert [r["id"] for r in mx] == ["r3"]
+        assert by_id["type"] == "AAAA"
+        assert len(cloudflare_fake.requests) == 2  # two pages
+
+    @pytest.mark.asyncio
+    @zone(record("r1", "www.example.com"))
+    async def test_write_through(self, cloudflare_fake, cloudflare_client):
+        """Test our own mutations update the cached zone without re-listing."""
+        cache = make_cache(cloudflare_client)
+        await cache.records(ZONE_ID)
+
+        cache.record_created(ZONE_ID, record("r2", "blog.example.com", "CNAME", "tunnel.cfargotunnel.com"))
+        cache.record_updated(ZONE_ID, record("r1", "www.example.com", content="192.0.2.9"))
+        cache.record_deleted(ZONE_ID, "missing")
+
+        assert [r["id"] for r in await cache.find_records(ZONE_ID, name="blog.example.com")] == ["r2"]
+        assert (await cache.get_record(ZONE_ID, "r1"))["content"] == "192.0.2.9"
+
+        cache.record_deleted(ZONE_ID, "r2")
+
+        assert await cache.find_records(ZONE_ID, name="blog.example.com") == []
+        assert len(cloudflare_fake.requests) == 1
+
+    @pytest.mark.asyncio
+    @zone(record("r1", "www.example.com"))
+    async def test_expiry_and_refresh(self, cloudflare_fake, cloudflare_client):
+        """Test records reload after the TTL or on explicit refresh."""
+        now = [0.0]
+        cache = make_cache(cloudflare_client, clock=lambda: now[0])
+
+        await cache.records(ZONE_ID)
+        cloudflare_fake.records.append(record("r2", "api.example.com"))
+        assert len(await cache.records(ZONE_ID)) == 1
+
+        now[0] = 301.0
+        assert len(await cache.records(ZONE_ID)) == 2
+
+        cloudflare_fake.records.pop()
+        assert len(await cache.records(ZONE_ID, refresh=True)) == 1
+        assert len(cloudflare_fake.requests) == 3
+
+    @pytest.mark.asyncio
+    @zone(record("r1", "www.example.com"))
+    async def test_concurrent_loads_share_one_request(self, cloudflare_fake, cloudflare_client):
+        """Test simultaneous cold lookups list the zone once."""
+        cache = make_cache(cloudflare_client)
+
+        results = await asyncio.gather(*(cache.find_records(ZONE_ID, name="www.example.com") for _ in range(5)))
+
+        assert all(len(found) == 1 for found in results)
+        assert len(cloudflare_fake.requests) == 1
+
+    @pytest.mark.asyncio
+    @zone(record("r1", "www.example.com"), record("r2", "old.example.com"))
+    async def test_write_through_during_load(self, cloudflare_fake, cloudflare_client):
+        """Test mutations made while the zone is being listed survive the load."""
+        cache = make_cache(cloudflare_client)
+
+        loading = asyncio.ensure_future(cache.records(ZONE_ID))
+        while not cloudflare_fake.requests:  # listing request in flight with the old snapshot
+            await asyncio.sleep(0)
+        cache.record_created(ZONE_ID, record("r3", "blog.example.com", "CNAME", "tunnel.cfargotunnel.com"))
+        cache.record_updated(ZONE_ID, record("r1", "www.example.com", content="192.0.2.9"))
+        cache.record_deleted(ZONE_ID, "r2")
+        await loading
+
+        assert {r["id"] for r in await cache.records(ZONE_ID)} == {"r1", "r3"}
+        assert (await cache.get_record(ZONE_ID, "r1"))["content"] == "192.0.2.9"
+        assert len(cloudflare_fake.requests) == 1
@@ -0,0 +1,51 @@
+"""Tests for batched container stats sampling."""
+
+import httpx
+import pytest
+
+from app.services.container_stats import ContainerStatsSampler
+from app.services.docker_client import DockerClient, calculate_cpu_percent
+
+
+def make_stats(total_usage: int, system_usage: int) -> dict:
+    """Build a minimal stats API response."""
+    return {
+        "cpu_stats": {"cpu_usage": {"total_usage": total_usage}, "system_cpu_usage": system_usage, "online_cpus": 1},
+        "precpu_stats": {},
+    }
+
+
+class TestContainerStatsSampler:
+    """Tests for ContainerStatsSampler."""
+
+    @pytest.mark.asyncio
+    async def test_second_pass_uses_one_shot_and_cached_sample(self):
+        """Test CPU% is computed from the previous pass without a sampling window."""
+        requests = []
+        samples = {"a": [make_stats(100, 1000), make_stats(150, 1100)]}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            container_id = request.url.path.split("/")[2]
+            requests.append((container_id, request.url.params.get("one-shot")))
+            return httpx.Response(200, json=samples[container_id].pop(0))
+
+        sampler = ContainerStatsSampler(docker=DockerClient(transport=httpx.MockTransport(handler)))
+
+        await sampler.sample(["a"])
+        stats = (await sampler.sample(["a"]))["a"]
+
+        assert requests == [("a", None), ("a", "true")]
+        assert calculate_cpu_percent(stats) == pytest.approx(50.0)
+
+    @pytest.mark.asyncio
+    async def test_failed_container_is_omitted(self):
+        """Test a failing container does not fail the whole pass."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            if "/containers/bad/" in request.url.path:
+                return httpx.Response(500, json={"message": "boom"})
+            return httpx.Response(200, json=make_stats(1, 1))
+
+        sampler = ContainerStatsSampler(docker=DockerClient(transport=httpx.MockTransport(handler)))
+        stats = await sampler.sample(["good", "bad"])
+
+        assert list(stats) == ["good"]
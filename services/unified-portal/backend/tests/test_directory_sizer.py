@@ -0,0 +1,55 @@
+"""Tests for the parallel directory sizer."""
+
+import os
+
+from app.services.directory_sizer import DirectorySizer
+
+
+class TestDirectorySizer:
+    """Tests for DirectorySizer."""
+
+    def test_nested_tree(self, tmp_path):
+        """Test that files in nested directories are all counted."""
+        for i in range(5):
+            subdir = tmp_path / f"dir{i}" / "sub"
+            subdir.mkdir(parents=True)
+            (subdir / "file").write_bytes(b"x" * 100)
+        (tmp_path / "top").write_bytes(b"x" * 10)
+
+        usage = DirectorySizer(max_workers=4).measure(str(tmp_path))
+
+        assert usage.file_count == 6
+        assert usage.inode_count == 6
+        assert usage.apparent_bytes == 510
+        assert usage.exclusive_bytes == usage.disk_bytes
+
+    def test_hard_links_counted_once(self, tmp_path):
+        """Test rsync-style hard-linked snapshots are deduplicated."""
+        first = tmp_path / "2025-01-01"
+        second = tmp_path / "2025-01-02"
+        first.mkdir()
+        second.mkdir()
+        (first / "unchanged").write_bytes(b"x" * 8192)
+        os.link(first / "unchanged", second / "unchanged")
+        (second / "new").write_bytes(b"y" * 4096)
+
+        sizer = DirectorySizer()
+        both = sizer.measure(str(tmp_path))
+        snapshot = sizer.measure(str(second))
+
+        assert both.file_count == 3
+        assert both.inode_count == 2
+        assert both.apparent_bytes == 8192 + 4096
+        # Whole tree holds every link, so everything is exclusive
+        assert both.exclusive_bytes == both.disk_bytes
+
+        assert snapshot.apparent_bytes == 8192 + 4096
+        # The unchanged file is shared with the previous snapshot
+        assert snapshot.exclusive_bytes < snapshot.disk_bytes
+
+    def test_missing_directory(self, tmp_path):
+        """Test that a missing directory measures as empty."""
+        usage = DirectorySizer().measure(str(tmp_path / "missing"))
+
+        assert usage.file_count == 0
+        assert usage.apparent_bytes == 0
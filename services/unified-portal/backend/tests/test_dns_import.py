@@ -0,0 +1,159 @@
+"""Tests for the bulk DNS record import."""
+
+import io
+import json
+
+import pytest
+
+from app.services.cloudflare_dns_cache import CloudflareDNSCache
+from app.services.dns_import import CSVRowReader, DNSImporter, iter_csv_rows
+from tests.conftest import CLOUDFLARE_ZONE_ID as ZONE_ID
+
+EXISTING = [
+    {"id": "r1", "type": "A", "name": "www.example.com", "content": "192.0.2.1", "ttl": 1, "proxied": True},
+    {"id": "r2", "type": "MX", "name": "example.com", "content": "mail.example.com", "ttl": 3600,
+     "proxied": False, "priority": 10},
+    {"id": "r3", "type": "CNAME", "name": "blog.example.com", "content": "old.example.net", "ttl": 1,
+     "proxied": False},
+]
+
+CSV = (
+    "Type,Name,Content,TTL,Proxied,Priority\n"
+    "A,www,192.0.2.1,1,Yes,\n"              # unchanged
+    "MX,@,mail.example.com,3600,No,20\n"    # priority changed -> update
+    "CNAME,blog,new.example.net,1,No,\n"    # CNAME target changed -> update
+    "A,api,192.0.2.10,300,No,\n"            # create
+    "A,api.example.com,192.0.2.10,300,No,\n"  # duplicate of previous row
+    "TXT,example.com,\"v=spf1 include:_spf.example.com, ~all\",1,No,\n"  # create (quoted comma)
+    "A,,192.0.2.11,1,No,\n"                 # invalid
+)
+
+
+def make_importer(client, **kwargs):
+    return DNSImporter(client=client, cache=CloudflareDNSCache(client), **kwargs)
+
+
+def rows_of(text, chunk_size=16):
+    """Stream CSV rows from text, as UploadFile.read would."""
+    buffer = io.BytesIO(text.encode())
+
+    async def read(size):
+        return buffer.read(size)
+
+    return iter_csv_rows(read, chunk_size=chunk_size)
+
+
+async def run(importer, **kwargs):
+    return await importer.run(ZONE_ID, "example.com", rows_of(CSV), **kwargs)
+
+
+class TestCSVRowReader:
+    """Tests for incremental CSV parsing."""
+
+    @pytest.mark.asyncio
+    async def test_chunked_rows(self):
+        """Test records split across chunks, quoted newlines and a missing final newline."""
+        text = '\ufeffType,Name,Content\r\nTXT,a,"line1\nline2, ""x"""\r\nA,b,192.0.2.1'
+        rows = [row async for row in rows_of(text, chunk_size=5)]
+
+        assert rows == [
+            (2, {"Type": "TXT", "Name": "a", "Content": 'line1\nline2, "x"'}),
+            (3, {"Type": "A", "Name": "b", "Content": "192.0.2.1"}),
+        ]
+
+    def test_multibyte_split(self):
+        """Test a UTF-8 character split between chunks is decoded."""
+        reader = CSVRowReader()
+        data = "a,é\n".encode()
+
+        assert reader.feed(data[:3]) == []
+        assert reader.feed(data[3:]) == [["a", "é"]]
+
+
+@pytest.mark.parametrize("cloudflare_fake", [{"records": EXISTING}], indirect=True)
+class TestDNSImporter:
+    """Tests for DNSImporter."""
+
+    @pytest.mark.asyncio
+    async def test_dry_run_plan(self, cloudflare_fake, cloudflare_client):
+        """Test rows are diffed against the zone without changing it."""
+        report = await run(make_importer(cloudflare_client), dry_run=True)
+
+        assert [(row.row, row.action) for row in report.rows] == [
+            (2, "unchanged"), (3, "update"), (4, "update"), (5, "create"),
+            (6, "duplicate"), (7, "create"), (8, "invalid"),
+        ]
+        assert report.rows[1].record_id == "r2"
+        assert report.rows[5].payload["content"] == "v=spf1 include:_spf.example.com, ~all"
+        assert [row.row for row in report.error_rows] == [8]
+        assert [r.method for r in cloudflare_fake.requests] == ["GET"]
+
+    @pytest.mark.asyncio
+    async def test_plan_reloads_cached_zone(self, cloudflare_fake, cloudflare_client):
+        """Test the diff uses the zone's current records, not a cached copy."""
+        importer = make_importer(cloudflare_client)
+        await importer.cache.records(ZONE_ID)
+
+        await run(importer, dry_run=True)
+
+        assert [r.method for r in cloudflare_fake.requests] == ["GET", "GET"]
+
+    @pytest.mark.asyncio
+    async def test_conflicting_cname_rows(self, cloudflare_client):
+        """Test a second target for the same CNAME name is a conflict, not a second change."""
+        csv_text = (
+            "Type,Name,Content\n"
+            "CNAME,blog,new.example.net\n"     # update of r3
+            "CNAME,blog,other.example.net\n"   # conflict
+            "CNAME,shop,a.example.net\n"       # create
+            "CNAME,shop,b.example.net\n"       # conflict
+        )
+        importer = make_importer(cloudflare_client)
+
+        report = await importer.run(ZONE_ID, "example.com", rows_of(csv_text), dry_run=True)
+
+        assert [row.action for row in report.rows] == ["update", "conflict", "create", "conflict"]
+        assert "row 2" in report.rows[1].error
+        assert [row.row for row in report.error_rows] == [3, 5]
+
+    @pytest.mark.asyncio
+    async def test_batch_apply(self, cloudflare_fake, cloudflare_client):
+        """Test changes go out in one batch request and are cached."""
+        importer = make_importer(cloudflare_client)
+
+        report = await run(importer)
+
+        batch = [r for r in cloudflare_fake.requests if r.url.path.endswith("/batch")]
+        assert len(batch) == 1
+        body = json.loads(batch[0].content)
+        assert [patch["id"] for patch in body["patches"]] == ["r2", "r3"]
+        assert [post["name"] for post in body["posts"]] == ["api.example.com", "example.com"]
+        assert [row.status for row in report.rows if row.action in ("create", "update")] == ["applied"] * 4
+        assert (await importer.cache.find_records(ZONE_ID, name="api.example.com"))[0]["id"] == "new0"
+
+    @pytest.mark.asyncio
+    async def test_failed_batch_marks_chunk(self, cloudflare_fake, cloudflare_client):
+        """Test a rejected batch fails every row of its chunk."""
+        cloudflare_fake.fail_batch = True
+
+        report = await run(make_importer(cloudflare_client, batch_size=2))
+
+        failed = [row for row in report.rows if row.status == "failed"]
+        assert len(failed) == 4
+        assert "invalid record" in failed[0].error
+        assert len([r for r in cloudflare_fake.requests if r.url.path.endswith("/batch")]) == 2
+
+    @pytest.mark.asyncio
+    async def test_concurrent_apply(self, cloudflare_fake, cloudflare_client):
+        """Test concurrent mode patches updates and posts creates."""
+        report = await run(make_importer(cloudflare_client, concurrency=2), mode="concurrent")
+
+        methods = sorted(r.method for r in cloudflare_fake.requests if r.method != "GET")
+        assert methods == ["PATCH", "PATCH", "POST", "POST"]
+        assert report.rows[3].record_id == "new-api.example.com"
+
+    @pytest.mark.asyncio
+    async def test_unknown_mode(self, cloudflare_client):
+        """Test unknown modes are rejected."""
+        with pytest.raises(ValueError):
+            await run(make_importer(cloudflare_client), mode="serial")
@@ -0,0 +1,185 @@
+"""Tests for the DNS propagation checker."""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import httpx
+import pytest
+
+from app.services.dns_propagation import (
+    DNSPropagationChecker,
+    Resolver,
+    matches,
+    parse_resolver,
+)
+
+DOH = [
+    Resolver("Google", "doh", "https://dns.google/resolve"),
+    Resolver("Cloudflare", "doh", "https://cloudflare-dns.com/dns-query"),
+    Resolver("Quad9", "doh", "https://dns.quad9.net:5053/dns-query"),
+]
+
+
+class FakeDoH:
+    """DoH JSON endpoints; each host sees the record after `visible_after` queries."""
+
+    def __init__(self, visible_after=None, delay=0.0):
+        self.visible_after = visible_after or {}
+        self.delay = delay
+        self.queries = {}
+
+    async def __call__(self, request):
+        host = request.url.host
+        self.queries[host] = self.queries.get(host, 0) + 1
+        await asyncio.sleep(self.delay)
+        answers = []
+        if self.queries[host] > self.visible_after.get(host, 0):
+            answers = [{"name": "blog.example.com.", "type": 1, "TTL": 300, "data": "192.0.2.1"}]
+        return httpx.Response(200, json={"Status": 0, "Answer": answers})
+
+
+class TestHelpers:
+    """Tests for resolver specs and answer matching."""
+
+    def test_parse_resolver(self):
+        """Test named and unnamed specs for each protocol."""
+        assert parse_resolver("Google=doh:https://dns.google/resolve?x=1") == Resolver(
+            "Google", "doh", "https://dns.google/resolve?x=1"
+        )
+        assert parse_resolver("udp:1.1.1.1") == Resolver("1.1.1.1", "udp", "1.1.1.1")
+        assert parse_resolver("ns=tcp:192.0.2.53:5353").address == "192.0.2.53:5353"
+        with pytest.raises(ValueError):
+            parse_resolver("doh:http://insecure.example/dns-query")
+        with pytest.raises(ValueError):
+            parse_resolver("smtp:192.0.2.1")
+
+    def test_matches(self):
+        """Test content comparison ignores quoting, case and trailing dots."""
+        assert matches("CNAME", ["Tunnel.cfargotunnel.com."], "tunnel.cfargotunnel.com")
+        assert matches("TXT", ['"v=spf1 " "~all"'], "v=spf1 ~all")
+        assert matches("MX", ["10 mail.example.com."], "mail.example.com")
+        assert matches("A", ["192.0.2.1"], None)
+        assert not matches("A", [], None)
+        assert not matches("A", ["192.0.2.2"], "192.0.2.1")
+
+
+class TestDNSPropagationChecker:
+    """Tests for DNSPropagationChecker."""
+
+    @pytest.mark.asyncio
+    async def test_resolvers_are_queried_concurrently(self):
+        """Test one check takes about as long as the slowest resolver."""
+        fake = FakeDoH(delay=0.2)
+        checker = DNSPropagationChecker(DOH, timeout=2, transport=httpx.MockTransport(fake))
+
+        started = time.monotonic()
+        result = await checker.check("blog.example.com", "a", "192.0.2.1")
+
+        assert time.monotonic() - started < 0.5  # sequential queries would take 0.6s
+        assert result.propagated
+        assert [answer.server for answer in result.answers] == ["Google", "Cloudflare", "Quad9"]
+        assert all(answer.protocol == "doh" for answer in result.answers)
+
+    @pytest.mark.asyncio
+    async def test_watch_polls_pending_resolvers(self):
+        """Test rounds re-query only resolvers that lag, until all agree."""
+        fake = FakeDoH(visible_after={"cloudflare-dns.com": 2, "dns.quad9.net": 1})
+        checker = DNSPropagationChecker(DOH, timeout=2, transport=httpx.MockTransport(fake))
+
+        rounds = [
+            result async for result in checker.watch(
+                "blog.example.com", "A", "192.0.2.1", deadline_seconds=5, initial_interval=0.01, max_interval=0.02
+            )
+        ]
+
+        assert [result.propagated for result in rounds] == [False, False, True]
+        assert rounds[0].answers[1].error == "No records found"
+        assert rounds[-1].checks == 3
+        assert fake.queries == {"dns.google": 1, "cloudflare-dns.com": 3, "dns.quad9.net": 2}
+
+    @pytest.mark.asyncio
+    async def test_wait_times_out(self):
+        """Test the final result is marked timed out at the deadline."""
+        fake = FakeDoH(visible_after={"dns.google": 1000})
+        checker = DNSPropagationChecker(DOH, timeout=2, transport=httpx.MockTransport(fake))
+
+        result = await checker.wait(
+            "blog.example.com", "A", deadline_seconds=0.05, initial_interval=0.01, max_interval=0.02
+        )
+
+        assert result.timed_out
+        assert not result.propagated
+        assert [answer.matched for answer in result.answers] == [False, True, True]
+
+    @pytest.mark.asyncio
+    async def test_plain_dns_over_udp(self):
+        """Test UDP resolvers are queried with dnspython."""
+        dns_message = pytest.importorskip("dns.message")
+        import dns.rrset
+
+        class StubDNS(asyncio.DatagramProtocol):
+            def connection_made(self, transport):
+                self.transport = transport
+
+            def datagram_received(self, data, addr):
+                query = dns_message.from_wire(data)
+                response = dns_message.make_response(query)
+                response.answer.append(dns.rrset.from_text(query.question[0].name, 300, "IN", "A", "192.0.2.1"))
+                self.transport.sendto(response.to_wire(), addr)
+
+        loop = asyncio.get_running_loop()
+        transport, _ = await loop.create_datagram_endpoint(StubDNS, local_addr=("127.0.0.1", 0))
+        port = transport.get_extra_info("sockname")[1]
+        try:
+            checker = DNSPropagationChecker([parse_resolver(f"local=udp:127.0.0.1:{port}")], timeout=2)
+            result = await checker.check("blog.example.com", "A", "192.0.2.1")
+        finally:
+            transport.close()
+
+        assert result.propagated
+        assert result.answers[0].records == ["192.0.2.1"]
+
+
+class TestVerifyEndpoints:
+    """Tests for the propagation endpoints."""
+
+    @pytest.fixture
+    def checker(self):
+        fake = FakeDoH(visible_after={"dns.quad9.net": 1})
+        checker = DNSPropagationChecker(DOH, timeout=2, transport=httpx.MockTransport(fake))
+        with patch("app.routers.domains.get_propagation_checker", return_value=checker):
+            yield checker
+
+    def test_verify_once(self, client, checker):
+        """Test a single check reports each resolver."""
+        response = client.post(
+            "/api/v1/domains/example.com/dns/verify",
+            params={"record_type": "A", "record_name": "blog", "expected_content": "192.0.2.1"},
+        )
+
+        data = response.json()
+        assert response.status_code == 200
+        assert data["name"] == "blog.example.com"
+        assert data["propagated"] is False
+        assert [server["matched"] for server in data["servers"]] == [True, True, False]
+
+    def test_stream_until_propagated(self, client, checker):
+        """Test SSE sends check events and ends with propagated."""
+        with patch("app.services.dns_propagation.settings.dns_propagation_poll_initial_seconds", 0.01):
+            response = client.get(
+                "/api/v1/domains/example.com/dns/verify/stream",
+                params={"record_type": "A", "record_name": "blog.example.com", "timeout": 5},
+            )
+
+        events = [line.split(": ", 1)[1] for line in response.text.splitlines() if line.startswith("event: ")]
+        assert events == ["check", "propagated"]
+
+    def test_invalid_resolver(self, client, checker):
+        """Test unknown resolvers are rejected."""
+        response = client.post(
+            "/api/v1/domains/example.com/dns/verify",
+            params={"record_type": "A", "record_name": "blog", "resolvers": "Google,nonsense"},
+        )
+
+        assert response.status_code == 400
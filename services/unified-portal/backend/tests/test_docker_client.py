@@ -0,0 +1,230 @@
+"""Tests for the Docker Engine API client."""
+
+import asyncio
+import io
+import json
+import struct
+import tarfile
+import threading
+
+import httpx
+import pytest
+
+from app.services.docker_client import (
+    DockerClient,
+    DockerNotFoundError,
+    StreamDemuxer,
+    calculate_cpu_percent,
+    calculate_memory_usage,
+    demux_stream,
+    format_binary_size,
+)
+
+
+def frame(stream_type: int, payload: bytes) -> bytes:
+    """Build a multiplexed stream frame."""
+    return struct.pack(">BxxxL", stream_type, len(payload)) + payload
+
+
+class TestStreamDemux:
+    """Tests for multiplexed stream parsing."""
+
+    def test_demux_stdout_and_stderr(self):
+        """Test splitting frames by stream type."""
+        data = frame(1, b"out1\n") + frame(2, b"err\n") + frame(1, b"out2\n")
+
+        stdout, stderr = demux_stream(data)
+
+        assert stdout == b"out1\nout2\n"
+        assert stderr == b"err\n"
+
+    def test_demux_raw_tty_stream(self):
+        """Test raw (TTY) output is returned as stdout."""
+        stdout, stderr = demux_stream(b"plain output\n")
+
+        assert stdout == b"plain output\n"
+        assert stderr == b""
+
+
+class TestStreamDemuxer:
+    """Tests for incremental stream demultiplexing."""
+
+    def test_frames_split_across_chunks(self):
+        """Test frames are emitted once complete, whatever the chunk size."""
+        data = frame(1, b"out1\n") + frame(2, b"err\n") + frame(1, b"out2\n")
+        demuxer = StreamDemuxer()
+
+        frames = []
+        for i in range(0, len(data), 3):
+            frames.extend(demuxer.feed(data[i:i + 3]))
+        frames.extend(demuxer.flush())
+
+        assert frames == [(1, b"out1\n"), (2, b"err\n"), (1, b"out2\n")]
+
+    def test_raw_tty_stream(self):
+        """Test raw (TTY) output is passed through as stdout."""
+        demuxer = StreamDemuxer()
+
+        frames = demuxer.feed(b"plain ") + demuxer.feed(b"output from a tty\n") + demuxer.flush()
+
+        assert b"".join(payload for _, payload in frames) == b"plain output from a tty\n"
+        assert all(stream_type == 1 for stream_type, _ in frames)
+
+
+class TestStatsCalculation:
+    """Tests for docker stats style calculations."""
+
+    def test_cpu_percent(self):
+        """Test CPU percentage from cpu_stats and precpu_stats."""
+        stats = {
+            "cpu_stats": {"cpu_usage": {"total_usage": 300}, "system_cpu_usage": 2000, "online_cpus": 2},
+            "precpu_stats": {"cpu_usage": {"total_usage": 100}, "system_cpu_usage": 1000},
+        }
+
+        assert calculate_cpu_percent(stats) == pytest.approx(40.0)
+
+    def test_memory_usage_excludes_cache(self):
+        """Test memory usage subtracts inactive file cache."""
+        stats = {"memory_stats": {"usage": 1000, "limit": 4000, "stats": {"inactive_file": 200}}}
+
+        assert calculate_memory_usage(stats) == (800, 4000)
+
+    def test_format_binary_size(self):
+        """Test binary unit formatting."""
+        assert format_binary_size(12.5 * 1024 * 1024) == "12.5MiB"
+        assert format_binary_size(512) == "512B"
+
+
+class TestDockerClient:
+    """Tests for DockerClient requests against a mock daemon."""
+
+    @pytest.mark.asyncio
+    async def test_list_containers_with_filters(self):
+        """Test container listing sends filters as JSON."""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen["path"] = request.url.path
+            seen["filters"] = json.loads(request.url.params["filters"])
+            return httpx.Response(200, json=[{"Id": "abc", "Names": ["/blog-nginx"], "State": "running"}])
+
+        client = DockerClient(transport=httpx.MockTransport(handler))
+        containers = await client.list_containers(filters={"name": ["blog-"]})
+
+        assert seen == {"path": "/containers/json", "filters": {"name": ["blog-"]}}
+        assert containers[0]["Names"] == ["/blog-nginx"]
+
+    @pytest.mark.asyncio
+    async def test_exec_returns_output_and_exit_code(self):
+        """Test exec create/start/inspect round trip."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            if request.url.path == "/containers/blog-redis/exec":
+                assert json.loads(request.content)["Cmd"] == ["redis-cli", "INFO"]
+                return httpx.Response(201, json={"Id": "exec1"})
+            if request.url.path == "/exec/exec1/start":
+                return httpx.Response(200, content=frame(1, b"redis_version:7.2\n") + frame(2, b"warn\n"))
+            if request.url.path == "/exec/exec1/json":
+                return httpx.Response(200, json={"ExitCode": 0})
+            return httpx.Response(500)
+
+        client = DockerClient(transport=httpx.MockTransport(handler))
+        result = await client.exec("blog-redis", ["redis-cli", "INFO"])
+
+        assert result.exit_code == 0
+        assert result.stdout == "redis_version:7.2\n"
+        assert result.stderr == "warn\n"
+
+    @pytest.mark.asyncio
+    async def test_not_found_raises(self):
+        """Test 404 responses raise DockerNotFoundError."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404, json={"message": "No such container: missing"})
+
+        client = DockerClient(transport=httpx.MockTransport(handler))
+
+        with pytest.raises(DockerNotFoundError) as exc_info:
+            await client.inspect_container("missing")
+        assert "No such container" in exc_info.value.message
+
+    @pytest.mark.asyncio
+    async def test_stream_logs(self):
+        """Test streamed logs send the filters and yield demultiplexed frames."""
+        seen = {}
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            seen.update(request.url.params)
+            return httpx.Response(200, content=frame(1, b"GET / 200\n") + frame(2, b"PHP Warning\n"))
+
+        client = DockerClient(transport=httpx.MockTransport(handler))
+        frames = [item async for item in client.stream_logs("blog-nginx", follow=True, tail="10", since=1700000000)]
+
+        assert frames == [(1, b"GET / 200\n"), (2, b"PHP Warning\n")]
+        assert seen["follow"] == "true"
+        assert seen["tail"] == "10"
+        assert float(seen["since"]) == 1700000000
+
+    @pytest.mark.asyncio
+    async def test_stream_logs_not_found(self):
+        """Test streaming logs of a missing container raises DockerNotFoundError."""
+        def handler(request: httpx.Request) -> httpx.Response:
+            return httpx.Response(404, json={"message": "No such container: missing"})
+
+        client = DockerClient(transport=httpx.MockTransport(handler))
+
+        with pytest.raises(DockerNotFoundError):
+            async for _ in client.stream_logs("missing"):
+                pass
+
+    @pytest.mark.asyncio
+    async def test_put_and_get_files(self):
+        """Test files round-trip through the archive endpoint in one request each."""
+        archives = []
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            assert request.url.params["path"] == "/etc/nginx/conf.d"
+            if request.method == "PUT":
+                archives.append(request.content)
+                return httpx.Response(200)
+            # GET returns the directory itself as the tar root
+            buffer = io.BytesIO()
+            with tarfile.open(fileobj=buffer, mode="w") as tar, tarfile.open(fileobj=io.BytesIO(archives[0])) as uploaded:
+                tar.addfile(tarfile.TarInfo("conf.d"))
+                for member in uploaded:
+                    data = uploaded.extractfile(member).read()
+                    member.name = f"conf.d/{member.name}"
+                    tar.addfile(member, io.BytesIO(data))
+            return httpx.Response(200, content=buffer.getvalue())
+
+        client = DockerClient(transport=httpx.MockTransport(handler))
+        await client.put_files("blog-nginx", "/etc/nginx/conf.d", {"a.conf": "server {}", "b.conf": "# b"})
+        files = await client.get_files("blog-nginx", "/etc/nginx/conf.d")
+
+        assert len(archives) == 1
+        assert files == {"a.conf": "server {}", "b.conf": "# b"}
+
+    @pytest.mark.asyncio
+    async def test_client_of_other_loop_is_closed(self):
+        """Test the pooled client of another (still running) loop is closed when replaced."""
+        client = DockerClient(transport=httpx.MockTransport(lambda request: httpx.Response(200, json=[])))
+        other = asyncio.new_event_loop()
+        thread = threading.Thread(target=other.run_forever, daemon=True)
+        thread.start()
+
+        async def bind():
+            return client.client
+
+        try:
+            old = asyncio.run_coroutine_threadsafe(bind(), other).result(timeout=5)
+            new = client.client
+            for _ in range(100):
+                if old.is_closed:
+                    break
+                await asyncio.sleep(0.01)
+        finally:
+            other.call_soon_threadsafe(other.stop)
+            thread.join(timeout=5)
+            other.close()
+
+        assert new is not old
+        assert old.is_closed
+        assert not new.is_closed
@@ -155,3 +155,19 @@ class TestDockerRouterErrors:
         """Test invalid container operations."""
         response = client.post("/api/v1/docker/containers/nonexistent/start")
         assert response.status_code in [404, 500]
+
+
+class TestDockerContainerLogStream:
+    """Tests for GET /api/v1/docker/containers/{container_id}/logs/stream endpoint."""
+
+    @pytest.mark.parametrize("query", [
+        "grep=(unclosed",
+        "since=yesterday",
+        "tail=-5",
+        "stdout=false&stderr=false",
+    ])
+    def test_invalid_parameters(self, client, query):
+        """Test invalid filters are rejected before streaming."""
+        response = client.get(f"/api/v1/docker/containers/blog-nginx/logs/stream?{query}")
+
+        assert response.status_code == 400
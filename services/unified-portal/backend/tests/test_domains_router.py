@@ -0,0 +1,91 @@
+"""Tests for Domain management API endpoints (Cloudflare mocked)."""
+
+import json
+from unittest.mock import patch
+
+import pytest
+
+from app.routers.domains import settings
+from app.services.cloudflare_dns_cache import CloudflareDNSCache
+from tests.conftest import CLOUDFLARE_ZONE_ID
+
+ZONES = [
+    {"id": f"{n:032x}", "name": f"site{n}.example", "status": "active", "name_servers": []}
+    for n in range(120)
+]
+ZONES[0].update(id=CLOUDFLARE_ZONE_ID, name="example.com")
+
+RECORDS = [
+    {"id": f"r{n}", "type": "A" if n % 2 else "TXT", "name": f"h{n}.example.com",
+     "content": "192.0.2.1", "ttl": 1, "proxied": False}
+    for n in range(12)
+]
+
+pytestmark = pytest.mark.parametrize("cloudflare_fake", [{"zones": ZONES, "records": RECORDS}], indirect=True)
+
+
+@pytest.fixture
+def cloudflare(cloudflare_fake, cloudflare_client):
+    with patch.object(settings, "cloudflare_api_token", "token"), \
+            patch("app.routers.domains.get_cloudflare_client", return_value=cloudflare_client), \
+            patch("app.routers.domains.get_cloudflare_dns_cache", return_value=CloudflareDNSCache(cloudflare_client)), \
+            patch("app.routers.domains.DNS_RECORDS_PAGE_SIZE", 5):
+        yield cloudflare_fake
+
+
+class TestListZones:
+    """Tests for GET /api/v1/domains/zones."""
+
+    def test_all_pages(self, client, cloudflare):
+        """Test zones beyond the first page are returned in order."""
+        response = client.get("/api/v1/domains/zones")
+
+        assert response.status_code == 200
+        assert [zone["id"] for zone in response.json()] == [zone["id"] for zone in cloudflare.zones]
+        assert sorted(cloudflare.pages) == [1, 2, 3]
+
+    def test_ndjson(self, client, cloudflare):
+        """Test NDJSON streams one zone per line."""
+        response = client.get("/api/v1/domains/zones?format=ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        assert len(lines) == 120
+        assert lines[0]["name"] == "example.com"
+
+    def test_ndjson_late_error(self, client, cloudflare):
+        """Test a failing later page ends the stream with an error line."""
+        cloudflare.fail_page = 3
+
+        response = client.get("/api/v1/domains/zones?format=ndjson")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 101
+        assert "page failed" in lines[-1]["error"]
+
+    def test_first_page_error(self, client, cloudflare):
+        """Test a failing first page is an HTTP error."""
+        cloudflare.fail_page = 1
+
+        response = client.get("/api/v1/domains/zones?format=ndjson")
+
+        assert response.status_code == 400
+
+
+class TestGetDNSRecords:
+    """Tests for GET /api/v1/domains/{domain}/dns."""
+
+    def test_all_pages(self, client, cloudflare):
+        """Test records of every page are returned."""
+        response = client.get("/api/v1/domains/example.com/dns")
+
+        assert response.status_code == 200
+        assert len(response.json()) == 12
+
+    def test_ndjson_with_type(self, client, cloudflare):
+        """Test NDJSON streams filtered records from the API."""
+        response = client.get("/api/v1/domains/example.com/dns?format=ndjson&record_type=a")
+
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        assert len(lines) == 6
+        assert {line["type"] for line in lines} == {"A"}
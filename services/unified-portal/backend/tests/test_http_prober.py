@@ -0,0 +1,288 @@
+"""Tests for the HTTP site prober against local stub servers."""
+
+import asyncio
+import datetime
+import ssl
+
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.x509.oid import NameOID
+
+from app.services import http_prober
+from app.services.http_prober import HttpProber, ProbeTarget, percentile
+
+
+class StubServer:
+    """Minimal keep-alive HTTP/1.1 server answering by Host header and path."""
+
+    def __init__(self, routes):
+        self.routes = routes  # (host, path) or path -> status code
+        self.connections = 0
+        self.requests = []
+        self._server = None
+
+    async def _handle(self, reader, writer):
+        self.connections += 1
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                lines = head.decode().split("\r\n")
+                path = lines[0].split(" ")[1]
+                headers = dict(line.split(": ", 1) for line in lines[1:] if ": " in line)
+                host = headers.get("host") or headers.get("Host")
+                self.requests.append((host, path, headers))
+                status = self.routes.get((host, path), self.routes.get(path, 404))
+                writer.write(
+                    f"HTTP/1.1 {status} Stub\r\nContent-Length: 2\r\nConnection: keep-alive\r\n\r\nok".encode()
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def __aenter__(self):
+        self._server = await asyncio.start_server(self._handle, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def __aexit__(self, *exc):
+        self._server.close()
+        await self._server.wait_closed()
+
+
+def self_signed_context(tmp_path, not_after):
+    """Create a server TLS context with a self-signed certificate."""
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "localhost")])
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(datetime.datetime(2020, 1, 1))
+        .not_valid_after(not_after)
+        .sign(key, hashes.SHA256())
+    )
+    cert_path = tmp_path / "cert.pem"
+    key_path = tmp_path / "key.pem"
+    cert_path.write_bytes(cert.public_bytes(serialization.Encoding.PEM))
+    key_path.write_bytes(key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ))
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert_path, key_path)
+    return context
+
+
+class TestPercentile:
+    """Tests for nearest-rank percentiles."""
+
+    def test_percentile(self):
+        """Test median and p95 of a sample."""
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 50) == 50.0
+        assert percentile(values, 95) == 95.0
+        assert percentile([], 50) is None
+        assert percentile([7.0], 95) == 7.0
+
+
+class TestHttpProber:
+    """Tests for HttpProber."""
+
+    @pytest.mark.asyncio
+    async def test_probe_all_reuses_connections(self):
+        """Test that all sites are probed and connections are kept alive."""
+        async with StubServer({"/": 200, "/broken": 503}) as server:
+            base = f"http://127.0.0.1:{server.port}"
+            targets = [ProbeTarget("ok", f"{base}/"), ProbeTarget("broken", f"{base}/broken")]
+            prober = HttpProber(concurrency=1, via_url="", timeout=5)
+
+            for _ in range(3):
+                await prober.probe_all(targets)
+            await prober.stop()
+
+        assert server.connections == 1
+        ok = prober.get("ok")
+        assert ok.status == "up"
+        assert ok.status_codes == [200, 200, 200]
+        assert ok.availability == 100.0
+        assert ok.p50_ms is not None and ok.p95_ms >= ok.p50_ms
+        broken = prober.get("broken")
+        assert broken.status == "down"
+        assert broken.availability == 0.0
+
+    @pytest.mark.asyncio
+    async def test_probe_via_local_proxy(self):
+        """Test that probes go to the proxy with the site's Host header."""
+        async with StubServer({("example.com", "/blog/"): 200}) as server:
+            prober = HttpProber(via_url=f"http://127.0.0.1:{server.port}", timeout=5)
+
+            stats = await prober.probe(ProbeTarget("blog", "http://example.com/blog/"))
+            await prober.stop()
+
+        assert stats.latest.status_code == 200
+        host, path, _ = server.requests[0]
+        assert (host, path) == ("example.com", "/blog/")
+
+    @pytest.mark.asyncio
+    async def test_unreachable_site(self):
+        """Test that connection failures are recorded as down."""
+        async with StubServer({}) as server:
+            port = server.port
+        prober = HttpProber(via_url="", timeout=2)
+
+        stats = await prober.probe(ProbeTarget("gone", f"http://127.0.0.1:{port}/"))
+        await prober.stop()
+
+        assert stats.status == "down"
+        assert stats.latest.status_code is None
+        assert stats.latest.error
+        assert stats.p50_ms is None
+
+    @pytest.mark.asyncio
+    async def test_history_is_bounded(self):
+        """Test that only the most recent results are kept."""
+        async with StubServer({"/": 200}) as server:
+            prober = HttpProber(via_url="", history_size=2, timeout=5)
+            target = ProbeTarget("ok", f"http://127.0.0.1:{server.port}/")
+
+            for _ in range(5):
+                await prober.probe(target)
+            await prober.stop()
+
+        assert len(prober.get("ok").history) == 2
+
+    @pytest.mark.asyncio
+    async def test_background_targets(self):
+        """Test that the background round probes the configured targets."""
+        async with StubServer({"/": 200}) as server:
+            async def targets():
+                return [ProbeTarget("ok", f"http://127.0.0.1:{server.port}/")]
+
+            prober = HttpProber(targets=targets, via_url="", timeout=5)
+            assert prober.all() == []
+
+            await prober.probe_all()
+            await prober.stop()
+
+        assert [stats.status for stats in prober.all()] == ["up"]
+
+    @pytest.mark.asyncio
+    async def test_tls_expiry(self, tmp_path):
+        """Test that the certificate expiry is read and cached."""
+        not_after = datetime.datetime(2040, 6, 1)
+        context = self_signed_context(tmp_path, not_after)
+        handshakes = 0
+
+        async def handle(reader, writer):
+            nonlocal handshakes
+            handshakes += 1
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        prober = HttpProber(via_url="", timeout=5, verify=False)
+
+        first = await prober.tls_expiry(f"https://localhost:{port}/")
+        second = await prober.tls_expiry(f"https://localhost:{port}/")
+        server.close()
+        await server.wait_closed()
+
+        expected = not_after.replace(tzinfo=datetime.timezone.utc).timestamp()
+        assert first == second == expected
+        assert handshakes == 1
+        assert await prober.tls_expiry("http://localhost/") is None
+
+    @pytest.mark.asyncio
+    async def test_expired_certificate(self, tmp_path):
+        """Test that an expired certificate still reports its expiry and an error."""
+        not_after = datetime.datetime(2021, 1, 1)
+        context = self_signed_context(tmp_path, not_after)
+
+        async def handle(reader, writer):
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        prober = HttpProber(via_url="", timeout=5)
+
+        stats = await prober.probe(ProbeTarget("expired", f"https://localhost:{port}/"))
+        await prober.stop()
+        server.close()
+        await server.wait_closed()
+
+        expected = not_after.replace(tzinfo=datetime.timezone.utc).timestamp()
+        assert stats.tls_expires_at == expected
+        assert stats.tls_days_left < 0
+        assert stats.tls_error == "Certificate expired"
+
+    @pytest.mark.asyncio
+    async def test_untrusted_certificate(self, tmp_path):
+        """Test that verification errors are reported next to the expiry."""
+        not_after = datetime.datetime(2040, 6, 1)
+        context = self_signed_context(tmp_path, not_after)
+
+        async def handle(reader, writer):
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        prober = HttpProber(via_url="", timeout=5)
+
+        check = await prober.tls_check(f"https://localhost:{port}/")
+        server.close()
+        await server.wait_closed()
+
+        assert check.expires_at == not_after.replace(tzinfo=datetime.timezone.utc).timestamp()
+        assert check.error.startswith("Certificate verification failed")
+
+    @pytest.mark.asyncio
+    async def test_unreadable_certificate(self, tmp_path, monkeypatch):
+        """Test that a certificate that cannot be parsed is reported, not raised."""
+        context = self_signed_context(tmp_path, datetime.datetime(2040, 6, 1))
+
+        async def handle(reader, writer):
+            writer.close()
+
+        def unparsable(der):
+            raise ValueError("error parsing asn1 value")
+
+        monkeypatch.setattr(http_prober, "certificate_expiry", unparsable)
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, ssl=context)
+        port = server.sockets[0].getsockname()[1]
+        prober = HttpProber(via_url="", timeout=5)
+
+        check = await prober.tls_check(f"https://localhost:{port}/")
+        server.close()
+        await server.wait_closed()
+
+        assert check.expires_at is None
+        assert check.error == "Unreadable certificate: error parsing asn1 value"
+
+    @pytest.mark.asyncio
+    async def test_failing_probe_does_not_abort_round(self, monkeypatch):
+        """Test that an exception probing one site leaves the others probed."""
+        async with StubServer({"/": 200}) as server:
+            prober = HttpProber(via_url="", timeout=5)
+            probe = prober.probe
+
+            async def flaky(target):
+                if target.name == "bad":
+                    raise RuntimeError("boom")
+                return await probe(target)
+
+            monkeypatch.setattr(prober, "probe", flaky)
+            results = await prober.probe_all([
+                ProbeTarget("bad", f"http://127.0.0.1:{server.port}/"),
+                ProbeTarget("ok", f"http://127.0.0.1:{server.port}/"),
+            ])
+            await prober.stop()
+
+        assert [stats.status for stats in results] == ["unknown", "up"]
@@ -0,0 +1,100 @@
+"""Tests for streamed container log helpers."""
+
+import asyncio
+
+import pytest
+
+from app.services.log_stream import (
+    LineSplitter,
+    compile_filter,
+    iter_log_lines,
+    parse_log_time,
+    with_keepalive,
+)
+
+
+async def frames_of(*frames):
+    """Async iterator over the given frames."""
+    for item in frames:
+        yield item
+
+
+class TestParseLogTime:
+    """Tests for since/until parsing."""
+
+    def test_relative(self):
+        """Test durations are subtracted from the reference time."""
+        assert parse_log_time("10m", now=1000.0) == 400.0
+        assert parse_log_time("1h", now=7200.0) == 3600.0
+        assert parse_log_time("1d", now=86400.0) == 0.0
+
+    def test_absolute(self):
+        """Test Unix timestamps and ISO 8601 (UTC if no offset)."""
+        assert parse_log_time("1700000000") == 1700000000.0
+        assert parse_log_time("2023-11-14T22:13:20Z") == 1700000000.0
+        assert parse_log_time("2023-11-14T22:13:20") == 1700000000.0
+
+    def test_invalid(self):
+        """Test unparseable values raise ValueError."""
+        with pytest.raises(ValueError):
+            parse_log_time("yesterday")
+
+
+class TestLineSplitter:
+    """Tests for LineSplitter."""
+
+    def test_lines_split_across_frames(self):
+        """Test partial lines are joined per stream."""
+        splitter = LineSplitter()
+
+        lines = splitter.feed(1, b"first li")
+        lines += splitter.feed(2, b"error\r\n")
+        lines += splitter.feed(1, b"ne\nsecond")
+        lines += splitter.flush()
+
+        assert lines == [(2, "error"), (1, "first line"), (1, "second")]
+
+    def test_long_lines_are_split(self):
+        """Test lines beyond the limit do not grow the buffer."""
+        splitter = LineSplitter(max_line_bytes=4)
+
+        lines = splitter.feed(1, b"abcdefghij")
+
+        assert lines == [(1, "abcd"), (1, "efgh")]
+        assert splitter.flush() == [(1, "ij")]
+
+
+class TestIterLogLines:
+    """Tests for filtered log line iteration."""
+
+    @pytest.mark.asyncio
+    async def test_grep_filter(self):
+        """Test only matching lines are yielded with their stream name."""
+        frames = frames_of((1, b"GET / 200\nGET /wp-login.php 404\n"), (2, b"PHP Fatal error\n"))
+
+        lines = [line async for line in iter_log_lines(frames, compile_filter("404|fatal", ignore_case=True))]
+
+        assert lines == [("stdout", "GET /wp-login.php 404"), ("stderr", "PHP Fatal error")]
+
+    def test_invalid_pattern(self):
+        """Test invalid regular expressions raise ValueError."""
+        with pytest.raises(ValueError):
+            compile_filter("(unclosed")
+
+
+class TestWithKeepalive:
+    """Tests for idle keepalives."""
+
+    @pytest.mark.asyncio
+    async def test_keepalive_does_not_lose_items(self):
+        """Test keepalives are sent while idle and the pending item still arrives."""
+        async def slow():
+            yield "first"
+            await asyncio.sleep(0.05)
+            yield "second"
+
+        items = [item async for item in with_keepalive(slow(), interval=0.01)]
+
+        assert items[0] == "first"
+        assert items[-1] == "second"
+        assert None in items
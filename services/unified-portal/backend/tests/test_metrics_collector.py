@@ -0,0 +1,170 @@
+"""Tests for the dashboard background metrics collector."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.metrics_collector import MetricsCollector, diff_values
+
+
+class TestMetricsCollector:
+    """Tests for MetricsCollector snapshot handling."""
+
+    @pytest.mark.asyncio
+    async def test_refresh_populates_snapshot(self):
+        """Test that refresh stores the value of every source."""
+        collector = MetricsCollector(sources={"a": lambda: 1, "b": lambda: "x"})
+
+        await collector.refresh()
+
+        assert (await collector.get("a")).value == 1
+        assert (await collector.get("b")).value == "x"
+        assert (await collector.get("a")).collected_at > 0
+
+    @pytest.mark.asyncio
+    async def test_failed_source_keeps_previous_value(self):
+        """Test that a failing source keeps its last value and records the error."""
+        calls = {"count": 0}
+
+        def flaky():
+            calls["count"] += 1
+            if calls["count"] > 1:
+                raise RuntimeError("boom")
+            return 42
+
+        collector = MetricsCollector(sources={"flaky": flaky})
+        await collector.refresh()
+        await collector.refresh()
+
+        sample = await collector.get("flaky")
+        assert sample.value == 42
+        assert sample.error == "boom"
+
+    @pytest.mark.asyncio
+    async def test_get_collects_inline_when_empty(self):
+        """Test that get() collects on demand before the first refresh."""
+        collector = MetricsCollector(sources={"a": lambda: 7})
+
+        assert (await collector.get("a")).value == 7
+
+    @pytest.mark.asyncio
+    async def test_async_source(self):
+        """Test that coroutine sources are awaited."""
+        async def source():
+            return "async"
+
+        collector = MetricsCollector(sources={"a": source})
+        await collector.refresh()
+
+        assert (await collector.get("a")).value == "async"
+
+    @pytest.mark.asyncio
+    async def test_get_raises_source_error_when_empty(self):
+        """Test that get() surfaces the source error when nothing is cached."""
+        def broken():
+            raise RuntimeError("unavailable")
+
+        collector = MetricsCollector(sources={"broken": broken})
+
+        with pytest.raises(RuntimeError):
+            await collector.get("broken")
+
+    @pytest.mark.asyncio
+    async def test_start_and_stop(self):
+        """Test background task lifecycle."""
+        collector = MetricsCollector(sources={"a": lambda: 1}, interval=60)
+
+        collector.start()
+        assert collector.running
+
+        await collector.stop()
+        assert not collector.running
+
+    @pytest.mark.asyncio
+    async def test_subscribers_receive_deltas(self):
+        """Test that subscribers receive only the changed fields."""
+        values = iter([{"cpu": 1, "mem": 2}, {"cpu": 1, "mem": 3}, {"cpu": 1, "mem": 3}])
+        collector = MetricsCollector(sources={"system": lambda: next(values)})
+        await collector.refresh()
+
+        queue = collector.subscribe()
+        await collector.refresh()
+        await collector.refresh()
+
+        delta = queue.get_nowait()
+        assert delta["source"] == "system"
+        assert delta["changes"] == {"mem": 3}
+        assert queue.empty()
+
+        collector.unsubscribe(queue)
+        assert collector.snapshot() == {"system": {"cpu": 1, "mem": 3}}
+
+    @pytest.mark.asyncio
+    async def test_slow_subscriber_gets_resync(self):
+        """Test that an overflowing subscriber queue is replaced by a resync marker."""
+        counter = iter(range(10))
+        collector = MetricsCollector(sources={"a": lambda: next(counter)})
+        queue = collector.subscribe(maxsize=2)
+
+        for _ in range(3):
+            await collector.refresh()
+
+        assert queue.get_nowait() is None
+        assert queue.empty()
+
+
+class TestDiffValues:
+    """Tests for diff_values."""
+
+    def test_named_records_diff_per_item(self):
+        """Test that lists of named records are diffed by name."""
+        old = [{"name": "nginx", "cpu": "1%"}, {"name": "redis", "cpu": "2%"}]
+        new = [{"name": "nginx", "cpu": "5%"}, {"name": "mariadb", "cpu": "0%"}]
+
+        assert diff_values(old, new) == {
+            "nginx": {"cpu": "5%"},
+            "mariadb": {"name": "mariadb", "cpu": "0%"},
+            "redis": None,
+        }
+
+    def test_no_change(self):
+        """Test that identical values produce no delta."""
+        assert diff_values({"a": [1, 2]}, {"a": [1, 2]}) is None
+
+
+class TestConcurrentRefresh:
+    """Tests for concurrent refresh with per-source timeouts."""
+
+    @pytest.mark.asyncio
+    async def test_sources_refresh_concurrently(self):
+        """Test that refresh latency is bounded by the slowest source."""
+        async def slow():
+            await asyncio.sleep(0.2)
+            return "slow"
+
+        collector = MetricsCollector(sources={"a": slow, "b": slow, "c": slow})
+
+        started = time.monotonic()
+        await collector.refresh()
+
+        assert time.monotonic() - started < 0.5
+        assert (await collector.get("c")).value == "slow"
+
+    @pytest.mark.asyncio
+    async def test_timeout_marks_source_stale(self):
+        """Test that a source exceeding the timeout keeps its value and is stale."""
+        delays = iter([0, 1])
+
+        async def source():
+            await asyncio.sleep(next(delays))
+            return "value"
+
+        collector = MetricsCollector(sources={"a": source}, timeout=0.05)
+        await collector.refresh()
+        await collector.refresh()
+
+        sample = await collector.get("a")
+        assert sample.value == "value"
+        assert "timed out" in sample.error
+        assert collector.is_stale(sample)
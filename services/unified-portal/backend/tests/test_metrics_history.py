@@ -0,0 +1,67 @@
+"""Tests for the dashboard metrics history store."""
+
+import pytest
+
+from app.services.metrics_history import CpuUsageTracker, MetricsHistory, RingBuffer, Tier
+
+
+class TestRingBuffer:
+    """Tests for RingBuffer."""
+
+    def test_overwrites_oldest(self):
+        """Test that the buffer keeps only the newest points in order."""
+        buffer = RingBuffer(3)
+        for i in range(5):
+            buffer.append(float(i), float(i * 10))
+
+        assert len(buffer) == 3
+        assert buffer.range() == ([2.0, 3.0, 4.0], [20.0, 30.0, 40.0])
+
+    def test_range_filter(self):
+        """Test since/until filtering."""
+        buffer = RingBuffer(10)
+        for i in range(5):
+            buffer.append(float(i), float(i))
+
+        assert buffer.range(since=1.0, until=3.0)[0] == [1.0, 2.0, 3.0]
+
+
+class TestMetricsHistory:
+    """Tests for MetricsHistory downsampling."""
+
+    def test_downsampled_tiers(self):
+        """Test that coarser tiers hold bucket averages."""
+        history = MetricsHistory(tiers=(Tier("1s", 1, 100), Tier("10s", 10, 10)))
+        for t in range(20):
+            history.record({"cpu": float(t)}, timestamp=float(t))
+
+        timestamps, values = history.query("cpu", "10s")
+        assert timestamps == [0.0, 10.0]
+        assert values == [pytest.approx(4.5), pytest.approx(14.5)]
+
+        assert len(history.query("cpu", "1s")[0]) == 20
+
+    def test_unknown_series_and_resolution(self):
+        """Test errors for unknown series and resolutions."""
+        history = MetricsHistory()
+        history.record({"cpu": 1.0})
+
+        with pytest.raises(KeyError):
+            history.query("memory")
+        with pytest.raises(ValueError):
+            history.query("cpu", "5m")
+
+
+class TestCpuUsageTracker:
+    """Tests for CpuUsageTracker."""
+
+    def test_percent_over_interval(self, tmp_path):
+        """Test that utilization is computed between two reads."""
+        stat = tmp_path / "stat"
+        tracker = CpuUsageTracker(proc_root=str(tmp_path))
+
+        stat.write_text("cpu  100 0 100 800 0 0 0 0 0 0\n")
+        tracker.percent()
+        stat.write_text("cpu  150 0 150 900 0 0 0 0 0 0\n")
+
+        assert tracker.percent() == pytest.approx(50.0)
@@ -0,0 +1,268 @@
+"""Tests for transactional nginx configuration changes."""
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.services.docker_client import ExecResult
+from app.services.nginx_config_service import NginxConfigService, SiteConfig, _template_environment, settings
+
+
+class FakeNginxContainer:
+    """In-memory nginx container: conf.d files and exec of rm/nginx."""
+
+    def __init__(self, files=None, valid=lambda files: True):
+        self.files = dict(files or {})
+        self.valid = valid
+        self.calls = []
+        self.test_delay = 0
+
+    async def get_files(self, container, directory):
+        self.calls.append("get_files")
+        return dict(self.files)
+
+    async def put_files(self, container, directory, files, mode=0o644):
+        self.calls.append("put_files")
+        self.files.update(files)
+
+    async def exec(self, container, cmd, timeout=None):
+        self.calls.append(" ".join(cmd[:2]))
+        if cmd[0] == "rm":
+            for path in cmd[2:]:
+                self.files.pop(path.rsplit("/", 1)[1], None)
+            return ExecResult(0, "", "")
+        if cmd == ["nginx", "-t"]:
+            await asyncio.sleep(self.test_delay)
+            if self.valid(self.files):
+                return ExecResult(0, "", "syntax is ok")
+            return ExecResult(1, "", "nginx: [emerg] unexpected end of file")
+        return ExecResult(0, "", "")
+
+
+@pytest.fixture
+def container():
+    fake = FakeNginxContainer({"a.conf": "old a", "b.conf": "old b"})
+    with patch("app.services.nginx_config_service.get_docker_client", return_value=fake):
+        yield fake
+
+
+class TestNginxConfigTransaction:
+    """Tests for NginxConfigTransaction."""
+
+    @pytest.mark.asyncio
+    async def test_batch_is_tested_and_reloaded_once(self, container):
+        """Test many writes and deletes take one upload, one test and one reload."""
+        service = NginxConfigService()
+
+        async with service.transaction() as tx:
+            tx.write("a.conf", "new a")
+            tx.write("c.conf", "new c")
+            tx.delete("b.conf")
+
+        assert container.files == {"a.conf": "new a", "c.conf": "new c"}
+        assert container.calls.count("put_files") == 1
+        assert container.calls.count("nginx -t") == 1
+        assert container.calls.count("nginx -s") == 1
+        assert tx.result.written == ["a.conf", "c.conf"]
+        assert tx.result.deleted == ["b.conf"]
+        assert tx.result.reloaded
+
+    @pytest.mark.asyncio
+    async def test_failed_test_rolls_back_everything(self, container):
+        """Test a rejected configuration restores all touched files."""
+        container.valid = lambda files: "broken" not in files.values()
+        service = NginxConfigService()
+
+        with pytest.raises(ValueError, match="rolled back"):
+            async with service.transaction() as tx:
+                tx.write("a.conf", "new a")
+                tx.write("c.conf", "broken")
+                tx.delete("b.conf")
+
+        assert container.files == {"a.conf": "old a", "b.conf": "old b"}
+        assert "nginx -s" not in container.calls
+
+    @pytest.mark.asyncio
+    async def test_unchanged_configs_skip_reload(self, container):
+        """Test rewriting identical content does not test or reload nginx."""
+        service = NginxConfigService()
+
+        async with service.transaction() as tx:
+            tx.write("a.conf", "old a")
+            tx.delete("missing.conf")
+
+        assert tx.result.written == []
+        assert tx.result.reloaded is False
+        assert "nginx -t" not in container.calls
+
+    @pytest.mark.asyncio
+    async def test_exception_in_block_applies_nothing(self, container):
+        """Test staged changes are discarded if the block raises."""
+        service = NginxConfigService()
+
+        with pytest.raises(RuntimeError):
+            async with service.transaction() as tx:
+                tx.write("a.conf", "new a")
+                raise RuntimeError("abort")
+
+        assert container.files["a.conf"] == "old a"
+        assert container.calls == []
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_does_not_interrupt_apply(self, container):
+        """Test a cancelled caller leaves the staged batch to be tested and reloaded."""
+        container.test_delay = 0.05
+        service = NginxConfigService()
+        tx = service.transaction()
+        tx.write("a.conf", "new a")
+
+        caller = asyncio.create_task(tx.apply())
+        await asyncio.sleep(0.01)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+        async with service._transaction_lock():
+            pass
+
+        assert container.files["a.conf"] == "new a"
+        assert container.calls[-1] == "nginx -s"
+
+    @pytest.mark.asyncio
+    async def test_cancelled_apply_rolls_back(self, container):
+        """Test cancelling between staging and the test restores the files."""
+        container.test_delay = 0.05
+        service = NginxConfigService()
+
+        task = asyncio.create_task(service._apply_changes({"a.conf": "new a", "c.conf": "new c"}, set(), True))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        assert container.files == {"a.conf": "old a", "b.conf": "old b"}
+        assert "nginx -s" not in container.calls
+
+    def test_invalid_filename(self, container):
+        """Test paths outside the config directory are rejected."""
+        tx = NginxConfigService().transaction()
+
+        with pytest.raises(ValueError):
+            tx.write("../nginx.conf", "")
+
+
+class TestNginxTemplates:
+    """Tests for site configuration templates."""
+
+    def test_templates_are_compiled_once(self):
+        """Test the environment returns the cached compiled template."""
+        assert _template_environment.get_template("wordpress.conf.j2") is _template_environment.get_template("wordpress.conf.j2")
+
+    def test_variants(self):
+        """Test each variant renders its specific directives."""
+        service = NginxConfigService()
+
+        cached = service.generate_wordpress_config("demo", "demo.example.com", "8.2", variant="wordpress-fastcgi-cache")
+        static = service.generate_wordpress_config("demo", "demo.example.com", "8.2", variant="static")
+        proxy = service.generate_wordpress_config(
+            "demo", "demo.example.com", "8.2", variant="reverse-proxy", proxy_pass="http://app:3000"
+        )
+
+        assert "fastcgi_cache WORDPRESS;" in cached
+        assert "# Variant: wordpress-fastcgi-cache" in cached
+        assert "fastcgi_pass" not in static
+        assert "root /var/www/html/demo;" in static
+        assert "proxy_pass http://app:3000;" in proxy
+        assert "root /var/www/html" not in proxy
+
+    def test_php_version_upstream(self):
+        """Test PHP versions map to their FastCGI upstream."""
+        service = NginxConfigService()
+
+        with patch.dict(settings.nginx_php_upstreams, {"8.2": "php-8-2:9000"}):
+            config = service.generate_wordpress_config("demo", "demo.example.com", "8.2")
+
+        assert "fastcgi_pass php-8-2:9000;" in config
+        assert "fastcgi_pass wordpress:9000;" in service.generate_wordpress_config("demo", "demo.example.com", "8.1")
+
+    def test_invalid_variant(self):
+        """Test unknown variants and missing or unsafe proxy targets are rejected."""
+        service = NginxConfigService()
+
+        with pytest.raises(ValueError):
+            service.generate_wordpress_config("demo", "demo.example.com", "8.2", variant="php-cgi")
+        with pytest.raises(ValueError):
+            service.generate_wordpress_config("demo", "demo.example.com", "8.2", variant="reverse-proxy")
+        with pytest.raises(ValueError):
+            service.generate_wordpress_config(
+                "demo", "demo.example.com", "8.2", variant="reverse-proxy", proxy_pass="http://app; return 200"
+            )
+
+
+class TestRegenerateSiteConfigs:
+    """Tests for batch regeneration with render-diff."""
+
+    @pytest.mark.asyncio
+    async def test_unchanged_sites_are_skipped(self, container):
+        """Test only changed configs are written, keeping deployed variants."""
+        service = NginxConfigService()
+        container.files = {
+            "a.conf": service.generate_wordpress_config("a", "a.example.com", "8.1"),
+            "b.conf": service.generate_wordpress_config("b", "b.example.com", "8.1", variant="static"),
+        }
+        sites = [
+            SiteConfig("a", "a.example.com", "8.1"),
+            SiteConfig("b", "b.example.com", "8.2"),
+        ]
+
+        result = await service.regenerate_site_configs(sites)
+
+        assert result.unchanged == ["a.conf"]
+        assert result.changed == ["b.conf"]
+        assert "+# PHP version: 8.2" in result.diffs["b.conf"]
+        assert "# Variant: static" in container.files["b.conf"]
+        assert result.reloaded
+        assert container.calls.count("nginx -s") == 1
+
+    @pytest.mark.asyncio
+    async def test_dry_run(self, container):
+        """Test dry runs report diffs without writing."""
+        service = NginxConfigService()
+
+        result = await service.regenerate_site_configs([SiteConfig("c", "c.example.com", "8.2")], dry_run=True)
+
+        assert result.changed == ["c.conf"]
+        assert result.diffs["c.conf"].startswith("--- a/c.conf")
+        assert "c.conf" not in container.files
+        assert "put_files" not in container.calls
+
+    @pytest.mark.asyncio
+    async def test_unrenderable_site_is_skipped(self, container):
+        """Test a site that cannot be rendered is reported without aborting the batch."""
+        service = NginxConfigService()
+        sites = [
+            SiteConfig("a", "a.example.com", "8.2", variant="php-cgi"),
+            SiteConfig("b", "b.example.com", "8.2"),
+        ]
+
+        result = await service.regenerate_site_configs(sites)
+
+        assert "Unknown nginx variant" in result.failed["a.conf"]
+        assert result.changed == ["b.conf"]
+        assert container.files["a.conf"] == "old a"
+        assert result.reloaded
+
+    @pytest.mark.asyncio
+    async def test_proxy_pass_keeps_reverse_proxy_variant(self, container):
+        """Test a deployed reverse-proxy site is re-rendered with its stored upstream."""
+        service = NginxConfigService()
+        container.files["p.conf"] = service.generate_wordpress_config(
+            "p", "p.example.com", "8.2", variant="reverse-proxy", proxy_pass="http://app:3000"
+        )
+
+        result = await service.regenerate_site_configs(
+            [SiteConfig("p", "p.example.com", "8.2", proxy_pass="http://app:4000")]
+        )
+
+        assert result.changed == ["p.conf"]
+        assert "proxy_pass http://app:4000;" in container.files["p.conf"]
@@ -0,0 +1,50 @@
+"""Tests for blog Redis statistics."""
+
+from app.routers.dashboard import RedisStats
+from app.services.redis_stats import summarize_redis_stats
+
+
+class TestSummarizeRedisStats:
+    """Tests for summarize_redis_stats."""
+
+    def test_summary(self):
+        """Test that raw replies are summarized into dashboard stats."""
+        info = {
+            "used_memory": 128 * 1024 * 1024,
+            "total_system_memory": 8 * 1024 ** 3,
+            "maxmemory_policy": "allkeys-lru",
+            "keyspace_hits": 90,
+            "keyspace_misses": 10,
+            "evicted_keys": 3,
+            "expired_keys": 7,
+            "total_commands_processed": 1000,
+            "connected_clients": 5,
+            "uptime_in_seconds": 86400 * 2 + 5,
+            "db0": {"keys": 10, "expires": 2, "avg_ttl": 100},
+            "db1": {"keys": 5, "expires": 0, "avg_ttl": 0},
+        }
+        slowlog = [{"id": 1, "start_time": 1700000000, "duration": 15000, "command": "KEYS *"}]
+        latency = [["command", 1700000000, 12, 30]]
+
+        stats = summarize_redis_stats(info, 512 * 1024 * 1024, slowlog, 1, latency)
+
+        assert stats["memory_total_mb"] == 512.0
+        assert stats["memory_percent"] == 25.0
+        assert stats["total_keys"] == 15
+        assert stats["cache_hit_rate"] == 90.0
+        assert stats["uptime_days"] == 2
+        assert stats["keyspace"]["db0"] == {"keys": 10, "expires": 2, "avg_ttl": 100}
+        assert stats["slowlog"][0]["duration_us"] == 15000
+        assert stats["latency_events"][0]["max_ms"] == 30
+
+        # Shape matches the dashboard response model
+        assert RedisStats(**stats).evicted_keys == 3
+
+    def test_no_maxmemory_uses_system_memory(self):
+        """Test that an unlimited Redis reports host memory as the total."""
+        info = {"used_memory": 1024 * 1024, "total_system_memory": 1024 * 1024 * 1024}
+
+        stats = summarize_redis_stats(info, 0, [], 0, [])
+
+        assert stats["memory_total_mb"] == 1024.0
+        assert stats["cache_hit_rate"] == 0.0
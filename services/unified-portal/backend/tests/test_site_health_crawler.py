@@ -0,0 +1,120 @@
+"""Tests for the WordPress site health crawler."""
+
+import asyncio
+import time
+
+import pytest
+
+from app.services.site_health_crawler import SiteHealth, SiteHealthCrawler
+from app.services.site_registry import SiteRecord
+
+SITES = [
+    SiteRecord(name="site-a", url="https://a.example.com"),
+    SiteRecord(name="site-b", url="https://b.example.com"),
+    SiteRecord(name="site-c", url="https://c.example.com"),
+]
+
+
+async def healthy(site):
+    """Check that always reports the site online."""
+    return SiteHealth(
+        name=site.name,
+        url=site.url,
+        status="online",
+        plugins=[{"name": "akismet", "update_available": True}],
+        redis_connected=True,
+    )
+
+
+class TestSiteHealthCrawler:
+    """Tests for SiteHealthCrawler."""
+
+    def test_unchecked_sites_are_unknown(self):
+        """Test that sites without a check are reported as unknown."""
+        crawler = SiteHealthCrawler(lambda: SITES, healthy)
+
+        results = crawler.all()
+
+        assert [health.name for health in results] == ["site-a", "site-b", "site-c"]
+        assert all(health.status == "unknown" for health in results)
+
+    @pytest.mark.asyncio
+    async def test_refresh_caches_results(self):
+        """Test that refreshed results are served from the cache."""
+        crawler = SiteHealthCrawler(lambda: SITES, healthy)
+
+        await crawler.refresh()
+        results = crawler.all()
+
+        assert all(health.status == "online" for health in results)
+        assert all(health.last_checked > 0 for health in results)
+        assert results[0].plugin_updates == 1
+
+    @pytest.mark.asyncio
+    async def test_refresh_selected_sites(self):
+        """Test that only the named sites are checked."""
+        crawler = SiteHealthCrawler(lambda: SITES, healthy)
+
+        results = await crawler.refresh(["site-b"])
+
+        assert [health.name for health in results] == ["site-b"]
+        assert crawler.get(SITES[0]).status == "unknown"
+
+    @pytest.mark.asyncio
+    async def test_failed_check_is_offline(self):
+        """Test that a raising check marks the site offline."""
+        async def failing(site):
+            raise RuntimeError("wp-cli command failed: database error")
+
+        crawler = SiteHealthCrawler(lambda: SITES, failing)
+
+        await crawler.refresh()
+        health = crawler.get(SITES[0])
+
+        assert health.status == "offline"
+        assert "database error" in health.error
+
+    @pytest.mark.asyncio
+    async def test_concurrency_is_bounded(self):
+        """Test that no more than `concurrency` checks run at once."""
+        active = 0
+        peak = 0
+
+        async def slow(site):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            return await healthy(site)
+
+        sites = [SiteRecord(name=f"site-{i}", url=f"https://{i}.example.com") for i in range(10)]
+        crawler = SiteHealthCrawler(lambda: sites, slow, concurrency=3)
+
+        await crawler.refresh()
+
+        assert peak == 3
+
+    @pytest.mark.asyncio
+    async def test_expired_results_are_unknown(self):
+        """Test that results older than the TTL are no longer trusted."""
+        crawler = SiteHealthCrawler(lambda: SITES, healthy, ttl=60)
+
+        await crawler.refresh()
+        crawler._cache["site-a"].last_checked = time.time() - 120
+        health = crawler.get(SITES[0])
+
+        assert health.status == "unknown"
+        assert health.error == "Health check expired"
+
+    @pytest.mark.asyncio
+    async def test_removed_sites_are_dropped(self):
+        """Test that sites no longer configured are evicted from the cache."""
+        sites = list(SITES)
+        crawler = SiteHealthCrawler(lambda: sites, healthy)
+
+        await crawler.refresh()
+        sites.pop()
+        await crawler.refresh()
+
+        assert "site-c" not in crawler._cache
@@ -0,0 +1,142 @@
+"""Tests for the site registry."""
+
+import threading
+import time
+
+import pytest
+
+from app.services.site_registry import SiteRegistry, parse_nginx_sites
+
+SEEDS = [
+    {"name": "blog-a", "url": "https://a.example.com", "database": "wp_blog_a"},
+    {"name": "blog-b", "url": "https://b.example.com", "database": "wp_shared"},
+    {"name": "blog-b-legacy", "url": "https://legacy.example.com", "database": "wp_shared"},
+]
+
+NGINX_CONF = """
+server {
+    listen 80;
+    server_name a.example.com www.a.example.com;
+
+    root /var/www/html/blog-a;
+
+    location / {
+        root /var/www/html/blog-a;
+    }
+}
+
+server {
+    listen 80;
+    server_name new.example.com;
+    root /var/www/html/nginx-only;
+}
+
+server {
+    listen 80;
+    server_name portal.example.com;
+    root /usr/share/nginx/html;
+}
+"""
+
+
+class TestParseNginxSites:
+    """Tests for nginx config parsing."""
+
+    def test_parse(self):
+        """Test that site roots are paired with their server names."""
+        assert parse_nginx_sites(NGINX_CONF) == [
+            ("blog-a", ["a.example.com", "www.a.example.com"]),
+            ("nginx-only", ["new.example.com"]),
+        ]
+
+
+class TestSiteRegistry:
+    """Tests for SiteRegistry."""
+
+    def make_registry(self, tmp_path, rows=None):
+        (tmp_path / "sites.conf").write_text(NGINX_CONF)
+        (tmp_path / "sites.conf.pre-migration").write_text("root /var/www/html/ignored;")
+        calls = []
+
+        def load_managed():
+            calls.append(1)
+            if rows is None:
+                raise ConnectionError("database down")
+            return rows
+
+        return SiteRegistry(seed_sites=SEEDS, nginx_conf_dir=str(tmp_path), load_managed=load_managed), calls
+
+    def test_merges_sources(self, tmp_path):
+        """Test that seed, nginx and managed sites are merged and indexed."""
+        rows = [
+            (1, "managed", "managed.example.com", "wp_managed", "8.2", True),
+            (2, "blog-b", "b.example.com", "wp_shared", "8.1", False),
+        ]
+        registry, _ = self.make_registry(tmp_path, rows)
+
+        names = [site.name for site in registry.all()]
+        assert names == ["blog-a", "blog-b", "blog-b-legacy", "nginx-only", "managed"]
+        assert "blog-b" not in [site.name for site in registry.all(enabled_only=True)]
+
+        assert registry.get("blog-a").nginx_config == "sites.conf"
+        assert registry.by_domain("www.a.example.com").name == "blog-a"
+        assert registry.by_domain("NEW.example.com.").name == "nginx-only"
+        assert registry.get("managed").managed
+        assert registry.get("blog-b").php_version == "8.1"
+        assert [site.name for site in registry.by_database("wp_shared")] == ["blog-b", "blog-b-legacy"]
+        assert registry.by_database("wp_unknown") == []
+        assert registry.get("missing") is None
+
+    def test_loaded_once_until_invalidated(self, tmp_path):
+        """Test that lookups reuse the indexes until invalidated."""
+        rows = []
+        registry, calls = self.make_registry(tmp_path, rows)
+
+        registry.get("blog-a")
+        registry.by_domain("a.example.com")
+        assert len(calls) == 1
+
+        rows.append((3, "added", "added.example.com", "wp_added", "8.2", True))
+        assert registry.get("added") is None
+
+        registry.invalidate()
+        assert registry.get("added").database_name == "wp_added"
+        assert len(calls) == 2
+
+    def test_database_failure(self, tmp_path):
+        """Test that seed and nginx sites are served while the database is down."""
+        registry, calls = self.make_registry(tmp_path)
+
+        assert registry.get("blog-a") is not None
+        registry.get("blog-b")
+        assert len(calls) == 1
+
+        registry.retry_seconds = 0
+        registry.get("blog-a")
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_invalidate_reloads_off_loop(self, tmp_path):
+        """Test lookups serve the previous snapshot while a worker thread reloads."""
+        rows = []
+        registry, calls = self.make_registry(tmp_path, rows)
+        await registry.load()
+        threads = []
+        build = registry._build
+
+        def slow_build():
+            threads.append(threading.current_thread())
+            time.sleep(0.05)
+            return build()
+
+        registry._build = slow_build
+        rows.append((3, "added", "added.example.com", "wp_added", "8.2", True))
+        registry.invalidate()
+
+        assert registry.get("added") is None
+        assert registry.get("blog-a") is not None
+
+        await registry.load()
+        assert registry.get("added").database_name == "wp_added"
+        assert len(calls) == 2
+        assert threads and threading.main_thread() not in threads
@@ -1,7 +1,9 @@
 """Tests for WordPress management API endpoints."""
 
+import asyncio
+
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 
 class TestWordPressSitesList:
@@ -148,3 +150,68 @@ class TestWordPressStats:
         assert "sites_online" in data
         assert "total_plugins" in data
         assert "redis_enabled_sites" in data
+
+
+class TestCollectSiteHealth:
+    """Tests for the per-site health check run by the crawler."""
+
+    class FakeProber:
+        """HTTP prober stub answering every probe with one status."""
+
+        def __init__(self, delay=0.0):
+            self.delay = delay
+            self.cancelled = False
+
+        async def probe(self, target):
+            from collections import deque
+            from app.services.http_prober import ProbeResult, SiteProbeStats
+
+            try:
+                await asyncio.sleep(self.delay)
+            except asyncio.CancelledError:
+                self.cancelled = True
+                raise
+            return SiteProbeStats(name=target.name, url=target.url, history=deque([
+                ProbeResult(status_code=200, latency_ms=1.0, checked_at=0.0)
+            ]))
+
+    @pytest.mark.asyncio
+    async def test_plugin_list_with_php_notices(self):
+        """Test that notices before the plugin JSON do not mark the site offline."""
+        from app.routers import wordpress
+        from app.services.docker_client import ExecResult
+        from app.services.site_registry import SiteRecord
+
+        results = [
+            ExecResult(0, "6.4.2\n", ""),
+            ExecResult(0, "8.2.10", ""),
+            ExecResult(0, "twentytwentyfour\n", ""),
+            ExecResult(0, "PHP Notice: Undefined index\n[{\"name\": \"akismet\"}]", ""),
+            ExecResult(0, "Status: Connected\n", ""),
+        ]
+        with patch.object(wordpress, "run_wp_cli_batch", AsyncMock(return_value=results)), \
+                patch.object(wordpress, "get_http_prober", return_value=self.FakeProber()):
+            health = await wordpress.collect_site_health(SiteRecord(name="a", url="https://a.example.com"))
+
+        assert health.status == "online"
+        assert health.plugins == []
+        assert health.wp_version == "6.4.2"
+
+    @pytest.mark.asyncio
+    async def test_probe_task_cancelled_on_unexpected_error(self):
+        """Test that the HTTP probe is not orphaned when the wp-cli batch fails unexpectedly."""
+        from app.routers import wordpress
+        from app.services.site_registry import SiteRecord
+
+        prober = self.FakeProber(delay=10)
+
+        async def failing_batch(site_path, commands):
+            await asyncio.sleep(0)  # let the probe start
+            raise ValueError("bad output")
+
+        with patch.object(wordpress, "run_wp_cli_batch", failing_batch), \
+                patch.object(wordpress, "get_http_prober", return_value=prober):
+            with pytest.raises(ValueError):
+                await wordpress.collect_site_health(SiteRecord(name="a", url="https://a.example.com"))
+
+        assert prober.cancelled
@@ -0,0 +1,183 @@
+"""Tests for the persistent wp-cli worker pool and batch runner."""
+
+import asyncio
+import base64
+import json
+import re
+import struct
+
+import pytest
+
+from app.services.docker_client import ExecResult
+from app.services.wp_cli_service import (
+    BATCH_MARKER,
+    OPCACHE_DIR,
+    WP_CLI_PHP_ARGS,
+    WpCliPool,
+    build_batch_args,
+    parse_batch_output,
+)
+
+
+def frame(stream_type: int, payload: bytes) -> bytes:
+    """Encode a multiplexed stream frame."""
+    return struct.pack(">BxxxL", stream_type, len(payload)) + payload
+
+
+class FakeShell:
+    """Fake attached `sh` session answering wp-cli commands."""
+
+    def __init__(self, reader: asyncio.StreamReader):
+        self.reader = reader
+        self.commands = []
+        self.closed = False
+
+    def write(self, data: bytes) -> None:
+        line = data.decode()
+        match = re.search(r'echo "(__WPCLI_DONE_\w+) \$\?"', line)
+        if not match:
+            return
+        self.commands.append(line)
+        marker = match.group(1).encode()
+        if "core version" in line:
+            output, code = b"6.4.2\n", b"0"
+        else:
+            output, code = b"", b"1"
+            self.reader.feed_data(frame(2, b"Error: unknown command\n"))
+        # Marker may arrive split over several frames
+        self.reader.feed_data(frame(1, output + marker[:5]))
+        self.reader.feed_data(frame(1, marker[5:] + b" " + code + b"\n"))
+        self.reader.feed_data(frame(2, marker + b"\n"))
+
+    async def drain(self) -> None:
+        pass
+
+    def is_closing(self) -> bool:
+        return self.closed
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class FakeDocker:
+    """Docker client stub creating fake shell sessions."""
+
+    def __init__(self, opcache_ok: bool = True):
+        self.sessions = []
+        self.execs = []
+        self.opcache_ok = opcache_ok
+
+    async def exec(self, container, cmd, env=None, workdir=None, user=None, timeout=None):
+        self.execs.append((cmd, user))
+        if self.opcache_ok:
+            return ExecResult(exit_code=0, stdout="", stderr="")
+        return ExecResult(exit_code=1, stdout="", stderr="")
+
+    async def exec_attach(self, container, cmd, env=None, workdir=None, user=None):
+        reader = asyncio.StreamReader()
+        shell = FakeShell(reader)
+        self.sessions.append(shell)
+        return reader, shell
+
+
+class TestWpCliPool:
+    """Tests for WpCliPool."""
+
+    @pytest.mark.asyncio
+    async def test_commands_reuse_session(self):
+        """Test that consecutive commands run in one persistent session."""
+        docker = FakeDocker()
+        pool = WpCliPool(docker=docker, container="blog-wordpress", size=1)
+
+        first = await pool.run(["--path=/var/www/html/site", "core", "version"])
+        second = await pool.run(["--path=/var/www/html/site", "core", "version"])
+
+        assert first.exit_code == 0
+        assert first.stdout == "6.4.2\n"
+        assert second.stdout == "6.4.2\n"
+        assert len(docker.sessions) == 1
+        assert len(docker.sessions[0].commands) == 2
+
+    @pytest.mark.asyncio
+    async def test_failed_command_reports_stderr(self):
+        """Test exit code and stderr of a failing command."""
+        pool = WpCliPool(docker=FakeDocker(), container="blog-wordpress", size=1)
+
+        result = await pool.run(["nope"])
+
+        assert result.exit_code == 1
+        assert result.stderr == "Error: unknown command\n"
+
+    @pytest.mark.asyncio
+    async def test_timeout_discards_session(self):
+        """Test that a timed out session is replaced."""
+        docker = FakeDocker()
+        pool = WpCliPool(docker=docker, container="blog-wordpress", size=1)
+
+        # Session answers nothing for this command
+        await pool.run(["core", "version"])
+        docker.sessions[0].write = lambda data: None
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.run(["core", "version"], timeout=0.05)
+
+        assert docker.sessions[0].closed
+        await pool.run(["core", "version"])
+        assert len(docker.sessions) == 2
+
+    @pytest.mark.asyncio
+    async def test_opcache_dir_verified_as_root(self):
+        """Test the opcache directory is created/verified before each session."""
+        docker = FakeDocker()
+        pool = WpCliPool(docker=docker, container="blog-wordpress", size=1)
+
+        await pool.run(["core", "version"])
+
+        cmd, user = docker.execs[0]
+        assert user == "root"
+        assert cmd[-2:] == [OPCACHE_DIR, "www-data"]
+        assert not OPCACHE_DIR.startswith("/tmp")
+        assert "file_cache_consistency_checks=0" not in WP_CLI_PHP_ARGS
+
+    @pytest.mark.asyncio
+    async def test_foreign_opcache_dir_refuses_session(self):
+        """Test no session starts if the opcache directory is not private."""
+        docker = FakeDocker(opcache_ok=False)
+        pool = WpCliPool(docker=docker, container="blog-wordpress", size=1)
+
+        with pytest.raises(PermissionError):
+            await pool.run(["core", "version"])
+
+        assert docker.sessions == []
+
+
+class TestBatch:
+    """Tests for the wp-cli batch runner helpers."""
+
+    def test_build_batch_args(self):
+        """Test commands are encoded inline into one eval call."""
+        args = build_batch_args([["core", "version"], ["option", "get", "blog name"]])
+
+        assert args[0] == "eval"
+        assert len(args) == 2
+        encoded = re.search(r"base64_decode\('([A-Za-z0-9+/=]+)'\)", args[1]).group(1)
+        assert json.loads(base64.b64decode(encoded)) == ["core version", "option get 'blog name'"]
+
+    def test_parse_batch_output(self):
+        """Test per-command results are parsed after the marker."""
+        payload = [
+            {"exit_code": 0, "stdout": "6.4.2", "stderr": ""},
+            {"exit_code": 1, "stdout": "", "stderr": "Error: not installed"},
+        ]
+        result = ExecResult(exit_code=0, stdout="Notice: noise\n" + BATCH_MARKER + json.dumps(payload), stderr="")
+
+        results = parse_batch_output(result)
+
+        assert [r.exit_code for r in results] == [0, 1]
+        assert results[0].stdout == "6.4.2"
+        assert results[1].stderr == "Error: not installed"
+
+    def test_parse_batch_output_without_marker(self):
+        """Test a batch that never ran is reported as None."""
+        result = ExecResult(exit_code=1, stdout="", stderr="Error: This does not seem to be a WordPress installation.")
+
+        assert parse_batch_output(result) is None